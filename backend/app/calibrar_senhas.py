@@ -0,0 +1,56 @@
+"""
+Script para calibrar o custo do hash de senhas no servidor de produção
+Execute: python -m app.calibrar_senhas [--esquema bcrypt|argon2] [--alvo-ms 250]
+"""
+import argparse
+
+from app.config import SENHAS_ARGON2_MEMORIA_KIB, SENHAS_ARGON2_PARALELISMO, SENHAS_ESQUEMA, SENHAS_TRABALHADORES
+from app.services.senhas import ESQUEMAS, calibrar
+
+# Nome da variável de ambiente de cada parâmetro da política
+_VARIAVEIS = {
+    "bcrypt_rounds": "SENHAS_BCRYPT_ROUNDS",
+    "argon2_time_cost": "SENHAS_ARGON2_TIME_COST",
+    "argon2_memoria_kib": "SENHAS_ARGON2_MEMORIA_KIB",
+    "argon2_paralelismo": "SENHAS_ARGON2_PARALELISMO",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o hash de senhas e sugere a política para uma latência alvo")
+    parser.add_argument("--esquema", choices=ESQUEMAS, default=SENHAS_ESQUEMA)
+    parser.add_argument(
+        "--alvo-ms",
+        type=float,
+        default=250,
+        help="Tempo máximo de um hash em ms (≈ custo da verificação no login; padrão: 250)"
+    )
+    parser.add_argument("--memoria-kib", type=int, default=SENHAS_ARGON2_MEMORIA_KIB, help="Memória do argon2")
+    parser.add_argument("--paralelismo", type=int, default=SENHAS_ARGON2_PARALELISMO, help="Paralelismo do argon2")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Hashes medidos por combinação")
+    args = parser.parse_args()
+
+    print(f"Calibrando {args.esquema} para {args.alvo_ms:.0f} ms por hash...")
+    recomendados, medicoes = calibrar(
+        args.esquema, args.alvo_ms, args.memoria_kib, args.paralelismo, args.repeticoes
+    )
+
+    for medicao in medicoes:
+        parametros = ", ".join(f"{nome}={valor}" for nome, valor in medicao.parametros.items())
+        marca = "  <- recomendado" if medicao.parametros == recomendados else ""
+        print(f"   {parametros}: {medicao.milissegundos:.0f} ms{marca}")
+
+    escolhida = next(m for m in medicoes if m.parametros == recomendados)
+    if escolhida.milissegundos > args.alvo_ms:
+        print(f"⚠️  Nem o menor custo medido cabe em {args.alvo_ms:.0f} ms neste servidor")
+
+    vazao = SENHAS_TRABALHADORES * 1000 / escolhida.milissegundos
+    print(f"Capacidade estimada: ~{vazao:.0f} logins/s com SENHAS_TRABALHADORES={SENHAS_TRABALHADORES}")
+    print("Configure e reinicie a API (hashes antigos são refeitos no próximo login):")
+    print(f"   SENHAS_ESQUEMA={args.esquema}")
+    for nome, valor in recomendados.items():
+        print(f"   {_VARIAVEIS[nome]}={valor}")
+
+
+if __name__ == "__main__":
+    main()
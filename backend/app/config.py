@@ -9,6 +9,63 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# RS256/ES256: chaves PEM em JWT_CHAVES_DIRETORIO (<kid>.pem) e kid da chave que assina
+JWT_CHAVES_DIRETORIO = os.getenv("JWT_CHAVES_DIRETORIO", "")
+JWT_CHAVE_ATIVA = os.getenv("JWT_CHAVE_ATIVA", "")
+JWKS_CACHE_CONTROL = os.getenv("JWKS_CACHE_CONTROL", "public, max-age=300")
 
 # Configurações do Banco de Dados
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./banco.db")
+# Opcional: por padrão é derivada de DATABASE_URL (ex.: sqlite -> sqlite+aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Catálogo em memória: intervalo para conferir escritas feitas por outros processos
+CATALOGO_REVALIDAR_SEGUNDOS = float(os.getenv("CATALOGO_REVALIDAR_SEGUNDOS", "30"))
+
+# Idempotency-Key em POST /pedidos (respostas na tabela idempotencia_respostas)
+IDEMPOTENCIA_TTL_SEGUNDOS = float(os.getenv("IDEMPOTENCIA_TTL_SEGUNDOS", "86400"))
+# Intervalo mínimo entre remoções em lote das respostas vencidas
+IDEMPOTENCIA_LIMPEZA_SEGUNDOS = float(os.getenv("IDEMPOTENCIA_LIMPEZA_SEGUNDOS", "300"))
+# Tempo máximo de uma requisição em andamento; depois disso a chave é considerada abandonada
+IDEMPOTENCIA_PENDENTE_SEGUNDOS = float(os.getenv("IDEMPOTENCIA_PENDENTE_SEGUNDOS", "30"))
+
+# Executor dedicado para hash/verificação de senhas ("thread" ou "processo")
+SENHAS_EXECUTOR = os.getenv("SENHAS_EXECUTOR", "thread")
+SENHAS_TRABALHADORES = int(os.getenv("SENHAS_TRABALHADORES", str(os.cpu_count() or 2)))
+SENHAS_FILA_MAXIMA = int(os.getenv("SENHAS_FILA_MAXIMA", "64"))
+
+# Política de hash de senhas ("bcrypt" ou "argon2"; argon2 requer o pacote argon2-cffi)
+# Hashes fora da política são refeitos no próximo login. Calibre com: python -m app.calibrar_senhas
+SENHAS_ESQUEMA = os.getenv("SENHAS_ESQUEMA", "bcrypt")
+SENHAS_BCRYPT_ROUNDS = int(os.getenv("SENHAS_BCRYPT_ROUNDS", "12"))
+SENHAS_ARGON2_TIME_COST = int(os.getenv("SENHAS_ARGON2_TIME_COST", "3"))
+SENHAS_ARGON2_MEMORIA_KIB = int(os.getenv("SENHAS_ARGON2_MEMORIA_KIB", "65536"))
+SENHAS_ARGON2_PARALELISMO = int(os.getenv("SENHAS_ARGON2_PARALELISMO", "4"))
+# Segredo (HMAC-SHA256) aplicado antes do hash, guardado fora do banco; não pode ser trocado depois de usado
+SENHAS_PEPPER = os.getenv("SENHAS_PEPPER", "")
+
+# Métricas Prometheus: intervalo para ressincronizar os medidores com o banco (0 desativa)
+METRICAS_RESSINCRONIZAR_SEGUNDOS = float(os.getenv("METRICAS_RESSINCRONIZAR_SEGUNDOS", "300"))
+
+# Sincronização incremental do cardápio (GET /cardapio/mudancas)
+# Versões mais antigas que a retenção, ou com mais itens alterados que o máximo, pedem ressincronização completa
+MUDANCAS_RETENCAO_DIAS = int(os.getenv("MUDANCAS_RETENCAO_DIAS", "30"))
+MUDANCAS_MAXIMO_ITENS = int(os.getenv("MUDANCAS_MAXIMO_ITENS", "1000"))
+
+# Cache-Control dos recursos públicos do catálogo com ETag/Last-Modified (padrão: sempre revalidar)
+CACHE_CONTROL_CATALOGO = os.getenv("CACHE_CONTROL_CATALOGO", "public, no-cache")
+
+# Cardápio publicado como arquivos estáticos para nginx/CDN a cada alteração do catálogo (vazio desativa)
+PUBLICACAO_DIRETORIO = os.getenv("PUBLICACAO_DIRETORIO", "")
+# Arquivos versionados sem uso há menos que isso não são removidos (outros workers podem referenciá-los)
+PUBLICACAO_RETENCAO_SEGUNDOS = float(os.getenv("PUBLICACAO_RETENCAO_SEGUNDOS", "3600"))
+
+# Cache dos usuários autenticados (id, ativo, admin) em obter_usuario_atual
+USUARIOS_CACHE_TTL_SEGUNDOS = float(os.getenv("USUARIOS_CACHE_TTL_SEGUNDOS", "60"))
+USUARIOS_CACHE_MAX_ENTRADAS = int(os.getenv("USUARIOS_CACHE_MAX_ENTRADAS", "10000"))
+
+# Memo das claims de tokens JWT já verificados (0 desativa)
+TOKENS_MEMO_MAX_ENTRADAS = int(os.getenv("TOKENS_MEMO_MAX_ENTRADAS", "10000"))
+
+# Mapa de revogação (versão mínima de token por usuário): conferência de escritas de outros processos
+REVOGACAO_REVALIDAR_SEGUNDOS = float(os.getenv("REVOGACAO_REVALIDAR_SEGUNDOS", "30"))
@@ -1,10 +1,42 @@
 """Configuração do banco de dados"""
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, ASYNC_DATABASE_URL
+
+# Drivers assíncronos usados quando ASYNC_DATABASE_URL não é informada
+DRIVERS_ASYNC = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def url_assincrona(url: str) -> str:
+    """Converte a URL síncrona do banco para o driver assíncrono equivalente"""
+    url_banco = make_url(url)
+    driver = DRIVERS_ASYNC.get(url_banco.get_backend_name())
+    if driver is None:
+        return url
+    return url_banco.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def argumentos_conexao(url: str) -> dict:
+    """Argumentos de conexão específicos do backend"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
 
 # Criando conexão com o banco de dados
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(DATABASE_URL, connect_args=argumentos_conexao(DATABASE_URL))
+
+# Conexão assíncrona para as rotas async def
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL or url_assincrona(DATABASE_URL),
+    connect_args=argumentos_conexao(DATABASE_URL)
+)
 
 # Criando base para os modelos
 Base = declarative_base()
@@ -12,6 +44,15 @@ Base = declarative_base()
 # Criando SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessões assíncronas não expiram objetos no commit: depois do commit não há
+# lazy load implícito (que exigiria I/O fora de um await)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def get_db():
     """Dependency para obter sessão do banco de dados"""
@@ -20,3 +61,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency para obter sessão assíncrona do banco de dados (rotas async def)"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,32 +1,36 @@
 """Dependências reutilizáveis para autenticação e autorização"""
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.models import Usuario
-from app.config import SECRET_KEY, ALGORITHM
+from app.database import get_async_db
 from app.exceptions import UsuarioInativo, SemPermissao
+from app.services.identidade import UsuarioAutenticado, usuario_do_token
+from app.services.tokens import decodificar_token
 
 
 # Schema de segurança Bearer
 security = HTTPBearer()
 
 
-def obter_usuario_atual(
+async def obter_usuario_atual(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Usuario:
+    db: AsyncSession = Depends(get_async_db)
+) -> UsuarioAutenticado:
     """
     Dependência que valida o token JWT e retorna o usuário autenticado
 
+    A autorização vem das claims do token (adm, atv), conferidas contra o
+    mapa de revogação; tokens antigos ou desatualizados usam o cache de
+    usuários. O banco só é consultado quando mapa ou cache não têm o usuário.
+
     Args:
         credentials: Credenciais Bearer token do header Authorization
-        db: Sessão do banco de dados
+        db: Sessão do banco de dados (usada só em uma falha do mapa ou do cache)
 
     Returns:
-        Usuario autenticado
+        UsuarioAutenticado (id, ativo e admin)
 
     Raises:
         HTTPException: Se token inválido ou usuário não encontrado
@@ -40,8 +44,8 @@ def obter_usuario_atual(
     )
 
     try:
-        # Decodificar token JWT
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Decodificar token JWT (tokens repetidos vêm do memo)
+        payload = decodificar_token(token)
         usuario_id: str = payload.get("sub")
 
         if usuario_id is None:
@@ -50,8 +54,8 @@ def obter_usuario_atual(
     except JWTError:
         raise credentials_exception
 
-    # Buscar usuário no banco
-    usuario = db.query(Usuario).filter(Usuario.id == int(usuario_id)).first()
+    # Usuário das claims (ou do cache/banco se o token estiver desatualizado)
+    usuario = await usuario_do_token(db, payload)
 
     if usuario is None:
         raise credentials_exception
@@ -64,8 +68,8 @@ def obter_usuario_atual(
 
 
 def obter_usuario_admin(
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
-) -> Usuario:
+    usuario_atual: UsuarioAutenticado = Depends(obter_usuario_atual)
+) -> UsuarioAutenticado:
     """
     Dependência que verifica se o usuário autenticado é administrador
 
@@ -73,7 +77,7 @@ def obter_usuario_admin(
         usuario_atual: Usuário obtido da dependência obter_usuario_atual
 
     Returns:
-        Usuario administrador
+        UsuarioAutenticado administrador
 
     Raises:
         SemPermissao: Se usuário não for administrador
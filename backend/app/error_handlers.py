@@ -8,15 +8,20 @@ from jose.exceptions import JWTError
 from app.exceptions import PizzariaException
 
 
+def corpo_erro(exc: PizzariaException, caminho: str) -> dict:
+    """Corpo JSON das respostas de erro da pizzaria"""
+    return {
+        "error": exc.__class__.__name__,
+        "message": exc.message,
+        "path": caminho
+    }
+
+
 async def pizzaria_exception_handler(request: Request, exc: PizzariaException):
     """Handler para exceções customizadas da pizzaria"""
     return JSONResponse(
         status_code=exc.status_code,
-        content={
-            "error": exc.__class__.__name__,
-            "message": exc.message,
-            "path": str(request.url)
-        }
+        content=corpo_erro(exc, str(request.url))
     )
 
 
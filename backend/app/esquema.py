@@ -0,0 +1,77 @@
+"""
+Criação e atualização do esquema do banco na inicialização
+Execute manualmente: python -m app.esquema
+
+create_all só cria tabelas que não existem: colunas e índices novos em
+tabelas já existentes (token_versao em usuarios, índices de paginação e
+da sincronização do catálogo) nunca chegariam a um banco criado por uma
+versão anterior. Depois do create_all, atualizar_esquema compara cada
+tabela do modelo com o banco e adiciona o que falta:
+
+- colunas: ALTER TABLE ... ADD COLUMN, só para colunas que aceitam NULL
+  ou têm server_default (as linhas existentes precisam de um valor);
+- índices: CREATE INDEX para os índices do modelo ausentes no banco.
+
+É idempotente: com o esquema em dia, só lê o catálogo do banco.
+"""
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from app.database import Base
+import app.models.models  # noqa: F401 (registra as tabelas em Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+
+def atualizar_esquema(engine: Engine) -> List[str]:
+    """
+    Cria as tabelas ausentes e adiciona colunas e índices novos às existentes
+
+    Args:
+        engine: Engine síncrona do banco
+
+    Returns:
+        Comandos executados (vazio se o esquema já estava em dia)
+
+    Raises:
+        RuntimeError: Coluna nova obrigatória sem server_default (exige migração manual)
+    """
+    Base.metadata.create_all(bind=engine)
+
+    executados: List[str] = []
+    with engine.begin() as conexao:
+        inspetor = inspect(conexao)
+        for tabela in Base.metadata.sorted_tables:
+            existentes = {coluna["name"] for coluna in inspetor.get_columns(tabela.name)}
+            for coluna in tabela.columns:
+                if coluna.name in existentes:
+                    continue
+                if not coluna.nullable and coluna.server_default is None:
+                    raise RuntimeError(
+                        f"Coluna obrigatória {tabela.name}.{coluna.name} ausente no banco e sem server_default"
+                    )
+                definicao = CreateColumn(coluna).compile(dialect=conexao.dialect)
+                comando = f"ALTER TABLE {tabela.name} ADD COLUMN {definicao}"
+                conexao.execute(text(comando))
+                executados.append(comando)
+
+            indices = {indice["name"] for indice in inspetor.get_indexes(tabela.name)}
+            for indice in tabela.indexes:
+                if indice.name not in indices:
+                    indice.create(conexao)
+                    executados.append(f"CREATE INDEX {indice.name}")
+
+    for comando in executados:
+        logger.warning("Esquema do banco atualizado: %s", comando)
+    return executados
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    comandos = atualizar_esquema(engine)
+    print(f"✅ Esquema do banco em dia ({len(comandos)} alteração(ões) aplicada(s))")
@@ -128,3 +128,38 @@ class IngredienteObrigatorio(PizzariaException):
     def __init__(self, ingrediente_nome: str):
         message = f"Ingrediente '{ingrediente_nome}' é obrigatório e não pode ser removido"
         super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class ChaveIdempotenciaReutilizada(PizzariaException):
+    """Exceção quando uma Idempotency-Key é reutilizada com outro conteúdo"""
+    def __init__(self):
+        message = "Idempotency-Key já utilizada com um conteúdo de pedido diferente"
+        super().__init__(message, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+class ServicoSobrecarregado(PizzariaException):
+    """Exceção quando a fila de um recurso limitado está cheia"""
+    def __init__(self, recurso: str):
+        message = f"Serviço de {recurso} sobrecarregado, tente novamente em instantes"
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class CursorInvalido(PizzariaException):
+    """Exceção quando o cursor de paginação não pode ser decodificado"""
+    def __init__(self):
+        message = "Cursor de paginação inválido"
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class VersaoCatalogoInvalida(PizzariaException):
+    """Exceção quando a versão informada em /cardapio/mudancas não pode ser decodificada"""
+    def __init__(self):
+        message = "Versão do catálogo inválida"
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class CampoInvalido(PizzariaException):
+    """Exceção quando um campo pedido na projeção não existe"""
+    def __init__(self, campo: str, permitidos):
+        message = f"Campo inválido: {campo}. Permitidos: {', '.join(permitidos)}"
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
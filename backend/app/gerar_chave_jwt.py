@@ -0,0 +1,43 @@
+"""
+Script para gerar uma chave de assinatura dos tokens JWT (RS256/ES256)
+Execute: python -m app.gerar_chave_jwt [--algoritmo ES256] [--diretorio chaves] [--kid 2026-10]
+"""
+import argparse
+import sys
+
+from app.config import ALGORITHM, JWT_CHAVES_DIRETORIO
+from app.services.chaves import ALGORITMOS_ASSIMETRICOS, gerar_chave
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera uma chave privada PEM para assinar os tokens")
+    parser.add_argument(
+        "--algoritmo",
+        choices=ALGORITMOS_ASSIMETRICOS,
+        default=ALGORITHM if ALGORITHM in ALGORITMOS_ASSIMETRICOS else "RS256",
+        help="Algoritmo da chave (padrão: ALGORITHM, ou RS256 se ALGORITHM for HS*)"
+    )
+    parser.add_argument(
+        "--diretorio",
+        default=JWT_CHAVES_DIRETORIO or "chaves",
+        help="Diretório das chaves (padrão: JWT_CHAVES_DIRETORIO, ou ./chaves)"
+    )
+    parser.add_argument("--kid", help="Identificador da chave (padrão: data de hoje + sufixo aleatório)")
+    args = parser.parse_args()
+
+    try:
+        caminho = gerar_chave(args.diretorio, args.algoritmo, args.kid)
+    except ValueError as erro:
+        print(f"❌ {erro}")
+        sys.exit(1)
+
+    print(f"✅ Chave {args.algoritmo} gerada em {caminho}")
+    print("Para assinar com ela, configure e reinicie a API:")
+    print(f"   ALGORITHM={args.algoritmo}")
+    print(f"   JWT_CHAVES_DIRETORIO={caminho.parent}")
+    print(f"   JWT_CHAVE_ATIVA={caminho.stem}")
+    print("Mantenha a chave anterior no diretório até os tokens assinados com ela vencerem.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,19 @@
 Sistema de Gerenciamento de Pizzaria - Backend API
 FastAPI application para gerenciamento de pedidos de pizzaria
 """
+import asyncio
+import signal
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.exc import SQLAlchemyError
 from jose.exceptions import JWTError
 
-from app.database import engine, Base
+from app.database import engine
+from app.esquema import atualizar_esquema
 from app.routers import (
     auth_router,
     orders_router,
@@ -16,9 +22,14 @@ from app.routers import (
     health_router,
     categorias_router,
     ingredientes_router,
-    cardapio_router
+    cardapio_router,
+    chaves_router
 )
 from app.exceptions import PizzariaException
+from app.services.chaves import recarregar_chaves
+from app.services.publicacao import publicador_cardapio
+from app.services.senhas import executor_senhas
+from app.services.metricas import MetricasMiddleware
 from app.error_handlers import (
     pizzaria_exception_handler,
     validation_exception_handler,
@@ -27,16 +38,33 @@ from app.error_handlers import (
     generic_exception_handler
 )
 
-# Criar tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
+# Criar tabelas e adicionar colunas/índices novos a bancos de versões anteriores
+atualizar_esquema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia a publicação estática do cardápio e libera recursos no desligamento"""
+    publicador_cardapio.iniciar()
+    # kill -HUP <pid> relê JWT_CHAVES_DIRETORIO (só no Unix e na thread principal)
+    if hasattr(signal, "SIGHUP"):
+        with suppress(NotImplementedError, RuntimeError, ValueError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, recarregar_chaves)
+    yield
+    publicador_cardapio.encerrar()
+    executor_senhas.encerrar()
+
 
 # Inicializar aplicação FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title="API Pizzaria",
     description="Sistema de gerenciamento de pedidos para pizzaria",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # Rotas sem serializador próprio (app.services.serializacao) codificam com orjson
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS para permitir requisições do frontend
@@ -46,8 +74,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Proximo-Cursor", "ETag"],
 )
 
+# Contagem de requisições e latência por rota (/metrics)
+app.add_middleware(MetricasMiddleware)
+
 # Registrar exception handlers
 app.add_exception_handler(PizzariaException, pizzaria_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -58,6 +90,7 @@ app.add_exception_handler(Exception, generic_exception_handler)
 # Registrar routers
 app.include_router(health_router)
 app.include_router(auth_router)
+app.include_router(chaves_router)
 app.include_router(categorias_router)
 app.include_router(ingredientes_router)
 app.include_router(products_router)
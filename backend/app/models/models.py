@@ -1,5 +1,9 @@
 """Modelos SQLAlchemy para o sistema de pizzaria"""
-from sqlalchemy import Column, String, Integer, Boolean, Float, ForeignKey, UniqueConstraint, JSON
+from datetime import datetime
+from sqlalchemy import (
+    Column, String, Integer, Boolean, Float, ForeignKey, UniqueConstraint, Index, JSON, DateTime, LargeBinary,
+    insert_sentinel
+)
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.mixins import TimestampMixin, SoftDeleteMixin
@@ -15,6 +19,8 @@ class Usuario(Base, TimestampMixin, SoftDeleteMixin):
     senha = Column(String, nullable=False)
     ativo = Column(Boolean, default=True)
     admin = Column(Boolean, default=False)
+    # Incrementada quando ativo/admin mudam: tokens com versão menor têm claims desatualizadas
+    token_versao = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relacionamentos
     pedidos = relationship("Pedido", back_populates="usuario")
@@ -55,6 +61,11 @@ class Pedido(Base, TimestampMixin, SoftDeleteMixin):
     itens = relationship("ItemPedido", back_populates="pedido", cascade="all, delete-orphan")
     endereco_entrega = relationship("Endereco")
 
+    __table_args__ = (
+        # Paginação keyset da listagem administrativa
+        Index('ix_pedidos_created_at_id', 'created_at', 'id'),
+    )
+
 
 class Categoria(Base, TimestampMixin, SoftDeleteMixin):
     """Modelo de categoria do cardapio"""
@@ -70,6 +81,12 @@ class Categoria(Base, TimestampMixin, SoftDeleteMixin):
     # Relacionamentos
     produtos = relationship("Produto", back_populates="categoria")
 
+    __table_args__ = (
+        # Sincronização incremental (GET /cardapio/mudancas)
+        Index('ix_categorias_updated_at_id', 'updated_at', 'id'),
+        Index('ix_categorias_deleted_at_id', 'deleted_at', 'id'),
+    )
+
 
 class Ingrediente(Base, TimestampMixin, SoftDeleteMixin):
     """Modelo de ingrediente para customizacao"""
@@ -83,6 +100,12 @@ class Ingrediente(Base, TimestampMixin, SoftDeleteMixin):
     # Relacionamentos
     produtos = relationship("ProdutoIngrediente", back_populates="ingrediente")
 
+    __table_args__ = (
+        # Sincronização incremental (GET /cardapio/mudancas)
+        Index('ix_ingredientes_updated_at_id', 'updated_at', 'id'),
+        Index('ix_ingredientes_deleted_at_id', 'deleted_at', 'id'),
+    )
+
 
 class ProdutoVariacao(Base, TimestampMixin, SoftDeleteMixin):
     """Modelo de variacao de produto (tamanhos/precos)"""
@@ -100,6 +123,9 @@ class ProdutoVariacao(Base, TimestampMixin, SoftDeleteMixin):
     # Constraints
     __table_args__ = (
         UniqueConstraint('produto_id', 'tamanho', name='uq_produto_tamanho'),
+        # Sincronização incremental: produtos afetados sem ler a tabela
+        Index('ix_produtos_variacoes_updated_at_produto', 'updated_at', 'produto_id'),
+        Index('ix_produtos_variacoes_deleted_at_id', 'deleted_at', 'id'),
     )
 
 
@@ -120,6 +146,9 @@ class ProdutoIngrediente(Base, TimestampMixin):
     # Constraints
     __table_args__ = (
         UniqueConstraint('produto_id', 'ingrediente_id', name='uq_produto_ingrediente'),
+        # Sincronização incremental: produtos afetados sem ler a tabela
+        Index('ix_produtos_ingredientes_updated_at_produto', 'updated_at', 'produto_id'),
+        Index('ix_produtos_ingredientes_ingrediente_produto', 'ingrediente_id', 'produto_id'),
     )
 
 
@@ -139,6 +168,27 @@ class Produto(Base, TimestampMixin, SoftDeleteMixin):
     variacoes = relationship("ProdutoVariacao", back_populates="produto", cascade="all, delete-orphan")
     ingredientes = relationship("ProdutoIngrediente", back_populates="produto", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Sincronização incremental (GET /cardapio/mudancas)
+        Index('ix_produtos_updated_at_id', 'updated_at', 'id'),
+        Index('ix_produtos_deleted_at_id', 'deleted_at', 'id'),
+    )
+
+
+class RemocaoCatalogo(Base):
+    """Remoção física de item do catálogo (linhas apagadas não deixam updated_at/deleted_at)"""
+    __tablename__ = "catalogo_remocoes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tipo = Column(String, nullable=False)  # categoria, produto, variacao, ingrediente, ingrediente_padrao
+    entidade_id = Column(Integer, nullable=False)
+    produto_id = Column(Integer, nullable=True)  # Produto afetado (variações e ingredientes padrão)
+    removido_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('ix_catalogo_remocoes_removido_em', 'removido_em', 'tipo', 'entidade_id', 'produto_id'),
+    )
+
 
 class ItemPedido(Base, TimestampMixin):
     """Modelo de item do pedido"""
@@ -162,7 +212,51 @@ class ItemPedido(Base, TimestampMixin):
 
     observacoes = Column(String, nullable=True)
 
+    # Sentinela do INSERT em lote com RETURNING ordenado (sort_by_parameter_order):
+    # no SQLite o id autoincremental não serve de sentinela, então sem ela o
+    # SQLAlchemy faria um INSERT por item
+    sentinela = insert_sentinel("sentinela_insercao")
+
     # Relacionamentos
     pedido = relationship("Pedido", back_populates="itens")
     produto_variacao = relationship("ProdutoVariacao")
 
+
+
+class EstatisticaUsuario(Base):
+    """Estatísticas de pedidos por usuário, mantidas incrementalmente"""
+    __tablename__ = "estatisticas_usuarios"
+
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    total_pedidos = Column(Integer, nullable=False, default=0)
+    valor_total = Column(Float, nullable=False, default=0.0)
+
+    # Contagem por status
+    pendente = Column(Integer, nullable=False, default=0)
+    em_preparo = Column(Integer, nullable=False, default=0)
+    pronto = Column(Integer, nullable=False, default=0)
+    entregue = Column(Integer, nullable=False, default=0)
+    cancelado = Column(Integer, nullable=False, default=0)
+
+
+class RespostaIdempotente(Base):
+    """
+    Resposta de POST /pedidos guardada por Idempotency-Key
+
+    A linha é criada (status_code e corpo nulos) antes de processar o
+    pedido, reservando a chave, e preenchida na transação do pedido.
+    """
+    __tablename__ = "idempotencia_respostas"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Sem chave estrangeira: entradas (que expiram) não impedem a remoção do usuário
+    usuario_id = Column(Integer, nullable=False)
+    chave = Column(String(255), nullable=False)
+    impressao = Column(String(32), nullable=False)  # Impressão digital do corpo da requisição
+    status_code = Column(Integer)  # Nulo enquanto a requisição está em andamento
+    corpo = Column(LargeBinary)
+    expira_em = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint('usuario_id', 'chave', name='uq_idempotencia_usuario_chave'),
+    )
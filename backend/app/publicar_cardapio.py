@@ -0,0 +1,41 @@
+"""
+Script para gerar os arquivos estáticos do cardápio (nginx/CDN)
+Execute: python -m app.publicar_cardapio [--diretorio DIR]
+"""
+import argparse
+import sys
+
+from app.config import PUBLICACAO_DIRETORIO
+from app.database import engine, SessionLocal
+from app.esquema import atualizar_esquema
+from app.services.publicacao import publicar_cardapio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica o cardápio como arquivos estáticos pré-comprimidos")
+    parser.add_argument(
+        "--diretorio",
+        default=PUBLICACAO_DIRETORIO,
+        help="Diretório de publicação (padrão: PUBLICACAO_DIRETORIO)"
+    )
+    args = parser.parse_args()
+
+    if not args.diretorio:
+        print("❌ Informe --diretorio ou defina PUBLICACAO_DIRETORIO")
+        sys.exit(1)
+
+    atualizar_esquema(engine)
+    db = SessionLocal()
+    try:
+        manifest = publicar_cardapio(db, args.diretorio)
+    finally:
+        db.close()
+
+    compressoes = ", ".join(manifest["cardapio"]["compressoes"])
+    print(f"✅ Cardápio publicado em {args.diretorio} (versão {manifest['versao']})")
+    print(f"   • {manifest['cardapio']['arquivo']} ({manifest['cardapio']['tamanho']} bytes; {compressoes})")
+    print(f"   • {len(manifest['categorias'])} lista(s) de produtos por categoria")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Script para recalcular as estatísticas de pedidos por usuário a partir do histórico
+Execute: python -m app.recalcular_estatisticas [--verificar]
+"""
+import argparse
+import sys
+
+from app.database import engine, SessionLocal
+from app.esquema import atualizar_esquema
+from app.services.estatisticas import recalcular_estatisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula o ledger de estatísticas de pedidos")
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="Apenas compara o ledger com o histórico, sem gravar (sai com código 1 se divergir)"
+    )
+    args = parser.parse_args()
+
+    atualizar_esquema(engine)
+    db = SessionLocal()
+    try:
+        divergentes = recalcular_estatisticas(db, aplicar=not args.verificar)
+    finally:
+        db.close()
+
+    if not divergentes:
+        print("✅ Ledger de estatísticas consistente com o histórico de pedidos")
+        return
+
+    acao = "divergentes" if args.verificar else "corrigidos"
+    print(f"⚠️  {len(divergentes)} usuário(s) {acao}: {', '.join(map(str, divergentes))}")
+    if args.verificar:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
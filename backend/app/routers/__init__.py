@@ -6,6 +6,7 @@ from app.routers.health import router as health_router
 from app.routers.categorias import router as categorias_router
 from app.routers.ingredientes import router as ingredientes_router
 from app.routers.cardapio import router as cardapio_router
+from app.routers.chaves import router as chaves_router
 
 __all__ = [
     "auth_router",
@@ -14,5 +15,6 @@ __all__ = [
     "health_router",
     "categorias_router",
     "ingredientes_router",
-    "cardapio_router"
+    "cardapio_router",
+    "chaves_router"
 ]
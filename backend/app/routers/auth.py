@@ -1,28 +1,32 @@
 """Rotas de autenticação"""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from jose import JWTError
 from datetime import datetime, timedelta, timezone
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import Usuario
 from app.schemas import UsuarioSchema, UsuarioResponse, LoginSchema, TokenResponse, RefreshTokenRequest
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from app.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from app.exceptions import EmailJaCadastrado, CredenciaisInvalidas, UsuarioInativo
+from app.services.chaves import chaveiro
+from app.services.identidade import claims_usuario
+from app.services.senhas import verificar_e_atualizar_senha, gerar_hash_senha
+from app.services.tokens import decodificar_token
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
-# Contexto de criptografia
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def criar_token(usuario_id: int, duracao_token: timedelta) -> str:
+def criar_token(usuario: Usuario, duracao_token: timedelta) -> str:
     """
     Cria um token JWT para o usuário
 
+    Além de sub e exp, o token traz as claims de autorização (adm, atv) e
+    a versão do usuário (ver); as rotas autorizam só com o token enquanto
+    a versão não for revogada.
+
     Args:
-        usuario_id: ID do usuário
+        usuario: Usuário autenticado
         duracao_token: Duração de validade do token
 
     Returns:
@@ -30,13 +34,13 @@ def criar_token(usuario_id: int, duracao_token: timedelta) -> str:
     """
     data_expiracao = datetime.now(timezone.utc) + duracao_token
     claims = {
-        "sub": str(usuario_id),
+        **claims_usuario(usuario),
         "exp": data_expiracao
     }
-    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    return chaveiro.assinar(claims)
 
 
-def autenticar_usuario(email: str, senha: str, db: Session) -> Usuario | bool:
+async def autenticar_usuario(email: str, senha: str, db: AsyncSession) -> Usuario | bool:
     """
     Autentica um usuário verificando email e senha
 
@@ -47,12 +51,19 @@ def autenticar_usuario(email: str, senha: str, db: Session) -> Usuario | bool:
 
     Returns:
         Objeto Usuario se autenticado, False caso contrário
+
+    Um hash fora da política de senhas atual é refeito e gravado aqui, único
+    momento em que a senha em texto plano está disponível.
     """
-    usuario = db.query(Usuario).filter(Usuario.email == email).first()
+    usuario = await db.scalar(select(Usuario).where(Usuario.email == email))
     if not usuario:
         return False
-    if not bcrypt_context.verify(senha, usuario.senha):
+    valida, novo_hash = await verificar_e_atualizar_senha(senha, usuario.senha)
+    if not valida:
         return False
+    if novo_hash is not None:
+        usuario.senha = novo_hash
+        await db.commit()
     return usuario
 
 
@@ -66,7 +77,7 @@ async def home():
 
 
 @router.post("/criar_conta", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED, summary="Criar nova conta")
-async def criar_conta(usuario: UsuarioSchema, db: Session = Depends(get_db)):
+async def criar_conta(usuario: UsuarioSchema, db: AsyncSession = Depends(get_async_db)):
     """
     Cria uma nova conta de usuário
 
@@ -77,12 +88,12 @@ async def criar_conta(usuario: UsuarioSchema, db: Session = Depends(get_db)):
     - **admin**: Se o usuário é administrador (opcional, padrão: False)
     """
     # Verifica se o email já existe
-    usuario_existente = db.query(Usuario).filter(Usuario.email == usuario.email).first()
+    usuario_existente = await db.scalar(select(Usuario.id).where(Usuario.email == usuario.email))
     if usuario_existente:
         raise EmailJaCadastrado(usuario.email)
 
     # Criptografa a senha
-    senha_hash = bcrypt_context.hash(usuario.senha)
+    senha_hash = await gerar_hash_senha(usuario.senha)
 
     # Cria novo usuário
     novo_usuario = Usuario(
@@ -94,14 +105,14 @@ async def criar_conta(usuario: UsuarioSchema, db: Session = Depends(get_db)):
     )
 
     db.add(novo_usuario)
-    db.commit()
-    db.refresh(novo_usuario)
+    await db.commit()
+    await db.refresh(novo_usuario)
 
     return novo_usuario
 
 
 @router.post("/login", response_model=TokenResponse, summary="Fazer login")
-async def login(credenciais: LoginSchema, db: Session = Depends(get_db)):
+async def login(credenciais: LoginSchema, db: AsyncSession = Depends(get_async_db)):
     """
     Autentica um usuário e retorna tokens de acesso
 
@@ -110,7 +121,7 @@ async def login(credenciais: LoginSchema, db: Session = Depends(get_db)):
 
     Retorna access_token (30min) e refresh_token (7 dias)
     """
-    usuario = autenticar_usuario(credenciais.email, credenciais.senha, db)
+    usuario = await autenticar_usuario(credenciais.email, credenciais.senha, db)
 
     if not usuario:
         raise CredenciaisInvalidas()
@@ -120,11 +131,11 @@ async def login(credenciais: LoginSchema, db: Session = Depends(get_db)):
 
     # Cria tokens
     access_token = criar_token(
-        usuario.id,
+        usuario,
         timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     refresh_token = criar_token(
-        usuario.id,
+        usuario,
         timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     )
 
@@ -137,7 +148,7 @@ async def login(credenciais: LoginSchema, db: Session = Depends(get_db)):
 @router.post("/refresh", response_model=TokenResponse, summary="Renovar token de acesso")
 async def refresh_access_token(
     token_request: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Renova o access token usando um refresh token válido
@@ -154,11 +165,7 @@ async def refresh_access_token(
 
     try:
         # Decodificar refresh token
-        payload = jwt.decode(
-            token_request.refresh_token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM]
-        )
+        payload = decodificar_token(token_request.refresh_token)
         usuario_id: str = payload.get("sub")
 
         if usuario_id is None:
@@ -168,7 +175,7 @@ async def refresh_access_token(
         raise credentials_exception
 
     # Buscar usuário no banco
-    usuario = db.query(Usuario).filter(Usuario.id == int(usuario_id)).first()
+    usuario = await db.get(Usuario, int(usuario_id))
 
     if not usuario:
         raise credentials_exception
@@ -179,11 +186,11 @@ async def refresh_access_token(
 
     # Gerar novos tokens
     new_access_token = criar_token(
-        usuario.id,
+        usuario,
         timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     new_refresh_token = criar_token(
-        usuario.id,
+        usuario,
         timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     )
 
@@ -1,11 +1,20 @@
 """Router publico para visualizacao do cardapio"""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.database import get_db
-from app.models.models import Categoria, Produto, ProdutoIngrediente
-from app.schemas.schemas import CardapioResponse, CardapioCategoria, ProdutoResponse
+from app.schemas.schemas import (
+    CardapioResponse, CardapioCategoria, MudancasCardapioResponse, ProdutoResponse, SugestaoResponse
+)
+from app.services.busca import indice_busca
+from app.services.cache_categorias import cache_categorias
+from app.services.cardapio import aceita_gzip, obter_cardapio_serializado
+from app.services.condicional import etag_corresponde, resposta_nao_modificada
+from app.services.carregamento import carregar_produtos_por_id
+from app.services.mudancas import listar_mudancas
+from app.services.serializacao import MUDANCAS, PRODUTOS, SUGESTOES, resposta_json
+from app.services.sugestoes import SUGESTOES_POR_NO, sugerir
 
 
 router = APIRouter(
@@ -16,47 +25,34 @@ router = APIRouter(
 
 @router.get("/", response_model=CardapioResponse)
 def listar_cardapio_completo(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
     Lista cardapio completo com categorias ativas e produtos disponiveis
 
-    Retorna categorias ordenadas por ordem_exibicao, com produtos aninhados
+    Retorna categorias ordenadas por ordem_exibicao, com produtos aninhados.
+    A resposta é servida de bytes pré-serializados (gzip quando aceito) com
+    ETag forte; If-None-Match com o ETag atual retorna 304.
     """
-    # Carregar categorias com produtos, variacoes e ingredientes em uma unica query
-    categorias = db.query(Categoria)\
-        .options(
-            joinedload(Categoria.produtos)
-            .joinedload(Produto.variacoes)
-        )\
-        .options(
-            joinedload(Categoria.produtos)
-            .joinedload(Produto.ingredientes)
-            .joinedload(ProdutoIngrediente.ingrediente)
-        )\
-        .filter(Categoria.ativa == True)\
-        .order_by(Categoria.ordem_exibicao)\
-        .all()
-
-    # Filtrar apenas produtos disponiveis
-    cardapio_data = []
-    for categoria in categorias:
-        produtos_disponiveis = [p for p in categoria.produtos if p.disponivel and not p.deleted_at]
-        if produtos_disponiveis:  # Apenas incluir categoria se tiver produtos disponiveis
-            cardapio_data.append({
-                "id": categoria.id,
-                "nome": categoria.nome,
-                "descricao": categoria.descricao,
-                "icone": categoria.icone,
-                "ordem_exibicao": categoria.ordem_exibicao,
-                "produtos": produtos_disponiveis
-            })
-
-    return {"categorias": cardapio_data}
+    cardapio = obter_cardapio_serializado(db)
+    usar_gzip = aceita_gzip(accept_encoding)
+    etag = cardapio.etag_gzip if usar_gzip else cardapio.etag
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+    if etag_corresponde(if_none_match, cardapio.etag, cardapio.etag_gzip):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if usar_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(cardapio.corpo_gzip, media_type="application/json", headers=headers)
+    return Response(cardapio.corpo, media_type="application/json", headers=headers)
 
 
 @router.get("/categorias/{categoria_id}/produtos", response_model=List[ProdutoResponse])
 def listar_produtos_por_categoria(
+    request: Request,
     categoria_id: int,
     incluir_indisponiveis: bool = False,
     db: Session = Depends(get_db)
@@ -64,38 +60,77 @@ def listar_produtos_por_categoria(
     """
     Lista produtos de uma categoria especifica
 
+    Suporta GET condicional (If-None-Match / If-Modified-Since -> 304).
+    A resposta fica em cache por categoria até uma alteração que a afete.
+
     - **categoria_id**: ID da categoria
-    - **incluir_indisponiveis**: Se True, inclui produtos indisponiveis
+    - **incluir_indisponiveis**: Se True, inclui produtos que não podem ser pedidos
+      (sem isso, vale a disponibilidade efetiva, como em GET /cardapio/)
     """
-    query = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))\
-        .filter(Produto.categoria_id == categoria_id)
-
-    if not incluir_indisponiveis:
-        query = query.filter(Produto.disponivel == True)
-
-    produtos = query.all()
-    return produtos
+    lista = cache_categorias.obter(db, categoria_id, incluir_indisponiveis)
+    nao_modificada = resposta_nao_modificada(request, lista.validador)
+    if nao_modificada:
+        return nao_modificada
+    return lista.resposta()
 
 
 @router.get("/buscar", response_model=List[ProdutoResponse])
 def buscar_produtos(
     termo: str = Query(..., min_length=2, description="Termo de busca"),
+    limite: int = Query(50, ge=1, le=200, description="Máximo de resultados"),
     db: Session = Depends(get_db)
 ):
     """
-    Busca produtos por nome ou descricao
+    Busca produtos por nome, descricao, categoria ou ingredientes
+
+    Ignora acentos e plurais simples ("calabresas" encontra "Calabrésa");
+    a última palavra também casa por prefixo. Resultados vêm ordenados
+    por relevância.
 
     - **termo**: Termo de busca (minimo 2 caracteres)
+    - **limite**: Maximo de resultados (padrao 50)
+    """
+    # IDs já vêm na ordem do ranking
+    return resposta_json(PRODUTOS, carregar_produtos_por_id(db, indice_busca.buscar(db, termo, limite)))
+
+
+@router.get("/sugestoes", response_model=List[SugestaoResponse])
+def sugerir_produtos(
+    termo: str = Query(..., min_length=1, max_length=100, description="Texto digitado"),
+    limite: int = Query(10, ge=1, le=SUGESTOES_POR_NO, description="Máximo de sugestões"),
+    db: Session = Depends(get_db)
+):
+    """
+    Autocomplete da barra de busca
+
+    Retorna IDs e nomes de produtos e ingredientes cujo nome tem uma
+    palavra começando pelo texto digitado. Acentos são ignorados e palavras
+    com um ou dois erros de digitação são corrigidas. Não consulta o banco
+    enquanto o catálogo não muda.
+
+    - **termo**: Texto digitado (a partir de 1 caractere)
+    - **limite**: Maximo de sugestoes (padrao 10)
+    """
+    return resposta_json(SUGESTOES, sugerir(db, termo, limite))
+
+
+@router.get("/mudancas", response_model=MudancasCardapioResponse)
+def listar_mudancas_cardapio(
+    desde: Optional[str] = Query(None, description="Versão recebida na sincronização anterior"),
+    db: Session = Depends(get_db)
+):
+    """
+    Sincronização incremental do cardápio
+
+    Retorna categorias, produtos (com variações e ingredientes) e
+    ingredientes criados ou alterados desde a versão informada, os IDs
+    removidos e a nova `versao` para a próxima chamada. Itens vêm com
+    `ativa`/`disponivel`; o cliente aplica os mesmos filtros do cardápio.
+
+    Quando `ressincronizar` é true (sem `desde`, versão antiga demais ou
+    mudanças demais), as listas vêm vazias: baixe GET /cardapio/ e guarde a
+    `versao` retornada aqui.
+
+    - **desde**: Valor de `versao` da resposta anterior
     """
-    produtos = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))\
-        .filter(
-            Produto.disponivel == True,
-            (Produto.nome.ilike(f"%{termo}%") | Produto.descricao.ilike(f"%{termo}%"))
-        )\
-        .all()
-
-    return produtos
+    return resposta_json(MUDANCAS, listar_mudancas(db, desde))
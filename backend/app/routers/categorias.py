@@ -1,13 +1,17 @@
 """Router para gerenciamento de categorias"""
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
-from app.models.models import Categoria, Usuario
+from app.models.models import Categoria
 from app.schemas.schemas import CategoriaCreate, CategoriaUpdate, CategoriaResponse
 from app.dependencies.auth import obter_usuario_admin
+from app.services.identidade import UsuarioAutenticado
 from app.exceptions import CategoriaNaoEncontrada, CategoriaJaExiste
+from app.services.condicional import calcular_validador, com_validador, resposta_nao_modificada, resumo
+from app.services.serializacao import CATEGORIA, CATEGORIAS, colunas, resposta_json
 
 
 router = APIRouter(
@@ -20,7 +24,7 @@ router = APIRouter(
 def criar_categoria(
     categoria: CategoriaCreate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Cria uma nova categoria (apenas admin)"""
     # Verificar se categoria com mesmo nome ja existe
@@ -37,24 +41,39 @@ def criar_categoria(
 
 @router.get("/", response_model=List[CategoriaResponse])
 def listar_categorias(
+    request: Request,
     apenas_ativas: bool = True,
     db: Session = Depends(get_db)
 ):
-    """Lista todas as categorias (filtro por ativas)"""
-    query = db.query(Categoria)
-    if apenas_ativas:
-        query = query.filter(Categoria.ativa == True)
-    categorias = query.order_by(Categoria.ordem_exibicao).all()
-    return categorias
+    """Lista todas as categorias (filtro por ativas; suporta GET condicional)"""
+    filtros = [Categoria.ativa == True] if apenas_ativas else []
+    validador = calcular_validador(db, f"categorias?ativas={apenas_ativas}", *resumo(Categoria, *filtros))
+    nao_modificada = resposta_nao_modificada(request, validador)
+    if nao_modificada:
+        return nao_modificada
+
+    # Só as colunas da resposta, sem montar objetos ORM
+    query = select(*colunas(Categoria, CategoriaResponse)).where(*filtros)
+    linhas = db.execute(query.order_by(Categoria.ordem_exibicao)).all()
+    return com_validador(resposta_json(CATEGORIAS, linhas), validador)
 
 
 @router.get("/{categoria_id}", response_model=CategoriaResponse)
-def buscar_categoria(categoria_id: int, db: Session = Depends(get_db)):
-    """Busca categoria por ID"""
-    categoria = db.query(Categoria).filter(Categoria.id == categoria_id).first()
+def buscar_categoria(request: Request, categoria_id: int, db: Session = Depends(get_db)):
+    """Busca categoria por ID (suporta GET condicional)"""
+    validador = calcular_validador(
+        db, f"categorias/{categoria_id}", *resumo(Categoria, Categoria.id == categoria_id), obrigatorio=True
+    )
+    nao_modificada = resposta_nao_modificada(request, validador)
+    if nao_modificada:
+        return nao_modificada
+
+    categoria = db.execute(
+        select(*colunas(Categoria, CategoriaResponse)).where(Categoria.id == categoria_id)
+    ).first()
     if not categoria:
         raise CategoriaNaoEncontrada(categoria_id)
-    return categoria
+    return com_validador(resposta_json(CATEGORIA, categoria), validador)
 
 
 @router.put("/{categoria_id}", response_model=CategoriaResponse)
@@ -62,7 +81,7 @@ def atualizar_categoria(
     categoria_id: int,
     categoria_update: CategoriaUpdate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Atualiza categoria (apenas admin)"""
     categoria = db.query(Categoria).filter(Categoria.id == categoria_id).first()
@@ -82,7 +101,7 @@ def atualizar_categoria(
 def deletar_categoria(
     categoria_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Deleta categoria (apenas admin)"""
     categoria = db.query(Categoria).filter(Categoria.id == categoria_id).first()
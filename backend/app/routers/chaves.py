@@ -0,0 +1,26 @@
+"""Router público com as chaves de verificação dos tokens (JWKS)"""
+from typing import Optional
+
+from fastapi import APIRouter, Header, Response, status
+
+from app.config import JWKS_CACHE_CONTROL
+from app.services.chaves import chaveiro
+from app.services.condicional import etag_corresponde
+
+
+router = APIRouter(tags=["Chaves"])
+
+
+@router.get("/.well-known/jwks.json")
+def obter_jwks(if_none_match: Optional[str] = Header(None)):
+    """
+    Chaves públicas que verificam os tokens emitidos pela API (RFC 7517)
+
+    Serviços internos verificam os tokens localmente, escolhendo a chave
+    pelo kid do cabeçalho do token. Com HS256 a lista é vazia: o segredo
+    nunca é publicado. If-None-Match com o ETag atual retorna 304.
+    """
+    headers = {"ETag": chaveiro.jwks_etag, "Cache-Control": JWKS_CACHE_CONTROL}
+    if etag_corresponde(if_none_match, chaveiro.jwks_etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(chaveiro.jwks, media_type="application/jwk-set+json", headers=headers)
@@ -1,19 +1,21 @@
 """Router para healthcheck e métricas do sistema"""
 from fastapi import APIRouter, Depends, status as http_status
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import os
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import Usuario, Pedido, Produto
+from app.services import metricas
 
 
 router = APIRouter(tags=["Health & Metrics"])
 
 
 @router.get("/health", summary="Verificação de saúde da API")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """
     Verifica o status de saúde da API e suas dependências
 
@@ -28,7 +30,7 @@ async def health_check(db: Session = Depends(get_db)):
 
     try:
         # Tentar executar uma query simples
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
     except Exception as e:
         db_status = "unhealthy"
         db_message = f"Erro na conexão com banco: {str(e)}"
@@ -49,63 +51,27 @@ async def health_check(db: Session = Depends(get_db)):
     }
 
 
-@router.get("/metrics", summary="Métricas do sistema")
-async def get_metrics(db: Session = Depends(get_db)):
+@router.get(
+    "/metrics",
+    summary="Métricas do sistema",
+    response_class=PlainTextResponse,
+    responses={200: {"content": {metricas.CONTENT_TYPE: {}}}}
+)
+async def get_metrics(db: AsyncSession = Depends(get_async_db)):
     """
-    Retorna métricas básicas do sistema
+    Retorna as métricas do sistema no formato texto do Prometheus
 
     Inclui:
-    - Total de usuários
-    - Total de pedidos
-    - Total de produtos
-    - Estatísticas de pedidos por status
-    - Valor total em pedidos
-    """
-    # Contar totais
-    total_usuarios = db.query(Usuario).count()
-    total_pedidos = db.query(Pedido).count()
-    total_produtos = db.query(Produto).count()
-    produtos_disponiveis = db.query(Produto).filter(Produto.disponivel == True).count()
-
-    # Estatísticas de pedidos
-    pedidos = db.query(Pedido).all()
-
-    pedidos_por_status = {
-        "PENDENTE": 0,
-        "EM_PREPARO": 0,
-        "PRONTO": 0,
-        "ENTREGUE": 0,
-        "CANCELADO": 0
-    }
-
-    valor_total_pedidos = 0.0
-    for pedido in pedidos:
-        if pedido.status in pedidos_por_status:
-            pedidos_por_status[pedido.status] += 1
-        valor_total_pedidos += pedido.preco_total
+    - Pedidos existentes por status e soma do valor dos pedidos
+    - Pedidos criados desde o início do processo
+    - Usuários (total, ativos, admins) e produtos por disponibilidade
+    - Requisições e latência por rota
 
-    # Calcular valor médio
-    valor_medio_pedido = round(valor_total_pedidos / total_pedidos, 2) if total_pedidos > 0 else 0
-
-    return {
-        "timestamp": datetime.now().isoformat(),
-        "usuarios": {
-            "total": total_usuarios,
-            "ativos": db.query(Usuario).filter(Usuario.ativo == True).count(),
-            "admins": db.query(Usuario).filter(Usuario.admin == True).count()
-        },
-        "produtos": {
-            "total": total_produtos,
-            "disponiveis": produtos_disponiveis,
-            "indisponiveis": total_produtos - produtos_disponiveis
-        },
-        "pedidos": {
-            "total": total_pedidos,
-            "por_status": pedidos_por_status,
-            "valor_total": round(valor_total_pedidos, 2),
-            "valor_medio": valor_medio_pedido
-        }
-    }
+    Os valores são mantidos em memória e atualizados nas escritas; o banco
+    só é consultado na semeadura e nas ressincronizações periódicas.
+    """
+    conteudo = await metricas.exportar(db)
+    return PlainTextResponse(conteudo, media_type=metricas.CONTENT_TYPE)
 
 
 @router.get("/info", summary="Informações sobre a API")
@@ -145,7 +111,7 @@ async def api_info():
 
 
 @router.get("/status", summary="Status completo do sistema")
-async def system_status(db: Session = Depends(get_db)):
+async def system_status(db: AsyncSession = Depends(get_async_db)):
     """
     Retorna status completo do sistema combinando health e métricas
 
@@ -154,19 +120,19 @@ async def system_status(db: Session = Depends(get_db)):
     # Verificar saúde do banco
     db_healthy = True
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
     except Exception:
         db_healthy = False
 
     # Métricas básicas
-    total_pedidos = db.query(Pedido).count()
-    total_usuarios = db.query(Usuario).count()
-    total_produtos = db.query(Produto).count()
+    total_pedidos = await db.scalar(select(func.count(Pedido.id)))
+    total_usuarios = await db.scalar(select(func.count(Usuario.id)))
+    total_produtos = await db.scalar(select(func.count(Produto.id)))
 
     # Pedidos ativos (não entregues ou cancelados)
-    pedidos_ativos = db.query(Pedido).filter(
-        Pedido.status.in_(["PENDENTE", "EM_PREPARO", "PRONTO"])
-    ).count()
+    pedidos_ativos = await db.scalar(
+        select(func.count(Pedido.id)).where(Pedido.status.in_(["PENDENTE", "EM_PREPARO", "PRONTO"]))
+    )
 
     return {
         "timestamp": datetime.now().isoformat(),
@@ -1,13 +1,17 @@
 """Router para gerenciamento de ingredientes"""
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
-from app.models.models import Ingrediente, Usuario
+from app.models.models import Ingrediente
 from app.schemas.schemas import IngredienteCreate, IngredienteUpdate, IngredienteResponse
 from app.dependencies.auth import obter_usuario_admin
+from app.services.identidade import UsuarioAutenticado
 from app.exceptions import IngredienteNaoEncontrado
+from app.services.condicional import calcular_validador, com_validador, resposta_nao_modificada, resumo
+from app.services.serializacao import INGREDIENTES, colunas, resposta_json
 
 
 router = APIRouter(
@@ -20,7 +24,7 @@ router = APIRouter(
 def criar_ingrediente(
     ingrediente: IngredienteCreate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Cria novo ingrediente (apenas admin)"""
     novo_ingrediente = Ingrediente(**ingrediente.model_dump())
@@ -32,15 +36,23 @@ def criar_ingrediente(
 
 @router.get("/", response_model=List[IngredienteResponse])
 def listar_ingredientes(
+    request: Request,
     apenas_disponiveis: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Lista todos os ingredientes"""
-    query = db.query(Ingrediente)
-    if apenas_disponiveis:
-        query = query.filter(Ingrediente.disponivel == True)
-    ingredientes = query.order_by(Ingrediente.nome).all()
-    return ingredientes
+    """Lista todos os ingredientes (suporta GET condicional)"""
+    filtros = [Ingrediente.disponivel == True] if apenas_disponiveis else []
+    validador = calcular_validador(
+        db, f"ingredientes?disponiveis={apenas_disponiveis}", *resumo(Ingrediente, *filtros)
+    )
+    nao_modificada = resposta_nao_modificada(request, validador)
+    if nao_modificada:
+        return nao_modificada
+
+    # Só as colunas da resposta, sem montar objetos ORM
+    query = select(*colunas(Ingrediente, IngredienteResponse)).where(*filtros)
+    linhas = db.execute(query.order_by(Ingrediente.nome)).all()
+    return com_validador(resposta_json(INGREDIENTES, linhas), validador)
 
 
 @router.get("/{ingrediente_id}", response_model=IngredienteResponse)
@@ -57,7 +69,7 @@ def atualizar_ingrediente(
     ingrediente_id: int,
     ingrediente_update: IngredienteUpdate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Atualiza ingrediente (apenas admin)"""
     ingrediente = db.query(Ingrediente).filter(Ingrediente.id == ingrediente_id).first()
@@ -77,7 +89,7 @@ def atualizar_ingrediente(
 def deletar_ingrediente(
     ingrediente_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Deleta ingrediente (apenas admin)"""
     ingrediente = db.query(Ingrediente).filter(Ingrediente.id == ingrediente_id).first()
@@ -93,7 +105,7 @@ def deletar_ingrediente(
 def alternar_disponibilidade(
     ingrediente_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Alterna disponibilidade do ingrediente (admin only)"""
     ingrediente = db.query(Ingrediente).filter(Ingrediente.id == ingrediente_id).first()
@@ -1,111 +1,162 @@
 """Rotas de gerenciamento de pedidos"""
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from typing import List, Tuple
-
-from app.database import get_db
-from app.models.models import (
-    Pedido, ItemPedido, Usuario, Produto, ProdutoVariacao,
-    Ingrediente, ProdutoIngrediente
+from datetime import datetime
+
+import orjson
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+
+from app.database import get_async_db
+from app.models.models import Pedido, ItemPedido, Endereco
+from app.schemas.schemas import (
+    PedidoCreate, PedidoResponse, EnderecoResponse,
+    PedidoListagemResponse, PaginaPedidosResponse
 )
-from app.schemas.schemas import PedidoCreate, PedidoResponse
 from app.dependencies.auth import obter_usuario_atual, obter_usuario_admin
-from app.exceptions import (
-    ProdutoNaoEncontrado, StatusInvalido, SemPermissao,
-    PedidoNaoEncontrado, ProdutoVariacaoNaoEncontrada,
-    IngredienteNaoEncontrado, IngredienteIndisponivel,
-    IngredienteObrigatorio
-)
+from app.services.identidade import UsuarioAutenticado
+from app.error_handlers import corpo_erro
+from app.exceptions import PizzariaException, StatusInvalido, SemPermissao, PedidoNaoEncontrado
+from app.services.precificacao import PedidoPrecificado, precificar_pedido
+from app.services.idempotencia import registro_idempotencia, impressao_requisicao
+from app.services.paginacao import codificar_cursor, decodificar_cursor
+from app.services.estatisticas import COLUNAS_STATUS, obter_estatisticas, registrar_movimento
+from app.services.metricas import registrar_pedido_criado
+from app.services.serializacao import PAGINA_PEDIDOS, PEDIDOS, resposta_json
 
 router = APIRouter(prefix="/pedidos", tags=["Pedidos"])
 
+STATUS_VALIDOS = ["PENDENTE", "EM_PREPARO", "PRONTO", "ENTREGUE", "CANCELADO"]
+
+# Colunas da listagem administrativa (sem itens nem relacionamentos)
+COLUNAS_LISTAGEM = (
+    Pedido.id, Pedido.status, Pedido.usuario_id, Pedido.preco_total,
+    Pedido.endereco_entrega_id, Pedido.created_at, Pedido.updated_at
+)
+
+# Linhas lidas por vez no modo streaming
+LOTE_STREAMING = 500
+
 
-def calcular_preco_item(
-    produto_variacao: ProdutoVariacao,
-    ingredientes_adicionados: List[int],
-    ingredientes_removidos: List[int],
-    quantidade: int,
-    db: Session
-) -> Tuple[float, float, float, list, list]:
+async def persistir_pedido(
+    usuario_id: int,
+    endereco_entrega_id: Optional[int],
+    pedido_precificado: PedidoPrecificado,
+    db: AsyncSession,
+    commit: bool = True
+) -> dict:
     """
-    Calcula preco de um item do pedido com customizacoes
+    Grava o pedido e seus itens com dois INSERTs e monta a resposta em memória
 
-    Retorna: (preco_base, preco_ingredientes, preco_total,
-              ingredientes_adicionados_data, ingredientes_removidos_data)
+    O cabeçalho é inserido com RETURNING e todos os itens em um único
+    executemany (com RETURNING quando o banco suporta), mantendo a
+    transação de escrita curta. A resposta é montada a partir dos dados
+    já em memória, sem refresh nem lazy loads.
+
+    Com commit=False a transação fica aberta para o chamador (a resposta
+    idempotente é gravada nela antes do commit).
+
+    Returns:
+        Dicionário no formato de PedidoResponse
     """
-    preco_base = produto_variacao.preco
-    preco_ingredientes = 0.0
-
-    # Validar e adicionar ingredientes extras
-    ingredientes_adicionados_data = []
-    for ing_id in ingredientes_adicionados:
-        ingrediente = db.query(Ingrediente).filter(Ingrediente.id == ing_id).first()
-        if not ingrediente:
-            raise IngredienteNaoEncontrado(ing_id)
-        if not ingrediente.disponivel:
-            raise IngredienteIndisponivel(ingrediente.nome)
-
-        preco_ingredientes += ingrediente.preco_adicional
-        ingredientes_adicionados_data.append({
-            "id": ingrediente.id,
-            "nome": ingrediente.nome,
-            "preco": ingrediente.preco_adicional
-        })
-
-    # Validar ingredientes removidos
-    ingredientes_removidos_data = []
-    for ing_id in ingredientes_removidos:
-        # Verificar se ingrediente esta nos ingredientes padrao do produto
-        produto_ingrediente = db.query(ProdutoIngrediente).filter(
-            ProdutoIngrediente.produto_id == produto_variacao.produto_id,
-            ProdutoIngrediente.ingrediente_id == ing_id
-        ).first()
-
-        if not produto_ingrediente:
-            continue  # Ignorar se nao e um ingrediente padrao
-
-        if produto_ingrediente.obrigatorio:
-            raise IngredienteObrigatorio(produto_ingrediente.ingrediente.nome)
-
-        ingredientes_removidos_data.append({
-            "id": produto_ingrediente.ingrediente.id,
-            "nome": produto_ingrediente.ingrediente.nome
-        })
-
-    preco_total = (preco_base + preco_ingredientes) * quantidade
-
-    return preco_base, preco_ingredientes, preco_total, ingredientes_adicionados_data, ingredientes_removidos_data
+    dialeto = db.get_bind().dialect
+
+    # Leituras antes da primeira escrita para nao alongar a transacao
+    endereco_entrega = None
+    if endereco_entrega_id is not None:
+        endereco = await db.get(Endereco, endereco_entrega_id)
+        if endereco is not None:
+            endereco_entrega = EnderecoResponse.model_validate(endereco).model_dump()
+
+    dados_pedido = {
+        "usuario_id": usuario_id,
+        "endereco_entrega_id": endereco_entrega_id,
+        "preco_total": pedido_precificado.preco_total,
+        "status": "PENDENTE"
+    }
+    if dialeto.insert_returning:
+        pedido_id = (await db.execute(insert(Pedido).returning(Pedido.id), dados_pedido)).scalar_one()
+    else:
+        pedido_id = (await db.execute(insert(Pedido), dados_pedido)).inserted_primary_key[0]
+
+    itens = [
+        {
+            "pedido_id": pedido_id,
+            "produto_variacao_id": item.produto_variacao_id,
+            "quantidade": item.quantidade,
+            # Snapshot (historico)
+            "produto_nome": item.produto_nome,
+            "tamanho": item.tamanho,
+            "preco_base": item.preco_base,
+            # Customizacoes
+            "ingredientes_adicionados": item.ingredientes_adicionados,
+            "ingredientes_removidos": item.ingredientes_removidos,
+            "preco_ingredientes": item.preco_ingredientes,
+            "preco_total": item.preco_total,
+            "observacoes": item.observacoes
+        }
+        for item in pedido_precificado.itens
+    ]
+
+    if itens:
+        if dialeto.insert_executemany_returning:
+            # O banco não garante que o RETURNING siga a ordem dos VALUES;
+            # sort_by_parameter_order faz o SQLAlchemy devolver os IDs na ordem
+            # dos parâmetros, ainda em lotes (insertmanyvalues)
+            item_ids = (await db.execute(
+                insert(ItemPedido).returning(ItemPedido.id, sort_by_parameter_order=True),
+                itens
+            )).scalars().all()
+        else:
+            await db.execute(insert(ItemPedido), itens)
+            item_ids = (await db.scalars(
+                select(ItemPedido.id)
+                .where(ItemPedido.pedido_id == pedido_id)
+                .order_by(ItemPedido.id)
+            )).all()
+
+        for item, item_id in zip(itens, item_ids):
+            item["id"] = item_id
+
+    await registrar_movimento(
+        db, usuario_id, {"PENDENTE": 1},
+        pedidos_delta=1, valor_delta=pedido_precificado.preco_total
+    )
+    registrar_pedido_criado(db, "PENDENTE", pedido_precificado.preco_total)
+    if commit:
+        await db.commit()
+
+    return {
+        "id": pedido_id,
+        "status": dados_pedido["status"],
+        "usuario_id": usuario_id,
+        "preco_total": dados_pedido["preco_total"],
+        "itens": itens,
+        "endereco_entrega": endereco_entrega
+    }
 
 
 @router.get("/meus/estatisticas", summary="Estatísticas dos meus pedidos")
 async def estatisticas_meus_pedidos(
-    db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_atual: UsuarioAutenticado = Depends(obter_usuario_atual)
 ):
     """
     Retorna estatísticas dos pedidos do usuário autenticado
 
     Inclui total de pedidos, valor total gasto e contagem por status
     """
-    pedidos = db.query(Pedido).filter(Pedido.usuario_id == usuario_atual.id).all()
-
-    # Calcular estatísticas
-    total_pedidos = len(pedidos)
-    valor_total = sum(p.preco_total for p in pedidos)
+    estatisticas = await obter_estatisticas(db, usuario_atual.id)
 
-    # Contar por status
+    total_pedidos = estatisticas["total_pedidos"]
+    valor_total = estatisticas["valor_total"]
     status_count = {
-        "PENDENTE": 0,
-        "EM_PREPARO": 0,
-        "PRONTO": 0,
-        "ENTREGUE": 0,
-        "CANCELADO": 0
+        status_pedido: estatisticas[coluna]
+        for status_pedido, coluna in COLUNAS_STATUS.items()
     }
 
-    for pedido in pedidos:
-        if pedido.status in status_count:
-            status_count[pedido.status] += 1
-
     return {
         "total_pedidos": total_pedidos,
         "valor_total_gasto": round(valor_total, 2),
@@ -117,8 +168,8 @@ async def estatisticas_meus_pedidos(
 @router.get("/meus", response_model=List[PedidoResponse], summary="Listar meus pedidos")
 async def listar_meus_pedidos(
     status_pedido: str = None,
-    db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_atual: UsuarioAutenticado = Depends(obter_usuario_atual)
 ):
     """
     Lista todos os pedidos do usuário autenticado
@@ -127,45 +178,108 @@ async def listar_meus_pedidos(
 
     Retorna apenas os pedidos pertencentes ao usuário que fez a requisição
     """
-    query = db.query(Pedido).filter(Pedido.usuario_id == usuario_atual.id)
+    query = select(Pedido)\
+        .options(selectinload(Pedido.itens), selectinload(Pedido.endereco_entrega))\
+        .where(Pedido.usuario_id == usuario_atual.id)
 
     # Filtrar por status se fornecido
     if status_pedido:
-        status_validos = ["PENDENTE", "EM_PREPARO", "PRONTO", "ENTREGUE", "CANCELADO"]
-        if status_pedido.upper() not in status_validos:
-            raise StatusInvalido(status_pedido, status_validos)
-        query = query.filter(Pedido.status == status_pedido.upper())
+        if status_pedido.upper() not in STATUS_VALIDOS:
+            raise StatusInvalido(status_pedido, STATUS_VALIDOS)
+        query = query.where(Pedido.status == status_pedido.upper())
+
+    pedidos = (await db.scalars(query)).all()
+    return resposta_json(PEDIDOS, pedidos)
 
-    pedidos = query.all()
-    return pedidos
 
+async def _transmitir_pedidos(bind, query) -> AsyncIterator[bytes]:
+    """Lê os pedidos em lotes e emite uma linha NDJSON por pedido"""
+    # Sessão própria: a sessão da requisição é fechada antes do corpo ser enviado
+    async with AsyncSession(bind=bind) as sessao:
+        resultado = await sessao.stream(query.execution_options(yield_per=LOTE_STREAMING))
+        async for linha in resultado.mappings():
+            yield PedidoListagemResponse.model_validate(linha).model_dump_json().encode() + b"\n"
 
-@router.get("/", summary="Listar todos os pedidos")
+
+@router.get(
+    "/",
+    response_model=PaginaPedidosResponse,
+    summary="Listar todos os pedidos",
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
 async def listar_pedidos(
-    db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    status_pedido: Optional[str] = Query(None, alias="status"),
+    usuario_id: Optional[int] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    limite: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    formato: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_db),
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """
-    Lista todos os pedidos da pizzaria (apenas admin)
-
-    Retorna todos os pedidos com seus itens
+    Lista os pedidos da pizzaria, do mais recente ao mais antigo (apenas admin)
+
+    - **status**: Filtrar por status
+    - **usuario_id**: Filtrar por usuário
+    - **data_inicio** / **data_fim**: Intervalo de criação [início, fim)
+    - **limite**: Pedidos por página (1-500)
+    - **cursor**: Valor de `proximo_cursor` da página anterior
+    - **formato**: `json` (página) ou `ndjson` (todos os pedidos a partir do
+      cursor, um por linha, sem limite de página)
+
+    A paginação é keyset sobre (created_at, id); `quantidade` é o número de
+    pedidos na página retornada (não há contagem total).
     """
-    pedidos = db.query(Pedido).all()
-    return {"total": len(pedidos), "pedidos": pedidos}
+    query = select(*COLUNAS_LISTAGEM)
+
+    if status_pedido:
+        if status_pedido.upper() not in STATUS_VALIDOS:
+            raise StatusInvalido(status_pedido, STATUS_VALIDOS)
+        query = query.where(Pedido.status == status_pedido.upper())
+    if usuario_id is not None:
+        query = query.where(Pedido.usuario_id == usuario_id)
+    if data_inicio is not None:
+        query = query.where(Pedido.created_at >= data_inicio)
+    if data_fim is not None:
+        query = query.where(Pedido.created_at < data_fim)
+    if cursor:
+        created_at, pedido_id = decodificar_cursor(cursor, 2)
+        query = query.where(tuple_(Pedido.created_at, Pedido.id) < tuple_(created_at, pedido_id))
+
+    query = query.order_by(Pedido.created_at.desc(), Pedido.id.desc())
+
+    if formato == "ndjson":
+        return StreamingResponse(_transmitir_pedidos(db.bind, query), media_type="application/x-ndjson")
+
+    # Uma linha a mais indica se existe próxima página
+    linhas = (await db.execute(query.limit(limite + 1))).mappings().all()
+    pagina = linhas[:limite]
+    proximo_cursor = None
+    if len(linhas) > limite:
+        ultima = pagina[-1]
+        proximo_cursor = codificar_cursor(ultima["created_at"], ultima["id"])
+
+    return resposta_json(PAGINA_PEDIDOS, {"quantidade": len(pagina), "pedidos": pagina, "proximo_cursor": proximo_cursor})
 
 
 @router.get("/{pedido_id}", response_model=PedidoResponse, summary="Buscar pedido por ID")
 async def buscar_pedido(
     pedido_id: int,
-    db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_atual: UsuarioAutenticado = Depends(obter_usuario_atual)
 ):
     """
     Busca um pedido específico pelo ID
 
     - **pedido_id**: ID do pedido
     """
-    pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
+    pedido = await db.scalar(
+        select(Pedido)
+        .options(selectinload(Pedido.itens), selectinload(Pedido.endereco_entrega))
+        .where(Pedido.id == pedido_id)
+    )
 
     if not pedido:
         raise PedidoNaoEncontrado(pedido_id)
@@ -180,8 +294,8 @@ async def buscar_pedido(
 @router.post("/calcular-preco", summary="Calcular preço do pedido antes de criar")
 async def calcular_preco_pedido(
     pedido: PedidoCreate,
-    db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_atual)
+    db: AsyncSession = Depends(get_async_db),
+    _: UsuarioAutenticado = Depends(obter_usuario_atual)
 ):
     """
     Calcula o preço total de um pedido sem salvá-lo
@@ -190,137 +304,99 @@ async def calcular_preco_pedido(
 
     Útil para mostrar o valor total antes de confirmar o pedido.
     """
-    preco_total = 0.0
-    itens_calculados = []
-
-    for item_data in pedido.itens:
-        # Buscar a variacao do produto
-        produto_variacao = db.query(ProdutoVariacao)\
-            .filter(ProdutoVariacao.id == item_data.produto_variacao_id)\
-            .first()
-
-        if not produto_variacao:
-            raise ProdutoVariacaoNaoEncontrada(item_data.produto_variacao_id)
-
-        # Verificar se a variacao esta disponivel
-        if not produto_variacao.disponivel or not produto_variacao.produto.disponivel:
-            raise ProdutoNaoEncontrado(produto_variacao.produto_id)
-
-        # Calcular preco com customizacoes
-        preco_base, preco_ingredientes, preco_item, ing_adicionados, ing_removidos = calcular_preco_item(
-            produto_variacao,
-            item_data.ingredientes_adicionados or [],
-            item_data.ingredientes_removidos or [],
-            item_data.quantidade,
-            db
-        )
-
-        preco_total += preco_item
-
-        itens_calculados.append({
-            "produto_id": produto_variacao.produto_id,
-            "produto_nome": produto_variacao.produto.nome,
-            "tamanho": produto_variacao.tamanho,
-            "quantidade": item_data.quantidade,
-            "preco_base": preco_base,
-            "preco_ingredientes": preco_ingredientes,
-            "preco_total_item": round(preco_item, 2),
-            "ingredientes_adicionados": ing_adicionados,
-            "ingredientes_removidos": ing_removidos
-        })
+    pedido_precificado = await db.run_sync(lambda sessao: precificar_pedido(pedido, sessao))
+
+    itens_calculados = [
+        {
+            "produto_id": item.produto_id,
+            "produto_nome": item.produto_nome,
+            "tamanho": item.tamanho,
+            "quantidade": item.quantidade,
+            "preco_base": item.preco_base,
+            "preco_ingredientes": item.preco_ingredientes,
+            "preco_total_item": round(item.preco_total, 2),
+            "ingredientes_adicionados": item.ingredientes_adicionados,
+            "ingredientes_removidos": item.ingredientes_removidos
+        }
+        for item in pedido_precificado.itens
+    ]
 
     return {
         "itens": itens_calculados,
-        "preco_total": round(preco_total, 2),
+        "preco_total": pedido_precificado.preco_total,
         "quantidade_itens": len(itens_calculados)
     }
 
 
 @router.post("/", response_model=PedidoResponse, status_code=status.HTTP_201_CREATED, summary="Criar novo pedido")
 async def criar_pedido(
+    request: Request,
     pedido: PedidoCreate,
-    db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Chave para repetir a requisição com segurança sem duplicar o pedido"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    usuario_atual: UsuarioAutenticado = Depends(obter_usuario_atual)
 ):
     """
     Cria um novo pedido para a pizzaria
 
     - **itens**: Lista de itens do pedido com produto_variacao_id e customizações
+    - **Idempotency-Key** (header opcional): repetições com a mesma chave devolvem
+      a resposta original (inclusive erros 4xx) sem criar outro pedido, em qualquer worker
 
     O pedido será criado para o usuário autenticado.
     Os preços são calculados automaticamente baseados no cardápio e customizações.
     """
-    # Criar o pedido para o usuario autenticado
-    novo_pedido = Pedido(
-        usuario_id=usuario_atual.id,
-        endereco_entrega_id=pedido.endereco_entrega_id
-    )
-    db.add(novo_pedido)
-    db.flush()  # Flush para obter o ID do pedido
-
-    # Adicionar os itens ao pedido com validacao de produtos e customizacoes
-    preco_total = 0.0
-    for item_data in pedido.itens:
-        # Buscar a variacao do produto
-        produto_variacao = db.query(ProdutoVariacao)\
-            .join(Produto)\
-            .filter(ProdutoVariacao.id == item_data.produto_variacao_id)\
-            .first()
-
-        if not produto_variacao:
-            raise ProdutoVariacaoNaoEncontrada(item_data.produto_variacao_id)
-
-        # Verificar se o produto e variacao estao disponiveis
-        if not produto_variacao.disponivel or not produto_variacao.produto.disponivel:
-            from app.exceptions import PizzariaException
-            raise PizzariaException(
-                f"Produto '{produto_variacao.produto.nome}' ({produto_variacao.tamanho}) não está disponível",
-                status.HTTP_400_BAD_REQUEST
-            )
-
-        # Calcular preco com customizacoes
-        preco_base, preco_ingredientes, preco_item, ing_adicionados, ing_removidos = calcular_preco_item(
-            produto_variacao,
-            item_data.ingredientes_adicionados or [],
-            item_data.ingredientes_removidos or [],
-            item_data.quantidade,
-            db
+    async def processar(commit: bool = True) -> Tuple[int, bytes]:
+        # Precificar todos os itens antes de abrir a escrita
+        pedido_precificado = await db.run_sync(lambda sessao: precificar_pedido(pedido, sessao))
+
+        dados = await persistir_pedido(
+            usuario_atual.id,
+            pedido.endereco_entrega_id,
+            pedido_precificado,
+            db,
+            commit=commit
         )
-
-        # Criar item do pedido com snapshot e customizacoes
-        item = ItemPedido(
-            pedido_id=novo_pedido.id,
-            produto_variacao_id=produto_variacao.id,
-            quantidade=item_data.quantidade,
-            # Snapshot (historico)
-            produto_nome=produto_variacao.produto.nome,
-            tamanho=produto_variacao.tamanho,
-            preco_base=preco_base,
-            # Customizacoes
-            ingredientes_adicionados=ing_adicionados,
-            ingredientes_removidos=ing_removidos,
-            preco_ingredientes=preco_ingredientes,
-            preco_total=preco_item,
-            observacoes=item_data.observacoes
-        )
-        preco_total += preco_item
-        db.add(item)
-
-    # Atualizar o preco total do pedido
-    novo_pedido.preco_total = round(preco_total, 2)
-
-    db.commit()
-    db.refresh(novo_pedido)
-
-    return novo_pedido
+        return status.HTTP_201_CREATED, PedidoResponse.model_validate(dados).model_dump_json().encode()
+
+    if idempotency_key is None:
+        status_code, corpo = await processar()
+        return Response(content=corpo, status_code=status_code, media_type="application/json")
+
+    async def processar_idempotente() -> Tuple[int, bytes]:
+        # O commit fica com o registro, junto com a resposta; erros de negócio também são guardados
+        try:
+            return await processar(commit=False)
+        except PizzariaException as erro:
+            await db.rollback()
+            return erro.status_code, orjson.dumps(corpo_erro(erro, str(request.url)))
+
+    resposta, replay = await registro_idempotencia.executar(
+        db,
+        usuario_atual.id,
+        idempotency_key,
+        impressao_requisicao(pedido.model_dump(mode="json")),
+        processar_idempotente
+    )
+    return Response(
+        content=resposta.corpo,
+        status_code=resposta.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true" if replay else "false"}
+    )
 
 
 @router.patch("/{pedido_id}/status", summary="Atualizar status do pedido")
 async def atualizar_status(
     pedido_id: int,
     novo_status: str,
-    db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    db: AsyncSession = Depends(get_async_db),
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """
     Atualiza o status de um pedido (apenas admin)
@@ -328,19 +404,20 @@ async def atualizar_status(
     - **pedido_id**: ID do pedido
     - **novo_status**: Novo status (PENDENTE, EM_PREPARO, PRONTO, ENTREGUE, CANCELADO)
     """
-    status_validos = ["PENDENTE", "EM_PREPARO", "PRONTO", "ENTREGUE", "CANCELADO"]
+    if novo_status.upper() not in STATUS_VALIDOS:
+        raise StatusInvalido(novo_status, STATUS_VALIDOS)
 
-    if novo_status.upper() not in status_validos:
-        raise StatusInvalido(novo_status, status_validos)
-
-    pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
+    pedido = await db.get(Pedido, pedido_id)
 
     if not pedido:
         raise PedidoNaoEncontrado(pedido_id)
 
+    status_anterior = pedido.status
     pedido.status = novo_status.upper()
-    db.commit()
-    db.refresh(pedido)
+    if pedido.status != status_anterior:
+        await registrar_movimento(db, pedido.usuario_id, {status_anterior: -1, pedido.status: 1})
+    await db.commit()
+    await db.refresh(pedido)
 
     return {
         "mensagem": f"Status do pedido {pedido_id} atualizado para {novo_status.upper()}",
@@ -351,8 +428,8 @@ async def atualizar_status(
 @router.delete("/{pedido_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Cancelar pedido")
 async def cancelar_pedido(
     pedido_id: int,
-    db: Session = Depends(get_db),
-    usuario_atual: Usuario = Depends(obter_usuario_atual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_atual: UsuarioAutenticado = Depends(obter_usuario_atual)
 ):
     """
     Cancela um pedido (deleta do banco de dados)
@@ -361,7 +438,7 @@ async def cancelar_pedido(
 
     Usuários podem cancelar seus próprios pedidos. Admins podem cancelar qualquer pedido.
     """
-    pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
+    pedido = await db.get(Pedido, pedido_id)
 
     if not pedido:
         raise PedidoNaoEncontrado(pedido_id)
@@ -370,7 +447,11 @@ async def cancelar_pedido(
     if pedido.usuario_id != usuario_atual.id and not usuario_atual.admin:
         raise SemPermissao("cancelar este pedido")
 
-    db.delete(pedido)
-    db.commit()
+    await db.delete(pedido)
+    await registrar_movimento(
+        db, pedido.usuario_id, {pedido.status: -1},
+        pedidos_delta=-1, valor_delta=-pedido.preco_total
+    )
+    await db.commit()
 
     return None
@@ -1,17 +1,25 @@
 """Router para gerenciamento de produtos do cardápio"""
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from typing import List, Optional
 
 from app.database import get_db
-from app.models.models import Produto, Usuario, ProdutoVariacao, ProdutoIngrediente, Categoria, Ingrediente
+from app.models.models import Produto, ProdutoVariacao, ProdutoIngrediente, Categoria, Ingrediente
 from app.schemas.schemas import (
     ProdutoCreate, ProdutoUpdate, ProdutoResponse,
     ProdutoVariacaoCreate, ProdutoVariacaoUpdate, ProdutoVariacaoResponse
 )
 from app.dependencies.auth import obter_usuario_admin
+from app.services.identidade import UsuarioAutenticado
+from app.services.carregamento import (
+    carregar_produto, consultar_produtos, consultar_produtos_parciais, serializador_parcial, validar_campos
+)
+from app.services.paginacao import codificar_cursor, decodificar_cursor
+from app.services.condicional import calcular_validador, com_validador, resposta_nao_modificada, resumo_produtos
+from app.services.serializacao import PRODUTO, PRODUTOS, resposta_json
 from app.exceptions import (
-    ProdutoNaoEncontrado, CategoriaNaoEncontrada,
+    CursorInvalido, ProdutoNaoEncontrado, CategoriaNaoEncontrada,
     IngredienteNaoEncontrado, ProdutoVariacaoNaoEncontrada
 )
 
@@ -26,7 +34,7 @@ router = APIRouter(
 def criar_produto(
     produto: ProdutoCreate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Cria um novo produto no cardápio com variações e ingredientes"""
     # Verificar se categoria existe
@@ -77,25 +85,49 @@ def criar_produto(
     db.refresh(novo_produto)
 
     # Carregar relacionamentos
-    produto_completo = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))\
-        .filter(Produto.id == novo_produto.id)\
-        .first()
+    produto_completo = carregar_produto(db, novo_produto.id)
 
     return produto_completo
 
 
+# Colunas aceitas em ?ordenar= (prefixo "-" para ordem decrescente)
+COLUNAS_ORDENACAO = {
+    "id": Produto.id,
+    "nome": Produto.nome,
+    "created_at": Produto.created_at,
+    "updated_at": Produto.updated_at,
+}
+
+
 @router.get("/", response_model=List[ProdutoResponse])
 def listar_produtos(
     disponivel: bool = None,
     categoria_id: int = None,
+    limite: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    ordenar: str = Query("id", pattern=f"^-?({'|'.join(COLUNAS_ORDENACAO)})$"),
+    campos: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Lista todos os produtos do cardápio com filtros opcionais"""
-    query = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))
+    """
+    Lista produtos do cardápio com filtros, paginação e projeção opcionais
+
+    - **disponivel** / **categoria_id**: Filtros
+    - **limite**: Produtos por página (1-500)
+    - **cursor**: Valor do header `X-Proximo-Cursor` da página anterior
+      (ausente na última página)
+    - **ordenar**: id, nome, created_at ou updated_at; prefixo `-` inverte
+    - **campos**: Lista separada por vírgulas (ex.: `nome,disponivel`);
+      só essas colunas/relações são lidas do banco. `id` sempre vem.
+    """
+    coluna = COLUNAS_ORDENACAO[ordenar.lstrip("-")]
+    decrescente = ordenar.startswith("-")
+
+    selecionados = validar_campos(campos) if campos else None
+    if selecionados:
+        query = consultar_produtos_parciais(db, selecionados, coluna)
+    else:
+        query = consultar_produtos(db)
 
     # Aplicar filtros
     if disponivel is not None:
@@ -104,23 +136,43 @@ def listar_produtos(
     if categoria_id:
         query = query.filter(Produto.categoria_id == categoria_id)
 
-    produtos = query.all()
-    return produtos
+    # Paginação keyset sobre (coluna de ordenação, id)
+    chave = (coluna,) if coluna is Produto.id else (coluna, Produto.id)
+    if cursor:
+        ordem_cursor, *valores = decodificar_cursor(cursor, len(chave) + 1)
+        if ordem_cursor != ordenar:
+            raise CursorInvalido()
+        posicao = tuple_(*chave)
+        query = query.filter(posicao < tuple_(*valores) if decrescente else posicao > tuple_(*valores))
+
+    query = query.order_by(*(c.desc() if decrescente else c.asc() for c in chave))
+    produtos = query.limit(limite + 1).all()
+    pagina = produtos[:limite]
+    headers = {}
+    if len(produtos) > limite:
+        ultimo = pagina[-1]
+        headers["X-Proximo-Cursor"] = codificar_cursor(ordenar, *(getattr(ultimo, c.key) for c in chave))
+
+    adaptador = serializador_parcial(selecionados) if selecionados else PRODUTOS
+    return resposta_json(adaptador, pagina, headers=headers)
 
 
 @router.get("/{produto_id}", response_model=ProdutoResponse)
-def buscar_produto(produto_id: int, db: Session = Depends(get_db)):
-    """Busca um produto específico por ID"""
-    produto = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))\
-        .filter(Produto.id == produto_id)\
-        .first()
+def buscar_produto(request: Request, produto_id: int, db: Session = Depends(get_db)):
+    """Busca um produto específico por ID (suporta GET condicional)"""
+    validador = calcular_validador(
+        db, f"produtos/{produto_id}", *resumo_produtos(Produto.id == produto_id), obrigatorio=True
+    )
+    nao_modificada = resposta_nao_modificada(request, validador)
+    if nao_modificada:
+        return nao_modificada
+
+    produto = carregar_produto(db, produto_id)
 
     if not produto:
         raise ProdutoNaoEncontrado(produto_id)
 
-    return produto
+    return com_validador(resposta_json(PRODUTO, produto), validador)
 
 
 @router.put("/{produto_id}", response_model=ProdutoResponse)
@@ -128,7 +180,7 @@ def atualizar_produto(
     produto_id: int,
     produto_update: ProdutoUpdate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Atualiza um produto existente"""
     produto = db.query(Produto).filter(Produto.id == produto_id).first()
@@ -151,11 +203,7 @@ def atualizar_produto(
     db.refresh(produto)
 
     # Carregar relacionamentos
-    produto_completo = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))\
-        .filter(Produto.id == produto_id)\
-        .first()
+    produto_completo = carregar_produto(db, produto_id)
 
     return produto_completo
 
@@ -164,7 +212,7 @@ def atualizar_produto(
 def deletar_produto(
     produto_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Remove um produto do cardápio"""
     produto = db.query(Produto).filter(Produto.id == produto_id).first()
@@ -182,14 +230,10 @@ def deletar_produto(
 def alternar_disponibilidade(
     produto_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Alterna a disponibilidade de um produto"""
-    produto = db.query(Produto)\
-        .options(joinedload(Produto.variacoes))\
-        .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))\
-        .filter(Produto.id == produto_id)\
-        .first()
+    produto = carregar_produto(db, produto_id)
 
     if not produto:
         raise ProdutoNaoEncontrado(produto_id)
@@ -207,7 +251,7 @@ def adicionar_variacao(
     produto_id: int,
     variacao: ProdutoVariacaoCreate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Adiciona uma nova variação a um produto"""
     produto = db.query(Produto).filter(Produto.id == produto_id).first()
@@ -244,7 +288,7 @@ def atualizar_variacao(
     variacao_id: int,
     variacao_update: ProdutoVariacaoUpdate,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Atualiza uma variação existente"""
     variacao = db.query(ProdutoVariacao).filter(
@@ -270,7 +314,7 @@ def deletar_variacao(
     produto_id: int,
     variacao_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Deleta uma variação de produto"""
     variacao = db.query(ProdutoVariacao).filter(
@@ -294,7 +338,7 @@ def adicionar_ingrediente_padrao(
     ingrediente_id: int,
     obrigatorio: bool = False,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Adiciona um ingrediente padrão a um produto"""
     # Verificar se produto existe
@@ -336,7 +380,7 @@ def remover_ingrediente_padrao(
     produto_id: int,
     ingrediente_id: int,
     db: Session = Depends(get_db),
-    _: Usuario = Depends(obter_usuario_admin)
+    _: UsuarioAutenticado = Depends(obter_usuario_admin)
 ):
     """Remove um ingrediente padrão de um produto"""
     produto_ingrediente = db.query(ProdutoIngrediente).filter(
@@ -209,6 +209,33 @@ class PedidoResponse(BaseModel):
         from_attributes = True
 
 
+class PedidoListagemResponse(BaseModel):
+    """Schema resumido de pedido para a listagem administrativa"""
+    id: int
+    status: str
+    usuario_id: int
+    preco_total: float
+    endereco_entrega_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PaginaPedidosResponse(BaseModel):
+    """
+    Schema de uma página da listagem administrativa de pedidos
+
+    `quantidade` é o número de pedidos desta página. O antigo campo `total`
+    (contagem de todos os pedidos do filtro) foi removido: a paginação
+    keyset não faz COUNT sobre a tabela.
+    """
+    quantidade: int
+    pedidos: List[PedidoListagemResponse]
+    proximo_cursor: Optional[str] = None
+
+
 # Schemas de Categoria
 class CategoriaCreate(BaseModel):
     """Schema para criacao de categoria"""
@@ -335,3 +362,31 @@ class CardapioResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class RemovidosResponse(BaseModel):
+    """Schema para IDs removidos do catalogo desde a versao informada"""
+    categorias: List[int] = []
+    produtos: List[int] = []
+    variacoes: List[int] = []
+    ingredientes: List[int] = []
+
+
+class MudancasCardapioResponse(BaseModel):
+    """Schema para resposta da sincronizacao incremental do cardapio"""
+    versao: str
+    ressincronizar: bool = False  # True: baixar GET /cardapio/ e usar esta versao
+    categorias: List[CategoriaResponse] = []
+    produtos: List[ProdutoResponse] = []
+    ingredientes: List[IngredienteResponse] = []
+    removidos: RemovidosResponse = RemovidosResponse()
+
+
+class SugestaoResponse(BaseModel):
+    """Schema para sugestao do autocomplete"""
+    tipo: str  # produto ou ingrediente
+    id: int
+    nome: str
+
+    class Config:
+        from_attributes = True
+
@@ -4,13 +4,12 @@ Execute: python -m app.seed_data
 """
 from sqlalchemy.orm import Session
 from app.database import engine, SessionLocal
+from app.esquema import atualizar_esquema
 from app.models.models import (
-    Base, Categoria, Ingrediente, Produto, ProdutoVariacao,
+    Categoria, Ingrediente, Produto, ProdutoVariacao,
     ProdutoIngrediente, Usuario
 )
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.services.senhas import politica_senhas
 
 
 def criar_categorias(db: Session):
@@ -329,7 +328,7 @@ def criar_usuario_admin(db: Session):
     admin = Usuario(
         nome="Administrador",
         email="admin@pizzaria.com",
-        senha=pwd_context.hash("admin123"),
+        senha=politica_senhas.gerar_hash("admin123"),
         admin=True,
         ativo=True
     )
@@ -341,7 +340,7 @@ def criar_usuario_admin(db: Session):
     usuario = Usuario(
         nome="Cliente Teste",
         email="cliente@teste.com",
-        senha=pwd_context.hash("senha123"),
+        senha=politica_senhas.gerar_hash("senha123"),
         admin=False,
         ativo=True
     )
@@ -373,7 +372,7 @@ def popular_banco():
     print("="*60 + "\n")
 
     # Criar as tabelas se não existirem
-    Base.metadata.create_all(bind=engine)
+    atualizar_esquema(engine)
 
     db = SessionLocal()
 
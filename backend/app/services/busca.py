@@ -0,0 +1,353 @@
+"""Índice invertido em memória para a busca de produtos
+
+Indexa nome e descrição do produto, nome da categoria e nomes dos
+ingredientes padrão. Os textos passam por dobra de acentos (Calabrésa ->
+calabresa) e por um redutor leve de plural/flexão do português
+(pizzas -> pizza, limões -> limao). O último termo da consulta também
+casa por prefixo, para buscas enquanto o usuário digita ("calab").
+
+O ranking soma, para cada termo, o peso do campo em que ele aparece
+multiplicado pelo IDF do termo. Só entram no resultado produtos com
+disponibilidade efetiva (indice_disponibilidade: categoria ativa,
+ingredientes obrigatórios e ao menos uma variação disponíveis), a mesma
+regra do cardápio; o cache de resultados é descartado a cada novo mapa de
+disponibilidade. O índice assina as alterações do
+catálogo: commits marcam como sujos apenas os produtos afetados, que são
+reindexados na próxima busca; alterações de escopo desconhecido (ex.:
+escrita de outro processo detectada pela revalidação) reconstroem tudo.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import Categoria, Ingrediente, Produto, ProdutoIngrediente
+from app.services.catalogo import AlteracoesCatalogo, Catalogo, obter_catalogo, observar_alteracoes
+from app.services.disponibilidade import MapaDisponibilidade, indice_disponibilidade
+
+# Peso de cada campo no ranking
+PESOS_CAMPOS = {
+    "nome": 4.0,
+    "categoria": 2.0,
+    "ingrediente": 1.5,
+    "descricao": 1.0,
+}
+
+# Fator aplicado a termos que casaram só por prefixo
+PESO_PREFIXO = 0.5
+
+# Consultas recentes guardadas por versão do índice
+RESULTADOS_EM_CACHE = 256
+
+_PALAVRA = re.compile(r"[a-z0-9]+")
+
+# Sufixos de plural/flexão (após a dobra de acentos), do mais longo ao mais curto
+_SUFIXOS = (
+    ("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+    ("res", "r"), ("zes", "z"), ("les", "l"), ("ns", "m"), ("s", ""),
+)
+_RADICAL_MINIMO = 3
+
+
+def dobrar(texto: str) -> str:
+    """Remove acentos e converte para minúsculas"""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def radical(palavra: str) -> str:
+    """Redução leve de plural do português sobre uma palavra já dobrada"""
+    for sufixo, troca in _SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= _RADICAL_MINIMO:
+            if sufixo == "s" and palavra.endswith(("ss", "us", "is")):
+                return palavra
+            return palavra[: -len(sufixo)] + troca
+    return palavra
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Quebra o texto em palavras dobradas"""
+    return _PALAVRA.findall(dobrar(texto))
+
+
+class IndiceBusca:
+    """Índice invertido de produtos com manutenção incremental"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versao: Optional[int] = None
+        self._completo = False
+        self._sujos: Set[int] = set()
+        self._categorias_pendentes: Set[int] = set()
+        self._ingredientes_pendentes: Set[int] = set()
+        self._resultados: "OrderedDict[Tuple[Tuple[str, ...], int], List[int]]" = OrderedDict()
+        # Mapa de disponibilidade usado pelos resultados em cache
+        self._disponibilidade: Optional[MapaDisponibilidade] = None
+        self._zerar()
+
+    def _zerar(self) -> None:
+        """Esvazia as estruturas do índice"""
+        # radical -> {produto_id: peso}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        # produto_id -> {radical: peso}
+        self._documentos: Dict[int, Dict[str, float]] = {}
+        # produto_id -> palavras do documento (para o vocabulário de prefixos)
+        self._palavras_documento: Dict[int, Set[str]] = {}
+        # palavra -> quantidade de documentos que a contêm
+        self._palavras: Dict[str, int] = defaultdict(int)
+        self._vocabulario: Optional[List[str]] = None
+        # Relações para propagar alterações de categorias e ingredientes
+        self._por_categoria: Dict[int, Set[int]] = defaultdict(set)
+        self._por_ingrediente: Dict[int, Set[int]] = defaultdict(set)
+        self._categoria_do_produto: Dict[int, int] = {}
+        self._ingredientes_do_produto: Dict[int, Set[int]] = {}
+        # Nomes indexados, para saber se uma categoria/ingrediente alterado mudou de nome
+        self._nomes_categorias: Dict[int, str] = {}
+        self._nomes_ingredientes: Dict[int, str] = {}
+
+    def marcar_alteracoes(self, versao: int, alteracoes: AlteracoesCatalogo) -> None:
+        """
+        Observador do catálogo: marca os produtos afetados como sujos
+
+        Categorias e ingredientes ficam pendentes: qualquer escrita em um
+        produto também aponta a categoria dele, então os dependentes só são
+        reindexados se o nome da categoria/ingrediente de fato mudou.
+        """
+        with self._lock:
+            if alteracoes.completa:
+                self._completo = False
+                return
+            self._sujos |= alteracoes.produtos
+            self._categorias_pendentes |= alteracoes.categorias
+            self._ingredientes_pendentes |= alteracoes.ingredientes
+
+    def limpar(self) -> None:
+        """Descarta o índice (reconstruído na próxima busca)"""
+        with self._lock:
+            self._completo = False
+
+    # Manutenção
+
+    def _carregar(self, db: Session, produto_ids: Optional[Iterable[int]] = None) -> Dict[int, dict]:
+        """Lê os campos indexados de todos os produtos ou dos IDs informados"""
+        query = select(
+            Produto.id, Produto.nome, Produto.descricao,
+            Produto.categoria_id, Categoria.nome.label("categoria_nome")
+        ).join(Categoria, Categoria.id == Produto.categoria_id).where(Produto.deleted_at.is_(None))
+        ingredientes = select(
+            ProdutoIngrediente.produto_id, Ingrediente.id, Ingrediente.nome
+        ).join(Ingrediente, Ingrediente.id == ProdutoIngrediente.ingrediente_id)\
+            .where(Ingrediente.deleted_at.is_(None))
+
+        if produto_ids is not None:
+            ids = list(produto_ids)
+            query = query.where(Produto.id.in_(ids))
+            ingredientes = ingredientes.where(ProdutoIngrediente.produto_id.in_(ids))
+
+        documentos = {
+            linha.id: {
+                "nome": linha.nome,
+                "descricao": linha.descricao,
+                "categoria_id": linha.categoria_id,
+                "categoria": linha.categoria_nome,
+                "ingredientes": {},
+            }
+            for linha in db.execute(query)
+        }
+        for produto_id, ingrediente_id, nome in db.execute(ingredientes):
+            if produto_id in documentos:
+                documentos[produto_id]["ingredientes"][ingrediente_id] = nome
+        return documentos
+
+    def _remover(self, produto_id: int) -> None:
+        """Remove um produto de todas as estruturas"""
+        for termo in self._documentos.pop(produto_id, {}):
+            postings = self._postings.get(termo)
+            if postings is not None:
+                postings.pop(produto_id, None)
+                if not postings:
+                    del self._postings[termo]
+        for palavra in self._palavras_documento.pop(produto_id, set()):
+            self._palavras[palavra] -= 1
+            if self._palavras[palavra] <= 0:
+                del self._palavras[palavra]
+                if self._vocabulario is not None:
+                    del self._vocabulario[bisect.bisect_left(self._vocabulario, palavra)]
+        categoria_id = self._categoria_do_produto.pop(produto_id, None)
+        if categoria_id is not None:
+            self._por_categoria[categoria_id].discard(produto_id)
+        for ingrediente_id in self._ingredientes_do_produto.pop(produto_id, set()):
+            self._por_ingrediente[ingrediente_id].discard(produto_id)
+
+    def _adicionar(self, produto_id: int, dados: dict) -> None:
+        """Indexa um produto"""
+        campos = (
+            ("nome", dados["nome"]),
+            ("descricao", dados["descricao"]),
+            ("categoria", dados["categoria"]),
+            *(("ingrediente", nome) for nome in dados["ingredientes"].values()),
+        )
+        pesos: Dict[str, float] = defaultdict(float)
+        palavras: Set[str] = set()
+        for campo, texto in campos:
+            for palavra in tokenizar(texto):
+                palavras.add(palavra)
+                termo = radical(palavra)
+                # Vale o campo mais forte em que o termo aparece (repetição não infla)
+                pesos[termo] = max(pesos[termo], PESOS_CAMPOS[campo])
+
+        self._documentos[produto_id] = dict(pesos)
+        for termo, peso in pesos.items():
+            self._postings[termo][produto_id] = peso
+        self._palavras_documento[produto_id] = palavras
+        for palavra in palavras:
+            if palavra not in self._palavras and self._vocabulario is not None:
+                bisect.insort(self._vocabulario, palavra)
+            self._palavras[palavra] += 1
+
+        self._categoria_do_produto[produto_id] = dados["categoria_id"]
+        self._por_categoria[dados["categoria_id"]].add(produto_id)
+        self._nomes_categorias[dados["categoria_id"]] = dados["categoria"]
+        self._ingredientes_do_produto[produto_id] = set(dados["ingredientes"])
+        for ingrediente_id, nome in dados["ingredientes"].items():
+            self._por_ingrediente[ingrediente_id].add(produto_id)
+            self._nomes_ingredientes[ingrediente_id] = nome
+
+    def _reconstruir(self, db: Session) -> None:
+        """Indexa todos os produtos do zero"""
+        self._zerar()
+        self._completo = True
+        for produto_id, dados in self._carregar(db).items():
+            self._adicionar(produto_id, dados)
+
+    def _renomeados(self, db: Session, modelo, ids: Set[int], nomes: Dict[int, str]) -> Set[int]:
+        """IDs (já indexados) cujo nome atual difere do indexado"""
+        ids = {id_ for id_ in ids if id_ in nomes}
+        if not ids:
+            return set()
+        atuais = dict(db.execute(
+            select(modelo.id, modelo.nome).where(modelo.id.in_(ids), modelo.deleted_at.is_(None))
+        ).all())
+        return {id_ for id_ in ids if atuais.get(id_) != nomes[id_]}
+
+    def _atualizar(self, db: Session, catalogo: Catalogo, disponibilidade: MapaDisponibilidade) -> None:
+        """Garante que o índice e o cache de resultados refletem a versão atual do catálogo"""
+        versao = catalogo.versao
+        if disponibilidade is not self._disponibilidade:
+            self._disponibilidade = disponibilidade
+            self._resultados.clear()
+        if self._completo and self._versao == versao and not self._sujos \
+                and not self._categorias_pendentes and not self._ingredientes_pendentes:
+            return
+        if not self._completo:
+            self._sujos.clear()
+            self._categorias_pendentes.clear()
+            self._ingredientes_pendentes.clear()
+            self._reconstruir(db)
+        else:
+            categorias, self._categorias_pendentes = self._categorias_pendentes, set()
+            ingredientes, self._ingredientes_pendentes = self._ingredientes_pendentes, set()
+            for categoria_id in self._renomeados(db, Categoria, categorias, self._nomes_categorias):
+                self._sujos |= self._por_categoria.get(categoria_id, set())
+            for ingrediente_id in self._renomeados(db, Ingrediente, ingredientes, self._nomes_ingredientes):
+                self._sujos |= self._por_ingrediente.get(ingrediente_id, set())
+
+        self._resultados.clear()
+        if self._sujos:
+            sujos, self._sujos = self._sujos, set()
+            documentos = self._carregar(db, sujos)
+            for produto_id in sujos:
+                self._remover(produto_id)
+                if produto_id in documentos:
+                    self._adicionar(produto_id, documentos[produto_id])
+        self._versao = versao
+
+    # Consulta
+
+    def _por_prefixo(self, prefixo: str) -> Set[str]:
+        """Radicais das palavras do vocabulário que começam com o prefixo"""
+        if self._vocabulario is None:
+            self._vocabulario = sorted(self._palavras)
+        inicio = bisect.bisect_left(self._vocabulario, prefixo)
+        fim = bisect.bisect_left(self._vocabulario, prefixo + "\uffff")
+        return {radical(palavra) for palavra in self._vocabulario[inicio:fim]}
+
+    def buscar(self, db: Session, termo: str, limite: int = 50) -> List[int]:
+        """
+        Busca produtos disponíveis
+
+        Args:
+            db: Sessão usada só para (re)indexar
+            termo: Texto digitado
+            limite: Máximo de resultados
+
+        Returns:
+            IDs dos produtos, do mais relevante ao menos relevante
+        """
+        palavras = tokenizar(termo)
+        if not palavras:
+            return []
+
+        with self._lock:
+            catalogo = obter_catalogo(db)
+            self._atualizar(db, catalogo, indice_disponibilidade.obter(catalogo))
+            chave = (tuple(palavras), limite)
+            if chave in self._resultados:
+                self._resultados.move_to_end(chave)
+                return list(self._resultados[chave])
+
+            resultado = self._ranquear(palavras, limite)
+            self._resultados[chave] = resultado
+            if len(self._resultados) > RESULTADOS_EM_CACHE:
+                self._resultados.popitem(last=False)
+            return list(resultado)
+
+    def _ranquear(self, palavras: List[str], limite: int) -> List[int]:
+        """Pontua os produtos que contêm todas as palavras e retorna os melhores"""
+        total = max(len(self._documentos), 1)
+        pontuacao: Optional[Dict[int, float]] = None
+
+        for posicao, palavra in enumerate(palavras):
+            termos: List[Tuple[str, float]] = [(radical(palavra), 1.0)]
+            if posicao == len(palavras) - 1:
+                termos += [(t, PESO_PREFIXO) for t in self._por_prefixo(palavra) if t != termos[0][0]]
+
+            da_palavra: Dict[int, float] = defaultdict(float)
+            for termo_indice, fator in termos:
+                postings = self._postings.get(termo_indice)
+                if not postings:
+                    continue
+                multiplicador = math.log(1 + total / len(postings)) * fator
+                for produto_id, peso in postings.items():
+                    da_palavra[produto_id] += peso * multiplicador
+
+            # Todas as palavras precisam casar (AND)
+            if pontuacao is None:
+                pontuacao = da_palavra
+            else:
+                pontuacao = {
+                    produto_id: valor + da_palavra[produto_id]
+                    for produto_id, valor in pontuacao.items() if produto_id in da_palavra
+                }
+            if not pontuacao:
+                return []
+
+        disponivel = self._disponibilidade.produto_disponivel
+        return [
+            produto_id for produto_id, _ in heapq.nsmallest(
+                limite,
+                ((produto_id, valor) for produto_id, valor in pontuacao.items() if disponivel(produto_id)),
+                key=lambda item: (-item[1], item[0])
+            )
+        ]
+
+
+indice_busca = IndiceBusca()
+observar_alteracoes(indice_busca.marcar_alteracoes)
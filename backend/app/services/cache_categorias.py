@@ -0,0 +1,192 @@
+"""Cache das listas de produtos por categoria, com um shard por categoria
+
+GET /cardapio/categorias/{id}/produtos é chamada a cada troca de aba no
+cardápio do frontend. A resposta de cada categoria fica em um shard
+próprio (bytes já serializados e o validador do GET condicional), e um
+acerto não consulta o banco.
+
+A invalidação acompanha as alterações do catálogo (observar_alteracoes) e
+só atinge as categorias afetadas:
+
+- categoria ou produto alterado: as categorias informadas no commit (o
+  catálogo já inclui a categoria atual e a anterior de um produto movido);
+- variação ou associação de ingrediente: a categoria do produto;
+- ingrediente: só as categorias cujas respostas em cache embutem o
+  ingrediente (índice reverso montado a partir do conteúdo cacheado).
+
+A lista sem indisponíveis segue a disponibilidade efetiva
+(indice_disponibilidade), como o cardápio completo e a validação dos
+pedidos: um produto com ingrediente obrigatório em falta ou sem variação
+disponível fica de fora. Por isso o índice reverso dessa lista também
+registra os produtos excluídos da categoria e os ingredientes
+obrigatórios de todos eles, e o ETag inclui os produtos disponíveis.
+
+Um produto ou ingrediente do qual nenhuma resposta em cache depende não
+tem o que invalidar. Cada shard guarda a versão do catálogo da última
+invalidação; uma resposta montada a partir de uma versão anterior (commit
+durante a montagem) não é guardada.
+
+Acertos e falhas por categoria são contados em metricas.
+"""
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from fastapi import Response
+from sqlalchemy.orm import Session
+
+from app.models.models import Produto
+from app.services import metricas
+from app.services.carregamento import consultar_produtos
+from app.services.catalogo import AlteracoesCatalogo, Catalogo, obter_catalogo, observar_alteracoes
+from app.services.condicional import Validador, calcular_validador, com_validador, resumo_produtos
+from app.services.disponibilidade import indice_disponibilidade
+from app.services.serializacao import PRODUTOS
+
+
+@dataclass(frozen=True)
+class ListaCategoria:
+    """Resposta serializada da lista de produtos de uma categoria"""
+    corpo: bytes
+    validador: Optional[Validador]
+    produtos: frozenset  # Produtos dos quais a resposta depende
+    ingredientes: frozenset  # Ingredientes dos quais a resposta depende
+
+    def resposta(self) -> Response:
+        """Response JSON com ETag, Last-Modified e Cache-Control"""
+        return com_validador(Response(self.corpo, media_type="application/json"), self.validador)
+
+
+class _Shard:
+    """Respostas em cache de uma categoria (com e sem indisponíveis)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.listas: Dict[bool, ListaCategoria] = {}
+        self.invalidado_em = 0
+
+
+class CacheCategorias:
+    """Cache das listas de produtos, particionado por categoria"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shards: Dict[int, _Shard] = {}
+        # Índices reversos do conteúdo em cache
+        self._categorias_do_produto: Dict[int, Set[int]] = defaultdict(set)
+        self._categorias_do_ingrediente: Dict[int, Set[int]] = defaultdict(set)
+        # Invalidação completa: nada montado antes desta versão é guardado
+        self._invalidado_em = 0
+
+    def obter(self, db: Session, categoria_id: int, incluir_indisponiveis: bool = False) -> ListaCategoria:
+        """
+        Lista de produtos da categoria, do cache ou montada e guardada
+
+        Args:
+            db: Sessão usada só em uma falha
+            categoria_id: ID da categoria
+            incluir_indisponiveis: Inclui produtos que não podem ser pedidos
+
+        Returns:
+            ListaCategoria com corpo e validador
+        """
+        # Também aplica escritas feitas por outros processos (nova versão)
+        catalogo = obter_catalogo(db)
+        if categoria_id not in catalogo.categorias:
+            # Categorias inexistentes não criam shards
+            return _montar(db, catalogo, categoria_id, incluir_indisponiveis)
+
+        shard = self._shard(categoria_id)
+        lista = shard.listas.get(incluir_indisponiveis)
+        if lista is not None:
+            metricas.cache_categorias.inc(categoria=categoria_id, resultado="acerto")
+            return lista
+
+        metricas.cache_categorias.inc(categoria=categoria_id, resultado="falha")
+        with shard.lock:
+            lista = shard.listas.get(incluir_indisponiveis)
+            if lista is not None:
+                return lista
+            lista = _montar(db, catalogo, categoria_id, incluir_indisponiveis)
+            with self._lock:
+                if catalogo.versao >= max(shard.invalidado_em, self._invalidado_em):
+                    shard.listas[incluir_indisponiveis] = lista
+                    for produto_id in lista.produtos:
+                        self._categorias_do_produto[produto_id].add(categoria_id)
+                    for ingrediente_id in lista.ingredientes:
+                        self._categorias_do_ingrediente[ingrediente_id].add(categoria_id)
+            return lista
+
+    def invalidar(self, versao: int, alteracoes: AlteracoesCatalogo) -> None:
+        """Observador do catálogo: descarta só as categorias afetadas"""
+        with self._lock:
+            if alteracoes.completa:
+                self._invalidado_em = versao
+                self._shards.clear()
+                self._categorias_do_produto.clear()
+                self._categorias_do_ingrediente.clear()
+                return
+
+            categorias = set(alteracoes.categorias)
+            for produto_id in alteracoes.produtos:
+                categorias |= self._categorias_do_produto.get(produto_id, set())
+            for ingrediente_id in alteracoes.ingredientes:
+                categorias |= self._categorias_do_ingrediente.get(ingrediente_id, set())
+
+            for categoria_id in categorias:
+                shard = self._shards.get(categoria_id)
+                if shard is not None:
+                    shard.invalidado_em = versao
+                    shard.listas = {}
+
+    def limpar(self) -> None:
+        """Descarta todo o cache"""
+        with self._lock:
+            self._shards.clear()
+            self._categorias_do_produto.clear()
+            self._categorias_do_ingrediente.clear()
+
+    def _shard(self, categoria_id: int) -> _Shard:
+        """Shard da categoria, criado no primeiro acesso"""
+        shard = self._shards.get(categoria_id)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(categoria_id, _Shard())
+                shard.invalidado_em = max(shard.invalidado_em, self._invalidado_em)
+        return shard
+
+
+def _montar(db: Session, catalogo: Catalogo, categoria_id: int, incluir_indisponiveis: bool) -> ListaCategoria:
+    """Consulta, serializa e calcula o validador da lista de uma categoria"""
+    filtros = [Produto.categoria_id == categoria_id]
+    escopo = f"cardapio/categorias/{categoria_id}/produtos?indisponiveis={incluir_indisponiveis}"
+    candidatos: Set[int] = set()
+    obrigatorios: Set[int] = set()
+    if not incluir_indisponiveis:
+        disponibilidade = indice_disponibilidade.obter(catalogo)
+        candidatos = {p.id for p in catalogo.produtos.values() if p.categoria_id == categoria_id}
+        obrigatorios = {
+            ingrediente_id
+            for (produto_id, ingrediente_id), associacao in catalogo.ingredientes_padrao.items()
+            if produto_id in candidatos and associacao.obrigatorio
+        }
+        disponiveis = sorted(i for i in candidatos if disponibilidade.produto_disponivel(i))
+        filtros.append(Produto.id.in_(disponiveis))
+        # Categoria desativada ou ingrediente obrigatório em falta não mudam os agregados dos produtos
+        escopo += f"&disponiveis={disponiveis}"
+
+    validador = calcular_validador(db, escopo, *resumo_produtos(*filtros))
+    produtos = consultar_produtos(db).filter(*filtros).all()
+    return ListaCategoria(
+        corpo=PRODUTOS.dump_json(PRODUTOS.validate_python(produtos, from_attributes=True)),
+        validador=validador,
+        produtos=frozenset(candidatos | {produto.id for produto in produtos}),
+        ingredientes=frozenset(obrigatorios | {
+            associacao.ingrediente_id for produto in produtos for associacao in produto.ingredientes
+        }),
+    )
+
+
+cache_categorias = CacheCategorias()
+observar_alteracoes(cache_categorias.invalidar)
@@ -0,0 +1,121 @@
+"""Cardápio público pré-serializado
+
+GET /cardapio/ é a rota mais acessada e o conteúdo só muda quando o
+catálogo muda. O JSON completo é montado uma vez por versão do catálogo
+(app.services.catalogo) e guardado como bytes, junto com a versão gzip e
+um ETag forte. Commits em categorias, produtos, variações, ingredientes
+ou ingredientes padrão incrementam a versão e a próxima leitura
+reconstrói os bytes.
+
+O ETag é o hash do conteúdo e não o número da versão: a versão é local
+ao processo, então dois workers poderiam usar o mesmo número para
+conteúdos diferentes.
+"""
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.models import Categoria
+from app.schemas.schemas import CardapioResponse
+from app.services.carregamento import consultar_categorias
+from app.services.catalogo import obter_catalogo
+from app.services.disponibilidade import indice_disponibilidade
+
+
+@dataclass(frozen=True)
+class CardapioSerializado:
+    """Bytes do cardápio em uma versão do catálogo"""
+    versao: int
+    corpo: bytes
+    corpo_gzip: bytes
+    etag: str
+    etag_gzip: str
+
+
+_cache: Optional[CardapioSerializado] = None
+_lock_construcao = threading.Lock()
+
+
+def carregar_cardapio(db: Session) -> dict:
+    """
+    Lê categorias ativas com produtos disponíveis, variações e ingredientes
+
+    Returns:
+        Dados no formato de CardapioResponse (produtos como objetos ORM)
+    """
+    # Carregar categorias com produtos, variacoes e ingredientes (uma query por nivel)
+    categorias = consultar_categorias(db)\
+        .filter(Categoria.ativa == True)\
+        .order_by(Categoria.ordem_exibicao)\
+        .all()
+
+    # Filtrar apenas produtos disponiveis (variações, categoria e ingredientes obrigatórios inclusos)
+    disponibilidade = indice_disponibilidade.obter(obter_catalogo(db))
+    cardapio_data = []
+    for categoria in categorias:
+        produtos_disponiveis = [p for p in categoria.produtos if disponibilidade.produto_disponivel(p.id)]
+        if produtos_disponiveis:  # Apenas incluir categoria se tiver produtos disponiveis
+            cardapio_data.append({
+                "id": categoria.id,
+                "nome": categoria.nome,
+                "descricao": categoria.descricao,
+                "icone": categoria.icone,
+                "ordem_exibicao": categoria.ordem_exibicao,
+                "produtos": produtos_disponiveis
+            })
+
+    return {"categorias": cardapio_data}
+
+
+def _serializar(db: Session, versao: int) -> CardapioSerializado:
+    """Monta, serializa e comprime o cardápio"""
+    corpo = CardapioResponse.model_validate(carregar_cardapio(db)).model_dump_json().encode()
+    digest = hashlib.sha256(corpo).hexdigest()[:32]
+    return CardapioSerializado(
+        versao=versao,
+        corpo=corpo,
+        corpo_gzip=gzip.compress(corpo, compresslevel=6, mtime=0),
+        etag=f'"{digest}"',
+        etag_gzip=f'"{digest}-gzip"'
+    )
+
+
+def obter_cardapio_serializado(db: Session) -> CardapioSerializado:
+    """
+    Retorna o cardápio serializado na versão atual do catálogo
+
+    Args:
+        db: Sessão usada só quando é preciso reconstruir
+
+    Returns:
+        CardapioSerializado com bytes, gzip e ETags
+    """
+    global _cache
+
+    # Também revalida o catálogo contra escritas de outros processos
+    versao = obter_catalogo(db).versao
+    cache = _cache
+    if cache is not None and cache.versao == versao:
+        return cache
+
+    with _lock_construcao:
+        cache = _cache
+        if cache is not None and cache.versao == versao:
+            return cache
+        cache = _serializar(db, versao)
+        if _cache is None or cache.versao >= _cache.versao:
+            _cache = cache
+        return cache
+
+
+def aceita_gzip(accept_encoding: Optional[str]) -> bool:
+    """Verifica se o cliente aceita gzip (ignorando q=0)"""
+    for codificacao in (accept_encoding or "").split(","):
+        nome, _, parametros = codificacao.strip().partition(";")
+        if nome.strip().lower() in ("gzip", "*"):
+            return parametros.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
@@ -0,0 +1,141 @@
+"""Carregamento do grafo de produtos sem explosão de linhas
+
+Encadear joinedload(Produto.variacoes) com
+joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente)
+faz o banco devolver o produto cartesiano variações x ingredientes: uma
+pizza com 4 tamanhos e 12 ingredientes vira 48 linhas, cada uma repetindo
+todas as colunas do produto.
+
+Aqui cada relacionamento é buscado por uma consulta própria com
+IN (ids do nível anterior), no estilo selectinload, e o SQLAlchemy monta o
+grafo em memória. O número de linhas passa a ser a soma de produtos,
+variações, associações e ingredientes distintos, e o número de consultas
+é fixo (uma por nível), independente da quantidade de produtos.
+
+Listagens com projeção (?campos=) carregam só as colunas e relações
+pedidas; o resto fica com raiseload, então um acesso acidental falha em
+vez de disparar uma consulta escondida.
+"""
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from pydantic import ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import Query, Session, load_only, raiseload, selectinload
+
+from app.exceptions import CampoInvalido
+from app.models.models import Categoria, Produto, ProdutoIngrediente
+from app.schemas.schemas import ProdutoResponse
+
+# Opções de carga reutilizáveis (objetos imutáveis)
+OPCOES_PRODUTO = (
+    selectinload(Produto.variacoes),
+    selectinload(Produto.ingredientes).selectinload(ProdutoIngrediente.ingrediente),
+)
+
+OPCOES_CATEGORIA = (
+    selectinload(Categoria.produtos).selectinload(Produto.variacoes),
+    selectinload(Categoria.produtos)
+    .selectinload(Produto.ingredientes)
+    .selectinload(ProdutoIngrediente.ingrediente),
+)
+
+# Campos aceitos na projeção de produtos: colunas e relacionamentos
+COLUNAS_PRODUTO = ("id", "categoria_id", "nome", "descricao", "imagem_url", "disponivel", "created_at", "updated_at")
+RELACIONAMENTOS_PRODUTO = {
+    "variacoes": selectinload(Produto.variacoes),
+    "ingredientes": selectinload(Produto.ingredientes).selectinload(ProdutoIngrediente.ingrediente),
+}
+
+
+def consultar_produtos(db: Session) -> Query:
+    """
+    Consulta de produtos com variações e ingredientes
+
+    Filtros e ordenação podem ser encadeados normalmente; os
+    relacionamentos são carregados em consultas separadas ao final.
+    """
+    return db.query(Produto).options(*OPCOES_PRODUTO)
+
+
+def carregar_produto(db: Session, produto_id: int) -> Optional[Produto]:
+    """Carrega um produto com variações e ingredientes (None se não existir)"""
+    return consultar_produtos(db).filter(Produto.id == produto_id).first()
+
+
+def carregar_produtos_por_id(db: Session, produto_ids: Sequence[int]) -> List[Produto]:
+    """
+    Carrega produtos preservando a ordem dos IDs informados
+
+    IDs inexistentes são ignorados.
+    """
+    if not produto_ids:
+        return []
+    por_id = {produto.id: produto for produto in consultar_produtos(db).filter(Produto.id.in_(produto_ids))}
+    return [por_id[produto_id] for produto_id in produto_ids if produto_id in por_id]
+
+
+def consultar_categorias(db: Session) -> Query:
+    """Consulta de categorias com produtos, variações e ingredientes"""
+    return db.query(Categoria).options(*OPCOES_CATEGORIA)
+
+
+def validar_campos(campos: str) -> Tuple[str, ...]:
+    """
+    Interpreta a lista de campos separada por vírgulas
+
+    Args:
+        campos: Ex.: "nome,disponivel,variacoes"
+
+    Returns:
+        Campos na ordem do ProdutoResponse, sempre incluindo id
+
+    Raises:
+        CampoInvalido: Se algum campo não existir
+    """
+    permitidos = (*COLUNAS_PRODUTO, *RELACIONAMENTOS_PRODUTO)
+    pedidos = {campo.strip() for campo in campos.split(",") if campo.strip()}
+    for campo in sorted(pedidos):
+        if campo not in permitidos:
+            raise CampoInvalido(campo, permitidos)
+    pedidos.add("id")
+    return tuple(campo for campo in ProdutoResponse.model_fields if campo in pedidos)
+
+
+def consultar_produtos_parciais(db: Session, campos: Sequence[str], *colunas_extras) -> Query:
+    """
+    Consulta de produtos que carrega só os campos informados
+
+    Args:
+        db: Sessão do banco
+        campos: Campos validados por validar_campos
+        colunas_extras: Colunas necessárias à consulta mas fora da resposta
+            (ex.: a coluna de ordenação usada no cursor)
+
+    Returns:
+        Query com load_only nas colunas e selectinload só nas relações pedidas
+    """
+    colunas = {campo: getattr(Produto, campo) for campo in campos if campo in COLUNAS_PRODUTO}
+    colunas.update((coluna.key, coluna) for coluna in colunas_extras)
+    relacionamentos = [RELACIONAMENTOS_PRODUTO[campo] for campo in campos if campo in RELACIONAMENTOS_PRODUTO]
+    return db.query(Produto).options(
+        load_only(*colunas.values(), raiseload=True),
+        *relacionamentos,
+        raiseload("*")
+    )
+
+
+@lru_cache(maxsize=64)
+def serializador_parcial(campos: Tuple[str, ...]) -> TypeAdapter:
+    """
+    Serializador de listas de produtos com apenas os campos informados
+
+    Lê só os atributos pedidos (nada de carga preguiçosa) e reaproveita os
+    tipos do ProdutoResponse. Cacheado por combinação de campos.
+    """
+    modelo = create_model(
+        "ProdutoParcialResponse",
+        __config__=ConfigDict(from_attributes=True),
+        __module__=ProdutoResponse.__module__,
+        **{campo: (ProdutoResponse.model_fields[campo].annotation, ...) for campo in campos}
+    )
+    return TypeAdapter(List[modelo])
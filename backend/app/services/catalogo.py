@@ -0,0 +1,332 @@
+"""Catálogo de preços em memória
+
+Mantém um snapshot imutável, local ao processo, com preços das variações,
+disponibilidade de produtos, variações e ingredientes, adicionais dos
+ingredientes e a flag de ingrediente obrigatório. O snapshot é trocado
+atomicamente: leitores sempre enxergam um catálogo inteiro e consistente.
+
+Qualquer commit que altere categorias, produtos, variações, ingredientes
+ou ingredientes padrão incrementa a versão do catálogo (via eventos da
+Session), e a próxima leitura reconstrói o snapshot. Outros índices em
+memória podem assinar as alterações com observar_alteracoes.
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.config import CATALOGO_REVALIDAR_SEGUNDOS
+from app.models.models import (
+    Categoria, Produto, ProdutoVariacao, Ingrediente, ProdutoIngrediente
+)
+
+
+@dataclass(frozen=True)
+class CategoriaCatalogo:
+    """Dados de uma categoria no snapshot"""
+    id: int
+    nome: str
+    ativa: bool
+
+
+@dataclass(frozen=True)
+class ProdutoCatalogo:
+    """Dados de um produto no snapshot"""
+    id: int
+    categoria_id: int
+    nome: str
+    disponivel: bool
+
+
+@dataclass(frozen=True)
+class VariacaoCatalogo:
+    """Dados de uma variação (tamanho/preço) no snapshot"""
+    id: int
+    produto_id: int
+    tamanho: str
+    preco: float
+    disponivel: bool
+
+
+@dataclass(frozen=True)
+class IngredienteCatalogo:
+    """Dados de um ingrediente no snapshot"""
+    id: int
+    nome: str
+    preco_adicional: float
+    disponivel: bool
+
+
+@dataclass(frozen=True)
+class IngredientePadraoCatalogo:
+    """Associação de ingrediente padrão de um produto no snapshot"""
+    produto_id: int
+    ingrediente_id: int
+    obrigatorio: bool
+
+
+@dataclass(frozen=True)
+class Catalogo:
+    """Snapshot imutável do catálogo em uma versão"""
+    versao: int
+    assinatura: tuple
+    categorias: Mapping[int, CategoriaCatalogo]
+    produtos: Mapping[int, ProdutoCatalogo]
+    variacoes: Mapping[int, VariacaoCatalogo]
+    ingredientes: Mapping[int, IngredienteCatalogo]
+    ingredientes_padrao: Mapping[Tuple[int, int], IngredientePadraoCatalogo]
+    verificado_em: float
+
+
+@dataclass(frozen=True)
+class AlteracoesCatalogo:
+    """IDs afetados por um commit no catálogo"""
+    categorias: frozenset = frozenset()
+    produtos: frozenset = frozenset()
+    variacoes: frozenset = frozenset()
+    ingredientes: frozenset = frozenset()
+    completa: bool = False  # Escopo desconhecido: tudo pode ter mudado
+
+
+_MODELOS_CATALOGO = (Categoria, Produto, ProdutoVariacao, Ingrediente, ProdutoIngrediente)
+_CHAVE_ALTERACOES = "alteracoes_catalogo"
+_TENTATIVAS_CONSTRUCAO = 3
+
+_lock_versao = threading.Lock()
+_lock_construcao = threading.Lock()
+_versao = 0
+_catalogo: Optional[Catalogo] = None
+_observadores: List[Callable[[int, "AlteracoesCatalogo"], None]] = []
+
+
+def versao_catalogo() -> int:
+    """Retorna a versão atual do catálogo neste processo"""
+    return _versao
+
+
+def invalidar_catalogo(alteracoes: Optional[AlteracoesCatalogo] = None) -> int:
+    """
+    Incrementa a versão do catálogo
+
+    Args:
+        alteracoes: IDs afetados (None quando o escopo é desconhecido)
+
+    Returns:
+        Nova versão do catálogo
+    """
+    global _versao
+    alteracoes = alteracoes or AlteracoesCatalogo(completa=True)
+    with _lock_versao:
+        versao = _versao + 1
+        # Os observadores recebem as alterações antes de a versão ficar
+        # visível: um leitor que já enxergue a versão nova (e monte o
+        # snapshot dela) encontra as alterações pendentes registradas
+        try:
+            for observador in _observadores:
+                observador(versao, alteracoes)
+        finally:
+            _versao = versao
+    return versao
+
+
+def observar_alteracoes(observador: Callable[[int, AlteracoesCatalogo], None]) -> None:
+    """
+    Registra uma função chamada a cada nova versão do catálogo
+
+    O observador recebe a nova versão e os IDs afetados (completa=True
+    quando o escopo é desconhecido) e deve ser rápido: roda na thread
+    que fez o commit, com o lock da versão, antes de a nova versão ficar
+    visível em versao_catalogo()/obter_catalogo(). Por isso não pode
+    ler o catálogo, só registrar o que mudou.
+    """
+    _observadores.append(observador)
+
+
+def _assinatura(db: Session) -> tuple:
+    """Calcula max(updated_at) e contagem de cada tabela do catálogo em uma consulta"""
+    colunas = []
+    for modelo in _MODELOS_CATALOGO:
+        colunas.append(select(func.max(modelo.updated_at)).scalar_subquery())
+        colunas.append(select(func.count(modelo.id)).scalar_subquery())
+    return tuple(db.execute(select(*colunas)).one())
+
+
+def _construir(db: Session, versao: int) -> Catalogo:
+    """Lê as tabelas do catálogo e monta um snapshot imutável"""
+    assinatura = _assinatura(db)
+
+    categorias = {
+        row.id: CategoriaCatalogo(row.id, row.nome, bool(row.ativa))
+        for row in db.execute(
+            select(Categoria.id, Categoria.nome, Categoria.ativa)
+            .where(Categoria.deleted_at.is_(None))
+        )
+    }
+    produtos = {
+        row.id: ProdutoCatalogo(row.id, row.categoria_id, row.nome, bool(row.disponivel))
+        for row in db.execute(
+            select(Produto.id, Produto.categoria_id, Produto.nome, Produto.disponivel)
+            .where(Produto.deleted_at.is_(None))
+        )
+    }
+    variacoes = {
+        row.id: VariacaoCatalogo(row.id, row.produto_id, row.tamanho, row.preco, bool(row.disponivel))
+        for row in db.execute(
+            select(
+                ProdutoVariacao.id, ProdutoVariacao.produto_id, ProdutoVariacao.tamanho,
+                ProdutoVariacao.preco, ProdutoVariacao.disponivel
+            ).where(ProdutoVariacao.deleted_at.is_(None))
+        )
+        if row.produto_id in produtos
+    }
+    ingredientes = {
+        row.id: IngredienteCatalogo(row.id, row.nome, row.preco_adicional, bool(row.disponivel))
+        for row in db.execute(
+            select(Ingrediente.id, Ingrediente.nome, Ingrediente.preco_adicional, Ingrediente.disponivel)
+            .where(Ingrediente.deleted_at.is_(None))
+        )
+    }
+    ingredientes_padrao = {
+        (row.produto_id, row.ingrediente_id): IngredientePadraoCatalogo(
+            row.produto_id, row.ingrediente_id, bool(row.obrigatorio)
+        )
+        for row in db.execute(
+            select(
+                ProdutoIngrediente.produto_id, ProdutoIngrediente.ingrediente_id,
+                ProdutoIngrediente.obrigatorio
+            )
+        )
+        if row.produto_id in produtos and row.ingrediente_id in ingredientes
+    }
+
+    return Catalogo(
+        versao=versao,
+        assinatura=assinatura,
+        categorias=MappingProxyType(categorias),
+        produtos=MappingProxyType(produtos),
+        variacoes=MappingProxyType(variacoes),
+        ingredientes=MappingProxyType(ingredientes),
+        ingredientes_padrao=MappingProxyType(ingredientes_padrao),
+        verificado_em=time.monotonic()
+    )
+
+
+def _revalidar(db: Session, catalogo: Catalogo) -> bool:
+    """
+    Confere a assinatura do banco para detectar escritas de outros processos
+
+    Returns:
+        True se o snapshot continua válido
+    """
+    if _assinatura(db) != catalogo.assinatura:
+        invalidar_catalogo()
+        return False
+
+    global _catalogo
+    with _lock_versao:
+        if _catalogo is catalogo:
+            _catalogo = replace(catalogo, verificado_em=time.monotonic())
+    return True
+
+
+def obter_catalogo(db: Session) -> Catalogo:
+    """
+    Retorna o snapshot do catálogo na versão atual
+
+    Reconstrói o snapshot quando a versão mudou desde a última leitura.
+    Se um commit acontecer durante a reconstrução, a leitura é refeita
+    para que nunca se publique um catálogo parcialmente atualizado.
+
+    Args:
+        db: Sessão usada apenas quando é preciso (re)construir o snapshot
+
+    Returns:
+        Catalogo imutável
+    """
+    global _catalogo
+
+    catalogo = _catalogo
+    if catalogo is not None and catalogo.versao == _versao:
+        if time.monotonic() - catalogo.verificado_em <= CATALOGO_REVALIDAR_SEGUNDOS:
+            return catalogo
+        if _revalidar(db, catalogo):
+            return catalogo
+
+    with _lock_construcao:
+        catalogo = _catalogo
+        if catalogo is not None and catalogo.versao == _versao:
+            return catalogo
+
+        for _ in range(_TENTATIVAS_CONSTRUCAO):
+            versao = _versao
+            novo = _construir(db, versao)
+            if versao == _versao:
+                break
+
+        with _lock_versao:
+            if _catalogo is None or novo.versao >= _catalogo.versao:
+                _catalogo = novo
+        return novo
+
+
+def _registrar_alteracoes(session: Session, flush_context) -> None:
+    """Acumula na sessão os IDs do catálogo afetados por um flush"""
+    registro: Dict[str, Set[int]] = session.info.setdefault(
+        _CHAVE_ALTERACOES,
+        {"categorias": set(), "produtos": set(), "variacoes": set(), "ingredientes": set()}
+    )
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, _MODELOS_CATALOGO):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+
+        if isinstance(obj, Categoria):
+            registro["categorias"].add(obj.id)
+        elif isinstance(obj, Produto):
+            registro["produtos"].add(obj.id)
+            registro["categorias"].add(obj.categoria_id)
+            registro["categorias"].update(_historico(obj, "categoria_id"))
+        elif isinstance(obj, ProdutoVariacao):
+            registro["variacoes"].add(obj.id)
+            registro["produtos"].add(obj.produto_id)
+        elif isinstance(obj, Ingrediente):
+            registro["ingredientes"].add(obj.id)
+        elif isinstance(obj, ProdutoIngrediente):
+            registro["produtos"].add(obj.produto_id)
+            registro["ingredientes"].add(obj.ingrediente_id)
+
+
+def _historico(obj, atributo: str) -> Set[int]:
+    """Retorna valores anteriores de um atributo alterado no flush"""
+    historico = inspect(obj).attrs[atributo].history
+    return {valor for valor in historico.deleted if valor is not None}
+
+
+def _publicar_alteracoes(session: Session) -> None:
+    """Após o commit, incrementa a versão se o catálogo foi alterado"""
+    registro = session.info.pop(_CHAVE_ALTERACOES, None)
+    if not registro or not any(registro.values()):
+        return
+
+    invalidar_catalogo(AlteracoesCatalogo(
+        categorias=frozenset(registro["categorias"] - {None}),
+        produtos=frozenset(registro["produtos"] - {None}),
+        variacoes=frozenset(registro["variacoes"] - {None}),
+        ingredientes=frozenset(registro["ingredientes"] - {None})
+    ))
+
+
+def _descartar_alteracoes(session: Session) -> None:
+    """Descarta alterações registradas quando a transação é revertida"""
+    session.info.pop(_CHAVE_ALTERACOES, None)
+
+
+event.listen(Session, "after_flush", _registrar_alteracoes)
+event.listen(Session, "after_commit", _publicar_alteracoes)
+event.listen(Session, "after_rollback", _descartar_alteracoes)
@@ -0,0 +1,239 @@
+"""Chaves de assinatura dos tokens JWT e documento JWKS
+
+Com ALGORITHM=HS256 (padrão) os tokens continuam assinados com
+SECRET_KEY, e quem quiser verificá-los precisa do segredo. Com RS256 ou
+ES256 a API assina com uma chave privada e publica as chaves públicas em
+GET /.well-known/jwks.json: telas da cozinha, relatórios e outros
+serviços verificam os tokens localmente, sem o segredo e sem chamar a API.
+
+As chaves ficam em JWT_CHAVES_DIRETORIO, um arquivo PEM por chave, e o
+nome do arquivo (sem .pem) é o kid. JWT_CHAVE_ATIVA escolhe a chave que
+assina; todas as chaves do diretório verificam. Rotação: gerar a nova
+chave (python -m app.gerar_chave_jwt), apontar JWT_CHAVE_ATIVA para ela e
+remover a antiga depois que os tokens assinados com ela vencerem
+(REFRESH_TOKEN_EXPIRE_DAYS). Arquivos só com a chave pública também são
+aceitos, para verificar tokens de chaves que já não assinam.
+
+As chaves são carregadas e convertidas uma vez, na inicialização, e o
+JWKS é montado e serializado uma única vez, com ETag. Chaveiro.recarregar
+(SIGHUP no processo da API) relê o diretório sem reiniciar e incrementa a
+geração do chaveiro, invalidando as verificações memoizadas em
+app.services.tokens: tokens de um kid removido deixam de valer na hora.
+
+EdDSA não é suportado pelo python-jose; ES256 é a alternativa de curva
+elíptica (assinaturas e chaves pequenas).
+"""
+import hashlib
+import json
+import logging
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from jose import jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWTError
+
+from app.config import ALGORITHM, JWT_CHAVE_ATIVA, JWT_CHAVES_DIRETORIO, SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+ALGORITMOS_ASSIMETRICOS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+# Curva de cada algoritmo ECDSA (RFC 7518)
+_CURVAS = {"ES256": "SECP256R1", "ES384": "SECP384R1", "ES512": "SECP521R1"}
+
+
+@dataclass(frozen=True)
+class _Chaves:
+    """Chaves carregadas do diretório e o JWKS correspondente"""
+    publicas: Mapping[str, Key]
+    privada: Optional[Key]
+    kid: Optional[str]
+    jwks: bytes
+    jwks_etag: str
+
+
+class Chaveiro:
+    """Assina e verifica tokens com a chave ativa e as chaves de verificação"""
+
+    def __init__(
+        self,
+        algoritmo: str,
+        segredo: Optional[str] = None,
+        diretorio: str = "",
+        chave_ativa: str = ""
+    ):
+        """
+        Args:
+            algoritmo: ALGORITHM (HS* usa o segredo; RS*/ES* usam as chaves do diretório)
+            segredo: SECRET_KEY (só para HS*)
+            diretorio: Diretório com os arquivos <kid>.pem
+            chave_ativa: kid da chave que assina (opcional se houver uma só chave privada)
+
+        Raises:
+            ValueError: Configuração de chaves inválida
+        """
+        self.algoritmo = algoritmo
+        self.assimetrico = algoritmo in ALGORITMOS_ASSIMETRICOS
+        self._segredo = segredo
+        self._diretorio = Path(diretorio) if diretorio else None
+        self._chave_ativa = chave_ativa
+        self._chaves = self._carregar()
+        # Incrementada a cada recarga: verificações de gerações anteriores não valem mais
+        self.geracao = 0
+
+    @property
+    def kid(self) -> Optional[str]:
+        """kid da chave que assina (None com HS*)"""
+        return self._chaves.kid
+
+    @property
+    def jwks(self) -> bytes:
+        """Documento JWKS serializado"""
+        return self._chaves.jwks
+
+    @property
+    def jwks_etag(self) -> str:
+        """ETag do JWKS"""
+        return self._chaves.jwks_etag
+
+    def recarregar(self) -> None:
+        """
+        Relê as chaves do diretório (rotação ou remoção de chave sem reiniciar)
+
+        Raises:
+            ValueError: Configuração de chaves inválida (as chaves atuais continuam valendo)
+        """
+        self._chaves = self._carregar()
+        self.geracao += 1
+
+    def _carregar(self) -> _Chaves:
+        """Lê e converte as chaves do diretório e monta o JWKS"""
+        publicas: Dict[str, Key] = {}
+        privadas: Dict[str, Key] = {}
+        kid = None
+        if self.assimetrico:
+            diretorio = self._diretorio
+            if diretorio is None or not diretorio.is_dir():
+                raise ValueError(f"{self.algoritmo} exige JWT_CHAVES_DIRETORIO com as chaves PEM")
+
+            for arquivo in sorted(diretorio.glob("*.pem")):
+                try:
+                    chave = jwk.construct(arquivo.read_bytes(), self.algoritmo)
+                    publica = chave if chave.is_public() else chave.public_key()
+                    # construct aceita uma chave de outro tipo; o erro só aparece ao exportá-la
+                    publica.to_dict()
+                except Exception as erro:
+                    raise ValueError(f"Chave {arquivo.name} inválida para {self.algoritmo}: {erro}") from erro
+                publicas[arquivo.stem] = publica
+                if not chave.is_public():
+                    privadas[arquivo.stem] = chave
+
+            kid = self._chave_ativa
+            if not kid and len(privadas) == 1:
+                kid = next(iter(privadas))
+            if kid not in privadas:
+                raise ValueError(
+                    f"JWT_CHAVE_ATIVA deve ser o kid de uma chave privada em {diretorio} "
+                    f"(disponíveis: {', '.join(privadas) or 'nenhuma'})"
+                )
+
+        jwks = json.dumps({"keys": [
+            {**chave.to_dict(), "kid": kid_publica, "use": "sig", "alg": self.algoritmo}
+            for kid_publica, chave in sorted(publicas.items())
+        ]}, separators=(",", ":")).encode()
+        return _Chaves(
+            publicas=MappingProxyType(publicas),
+            privada=privadas.get(kid),
+            kid=kid,
+            jwks=jwks,
+            jwks_etag=f'"{hashlib.sha256(jwks).hexdigest()[:32]}"'
+        )
+
+    def assinar(self, claims: Mapping) -> str:
+        """
+        Codifica e assina as claims
+
+        Returns:
+            Token JWT (com kid no cabeçalho quando assimétrico)
+        """
+        if not self.assimetrico:
+            return jwt.encode(dict(claims), self._segredo, algorithm=self.algoritmo)
+        chaves = self._chaves
+        return jwt.encode(dict(claims), chaves.privada, algorithm=self.algoritmo, headers={"kid": chaves.kid})
+
+    def verificar(self, token: str) -> dict:
+        """
+        Verifica assinatura e validade do token
+
+        Returns:
+            Claims do token
+
+        Raises:
+            JWTError: Token malformado, kid desconhecido, assinatura incorreta ou vencido
+        """
+        if not self.assimetrico:
+            return jwt.decode(token, self._segredo, algorithms=[self.algoritmo])
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        chave = self._chaves.publicas.get(kid) if isinstance(kid, str) else None
+        if chave is None:
+            raise JWTError("Chave de assinatura desconhecida")
+        # algorithms fixo: um token HS* nunca é verificado com a chave pública como segredo
+        return jwt.decode(token, chave, algorithms=[self.algoritmo])
+
+
+def gerar_chave(diretorio: str, algoritmo: str, kid: Optional[str] = None) -> Path:
+    """
+    Gera uma chave privada PEM em <diretorio>/<kid>.pem
+
+    Args:
+        diretorio: Diretório das chaves (criado se não existir)
+        algoritmo: RS* (RSA 2048 bits) ou ES* (curva do algoritmo)
+        kid: Identificador da chave (padrão: data de hoje + sufixo aleatório)
+
+    Returns:
+        Caminho do arquivo gerado
+
+    Raises:
+        ValueError: Algoritmo não assimétrico ou kid já existente
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algoritmo not in ALGORITMOS_ASSIMETRICOS:
+        raise ValueError(f"Algoritmo {algoritmo} não usa par de chaves ({', '.join(ALGORITMOS_ASSIMETRICOS)})")
+    kid = kid or f"{datetime.now(timezone.utc):%Y%m%d}-{secrets.token_hex(3)}"
+    caminho = Path(diretorio) / f"{kid}.pem"
+    if caminho.exists():
+        raise ValueError(f"Já existe uma chave com o kid {kid}")
+
+    if algoritmo.startswith("RS"):
+        privada = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        privada = ec.generate_private_key(getattr(ec, _CURVAS[algoritmo])())
+    pem = privada.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.touch(mode=0o600)
+    caminho.write_bytes(pem)
+    return caminho
+
+
+chaveiro = Chaveiro(ALGORITHM, SECRET_KEY, JWT_CHAVES_DIRETORIO, JWT_CHAVE_ATIVA)
+
+
+def recarregar_chaves() -> None:
+    """Recarrega o chaveiro do processo (handler de SIGHUP), registrando o resultado"""
+    try:
+        chaveiro.recarregar()
+    except ValueError:
+        logger.exception("Falha ao recarregar as chaves JWT; as chaves atuais continuam valendo")
+        return
+    logger.warning("Chaves JWT recarregadas (geração %d, kid ativo %s)", chaveiro.geracao, chaveiro.kid)
@@ -0,0 +1,152 @@
+"""GET condicional (ETag / Last-Modified) para recursos do catálogo
+
+Cada recurso tem um validador barato: uma única consulta de agregados
+(max(updated_at) e count(id)) sobre as linhas que compõem a resposta,
+respondida pelos índices, sem montar objetos ORM. O ETag é o hash desses
+agregados e dos parâmetros da rota; Last-Modified é o maior updated_at.
+
+A rota calcula o validador antes de consultar os dados: se o cliente já
+tem a representação atual (If-None-Match, ou If-Modified-Since quando não
+há If-None-Match, como manda a RFC 9110), responde 304 sem consulta nem
+serialização.
+
+count(id) entra no validador porque remoções físicas não deixam
+updated_at mais recente.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import CACHE_CONTROL_CATALOGO
+from app.models.models import Ingrediente, Produto, ProdutoIngrediente, ProdutoVariacao
+
+
+@dataclass(frozen=True)
+class Validador:
+    """Validadores HTTP de uma representação"""
+    etag: str
+    ultima_modificacao: Optional[datetime]  # UTC, sem fuso (como updated_at)
+
+    def headers(self) -> dict:
+        """ETag, Last-Modified e Cache-Control da representação"""
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL_CATALOGO}
+        if self.ultima_modificacao is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.ultima_modificacao.replace(tzinfo=timezone.utc), usegmt=True
+            )
+        return headers
+
+
+def etag_corresponde(if_none_match: Optional[str], *etags: str) -> bool:
+    """
+    Verifica o header If-None-Match (comparação fraca, como manda a RFC 9110)
+
+    Args:
+        if_none_match: Valor do header
+        etags: ETags atuais do recurso
+
+    Returns:
+        True se o cliente já tem a representação atual
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+    return any(etag.removeprefix("W/") in candidatos for etag in etags)
+
+
+def resumo(modelo, *filtros) -> tuple:
+    """Agregados max(updated_at) e count(id) das linhas filtradas"""
+    return (
+        select(func.max(modelo.updated_at)).where(*filtros).scalar_subquery(),
+        select(func.count(modelo.id)).where(*filtros).scalar_subquery(),
+    )
+
+
+def resumo_produtos(*filtros) -> tuple:
+    """
+    Agregados dos produtos filtrados e do que ProdutoResponse embute
+
+    Inclui variações, ingredientes padrão e os ingredientes associados,
+    então alterar um preço ou um ingrediente também muda o validador.
+    """
+    produtos = select(Produto.id).where(*filtros)
+    return (
+        *resumo(Produto, *filtros),
+        *resumo(ProdutoVariacao, ProdutoVariacao.produto_id.in_(produtos)),
+        *resumo(ProdutoIngrediente, ProdutoIngrediente.produto_id.in_(produtos)),
+        select(func.max(Ingrediente.updated_at))
+        .join(ProdutoIngrediente, ProdutoIngrediente.ingrediente_id == Ingrediente.id)
+        .where(ProdutoIngrediente.produto_id.in_(produtos))
+        .scalar_subquery(),
+    )
+
+
+def calcular_validador(db: Session, escopo: str, *agregados, obrigatorio: bool = False) -> Optional[Validador]:
+    """
+    Executa os agregados em uma consulta e monta o validador
+
+    Args:
+        db: Sessão do banco
+        escopo: Rota e parâmetros que mudam a representação (ex.: "categorias?ativas=1")
+        agregados: Subconsultas escalares de resumo() / resumo_produtos()
+        obrigatorio: Recurso único: sem linhas (primeiro count zero) retorna None
+            para a rota seguir o caminho normal e responder 404
+
+    Returns:
+        Validador, ou None se o recurso não existir
+    """
+    valores = tuple(db.execute(select(*agregados)).one())
+    if obrigatorio and not valores[1]:
+        return None
+    datas = [valor for valor in valores if isinstance(valor, datetime)]
+    digest = hashlib.sha256(repr((escopo, valores)).encode()).hexdigest()[:32]
+    return Validador(etag=f'W/"{digest}"', ultima_modificacao=max(datas, default=None))
+
+
+def resposta_nao_modificada(request: Request, validador: Optional[Validador]) -> Optional[Response]:
+    """
+    Responde 304 se o cliente já tem a representação atual
+
+    Returns:
+        Response 304 com os validadores, ou None para gerar a resposta
+    """
+    if validador is None:
+        return None
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        atual = etag_corresponde(if_none_match, validador.etag)
+    else:
+        atual = _nao_modificado_desde(request.headers.get("if-modified-since"), validador.ultima_modificacao)
+
+    if atual:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validador.headers())
+    return None
+
+
+def _nao_modificado_desde(if_modified_since: Optional[str], ultima_modificacao: Optional[datetime]) -> bool:
+    """Compara If-Modified-Since com a última modificação (precisão de segundos)"""
+    if not if_modified_since or ultima_modificacao is None:
+        return False
+    try:
+        data = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if data.tzinfo is None:
+        return False
+    return ultima_modificacao.replace(microsecond=0) <= data.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def com_validador(resposta: Response, validador: Optional[Validador]) -> Response:
+    """Acrescenta ETag, Last-Modified e Cache-Control à resposta"""
+    if validador is not None:
+        resposta.headers.update(validador.headers())
+    return resposta
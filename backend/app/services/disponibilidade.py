@@ -0,0 +1,226 @@
+"""Índice de disponibilidade efetiva de produtos e variações
+
+Produto.disponivel sozinho não diz se o produto pode ser pedido. Aqui a
+disponibilidade efetiva é derivada de todas as flags envolvidas:
+
+- variação: a própria flag e a disponibilidade base do produto;
+- produto (base): Produto.disponivel, categoria existente e ativa, e todos
+  os ingredientes obrigatórios disponíveis;
+- produto (efetiva): base e ao menos uma variação disponível.
+
+O índice assina as alterações do catálogo (observar_alteracoes) e, a cada
+nova versão, rederiva só os produtos afetados. Ele lê apenas o snapshot
+do catálogo, nunca o banco. Uma categoria ou um ingrediente alterado só
+propaga para os dependentes se a flag ativa/disponivel de fato mudou.
+Cada versão é publicada como um MapaDisponibilidade imutável, então os
+leitores nunca enxergam um estado parcial.
+"""
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from app.services.catalogo import AlteracoesCatalogo, Catalogo, observar_alteracoes
+
+
+@dataclass(frozen=True)
+class MapaDisponibilidade:
+    """Disponibilidade efetiva em uma versão do catálogo"""
+    versao: int
+    produtos: Mapping[int, bool]
+    variacoes: Mapping[int, bool]
+
+    def produto_disponivel(self, produto_id: int) -> bool:
+        """Produto pode ser pedido em ao menos um tamanho"""
+        return self.produtos.get(produto_id, False)
+
+    def variacao_disponivel(self, variacao_id: int) -> bool:
+        """Variação pode ser pedida"""
+        return self.variacoes.get(variacao_id, False)
+
+
+class IndiceDisponibilidade:
+    """Disponibilidade efetiva mantida incrementalmente a partir do catálogo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mapa: Optional[MapaDisponibilidade] = None
+        # Alterações recebidas e ainda não aplicadas, com a versão de cada uma
+        self._pendentes: List[Tuple[int, AlteracoesCatalogo]] = []
+        self._zerar()
+
+    def _zerar(self) -> None:
+        """Descarta o estado derivado (reconstruído na próxima leitura)"""
+        self._completo = False
+        self._variacoes_do_produto: Dict[int, Set[int]] = defaultdict(set)
+        self._produto_da_variacao: Dict[int, int] = {}
+        self._por_categoria: Dict[int, Set[int]] = defaultdict(set)
+        self._categoria_do_produto: Dict[int, int] = {}
+        self._por_obrigatorio: Dict[int, Set[int]] = defaultdict(set)
+        self._obrigatorios_do_produto: Dict[int, Set[int]] = {}
+        # Flags usadas na última derivação, para detectar mudanças reais
+        self._categorias_ativas: Dict[int, bool] = {}
+        self._ingredientes_disponiveis: Dict[int, bool] = {}
+
+    def marcar_alteracoes(self, versao: int, alteracoes: AlteracoesCatalogo) -> None:
+        """Observador do catálogo: guarda as alterações para a próxima leitura"""
+        with self._lock:
+            self._pendentes.append((versao, alteracoes))
+
+    def obter(self, catalogo: Catalogo) -> MapaDisponibilidade:
+        """
+        Disponibilidade efetiva na versão do snapshot informado
+
+        Args:
+            catalogo: Snapshot de obter_catalogo (o mesmo usado na leitura
+                dos preços, para que os dois correspondam)
+
+        Returns:
+            MapaDisponibilidade imutável
+        """
+        mapa = self._mapa
+        if mapa is not None and mapa.versao >= catalogo.versao:
+            return mapa
+
+        with self._lock:
+            mapa = self._mapa
+            if mapa is not None and mapa.versao >= catalogo.versao:
+                return mapa
+
+            # Alterações de versões posteriores ao snapshot ficam para depois
+            aplicaveis = [alteracoes for versao, alteracoes in self._pendentes if versao <= catalogo.versao]
+            self._pendentes = [(versao, a) for versao, a in self._pendentes if versao > catalogo.versao]
+
+            if not self._completo or mapa is None or any(a.completa for a in aplicaveis):
+                self._mapa = self._reconstruir(catalogo)
+            else:
+                self._mapa = self._aplicar(catalogo, mapa, aplicaveis)
+            return self._mapa
+
+    def limpar(self) -> None:
+        """Descarta o índice (reconstruído na próxima leitura)"""
+        with self._lock:
+            self._zerar()
+            self._mapa = None
+
+    # Manutenção
+
+    def _reconstruir(self, catalogo: Catalogo) -> MapaDisponibilidade:
+        """Deriva a disponibilidade de todos os produtos"""
+        self._zerar()
+        for variacao in catalogo.variacoes.values():
+            self._variacoes_do_produto[variacao.produto_id].add(variacao.id)
+            self._produto_da_variacao[variacao.id] = variacao.produto_id
+        obrigatorios: Dict[int, Set[int]] = defaultdict(set)
+        for (produto_id, ingrediente_id), associacao in catalogo.ingredientes_padrao.items():
+            if associacao.obrigatorio:
+                obrigatorios[produto_id].add(ingrediente_id)
+
+        produtos: Dict[int, bool] = {}
+        variacoes: Dict[int, bool] = {}
+        for produto_id in catalogo.produtos:
+            self._derivar(catalogo, produto_id, obrigatorios.get(produto_id, set()), produtos, variacoes)
+        self._completo = True
+        return MapaDisponibilidade(catalogo.versao, MappingProxyType(produtos), MappingProxyType(variacoes))
+
+    def _aplicar(
+        self, catalogo: Catalogo, mapa: MapaDisponibilidade, alteracoes: Iterable[AlteracoesCatalogo]
+    ) -> MapaDisponibilidade:
+        """Rederiva só os produtos afetados pelas alterações"""
+        sujos: Set[int] = set()
+        variacoes_alteradas: Set[int] = set()
+        categorias: Set[int] = set()
+        ingredientes: Set[int] = set()
+        for alteracao in alteracoes:
+            sujos |= alteracao.produtos
+            variacoes_alteradas |= alteracao.variacoes
+            categorias |= alteracao.categorias
+            ingredientes |= alteracao.ingredientes
+
+        # Variações criadas, removidas ou movidas de produto
+        for variacao_id in variacoes_alteradas:
+            anterior = self._produto_da_variacao.pop(variacao_id, None)
+            if anterior is not None:
+                self._variacoes_do_produto[anterior].discard(variacao_id)
+                sujos.add(anterior)
+            variacao = catalogo.variacoes.get(variacao_id)
+            if variacao is not None:
+                self._variacoes_do_produto[variacao.produto_id].add(variacao_id)
+                self._produto_da_variacao[variacao_id] = variacao.produto_id
+                sujos.add(variacao.produto_id)
+
+        # Categorias e ingredientes só propagam se a flag mudou
+        for categoria_id in categorias:
+            categoria = catalogo.categorias.get(categoria_id)
+            ativa = categoria is not None and categoria.ativa
+            if self._categorias_ativas.get(categoria_id) != ativa:
+                sujos |= self._por_categoria.get(categoria_id, set())
+        for ingrediente_id in ingredientes:
+            ingrediente = catalogo.ingredientes.get(ingrediente_id)
+            disponivel = ingrediente is not None and ingrediente.disponivel
+            if self._ingredientes_disponiveis.get(ingrediente_id) != disponivel:
+                sujos |= self._por_obrigatorio.get(ingrediente_id, set())
+
+        produtos = dict(mapa.produtos)
+        variacoes = dict(mapa.variacoes)
+        for variacao_id in variacoes_alteradas:
+            variacoes.pop(variacao_id, None)
+        for produto_id in sujos:
+            # Associações alteradas registram produto e ingrediente: os
+            # candidatos a obrigatório são os atuais mais os ingredientes alterados
+            obrigatorios = set()
+            for ingrediente_id in self._obrigatorios_do_produto.get(produto_id, set()) | ingredientes:
+                associacao = catalogo.ingredientes_padrao.get((produto_id, ingrediente_id))
+                if associacao is not None and associacao.obrigatorio:
+                    obrigatorios.add(ingrediente_id)
+            self._derivar(catalogo, produto_id, obrigatorios, produtos, variacoes)
+        return MapaDisponibilidade(catalogo.versao, MappingProxyType(produtos), MappingProxyType(variacoes))
+
+    def _derivar(
+        self, catalogo: Catalogo, produto_id: int, obrigatorios: Set[int],
+        produtos: Dict[int, bool], variacoes: Dict[int, bool]
+    ) -> None:
+        """Calcula a disponibilidade de um produto e das suas variações"""
+        categoria_anterior = self._categoria_do_produto.pop(produto_id, None)
+        if categoria_anterior is not None:
+            self._por_categoria[categoria_anterior].discard(produto_id)
+        for ingrediente_id in self._obrigatorios_do_produto.pop(produto_id, set()):
+            self._por_obrigatorio[ingrediente_id].discard(produto_id)
+
+        produto = catalogo.produtos.get(produto_id)
+        ids_variacoes = self._variacoes_do_produto.get(produto_id, set())
+        if produto is None:
+            produtos.pop(produto_id, None)
+            for variacao_id in ids_variacoes:
+                variacoes.pop(variacao_id, None)
+            return
+
+        self._categoria_do_produto[produto_id] = produto.categoria_id
+        self._por_categoria[produto.categoria_id].add(produto_id)
+        self._obrigatorios_do_produto[produto_id] = obrigatorios
+        for ingrediente_id in obrigatorios:
+            self._por_obrigatorio[ingrediente_id].add(produto_id)
+
+        categoria = catalogo.categorias.get(produto.categoria_id)
+        ativa = categoria is not None and categoria.ativa
+        self._categorias_ativas[produto.categoria_id] = ativa
+        ingredientes_ok = True
+        for ingrediente_id in obrigatorios:
+            ingrediente = catalogo.ingredientes.get(ingrediente_id)
+            disponivel = ingrediente is not None and ingrediente.disponivel
+            self._ingredientes_disponiveis[ingrediente_id] = disponivel
+            ingredientes_ok = ingredientes_ok and disponivel
+
+        base = produto.disponivel and ativa and ingredientes_ok
+        algum = False
+        for variacao_id in ids_variacoes:
+            variacao = catalogo.variacoes.get(variacao_id)
+            disponivel = base and variacao is not None and variacao.disponivel
+            variacoes[variacao_id] = disponivel
+            algum = algum or disponivel
+        produtos[produto_id] = algum
+
+
+indice_disponibilidade = IndiceDisponibilidade()
+observar_alteracoes(indice_disponibilidade.marcar_alteracoes)
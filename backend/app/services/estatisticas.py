@@ -0,0 +1,184 @@
+"""Estatísticas de pedidos por usuário
+
+Cada usuário tem uma linha em estatisticas_usuarios com o total de
+pedidos, o valor total e a contagem por status. Criação, mudança de
+status e cancelamento de pedidos aplicam deltas nessa linha na mesma
+transação da escrita, então a leitura é uma busca por chave primária.
+
+Quando a linha ainda não existe (usuários anteriores ao ledger), ela é
+montada a partir do histórico de pedidos dentro da própria transação.
+O comando app.recalcular_estatisticas refaz o ledger a partir do
+histórico para verificação.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import EstatisticaUsuario, Pedido
+
+# Status de pedido -> coluna de contagem no ledger
+COLUNAS_STATUS = {
+    "PENDENTE": "pendente",
+    "EM_PREPARO": "em_preparo",
+    "PRONTO": "pronto",
+    "ENTREGUE": "entregue",
+    "CANCELADO": "cancelado",
+}
+
+
+def consulta_historico(usuario_id: Optional[int] = None):
+    """Agrega contagem e valor dos pedidos por (usuário, status)"""
+    query = select(
+        Pedido.usuario_id,
+        Pedido.status,
+        func.count(Pedido.id).label("quantidade"),
+        func.coalesce(func.sum(Pedido.preco_total), 0.0).label("valor")
+    ).group_by(Pedido.usuario_id, Pedido.status)
+    if usuario_id is not None:
+        query = query.where(Pedido.usuario_id == usuario_id)
+    return query
+
+
+def valores_vazios(usuario_id: int) -> dict:
+    """Valores do ledger para um usuário sem pedidos"""
+    return {
+        "usuario_id": usuario_id,
+        "total_pedidos": 0,
+        "valor_total": 0.0,
+        **{coluna: 0 for coluna in COLUNAS_STATUS.values()}
+    }
+
+
+def montar_estatisticas(linhas: Iterable) -> Dict[int, dict]:
+    """Converte as linhas de consulta_historico em valores do ledger por usuário"""
+    estatisticas: Dict[int, dict] = {}
+    for linha in linhas:
+        valores = estatisticas.get(linha.usuario_id)
+        if valores is None:
+            valores = estatisticas[linha.usuario_id] = valores_vazios(linha.usuario_id)
+        valores["total_pedidos"] += linha.quantidade
+        valores["valor_total"] += linha.valor
+        coluna = COLUNAS_STATUS.get(linha.status)
+        if coluna:
+            valores[coluna] += linha.quantidade
+    return estatisticas
+
+
+def _valores(estatistica: EstatisticaUsuario) -> dict:
+    """Valores das colunas de uma linha do ledger"""
+    return {coluna.key: getattr(estatistica, coluna.key) for coluna in EstatisticaUsuario.__table__.columns}
+
+
+async def _inserir_do_historico(db: AsyncSession, usuario_id: int) -> Optional[dict]:
+    """
+    Cria a linha do usuário a partir do histórico visível nesta transação
+
+    Returns:
+        Valores inseridos, ou None se outra transação criou a linha antes
+    """
+    # Alterações pendentes na sessão precisam entrar na agregação
+    await db.flush()
+    linhas = (await db.execute(consulta_historico(usuario_id))).all()
+    valores = montar_estatisticas(linhas).get(usuario_id) or valores_vazios(usuario_id)
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(EstatisticaUsuario), valores)
+    except IntegrityError:
+        return None
+    return valores
+
+
+async def registrar_movimento(
+    db: AsyncSession,
+    usuario_id: int,
+    status_delta: Dict[str, int],
+    pedidos_delta: int = 0,
+    valor_delta: float = 0.0
+) -> None:
+    """
+    Aplica um delta no ledger do usuário, sem commit
+
+    Deve ser chamada depois da escrita do pedido e antes do commit, na
+    mesma transação.
+
+    Args:
+        db: Sessão da transação do pedido
+        usuario_id: Dono do pedido
+        status_delta: Variação da contagem por status (ex.: {"PENDENTE": -1, "PRONTO": 1})
+        pedidos_delta: Variação do total de pedidos
+        valor_delta: Variação do valor total
+    """
+    valores = {
+        "total_pedidos": EstatisticaUsuario.total_pedidos + pedidos_delta,
+        "valor_total": EstatisticaUsuario.valor_total + valor_delta,
+    }
+    for status_pedido, delta in status_delta.items():
+        coluna = COLUNAS_STATUS.get(status_pedido)
+        if coluna and delta:
+            valores[coluna] = getattr(EstatisticaUsuario, coluna) + delta
+
+    comando = (
+        update(EstatisticaUsuario)
+        .where(EstatisticaUsuario.usuario_id == usuario_id)
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
+    if (await db.execute(comando)).rowcount:
+        return
+
+    # Sem linha ainda: o histórico já inclui esta escrita, então não há delta a aplicar
+    if await _inserir_do_historico(db, usuario_id) is None:
+        await db.execute(comando)
+
+
+async def obter_estatisticas(db: AsyncSession, usuario_id: int) -> dict:
+    """
+    Lê o ledger do usuário, criando-o a partir do histórico se necessário
+
+    Returns:
+        Valores das colunas do ledger
+    """
+    estatistica = await db.get(EstatisticaUsuario, usuario_id)
+    if estatistica is not None:
+        return _valores(estatistica)
+
+    valores = await _inserir_do_historico(db, usuario_id)
+    await db.commit()
+    if valores is None:
+        return _valores(await db.get(EstatisticaUsuario, usuario_id))
+    return valores
+
+
+def recalcular_estatisticas(db: Session, aplicar: bool = True) -> List[int]:
+    """
+    Recalcula o ledger de todos os usuários a partir do histórico
+
+    Args:
+        db: Sessão síncrona
+        aplicar: Se False, apenas compara sem gravar
+
+    Returns:
+        IDs dos usuários cujo ledger divergia do histórico
+    """
+    esperado = montar_estatisticas(db.execute(consulta_historico()))
+    atuais = {linha.usuario_id: linha for linha in db.scalars(select(EstatisticaUsuario))}
+
+    divergentes = []
+    for usuario_id in sorted(set(esperado) | set(atuais)):
+        valores = esperado.get(usuario_id) or valores_vazios(usuario_id)
+        atual = atuais.get(usuario_id)
+        if atual is not None and all(
+            round(getattr(atual, chave), 2) == round(valor, 2) for chave, valor in valores.items()
+        ):
+            continue
+
+        divergentes.append(usuario_id)
+        if aplicar:
+            db.merge(EstatisticaUsuario(**valores))
+
+    if aplicar:
+        db.commit()
+    return divergentes
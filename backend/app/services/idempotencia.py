@@ -0,0 +1,219 @@
+"""Suporte a Idempotency-Key com replay da resposta
+
+Guarda, por (usuário, chave), uma impressão digital compacta da
+requisição e os bytes da resposta serializada na tabela
+idempotencia_respostas, com expiração por TTL. Uma nova tentativa com a
+mesma chave recebe os bytes armazenados sem reexecutar o pedido.
+
+A chave é reservada antes do processamento: uma linha sem resposta
+(status_code nulo) é gravada e confirmada, e a restrição única
+(usuario_id, chave) garante que só uma requisição a reserve. As
+duplicatas concorrentes, em qualquer worker ou instância da API, não
+precificam nem gravam nada: consultam a linha até a resposta aparecer e
+devolvem os bytes gravados.
+
+A resposta é preenchida na mesma transação do pedido: ou os dois existem,
+ou nenhum. Uma reserva tem validade curta (IDEMPOTENCIA_PENDENTE_SEGUNDOS):
+se o processo cair no meio, a chave é liberada quando ela vence.
+
+Respostas de erro de negócio (4xx) também são guardadas: repetir a chave
+devolve o mesmo erro. Erros 5xx (e exceções inesperadas) não são
+guardados: a transação é desfeita, a reserva é removida e a nova
+tentativa processa de novo.
+
+Entradas vencidas são ignoradas na leitura e removidas em lote a cada
+IDEMPOTENCIA_LIMPEZA_SEGUNDOS (por processo), junto com uma gravação.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    IDEMPOTENCIA_LIMPEZA_SEGUNDOS, IDEMPOTENCIA_PENDENTE_SEGUNDOS, IDEMPOTENCIA_TTL_SEGUNDOS
+)
+from app.exceptions import ChaveIdempotenciaReutilizada
+from app.models.models import RespostaIdempotente
+
+# Intervalo entre consultas de uma duplicata aguardando a requisição original
+INTERVALO_ESPERA_SEGUNDOS = 0.05
+
+
+@dataclass(frozen=True)
+class RespostaArmazenada:
+    """Resposta serializada de uma requisição idempotente"""
+    impressao: str
+    status_code: Optional[int]  # None: requisição original ainda em andamento
+    corpo: Optional[bytes]
+    expira_em: datetime  # UTC, sem fuso (como os demais timestamps)
+
+    @property
+    def pendente(self) -> bool:
+        """A chave está reservada e a resposta ainda não foi gravada"""
+        return self.status_code is None
+
+
+def impressao_requisicao(dados: dict) -> str:
+    """Gera uma impressão digital compacta e estável do corpo da requisição"""
+    canonico = json.dumps(dados, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonico.encode()).hexdigest()[:32]
+
+
+class RegistroIdempotencia:
+    """Respostas por (usuário, chave) no banco, com TTL"""
+
+    def __init__(
+        self,
+        ttl_segundos: float,
+        limpeza_segundos: float,
+        pendente_segundos: float = IDEMPOTENCIA_PENDENTE_SEGUNDOS,
+        intervalo_espera: float = INTERVALO_ESPERA_SEGUNDOS
+    ):
+        self.ttl_segundos = ttl_segundos
+        self.limpeza_segundos = limpeza_segundos
+        self.pendente_segundos = pendente_segundos
+        self.intervalo_espera = intervalo_espera
+        self._limpo_em = float("-inf")
+
+    async def _buscar(
+        self,
+        db: AsyncSession,
+        usuario_id: int,
+        chave: str,
+        impressao: str
+    ) -> Optional[RespostaArmazenada]:
+        """
+        Resposta (ou reserva) vigente da chave
+
+        Raises:
+            ChaveIdempotenciaReutilizada: Se a chave foi usada com outro corpo
+        """
+        linha = (await db.execute(
+            select(
+                RespostaIdempotente.impressao,
+                RespostaIdempotente.status_code,
+                RespostaIdempotente.corpo,
+                RespostaIdempotente.expira_em
+            ).where(
+                RespostaIdempotente.usuario_id == usuario_id,
+                RespostaIdempotente.chave == chave,
+                RespostaIdempotente.expira_em > datetime.utcnow()
+            )
+        )).first()
+        if linha is None:
+            return None
+        if linha.impressao != impressao:
+            raise ChaveIdempotenciaReutilizada()
+        corpo = bytes(linha.corpo) if linha.corpo is not None else None
+        return RespostaArmazenada(linha.impressao, linha.status_code, corpo, linha.expira_em)
+
+    async def _reservar(self, db: AsyncSession, usuario_id: int, chave: str, impressao: str) -> Optional[int]:
+        """
+        Grava e confirma a reserva da chave
+
+        Returns:
+            ID da reserva, ou None se outra requisição reservou antes
+        """
+        agora = datetime.utcnow()
+        try:
+            # Entrada vencida da mesma chave (resposta antiga ou reserva abandonada)
+            await db.execute(delete(RespostaIdempotente).where(
+                RespostaIdempotente.usuario_id == usuario_id,
+                RespostaIdempotente.chave == chave,
+                RespostaIdempotente.expira_em <= agora
+            ))
+            reserva_id = await db.scalar(insert(RespostaIdempotente).values(
+                usuario_id=usuario_id,
+                chave=chave,
+                impressao=impressao,
+                expira_em=agora + timedelta(seconds=self.pendente_segundos)
+            ).returning(RespostaIdempotente.id))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return None
+        return reserva_id
+
+    async def _liberar(self, db: AsyncSession, reserva_id: int) -> None:
+        """Desfaz a transação em andamento e remove a reserva"""
+        await db.rollback()
+        await db.execute(delete(RespostaIdempotente).where(
+            RespostaIdempotente.id == reserva_id,
+            RespostaIdempotente.status_code.is_(None)
+        ))
+        await db.commit()
+
+    async def executar(
+        self,
+        db: AsyncSession,
+        usuario_id: int,
+        chave: str,
+        impressao: str,
+        produzir: Callable[[], Awaitable[Tuple[int, bytes]]]
+    ) -> Tuple[RespostaArmazenada, bool]:
+        """
+        Executa a requisição uma única vez por (usuário, chave)
+
+        Args:
+            db: Sessão da requisição; produzir escreve nela sem fazer commit
+            usuario_id: Dono da chave
+            chave: Valor do header Idempotency-Key
+            impressao: Impressão digital do corpo da requisição
+            produzir: Corrotina que processa a requisição (sem commit) e retorna
+                (status, corpo); erros de negócio devem ser retornados já
+                serializados, com as escritas desfeitas
+
+        Returns:
+            (resposta, replay) onde replay indica se veio do armazenamento
+
+        Raises:
+            ChaveIdempotenciaReutilizada: Se a chave já foi usada com outro corpo
+        """
+        while True:
+            armazenada = await self._buscar(db, usuario_id, chave, impressao)
+            if armazenada is None:
+                reserva_id = await self._reservar(db, usuario_id, chave, impressao)
+                if reserva_id is not None:
+                    break
+            elif not armazenada.pendente:
+                return armazenada, True
+            else:
+                # Encerra a leitura para enxergar o commit da requisição original
+                await db.rollback()
+                await asyncio.sleep(self.intervalo_espera)
+
+        try:
+            status_code, corpo = await produzir()
+        except BaseException:
+            await self._liberar(db, reserva_id)
+            raise
+
+        agora = datetime.utcnow()
+        resposta = RespostaArmazenada(impressao, status_code, corpo, agora + timedelta(seconds=self.ttl_segundos))
+        if status_code >= 500:
+            await self._liberar(db, reserva_id)
+            return resposta, False
+
+        if time.monotonic() - self._limpo_em > self.limpeza_segundos:
+            await db.execute(delete(RespostaIdempotente).where(RespostaIdempotente.expira_em <= agora))
+            self._limpo_em = time.monotonic()
+        preenchida = await db.execute(update(RespostaIdempotente).where(
+            RespostaIdempotente.id == reserva_id,
+            RespostaIdempotente.status_code.is_(None)
+        ).values(status_code=status_code, corpo=corpo, expira_em=resposta.expira_em))
+        if preenchida.rowcount != 1:
+            # A reserva venceu durante o processamento e outra requisição assumiu a chave
+            await db.rollback()
+            return await self.executar(db, usuario_id, chave, impressao, produzir)
+        await db.commit()
+        return resposta, False
+
+
+registro_idempotencia = RegistroIdempotencia(IDEMPOTENCIA_TTL_SEGUNDOS, IDEMPOTENCIA_LIMPEZA_SEGUNDOS)
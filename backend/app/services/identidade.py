@@ -0,0 +1,288 @@
+"""Identidade dos usuários autenticados
+
+A autorização só precisa de id, ativo e admin. Tokens novos trazem esses
+campos como claims (adm, atv) junto com a versão do usuário (ver), e a
+rota decide só com o token: um mapa de revogação em memória guarda, por
+usuário, a menor versão válida (Usuario.token_versao). Alterar ativo ou
+admin incrementa token_versao no flush; tokens com versão menor têm
+claims desatualizadas e o estado passa a vir do banco. O mapa só consulta
+o banco para usuários que ainda não conhece ou depois de uma alteração, e
+a cada REVOGACAO_REVALIDAR_SEGUNDOS confere (contagem, maior id e soma
+das versões) se outro processo alterou ou removeu usuários.
+
+Tokens sem claims (emitidos antes) e tokens desatualizados usam o cache
+LRU de usuários por id, com TTL e limite de entradas.
+
+Escritas em usuários (alteração, desativação, remoção) invalidam cache e
+mapa explicitamente: eventos da Session acumulam os IDs durante o flush e
+os descartam depois do commit (nada no rollback). UPDATE/DELETE em lote
+via ORM descartam tudo. Uma leitura que começou antes de uma invalidação
+não guarda o resultado, então um commit concorrente nunca é sobrescrito
+por dados antigos. No cache, escritas de outros processos valem no
+máximo após USUARIOS_CACHE_TTL_SEGUNDOS.
+
+Acertos e falhas do cache são contados em metricas.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Set
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import REVOGACAO_REVALIDAR_SEGUNDOS, USUARIOS_CACHE_MAX_ENTRADAS, USUARIOS_CACHE_TTL_SEGUNDOS
+from app.models.models import Usuario
+from app.services import metricas
+
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    """Campos do usuário usados na autorização"""
+    id: int
+    ativo: bool
+    admin: bool
+
+
+class CacheUsuarios:
+    """Usuários autenticados por id, com TTL e limite de entradas (LRU)"""
+
+    def __init__(self, ttl_segundos: float, max_entradas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[int, tuple]" = OrderedDict()  # id -> (usuario, expira_em)
+        # Incrementada a cada invalidação: leituras anteriores não são guardadas
+        self._geracao = 0
+
+    async def obter(self, db: AsyncSession, usuario_id: int) -> Optional[UsuarioAutenticado]:
+        """
+        Usuário do cache, ou lido do banco e guardado
+
+        Args:
+            db: Sessão usada só em uma falha
+            usuario_id: ID do token (claim sub)
+
+        Returns:
+            UsuarioAutenticado, ou None se o usuário não existir
+        """
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(usuario_id)
+            if entrada is not None and entrada[1] > agora:
+                self._entradas.move_to_end(usuario_id)
+                metricas.cache_usuarios.inc(resultado="acerto")
+                return entrada[0]
+            geracao = self._geracao
+
+        metricas.cache_usuarios.inc(resultado="falha")
+        linha = (await db.execute(
+            select(Usuario.id, Usuario.ativo, Usuario.admin).where(Usuario.id == usuario_id)
+        )).first()
+        if linha is None:
+            return None
+
+        usuario = UsuarioAutenticado(id=linha.id, ativo=bool(linha.ativo), admin=bool(linha.admin))
+        with self._lock:
+            if geracao == self._geracao:
+                self._entradas[usuario_id] = (usuario, time.monotonic() + self.ttl_segundos)
+                self._entradas.move_to_end(usuario_id)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+        return usuario
+
+    def invalidar(self, usuario_ids: Optional[Set[int]] = None) -> None:
+        """
+        Descarta usuários do cache
+
+        Args:
+            usuario_ids: IDs alterados (None descarta todos)
+        """
+        with self._lock:
+            self._geracao += 1
+            if usuario_ids is None:
+                self._entradas.clear()
+                return
+            for usuario_id in usuario_ids:
+                self._entradas.pop(usuario_id, None)
+
+    def limpar(self) -> None:
+        """Descarta todo o cache"""
+        self.invalidar()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+class MapaRevogacao:
+    """Menor versão de token válida por usuário (None: usuário removido)"""
+
+    def __init__(self, revalidar_segundos: float):
+        self.revalidar_segundos = revalidar_segundos
+        self._lock = threading.Lock()
+        self._minimos: Dict[int, Optional[int]] = {}
+        self._geracao = 0
+        # count(id), max(id) e sum(token_versao) na última conferência com o banco
+        self._assinatura: Optional[tuple] = None
+        self._verificado_em = float("-inf")
+
+    async def minimo(self, db: AsyncSession, usuario_id: int) -> Optional[int]:
+        """
+        Menor versão válida dos tokens do usuário
+
+        Args:
+            db: Sessão usada só para usuários fora do mapa e na revalidação
+            usuario_id: ID do token (claim sub)
+
+        Returns:
+            token_versao atual, ou None se o usuário não existir
+        """
+        if time.monotonic() - self._verificado_em > self.revalidar_segundos:
+            await self._revalidar(db)
+
+        with self._lock:
+            if usuario_id in self._minimos:
+                return self._minimos[usuario_id]
+            geracao = self._geracao
+
+        versao = await db.scalar(select(Usuario.token_versao).where(Usuario.id == usuario_id))
+        with self._lock:
+            if geracao == self._geracao:
+                self._minimos[usuario_id] = versao
+        return versao
+
+    async def _revalidar(self, db: AsyncSession) -> None:
+        """Descarta o mapa se usuários foram alterados por outro processo"""
+        with self._lock:
+            geracao = self._geracao
+        assinatura = tuple((await db.execute(
+            select(
+                func.count(Usuario.id), func.max(Usuario.id), func.coalesce(func.sum(Usuario.token_versao), 0)
+            )
+        )).one())
+        with self._lock:
+            if geracao != self._geracao:
+                return
+            if assinatura != self._assinatura:
+                self._minimos.clear()
+                self._assinatura = assinatura
+            self._verificado_em = time.monotonic()
+
+    def invalidar(self, usuario_ids: Optional[Set[int]] = None) -> None:
+        """
+        Descarta usuários do mapa (relidos do banco no próximo acesso)
+
+        Args:
+            usuario_ids: IDs alterados (None descarta todos)
+        """
+        with self._lock:
+            self._geracao += 1
+            if usuario_ids is None:
+                self._minimos.clear()
+                self._assinatura = None
+                return
+            for usuario_id in usuario_ids:
+                self._minimos.pop(usuario_id, None)
+
+    def limpar(self) -> None:
+        """Descarta todo o mapa"""
+        self.invalidar()
+        self._verificado_em = float("-inf")
+
+
+cache_usuarios = CacheUsuarios(USUARIOS_CACHE_TTL_SEGUNDOS, USUARIOS_CACHE_MAX_ENTRADAS)
+mapa_revogacao = MapaRevogacao(REVOGACAO_REVALIDAR_SEGUNDOS)
+
+
+def claims_usuario(usuario: Usuario) -> dict:
+    """Claims de autorização embutidas nos tokens do usuário"""
+    return {
+        "sub": str(usuario.id),
+        "adm": bool(usuario.admin),
+        "atv": bool(usuario.ativo),
+        "ver": usuario.token_versao or 0,
+    }
+
+
+async def usuario_do_token(db: AsyncSession, claims: Mapping) -> Optional[UsuarioAutenticado]:
+    """
+    Resolve o usuário autenticado a partir das claims verificadas
+
+    Com claims atuais (ver não revogada), decide só pelo token. Tokens sem
+    claims de autorização ou desatualizados usam o estado do banco (via
+    cache de usuários).
+
+    Args:
+        db: Sessão usada só quando o mapa ou o cache não têm o usuário
+        claims: Claims de decodificar_token
+
+    Returns:
+        UsuarioAutenticado, ou None se o usuário não existir
+    """
+    usuario_id = int(claims["sub"])
+    versao = claims.get("ver")
+    if isinstance(versao, int) and "adm" in claims and "atv" in claims:
+        minimo = await mapa_revogacao.minimo(db, usuario_id)
+        if minimo is None:
+            return None
+        if versao >= minimo:
+            return UsuarioAutenticado(id=usuario_id, ativo=bool(claims["atv"]), admin=bool(claims["adm"]))
+    return await cache_usuarios.obter(db, usuario_id)
+
+
+_CHAVE_USUARIOS = "usuarios_alterados"
+_TODOS = -1  # Marcador de UPDATE/DELETE em lote
+
+
+def _incrementar_versoes(session: Session, flush_context, instancias) -> None:
+    """Antes do flush, incrementa token_versao de quem teve ativo ou admin alterado"""
+    for obj in session.dirty:
+        if not isinstance(obj, Usuario):
+            continue
+        atributos = inspect(obj).attrs
+        if atributos.ativo.history.has_changes() or atributos.admin.history.has_changes():
+            obj.token_versao = (obj.token_versao or 0) + 1
+
+
+def _registrar_usuarios(session: Session, flush_context) -> None:
+    """Acumula na sessão os IDs de usuários alterados ou removidos no flush"""
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Usuario) and (obj in session.deleted or session.is_modified(obj)):
+            session.info.setdefault(_CHAVE_USUARIOS, set()).add(obj.id)
+
+
+def _registrar_em_lote(estado) -> None:
+    """
+    UPDATE/DELETE em lote em usuarios invalida tudo no commit
+
+    Sem as instâncias não dá para saber se ativo/admin mudaram: todo UPDATE
+    em lote também incrementa token_versao das linhas atingidas.
+    """
+    if not (estado.is_update or estado.is_delete) or not any(m.class_ is Usuario for m in estado.all_mappers):
+        return
+    if estado.is_update:
+        estado.statement = estado.statement.values(token_versao=Usuario.token_versao + 1)
+    estado.session.info.setdefault(_CHAVE_USUARIOS, set()).add(_TODOS)
+
+
+def _publicar_usuarios(session: Session) -> None:
+    """Após o commit, descarta do cache os usuários alterados"""
+    alterados = session.info.pop(_CHAVE_USUARIOS, None)
+    if alterados:
+        usuario_ids = None if _TODOS in alterados else alterados
+        cache_usuarios.invalidar(usuario_ids)
+        mapa_revogacao.invalidar(usuario_ids)
+
+
+def _descartar_usuarios(session: Session) -> None:
+    """Descarta os IDs registrados quando a transação é revertida"""
+    session.info.pop(_CHAVE_USUARIOS, None)
+
+
+event.listen(Session, "before_flush", _incrementar_versoes)
+event.listen(Session, "after_flush", _registrar_usuarios)
+event.listen(Session, "do_orm_execute", _registrar_em_lote)
+event.listen(Session, "after_commit", _publicar_usuarios)
+event.listen(Session, "after_rollback", _descartar_usuarios)
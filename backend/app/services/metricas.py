@@ -0,0 +1,402 @@
+"""Métricas em memória expostas no formato texto do Prometheus
+
+Contadores, medidores e histogramas vivem no processo; o scrape só
+serializa os valores atuais. As métricas de domínio (pedidos por status,
+valor dos pedidos, usuários e produtos) são semeadas do banco uma vez
+(e ressincronizadas a cada METRICAS_RESSINCRONIZAR_SEGUNDOS) e depois
+acompanham as escritas: eventos da Session acumulam deltas durante o
+flush e os aplicam só depois do commit, descartando-os no rollback.
+Escritas via Core (INSERT em lote de pedidos) informam seus deltas com
+registrar_pedido_criado.
+
+MetricasMiddleware conta requisições e mede a latência por rota.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import METRICAS_RESSINCRONIZAR_SEGUNDOS
+from app.models.models import Pedido, Produto, Usuario
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STATUS_PEDIDO = ("PENDENTE", "EM_PREPARO", "PRONTO", "ENTREGUE", "CANCELADO")
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor: str) -> str:
+    """Escapa o valor de um rótulo no formato texto"""
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _rotulos(nomes: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    """Formata {nome="valor",...}"""
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    """Formata um valor numérico (inteiros sem casa decimal)"""
+    if valor == int(valor) and abs(valor) < 1e15:
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    """Base das métricas: nome, ajuda, rótulos e lock"""
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def _cabecalho(self) -> list:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    """Valor que só cresce"""
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, valor: float = 1.0, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] += valor
+
+    def valor(self, **rotulos) -> float:
+        return self._valores.get(self._chave(rotulos), 0.0)
+
+    def exportar(self) -> list:
+        linhas = self._cabecalho()
+        with self._lock:
+            itens = sorted(self._valores.items())
+        if not itens and not self.rotulos:
+            itens = [((), 0.0)]
+        for chave, valor in itens:
+            linhas.append(f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}")
+        return linhas
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce"""
+    tipo = "gauge"
+
+    def definir(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = valor
+
+
+class Histograma(_Metrica):
+    """Distribuição de observações em buckets cumulativos"""
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = (), buckets=BUCKETS_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+        # chave -> [contagem por bucket..., +Inf], soma
+        self._series: Dict[Tuple[str, ...], Tuple[list, list]] = {}
+
+    def observar(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][indice] += 1
+            serie[1][0] += valor
+
+    def contagem(self, **rotulos) -> int:
+        serie = self._series.get(self._chave(rotulos))
+        return sum(serie[0]) if serie else 0
+
+    def exportar(self) -> list:
+        linhas = self._cabecalho()
+        with self._lock:
+            series = sorted((chave, list(contagens), soma[0]) for chave, (contagens, soma) in self._series.items())
+        for chave, contagens, soma in series:
+            acumulado = 0
+            for limite, contagem in zip((*self.buckets, float("inf")), contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else _numero(limite)
+                rotulos = _rotulos(self.rotulos, chave, 'le="' + le + '"')
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Conjunto de métricas exportadas juntas"""
+
+    def __init__(self):
+        self._metricas: list = []
+
+    def registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def exportar(self) -> str:
+        linhas = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+requisicoes = registro.registrar(Contador(
+    "pizzaria_http_requisicoes_total", "Requisições HTTP atendidas", ("metodo", "rota", "status")
+))
+duracao_requisicoes = registro.registrar(Histograma(
+    "pizzaria_http_duracao_segundos", "Latência das requisições HTTP", ("metodo", "rota")
+))
+pedidos = registro.registrar(Medidor(
+    "pizzaria_pedidos", "Pedidos existentes por status", ("status",)
+))
+pedidos_valor = registro.registrar(Medidor(
+    "pizzaria_pedidos_valor_total", "Soma do preço dos pedidos existentes"
+))
+pedidos_criados = registro.registrar(Contador(
+    "pizzaria_pedidos_criados_total", "Pedidos criados desde o início do processo"
+))
+usuarios = registro.registrar(Medidor(
+    "pizzaria_usuarios", "Usuários cadastrados", ("tipo",)
+))
+produtos = registro.registrar(Medidor(
+    "pizzaria_produtos", "Produtos cadastrados por disponibilidade", ("disponibilidade",)
+))
+cache_categorias = registro.registrar(Contador(
+    "pizzaria_cache_categorias_total",
+    "Leituras do cache de produtos por categoria (resultado: acerto ou falha)",
+    ("categoria", "resultado")
+))
+cache_usuarios = registro.registrar(Contador(
+    "pizzaria_cache_usuarios_total",
+    "Leituras do cache de usuários autenticados (resultado: acerto ou falha)",
+    ("resultado",)
+))
+senhas_atualizadas = registro.registrar(Contador(
+    "pizzaria_senhas_atualizadas_total",
+    "Hashes de senha refeitos no login por não seguirem a política atual",
+    ("esquema",)
+))
+
+# Estado da semeadura das métricas de domínio
+_semeado_em: Optional[float] = None
+_lock_semeadura = threading.Lock()
+
+_CHAVE_DELTAS = "deltas_metricas"
+
+
+def _aplicar(deltas: Dict[tuple, float]) -> None:
+    """Aplica deltas acumulados de uma transação nos medidores de domínio"""
+    if _semeado_em is None:
+        # Ainda não semeado: a semeadura lerá o estado já com esta escrita
+        return
+    for (metrica, rotulo), delta in deltas.items():
+        if not delta:
+            continue
+        if metrica == "pedidos":
+            pedidos.inc(delta, status=rotulo)
+        elif metrica == "pedidos_valor":
+            pedidos_valor.inc(delta)
+        elif metrica == "usuarios":
+            usuarios.inc(delta, tipo=rotulo)
+        elif metrica == "produtos":
+            produtos.inc(delta, disponibilidade=rotulo)
+
+
+async def sincronizar(db: AsyncSession, forcar: bool = False) -> None:
+    """
+    Semeia (ou ressincroniza) as métricas de domínio a partir do banco
+
+    Executa só na primeira chamada e depois a cada
+    METRICAS_RESSINCRONIZAR_SEGUNDOS (0 desativa a ressincronização).
+    """
+    global _semeado_em
+    agora = time.monotonic()
+    if not forcar and _semeado_em is not None and (
+        METRICAS_RESSINCRONIZAR_SEGUNDOS <= 0
+        or agora - _semeado_em < METRICAS_RESSINCRONIZAR_SEGUNDOS
+    ):
+        return
+
+    por_status = (await db.execute(
+        select(Pedido.status, func.count(Pedido.id), func.coalesce(func.sum(Pedido.preco_total), 0.0))
+        .group_by(Pedido.status)
+    )).all()
+    contagem_usuarios = (await db.execute(select(
+        func.count(Usuario.id),
+        func.count(case((Usuario.ativo == True, 1))),
+        func.count(case((Usuario.admin == True, 1)))
+    ))).one()
+    contagem_produtos = (await db.execute(select(
+        func.count(case((Produto.disponivel == True, 1))),
+        func.count(case((Produto.disponivel != True, 1)))
+    ))).one()
+
+    with _lock_semeadura:
+        contagens = dict.fromkeys(STATUS_PEDIDO, 0)
+        for status_pedido, quantidade, _ in por_status:
+            contagens[status_pedido] = quantidade
+        for status_pedido, quantidade in contagens.items():
+            pedidos.definir(quantidade, status=status_pedido)
+        pedidos_valor.definir(sum(valor for _, _, valor in por_status))
+        usuarios.definir(contagem_usuarios[0], tipo="total")
+        usuarios.definir(contagem_usuarios[1], tipo="ativos")
+        usuarios.definir(contagem_usuarios[2], tipo="admins")
+        produtos.definir(contagem_produtos[0], disponibilidade="disponivel")
+        produtos.definir(contagem_produtos[1], disponibilidade="indisponivel")
+        _semeado_em = agora
+
+
+def reiniciar() -> None:
+    """Descarta a semeadura (a próxima exportação relê o banco)"""
+    global _semeado_em
+    _semeado_em = None
+
+
+async def exportar(db: AsyncSession) -> str:
+    """Retorna todas as métricas no formato texto do Prometheus"""
+    await sincronizar(db)
+    return registro.exportar()
+
+
+def _deltas(session) -> Dict[tuple, float]:
+    """Deltas pendentes da transação atual da sessão"""
+    return session.info.setdefault(_CHAVE_DELTAS, defaultdict(float))
+
+
+def registrar_pedido_criado(db, status_pedido: str, valor: float) -> None:
+    """Registra um pedido inserido via Core (aplicado após o commit)"""
+    deltas = _deltas(db)
+    deltas[("pedidos", status_pedido)] += 1
+    deltas[("pedidos_valor", None)] += valor
+    deltas[("criados", None)] += 1
+
+
+def _antes(obj, atributo: str):
+    """Valor do atributo antes do flush, sem emitir SQL"""
+    historico = inspect(obj).attrs[atributo].history
+    if historico.deleted:
+        return historico.deleted[0]
+    if historico.unchanged:
+        return historico.unchanged[0]
+    return None
+
+
+def _depois(obj, atributo: str):
+    """Valor do atributo depois do flush, sem emitir SQL"""
+    return inspect(obj).dict.get(atributo)
+
+
+def _contribuicao(obj, valor) -> Dict[tuple, float]:
+    """Contribuição de um objeto para os medidores, dado um leitor de atributos"""
+    if isinstance(obj, Pedido):
+        return {
+            ("pedidos", valor(obj, "status")): 1,
+            ("pedidos_valor", None): valor(obj, "preco_total") or 0.0,
+        }
+    if isinstance(obj, Usuario):
+        return {
+            ("usuarios", "total"): 1,
+            ("usuarios", "ativos"): 1 if valor(obj, "ativo") else 0,
+            ("usuarios", "admins"): 1 if valor(obj, "admin") else 0,
+        }
+    disponibilidade = "disponivel" if valor(obj, "disponivel") else "indisponivel"
+    return {("produtos", disponibilidade): 1}
+
+
+def _registrar_deltas(session: Session, flush_context) -> None:
+    """Acumula na sessão os deltas de usuários, produtos e pedidos de um flush"""
+    deltas = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, (Pedido, Usuario, Produto)):
+            continue
+        if deltas is None:
+            deltas = _deltas(session)
+
+        if obj in session.new:
+            for chave, valor in _contribuicao(obj, _depois).items():
+                deltas[chave] += valor
+            if isinstance(obj, Pedido):
+                deltas[("criados", None)] += 1
+        elif obj in session.deleted:
+            for chave, valor in _contribuicao(obj, _antes).items():
+                deltas[chave] -= valor
+        elif session.is_modified(obj):
+            for chave, valor in _contribuicao(obj, _antes).items():
+                deltas[chave] -= valor
+            for chave, valor in _contribuicao(obj, _depois).items():
+                deltas[chave] += valor
+
+
+def _publicar_deltas(session: Session) -> None:
+    """Após o commit, aplica os deltas acumulados"""
+    deltas = session.info.pop(_CHAVE_DELTAS, None)
+    if not deltas:
+        return
+    criados = deltas.pop(("criados", None), 0)
+    if criados:
+        pedidos_criados.inc(criados)
+    _aplicar(deltas)
+
+
+def _descartar_deltas(session: Session) -> None:
+    """Descarta deltas quando a transação é revertida"""
+    session.info.pop(_CHAVE_DELTAS, None)
+
+
+event.listen(Session, "after_flush", _registrar_deltas)
+event.listen(Session, "after_commit", _publicar_deltas)
+event.listen(Session, "after_rollback", _descartar_deltas)
+
+
+class MetricasMiddleware:
+    """Middleware ASGI que conta requisições e mede a latência por rota"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def enviar(mensagem):
+            nonlocal status_code
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # Usa o template da rota (ex.: /pedidos/{pedido_id}) para limitar a cardinalidade
+            rota = getattr(scope.get("route"), "path", None) or "desconhecida"
+            metodo = scope["method"]
+            duracao_requisicoes.observar(time.perf_counter() - inicio, metodo=metodo, rota=rota)
+            requisicoes.inc(metodo=metodo, rota=rota, status=str(status_code))
@@ -0,0 +1,179 @@
+"""Sincronização incremental do cardápio
+
+Clientes que já têm o cardápio (frontend, totens) pedem só o que mudou
+desde a última versão recebida em vez de baixar GET /cardapio/ inteiro.
+
+A versão é um instante (UTC) codificado como token opaco. Mudanças são
+encontradas por TimestampMixin.updated_at e SoftDeleteMixin.deleted_at,
+com índices compostos (updated_at, id) / (deleted_at, id) que respondem
+sem ler as tabelas. Remoções físicas (DELETE nas rotas) não deixam rastro
+nessas colunas; um evento after_delete grava cada uma em
+catalogo_remocoes, mantida por MUDANCAS_RETENCAO_DIAS.
+
+Produtos embutem variações e ingredientes (ProdutoResponse), então uma
+mudança em variação, ingrediente padrão ou ingrediente reenvia os
+produtos afetados inteiros.
+
+O cliente deve baixar o cardápio completo (ressincronizar=True) quando:
+- não informa versão (primeira sincronização);
+- a versão é mais antiga que a retenção das remoções;
+- há mais de MUDANCAS_MAXIMO_ITENS itens alterados.
+"""
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from sqlalchemy import delete, event, insert, select, union
+from sqlalchemy.orm import Session
+
+from app.config import MUDANCAS_MAXIMO_ITENS, MUDANCAS_RETENCAO_DIAS
+from app.exceptions import CursorInvalido, VersaoCatalogoInvalida
+from app.models.models import (
+    Categoria, Ingrediente, Produto, ProdutoIngrediente, ProdutoVariacao, RemocaoCatalogo
+)
+from app.schemas.schemas import CategoriaResponse, IngredienteResponse
+from app.services.carregamento import carregar_produtos_por_id
+from app.services.paginacao import codificar_cursor, decodificar_cursor
+from app.services.serializacao import colunas
+
+# updated_at é gravado no flush e a transação pode confirmar depois: cada
+# consulta volta esta janela para não perder commits lentos (itens podem
+# vir repetidos; o cliente só substitui pelo ID)
+JANELA_SEGURANCA = timedelta(seconds=5)
+
+_TIPOS_REMOCAO = {
+    Categoria: "categoria",
+    Produto: "produto",
+    ProdutoVariacao: "variacao",
+    Ingrediente: "ingrediente",
+    ProdutoIngrediente: "ingrediente_padrao",
+}
+
+
+def codificar_versao(instante: datetime) -> str:
+    """Token opaco de versão a partir de um instante UTC"""
+    return codificar_cursor(instante)
+
+
+def decodificar_versao(versao: str) -> datetime:
+    """
+    Inverso de codificar_versao
+
+    Raises:
+        VersaoCatalogoInvalida: Se o token estiver malformado
+    """
+    try:
+        (instante,) = decodificar_cursor(versao, 1)
+    except CursorInvalido:
+        raise VersaoCatalogoInvalida()
+    if not isinstance(instante, datetime):
+        raise VersaoCatalogoInvalida()
+    return instante
+
+
+def _ids(db: Session, consulta) -> Set[int]:
+    """Executa uma consulta de uma coluna de IDs"""
+    return set(db.scalars(consulta))
+
+
+def _removidos(db: Session, modelo, limite: datetime) -> Set[int]:
+    """IDs com soft delete ou remoção física depois do limite"""
+    return _ids(db, union(
+        select(modelo.id).where(modelo.deleted_at > limite),
+        select(RemocaoCatalogo.entidade_id).where(
+            RemocaoCatalogo.removido_em > limite,
+            RemocaoCatalogo.tipo == _TIPOS_REMOCAO[modelo]
+        )
+    ))
+
+
+def _alterados(db: Session, modelo, limite: datetime) -> Set[int]:
+    """IDs criados ou atualizados depois do limite (só o índice (updated_at, id))"""
+    return _ids(db, select(modelo.id).where(modelo.updated_at > limite))
+
+
+def listar_mudancas(db: Session, desde: Optional[str], agora: Optional[datetime] = None) -> dict:
+    """
+    Itens do catálogo alterados desde uma versão
+
+    Args:
+        db: Sessão do banco
+        desde: Token de versão recebido na sincronização anterior (None na primeira)
+        agora: Instante da nova versão (padrão: datetime.utcnow())
+
+    Returns:
+        Dados no formato de MudancasCardapioResponse
+
+    Raises:
+        VersaoCatalogoInvalida: Se o token estiver malformado
+    """
+    agora = agora or datetime.utcnow()
+    resposta = {"versao": codificar_versao(agora)}
+    ressincronizar = {**resposta, "ressincronizar": True}
+
+    if desde is None:
+        return ressincronizar
+    instante = decodificar_versao(desde)
+    if instante < agora - timedelta(days=MUDANCAS_RETENCAO_DIAS):
+        return ressincronizar
+    limite = instante - JANELA_SEGURANCA
+
+    removidos = {
+        "categorias": _removidos(db, Categoria, limite),
+        "produtos": _removidos(db, Produto, limite),
+        "variacoes": _removidos(db, ProdutoVariacao, limite),
+        "ingredientes": _removidos(db, Ingrediente, limite),
+    }
+    categorias = _alterados(db, Categoria, limite) - removidos["categorias"]
+    ingredientes = _alterados(db, Ingrediente, limite) - removidos["ingredientes"]
+
+    # Produtos alterados diretamente ou por variações/ingredientes embutidos
+    ingredientes_afetados = ingredientes | removidos["ingredientes"]
+    produtos = _ids(db, union(
+        select(Produto.id).where(Produto.updated_at > limite),
+        select(ProdutoVariacao.produto_id).where(ProdutoVariacao.updated_at > limite),
+        select(ProdutoIngrediente.produto_id).where(ProdutoIngrediente.updated_at > limite),
+        select(ProdutoIngrediente.produto_id).where(ProdutoIngrediente.ingrediente_id.in_(ingredientes_afetados)),
+        select(RemocaoCatalogo.produto_id).where(
+            RemocaoCatalogo.removido_em > limite,
+            RemocaoCatalogo.produto_id.is_not(None)
+        )
+    )) - removidos["produtos"]
+
+    if len(categorias) + len(produtos) + len(ingredientes) > MUDANCAS_MAXIMO_ITENS:
+        return ressincronizar
+
+    # Soft delete antigo seguido de atualização: fica de fora
+    resposta["categorias"] = db.execute(
+        select(*colunas(Categoria, CategoriaResponse))
+        .where(Categoria.id.in_(categorias), Categoria.deleted_at.is_(None))
+        .order_by(Categoria.id)
+    ).all() if categorias else []
+    resposta["ingredientes"] = db.execute(
+        select(*colunas(Ingrediente, IngredienteResponse))
+        .where(Ingrediente.id.in_(ingredientes), Ingrediente.deleted_at.is_(None))
+        .order_by(Ingrediente.id)
+    ).all() if ingredientes else []
+    resposta["produtos"] = [
+        produto for produto in carregar_produtos_por_id(db, sorted(produtos)) if produto.deleted_at is None
+    ]
+    resposta["removidos"] = {tipo: sorted(ids) for tipo, ids in removidos.items()}
+    return resposta
+
+
+def _registrar_remocao(mapper, connection, alvo) -> None:
+    """Grava a remoção física em catalogo_remocoes e descarta registros vencidos"""
+    agora = datetime.utcnow()
+    connection.execute(insert(RemocaoCatalogo).values(
+        tipo=_TIPOS_REMOCAO[mapper.class_],
+        entidade_id=alvo.id,
+        produto_id=getattr(alvo, "produto_id", None),
+        removido_em=agora
+    ))
+    connection.execute(
+        delete(RemocaoCatalogo)
+        .where(RemocaoCatalogo.removido_em < agora - timedelta(days=MUDANCAS_RETENCAO_DIAS))
+    )
+
+
+for _modelo in _TIPOS_REMOCAO:
+    event.listen(_modelo, "after_delete", _registrar_remocao)
@@ -0,0 +1,64 @@
+"""Cursores opacos para paginação keyset
+
+O cursor carrega os valores da chave de ordenação da última linha
+entregue (ex.: created_at e id). A próxima página filtra a partir deles
+em vez de usar OFFSET, então o custo não cresce com a profundidade.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from app.exceptions import CursorInvalido
+
+
+def _serializar(valor: Any) -> Any:
+    """Converte valores da chave para JSON mantendo o tipo recuperável"""
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    return valor
+
+
+def _desserializar(valor: Any) -> Any:
+    """Inverso de _serializar"""
+    if isinstance(valor, dict) and set(valor) == {"dt"}:
+        return datetime.fromisoformat(valor["dt"])
+    return valor
+
+
+def codificar_cursor(*chave: Any) -> str:
+    """
+    Codifica os valores da chave de ordenação em um cursor opaco
+
+    Args:
+        chave: Valores da chave (ex.: created_at, id) da última linha
+
+    Returns:
+        Cursor em base64 url-safe
+    """
+    dados = json.dumps([_serializar(valor) for valor in chave], separators=(",", ":"))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, tamanho: int) -> Tuple[Any, ...]:
+    """
+    Decodifica um cursor gerado por codificar_cursor
+
+    Args:
+        cursor: Cursor recebido do cliente
+        tamanho: Quantidade de valores esperada na chave
+
+    Returns:
+        Tupla com os valores da chave
+
+    Raises:
+        CursorInvalido: Se o cursor estiver malformado
+    """
+    try:
+        dados = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        chave = json.loads(dados)
+        if not isinstance(chave, list) or len(chave) != tamanho:
+            raise ValueError(cursor)
+        return tuple(_desserializar(valor) for valor in chave)
+    except (ValueError, TypeError):
+        raise CursorInvalido()
@@ -0,0 +1,137 @@
+"""Motor de precificação de pedidos
+
+Resolve um PedidoCreate inteiro a partir do snapshot imutável do catálogo
+(app.services.catalogo) e calcula o preço de todos os itens em memória.
+O banco só é consultado quando o snapshot precisa ser reconstruído.
+A disponibilidade de cada variação vem do índice de disponibilidade
+efetiva (app.services.disponibilidade) na mesma versão do snapshot.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.schemas.schemas import PedidoCreate
+from app.services.catalogo import Catalogo, obter_catalogo
+from app.services.disponibilidade import MapaDisponibilidade, indice_disponibilidade
+from app.exceptions import (
+    ProdutoVariacaoNaoEncontrada, ProdutoIndisponivel,
+    IngredienteNaoEncontrado, IngredienteIndisponivel,
+    IngredienteObrigatorio
+)
+
+
+@dataclass(frozen=True)
+class ItemPrecificado:
+    """Item do pedido com preço calculado e snapshot dos dados do cardápio"""
+    produto_variacao_id: int
+    produto_id: int
+    produto_nome: str
+    tamanho: str
+    quantidade: int
+    preco_base: float
+    preco_ingredientes: float
+    preco_total: float
+    ingredientes_adicionados: List[dict] = field(default_factory=list)
+    ingredientes_removidos: List[dict] = field(default_factory=list)
+    observacoes: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PedidoPrecificado:
+    """Resultado da precificação de um pedido completo"""
+    itens: List[ItemPrecificado]
+    preco_total: float
+    versao_catalogo: int
+
+
+def _precificar_item(item_data, catalogo: Catalogo, disponibilidade: MapaDisponibilidade) -> ItemPrecificado:
+    """Valida e calcula o preço de um item usando apenas o snapshot do catálogo"""
+    produto_variacao = catalogo.variacoes.get(item_data.produto_variacao_id)
+    if not produto_variacao:
+        raise ProdutoVariacaoNaoEncontrada(item_data.produto_variacao_id)
+
+    # Considera variação, produto, categoria e ingredientes obrigatórios
+    produto = catalogo.produtos[produto_variacao.produto_id]
+    if not disponibilidade.variacao_disponivel(produto_variacao.id):
+        raise ProdutoIndisponivel(f"{produto.nome} ({produto_variacao.tamanho})")
+
+    # Validar e adicionar ingredientes extras
+    preco_ingredientes = 0.0
+    ingredientes_adicionados_data = []
+    for ing_id in item_data.ingredientes_adicionados or []:
+        ingrediente = catalogo.ingredientes.get(ing_id)
+        if not ingrediente:
+            raise IngredienteNaoEncontrado(ing_id)
+        if not ingrediente.disponivel:
+            raise IngredienteIndisponivel(ingrediente.nome)
+
+        preco_ingredientes += ingrediente.preco_adicional
+        ingredientes_adicionados_data.append({
+            "id": ingrediente.id,
+            "nome": ingrediente.nome,
+            "preco": ingrediente.preco_adicional
+        })
+
+    # Validar ingredientes removidos (ignorar os que nao sao padrao do produto)
+    ingredientes_removidos_data = []
+    for ing_id in item_data.ingredientes_removidos or []:
+        produto_ingrediente = catalogo.ingredientes_padrao.get((produto.id, ing_id))
+        if not produto_ingrediente:
+            continue
+
+        ingrediente = catalogo.ingredientes[ing_id]
+        if produto_ingrediente.obrigatorio:
+            raise IngredienteObrigatorio(ingrediente.nome)
+
+        ingredientes_removidos_data.append({
+            "id": ingrediente.id,
+            "nome": ingrediente.nome
+        })
+
+    preco_base = produto_variacao.preco
+    preco_total = (preco_base + preco_ingredientes) * item_data.quantidade
+
+    return ItemPrecificado(
+        produto_variacao_id=produto_variacao.id,
+        produto_id=produto.id,
+        produto_nome=produto.nome,
+        tamanho=produto_variacao.tamanho,
+        quantidade=item_data.quantidade,
+        preco_base=preco_base,
+        preco_ingredientes=preco_ingredientes,
+        preco_total=preco_total,
+        ingredientes_adicionados=ingredientes_adicionados_data,
+        ingredientes_removidos=ingredientes_removidos_data,
+        observacoes=item_data.observacoes
+    )
+
+
+def precificar_pedido(pedido: PedidoCreate, db: Session) -> PedidoPrecificado:
+    """
+    Calcula o preço de todos os itens de um pedido
+
+    Todos os itens são precificados contra o mesmo snapshot do catálogo,
+    então um pedido nunca mistura preços de versões diferentes.
+
+    Args:
+        pedido: Dados do pedido com itens e customizações
+        db: Sessão do banco de dados (usada só para reconstruir o catálogo)
+
+    Returns:
+        PedidoPrecificado com os itens na mesma ordem do pedido
+
+    Raises:
+        ProdutoVariacaoNaoEncontrada, ProdutoIndisponivel,
+        IngredienteNaoEncontrado, IngredienteIndisponivel,
+        IngredienteObrigatorio
+    """
+    catalogo = obter_catalogo(db)
+    disponibilidade = indice_disponibilidade.obter(catalogo)
+    itens = [_precificar_item(item_data, catalogo, disponibilidade) for item_data in pedido.itens or []]
+    preco_total = sum(item.preco_total for item in itens)
+    return PedidoPrecificado(
+        itens=itens,
+        preco_total=round(preco_total, 2),
+        versao_catalogo=catalogo.versao
+    )
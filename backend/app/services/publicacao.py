@@ -0,0 +1,274 @@
+"""Publicação do cardápio como arquivos estáticos (CDN / nginx)
+
+A cada nova versão do catálogo o cardápio completo (GET /cardapio/) e a
+lista de produtos de cada categoria (GET /cardapio/categorias/{id}/produtos)
+são gravados em PUBLICACAO_DIRETORIO com os mesmos bytes que a API
+responderia, já comprimidos em gzip e brotli. Assim o nginx (gzip_static / brotli_static) ou uma
+CDN servem o cardápio sem passar pelo Python.
+
+Layout do diretório:
+
+    cardapio.<hash>.json[.gz|.br]              versões imutáveis
+    categorias/<id>/produtos.<hash>.json[...]
+    cardapio.json[.gz|.br]                     cópia da versão atual
+    categorias/<id>/produtos.json[...]
+    manifest.json                              versão atual e arquivos
+
+Todo arquivo é gravado em um temporário no mesmo diretório e trocado com
+os.replace, então quem lê nunca enxerga um arquivo pela metade. Os
+versionados têm o hash do conteúdo no nome (podem ser cacheados para
+sempre) e só são gravados se ainda não existirem; quando já existem, a
+data de modificação é renovada, marcando o último uso. O manifest é o
+último a ser trocado.
+
+Com vários workers, cada processo publica a sua versão no mesmo
+diretório, e o manifest de outro processo pode apontar para arquivos que
+este não conhece. Por isso a limpeza não depende só dos manifests: um
+arquivo fora do manifest novo e do anterior só é removido se não foi
+gravado nem referenciado por nenhuma publicação nos últimos
+PUBLICACAO_RETENCAO_SEGUNDOS.
+
+A publicação roda em uma thread própria: o observador do catálogo só
+sinaliza, e várias alterações seguidas geram uma única publicação.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+import brotli
+from sqlalchemy.orm import Session
+
+from app.config import PUBLICACAO_DIRETORIO, PUBLICACAO_RETENCAO_SEGUNDOS
+from app.services.cache_categorias import cache_categorias
+from app.services.cardapio import obter_cardapio_serializado
+from app.services.catalogo import AlteracoesCatalogo, obter_catalogo, observar_alteracoes, versao_catalogo
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def _gravar(caminho: Path, conteudo: bytes) -> None:
+    """Grava o arquivo de forma atômica (temporário + os.replace)"""
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=f".{caminho.name}.")
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def _variantes(corpo: bytes) -> Dict[str, bytes]:
+    """Corpo original e as versões pré-comprimidas, por sufixo"""
+    return {
+        "": corpo,
+        ".gz": gzip.compress(corpo, compresslevel=9, mtime=0),
+        ".br": brotli.compress(corpo, mode=brotli.MODE_TEXT),
+    }
+
+
+def _publicar_recurso(diretorio: Path, nome: str, corpo: bytes) -> dict:
+    """
+    Grava um recurso versionado e a cópia com nome estável
+
+    Args:
+        diretorio: Diretório de publicação
+        nome: Caminho relativo sem extensão (ex.: "categorias/3/produtos")
+        corpo: JSON da resposta
+
+    Returns:
+        Entrada do manifest (arquivo versionado, ETag, tamanho e compressões)
+    """
+    digest = hashlib.sha256(corpo).hexdigest()[:32]
+    versionado = f"{nome}.{digest[:12]}.json"
+    variantes = _variantes(corpo)
+    for sufixo, conteudo in variantes.items():
+        caminho = diretorio / f"{versionado}{sufixo}"
+        try:
+            os.utime(caminho)  # Último uso, para a limpeza
+        except FileNotFoundError:
+            _gravar(caminho, conteudo)
+        _gravar(diretorio / f"{nome}.json{sufixo}", conteudo)
+    return {
+        "arquivo": versionado,
+        "etag": f'"{digest}"',
+        "tamanho": len(corpo),
+        "compressoes": [sufixo.lstrip(".") for sufixo in variantes if sufixo],
+    }
+
+
+def _arquivos(manifest: Optional[dict]) -> Set[str]:
+    """Arquivos versionados referenciados por um manifest (com as compressões)"""
+    if not manifest:
+        return set()
+    entradas = [manifest["cardapio"], *manifest["categorias"].values()]
+    return {
+        f"{entrada['arquivo']}{sufixo}"
+        for entrada in entradas
+        for sufixo in ("", *(f".{c}" for c in entrada["compressoes"]))
+    }
+
+
+def _ler_manifest(diretorio: Path) -> Optional[dict]:
+    """Manifest publicado no diretório (None se não existir ou estiver ilegível)"""
+    try:
+        return json.loads((diretorio / MANIFEST).read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _remover_antigos(
+    diretorio: Path, manifest: dict, anterior: Optional[dict], retencao_segundos: float
+) -> None:
+    """
+    Remove versões e categorias que deixaram de ser publicadas
+
+    Um arquivo fora dos dois últimos manifests só é removido se a data de
+    modificação (gravação ou último uso) tiver mais de retencao_segundos.
+    """
+    limite = time.time() - retencao_segundos
+    manter = _arquivos(manifest) | _arquivos(anterior) | {MANIFEST}
+    # Cópias estáveis só das categorias do manifest atual
+    for nome in _arquivos(manifest):
+        base, _, sufixo = nome.rpartition(".json")
+        manter.add(f"{base.rsplit('.', 1)[0]}.json{sufixo}")
+
+    for caminho in diretorio.rglob("*.json*"):
+        if caminho.name.startswith("."):  # Temporário de uma gravação em andamento
+            continue
+        if caminho.relative_to(diretorio).as_posix() in manter:
+            continue
+        try:
+            if caminho.stat().st_mtime < limite:
+                caminho.unlink()
+        except FileNotFoundError:  # Removido por outro processo
+            pass
+    categorias = diretorio / "categorias"
+    if categorias.is_dir():
+        for pasta in categorias.iterdir():
+            if pasta.is_dir() and not any(pasta.iterdir()):
+                try:
+                    pasta.rmdir()
+                except OSError:  # Outro processo acabou de gravar nela
+                    pass
+
+
+def publicar_cardapio(
+    db: Session, diretorio: str, retencao_segundos: float = PUBLICACAO_RETENCAO_SEGUNDOS
+) -> dict:
+    """
+    Grava o cardápio e as listas por categoria como arquivos estáticos
+
+    Args:
+        db: Sessão do banco
+        diretorio: Diretório de publicação (criado se não existir)
+        retencao_segundos: Idade mínima para remover um arquivo fora dos
+            dois últimos manifests
+
+    Returns:
+        Manifest publicado
+    """
+    destino = Path(diretorio)
+    destino.mkdir(parents=True, exist_ok=True)
+    anterior = _ler_manifest(destino)
+
+    catalogo = obter_catalogo(db)
+    cardapio = obter_cardapio_serializado(db)
+
+    # Mesmo conteúdo de GET /cardapio/categorias/{id}/produtos (sem indisponíveis)
+    recursos = {
+        "cardapio": _publicar_recurso(destino, "cardapio", cardapio.corpo),
+        "categorias": {
+            str(categoria_id): _publicar_recurso(
+                destino, f"categorias/{categoria_id}/produtos", cache_categorias.obter(db, categoria_id).corpo
+            )
+            for categoria_id in sorted(catalogo.categorias)
+        },
+    }
+    # A versão do catálogo é local ao processo: o manifest usa o hash do conteúdo
+    manifest = {
+        "versao": hashlib.sha256(json.dumps(recursos, sort_keys=True).encode()).hexdigest()[:16],
+        "gerado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **recursos,
+    }
+    _gravar(destino / MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2).encode())
+    _remover_antigos(destino, manifest, anterior, retencao_segundos)
+    return manifest
+
+
+class PublicadorCardapio:
+    """Publica o cardápio em segundo plano a cada nova versão do catálogo"""
+
+    def __init__(self):
+        self._sinal = threading.Event()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._diretorio: Optional[str] = None
+        # Maior versão do catálogo já sinalizada
+        self._pedida = 0
+
+    def iniciar(self, diretorio: str = PUBLICACAO_DIRETORIO) -> None:
+        """Inicia a thread de publicação e agenda a primeira publicação"""
+        if not diretorio or self._thread is not None:
+            return
+        self._diretorio = diretorio
+        self._parar.clear()
+        self._sinal.set()
+        self._thread = threading.Thread(target=self._executar, name="publicador-cardapio", daemon=True)
+        self._thread.start()
+
+    def encerrar(self) -> None:
+        """Para a thread (a publicação em andamento termina antes)"""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._sinal.set()
+        self._thread.join()
+        self._thread = None
+
+    def agendar(self, versao: int = 0, alteracoes: Optional[AlteracoesCatalogo] = None) -> None:
+        """Observador do catálogo: pede uma nova publicação"""
+        if self._thread is not None:
+            self._pedida = max(self._pedida, versao)
+            self._sinal.set()
+
+    def _executar(self) -> None:
+        """Laço da thread: uma publicação por sinal, agrupando sinais seguidos"""
+        # Import tardio: app.database cria o engine na importação
+        from app.database import SessionLocal
+
+        while True:
+            self._sinal.wait()
+            if self._parar.is_set():
+                return
+            self._sinal.clear()
+            versao = versao_catalogo()
+            db = SessionLocal()
+            try:
+                publicar_cardapio(db, self._diretorio)
+            except Exception:
+                logger.exception("Falha ao publicar o cardápio em %s", self._diretorio)
+            finally:
+                db.close()
+            # O sinal chega antes de a versão nova ficar visível: se a
+            # publicação leu uma versão anterior, publica de novo
+            if versao < self._pedida:
+                self._sinal.set()
+
+
+publicador_cardapio = PublicadorCardapio()
+observar_alteracoes(publicador_cardapio.agendar)
@@ -0,0 +1,324 @@
+"""Hash e verificação de senhas fora do event loop
+
+bcrypt consome centenas de milissegundos de CPU por chamada; executado
+dentro de uma rota async def, congela todas as requisições do worker.
+As operações rodam em um executor dedicado e limitado (threads ou
+processos, conforme SENHAS_EXECUTOR). Quando trabalhadores e fila estão
+todos ocupados, a chamada falha na hora com ServicoSobrecarregado em vez
+de acumular espera indefinidamente.
+
+O custo do hash segue uma política configurável (SENHAS_ESQUEMA, rounds
+do bcrypt ou parâmetros do argon2, pepper opcional). Hashes gerados com
+outra política continuam válidos e são refeitos no próximo login bem
+sucedido, quando a senha em texto plano está disponível: subir ou baixar
+o custo não invalida nenhuma senha. python -m app.calibrar_senhas mede o
+tempo do hash no servidor e sugere os parâmetros para uma latência alvo.
+
+O pepper é um HMAC-SHA256 da senha com um segredo fora do banco, aplicado
+antes do hash; hashes com pepper levam o prefixo "pepper:" para que os
+antigos, sem pepper, ainda sejam verificados (e migrados no login).
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import statistics
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import (
+    SENHAS_ARGON2_MEMORIA_KIB,
+    SENHAS_ARGON2_PARALELISMO,
+    SENHAS_ARGON2_TIME_COST,
+    SENHAS_BCRYPT_ROUNDS,
+    SENHAS_ESQUEMA,
+    SENHAS_EXECUTOR,
+    SENHAS_FILA_MAXIMA,
+    SENHAS_PEPPER,
+    SENHAS_TRABALHADORES,
+)
+from app.exceptions import ServicoSobrecarregado
+from app.services import metricas
+
+ESQUEMAS = ("bcrypt", "argon2")
+_PREFIXO_PEPPER = "pepper:"
+
+
+class PoliticaSenhas:
+    """Esquema, custo e pepper usados para gerar e verificar hashes"""
+
+    def __init__(
+        self,
+        esquema: str = "bcrypt",
+        bcrypt_rounds: int = 12,
+        argon2_time_cost: int = 3,
+        argon2_memoria_kib: int = 65536,
+        argon2_paralelismo: int = 4,
+        pepper: str = ""
+    ):
+        """
+        Raises:
+            ValueError: Esquema desconhecido ou argon2 sem o pacote argon2-cffi
+        """
+        if esquema not in ESQUEMAS:
+            raise ValueError(f"SENHAS_ESQUEMA inválido: {esquema!r} (use {' ou '.join(ESQUEMAS)})")
+        if esquema == "argon2":
+            from passlib.hash import argon2
+            if not argon2.has_backend():
+                raise ValueError("SENHAS_ESQUEMA=argon2 requer o pacote argon2-cffi")
+
+        self.esquema = esquema
+        self.bcrypt_rounds = bcrypt_rounds
+        self.argon2_time_cost = argon2_time_cost
+        self.argon2_memoria_kib = argon2_memoria_kib
+        self.argon2_paralelismo = argon2_paralelismo
+        self._pepper = pepper.encode()
+        # min/max iguais ao padrão: hashes com qualquer outro custo precisam de atualização
+        self.contexto = CryptContext(
+            schemes=list(ESQUEMAS),
+            default=esquema,
+            deprecated="auto",
+            bcrypt__rounds=bcrypt_rounds,
+            bcrypt__min_rounds=bcrypt_rounds,
+            bcrypt__max_rounds=bcrypt_rounds,
+            argon2__rounds=argon2_time_cost,
+            argon2__min_rounds=argon2_time_cost,
+            argon2__max_rounds=argon2_time_cost,
+            argon2__memory_cost=argon2_memoria_kib,
+            argon2__parallelism=argon2_paralelismo,
+        )
+
+    def _temperar(self, senha: str) -> str:
+        """Senha com o pepper aplicado (HMAC-SHA256 em base64, 44 caracteres)"""
+        digest = hmac.new(self._pepper, senha.encode(), hashlib.sha256).digest()
+        return base64.b64encode(digest).decode()
+
+    def gerar_hash(self, senha: str) -> str:
+        """Hash da senha com a política atual"""
+        if self._pepper:
+            return _PREFIXO_PEPPER + self.contexto.hash(self._temperar(senha))
+        return self.contexto.hash(senha)
+
+    def verificar(self, senha: str, senha_hash: str) -> bool:
+        """Verifica a senha contra um hash de qualquer política suportada"""
+        if senha_hash.startswith(_PREFIXO_PEPPER):
+            if not self._pepper:
+                raise ValueError("Hash de senha com pepper, mas SENHAS_PEPPER não está configurado")
+            return self.contexto.verify(self._temperar(senha), senha_hash[len(_PREFIXO_PEPPER):])
+        return self.contexto.verify(senha, senha_hash)
+
+    def precisa_atualizar(self, senha_hash: str) -> bool:
+        """True se o hash não segue a política atual (esquema, custo ou pepper)"""
+        com_pepper = senha_hash.startswith(_PREFIXO_PEPPER)
+        if com_pepper != bool(self._pepper):
+            return True
+        return self.contexto.needs_update(senha_hash[len(_PREFIXO_PEPPER):] if com_pepper else senha_hash)
+
+    def verificar_e_atualizar(self, senha: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica a senha e, se ela confere com um hash fora da política, gera o novo hash
+
+        Returns:
+            (senha confere, novo hash ou None)
+        """
+        if not self.verificar(senha, senha_hash):
+            return False, None
+        if self.precisa_atualizar(senha_hash):
+            return True, self.gerar_hash(senha)
+        return True, None
+
+
+politica_senhas = PoliticaSenhas(
+    SENHAS_ESQUEMA,
+    bcrypt_rounds=SENHAS_BCRYPT_ROUNDS,
+    argon2_time_cost=SENHAS_ARGON2_TIME_COST,
+    argon2_memoria_kib=SENHAS_ARGON2_MEMORIA_KIB,
+    argon2_paralelismo=SENHAS_ARGON2_PARALELISMO,
+    pepper=SENHAS_PEPPER,
+)
+
+
+def _verificar(senha: str, senha_hash: str) -> bool:
+    """Executada no trabalhador: precisa ser global para o pool de processos"""
+    return politica_senhas.verificar(senha, senha_hash)
+
+
+def _verificar_e_atualizar(senha: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+    """Executada no trabalhador: precisa ser global para o pool de processos"""
+    return politica_senhas.verificar_e_atualizar(senha, senha_hash)
+
+
+def _gerar_hash(senha: str) -> str:
+    """Executada no trabalhador: precisa ser global para o pool de processos"""
+    return politica_senhas.gerar_hash(senha)
+
+
+class ExecutorSenhas:
+    """Executor limitado para operações de senha"""
+
+    def __init__(self, tipo: str, trabalhadores: int, fila_maxima: int):
+        if tipo not in ("thread", "processo"):
+            raise ValueError(f"SENHAS_EXECUTOR inválido: {tipo!r} (use 'thread' ou 'processo')")
+        self.tipo = tipo
+        self.trabalhadores = max(1, trabalhadores)
+        self.fila_maxima = max(0, fila_maxima)
+        self._vagas = threading.BoundedSemaphore(self.trabalhadores + self.fila_maxima)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _obter_executor(self) -> Executor:
+        """Cria o pool na primeira utilização"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.tipo == "processo":
+                        self._executor = ProcessPoolExecutor(max_workers=self.trabalhadores)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.trabalhadores,
+                            thread_name_prefix="senhas"
+                        )
+        return self._executor
+
+    async def executar(self, funcao: Callable, *args):
+        """
+        Executa uma operação de senha no pool sem bloquear o event loop
+
+        Raises:
+            ServicoSobrecarregado: Se trabalhadores e fila estiverem ocupados
+        """
+        if not self._vagas.acquire(blocking=False):
+            raise ServicoSobrecarregado("autenticação")
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._obter_executor(), funcao, *args)
+        finally:
+            self._vagas.release()
+
+    def encerrar(self) -> None:
+        """Finaliza o pool (recriado sob demanda no próximo uso)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+executor_senhas = ExecutorSenhas(SENHAS_EXECUTOR, SENHAS_TRABALHADORES, SENHAS_FILA_MAXIMA)
+
+
+async def verificar_senha(senha: str, senha_hash: str) -> bool:
+    """
+    Verifica uma senha contra o hash armazenado
+
+    Args:
+        senha: Senha em texto plano
+        senha_hash: Hash armazenado
+
+    Returns:
+        True se a senha confere
+
+    Raises:
+        ServicoSobrecarregado: Se o executor de senhas estiver saturado
+    """
+    return await executor_senhas.executar(_verificar, senha, senha_hash)
+
+
+async def gerar_hash_senha(senha: str) -> str:
+    """
+    Gera o hash de uma senha com a política atual
+
+    Args:
+        senha: Senha em texto plano
+
+    Returns:
+        Hash da senha
+
+    Raises:
+        ServicoSobrecarregado: Se o executor de senhas estiver saturado
+    """
+    return await executor_senhas.executar(_gerar_hash, senha)
+
+
+async def verificar_e_atualizar_senha(senha: str, senha_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica uma senha e gera o novo hash se o armazenado não segue a política atual
+
+    Args:
+        senha: Senha em texto plano
+        senha_hash: Hash armazenado
+
+    Returns:
+        (senha confere, novo hash a gravar ou None)
+
+    Raises:
+        ServicoSobrecarregado: Se o executor de senhas estiver saturado
+    """
+    valida, novo_hash = await executor_senhas.executar(_verificar_e_atualizar, senha, senha_hash)
+    if novo_hash is not None:
+        metricas.senhas_atualizadas.inc(esquema=politica_senhas.esquema)
+    return valida, novo_hash
+
+
+@dataclass(frozen=True)
+class Medicao:
+    """Tempo de hash de uma combinação de parâmetros"""
+    parametros: dict
+    milissegundos: float
+
+
+def medir_hash(politica: PoliticaSenhas, repeticoes: int = 3) -> float:
+    """Mediana, em milissegundos, do tempo de um hash com a política"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        politica.gerar_hash("calibracao-da-politica-de-senhas")
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def calibrar(
+    esquema: str,
+    alvo_ms: float,
+    argon2_memoria_kib: int = 65536,
+    argon2_paralelismo: int = 4,
+    repeticoes: int = 3
+) -> Tuple[dict, List[Medicao]]:
+    """
+    Mede o hash com custos crescentes até passar da latência alvo
+
+    bcrypt varia os rounds (cada round dobra o tempo); argon2 fixa memória
+    e paralelismo e varia time_cost.
+
+    Args:
+        esquema: bcrypt ou argon2
+        alvo_ms: Tempo máximo desejado para um hash (≈ verificação no login)
+        argon2_memoria_kib: Memória do argon2
+        argon2_paralelismo: Paralelismo do argon2
+        repeticoes: Hashes medidos por combinação
+
+    Returns:
+        (parâmetros recomendados: o maior custo dentro do alvo, ou o menor
+        medido se nenhum couber; todas as medições)
+    """
+    if esquema == "bcrypt":
+        candidatos = ({"bcrypt_rounds": rounds} for rounds in range(8, 20))
+    else:
+        candidatos = (
+            {"argon2_time_cost": t, "argon2_memoria_kib": argon2_memoria_kib, "argon2_paralelismo": argon2_paralelismo}
+            for t in range(1, 33)
+        )
+
+    medicoes: List[Medicao] = []
+    for parametros in candidatos:
+        ms = medir_hash(PoliticaSenhas(esquema, **parametros), repeticoes)
+        medicoes.append(Medicao(parametros, ms))
+        if ms > alvo_ms:
+            break
+
+    dentro_do_alvo = [m for m in medicoes if m.milissegundos <= alvo_ms]
+    return (dentro_do_alvo[-1] if dentro_do_alvo else medicoes[0]).parametros, medicoes
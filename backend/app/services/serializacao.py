@@ -0,0 +1,72 @@
+"""Serialização das respostas JSON sem o caminho genérico do FastAPI
+
+Para uma rota com response_model, o FastAPI valida o retorno, converte o
+resultado em dicts e listas "compatíveis com JSON" e só então o codifica
+com json.dumps. Em listagens grandes esses passos intermediários custam
+mais que a consulta.
+
+Aqui cada formato de resposta tem um TypeAdapter montado uma única vez na
+importação. Ele valida os objetos ORM (ou linhas de colunas) e gera os
+bytes direto no pydantic-core, sem a árvore intermediária de dicts. As
+rotas continuam declarando response_model para o OpenAPI; como retornam
+um Response pronto, o FastAPI não revalida nada.
+
+Listagens planas (categorias, ingredientes) leem só as colunas do schema
+como linhas, sem hidratar objetos ORM.
+"""
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas.schemas import (
+    CategoriaResponse, IngredienteResponse, MudancasCardapioResponse, PaginaPedidosResponse,
+    PedidoResponse, ProdutoResponse, SugestaoResponse
+)
+
+PRODUTO = TypeAdapter(ProdutoResponse)
+PRODUTOS = TypeAdapter(List[ProdutoResponse])
+CATEGORIA = TypeAdapter(CategoriaResponse)
+CATEGORIAS = TypeAdapter(List[CategoriaResponse])
+INGREDIENTES = TypeAdapter(List[IngredienteResponse])
+PEDIDOS = TypeAdapter(List[PedidoResponse])
+PAGINA_PEDIDOS = TypeAdapter(PaginaPedidosResponse)
+SUGESTOES = TypeAdapter(List[SugestaoResponse])
+MUDANCAS = TypeAdapter(MudancasCardapioResponse)
+
+
+def colunas(modelo: Any, esquema: Type[BaseModel]) -> list:
+    """
+    Colunas do modelo ORM que compõem o schema de resposta
+
+    Args:
+        modelo: Classe mapeada (ex.: Categoria)
+        esquema: Schema pydantic de resposta (ex.: CategoriaResponse)
+
+    Returns:
+        Atributos instrumentados na ordem dos campos do schema, para usar
+        em select(*colunas(...))
+    """
+    return [getattr(modelo, campo) for campo in esquema.model_fields]
+
+
+def resposta_json(
+    adaptador: TypeAdapter,
+    dados: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Valida e serializa os dados em uma única passada
+
+    Args:
+        adaptador: Um dos adaptadores deste módulo (ou serializador_parcial)
+        dados: Objetos ORM, linhas (Row/RowMapping) ou dicts
+        status_code: Status HTTP da resposta
+        headers: Headers adicionais
+
+    Returns:
+        Response com o corpo JSON já codificado
+    """
+    corpo = adaptador.dump_json(adaptador.validate_python(dados, from_attributes=True))
+    return Response(corpo, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,265 @@
+"""Autocomplete do cardápio tolerante a erros de digitação
+
+Sugere produtos que podem ser pedidos (disponibilidade efetiva de
+app.services.disponibilidade, a mesma do cardápio e dos pedidos) e
+ingredientes disponíveis a partir do que o usuário já digitou. Duas estruturas são
+montadas a partir do snapshot do catálogo (app.services.catalogo):
+
+- trie de prefixos das palavras dos nomes (sem acentos), em que cada nó
+  guarda as melhores sugestões já ordenadas, então a resposta não depende
+  do tamanho do catálogo;
+- BK-tree sobre o vocabulário, com distância de Levenshtein, para corrigir
+  palavras digitadas com um ou dois erros ("calabreza", "musarela").
+
+As estruturas são imutáveis e reconstruídas na primeira consulta após uma
+mudança de versão do catálogo.
+"""
+import bisect
+import heapq
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.busca import dobrar, tokenizar
+from app.services.catalogo import Catalogo, obter_catalogo
+from app.services.disponibilidade import MapaDisponibilidade, indice_disponibilidade
+
+# Sugestões pré-ordenadas guardadas em cada nó da trie (limite máximo da rota)
+SUGESTOES_POR_NO = 20
+
+# Correções de palavras memorizadas por índice (o usuário redigita o mesmo erro a cada tecla)
+CORRECOES_EM_CACHE = 1024
+
+_ORDEM_TIPOS = {"produto": 0, "ingrediente": 1}
+
+
+@dataclass(frozen=True)
+class Sugestao:
+    """Item sugerido ao usuário"""
+    tipo: str
+    id: int
+    nome: str
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Distância de edição (inserção, remoção e troca custam 1)"""
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        anterior = atual
+    return anterior[-1]
+
+
+def tolerancia(palavra: str) -> int:
+    """Erros aceitos conforme o tamanho da palavra digitada"""
+    if len(palavra) < 4:
+        return 0
+    return 1 if len(palavra) < 7 else 2
+
+
+class ArvoreBK:
+    """BK-tree de palavras para busca por distância de edição"""
+
+    def __init__(self):
+        self._raiz: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def adicionar(self, palavra: str) -> None:
+        """Insere uma palavra (duplicatas são ignoradas)"""
+        if self._raiz is None:
+            self._raiz = (palavra, {})
+            return
+        no = self._raiz
+        while True:
+            distancia = levenshtein(palavra, no[0])
+            if distancia == 0:
+                return
+            filho = no[1].get(distancia)
+            if filho is None:
+                no[1][distancia] = (palavra, {})
+                return
+            no = filho
+
+    def buscar(self, palavra: str, maximo: int) -> List[Tuple[int, str]]:
+        """
+        Palavras a no máximo `maximo` edições
+
+        Returns:
+            Pares (distância, palavra), dos mais próximos aos mais distantes
+        """
+        encontradas = []
+        pendentes = [self._raiz] if self._raiz is not None else []
+        while pendentes:
+            termo, filhos = pendentes.pop()
+            distancia = levenshtein(palavra, termo)
+            if distancia <= maximo:
+                encontradas.append((distancia, termo))
+            # Desigualdade triangular: só subárvores que podem conter resultados
+            for aresta, filho in filhos.items():
+                if distancia - maximo <= aresta <= distancia + maximo:
+                    pendentes.append(filho)
+        return sorted(encontradas)
+
+
+class _No:
+    """Nó da trie com as melhores sugestões do prefixo"""
+    __slots__ = ("filhos", "iniciais", "internas")
+
+    def __init__(self):
+        self.filhos: Dict[str, "_No"] = {}
+        # Índices das sugestões em que o prefixo começa o nome / outra palavra
+        self.iniciais: List[int] = []
+        self.internas: List[int] = []
+
+
+class IndiceSugestoes:
+    """Trie + BK-tree de uma versão do catálogo"""
+
+    def __init__(self, catalogo: Catalogo):
+        self.versao = catalogo.versao
+        self.sugestoes: List[Sugestao] = self._coletar(catalogo, indice_disponibilidade.obter(catalogo))
+        self.palavras_sugestao: List[Tuple[str, ...]] = [tuple(tokenizar(s.nome)) for s in self.sugestoes]
+        self.por_palavra: Dict[str, List[int]] = defaultdict(list)
+        self.raiz = _No()
+        self.arvore = ArvoreBK()
+
+        # Sugestões entram em ordem de relevância, então cada nó só precisa
+        # guardar as primeiras que chegarem
+        for indice, palavras in enumerate(self.palavras_sugestao):
+            for posicao, palavra in enumerate(palavras):
+                if not self.por_palavra[palavra] or self.por_palavra[palavra][-1] != indice:
+                    self.por_palavra[palavra].append(indice)
+                no = self.raiz
+                for letra in palavra:
+                    no = no.filhos.setdefault(letra, _No())
+                    lista = no.iniciais if posicao == 0 else no.internas
+                    if len(lista) < SUGESTOES_POR_NO and (not lista or lista[-1] != indice):
+                        lista.append(indice)
+
+        self.por_palavra = dict(self.por_palavra)
+        self.conjuntos: Dict[str, FrozenSet[int]] = {p: frozenset(i) for p, i in self.por_palavra.items()}
+        self.vocabulario: List[str] = sorted(self.por_palavra)
+        # Números (tamanhos, códigos) não passam por correção
+        for palavra in self.vocabulario:
+            if not palavra.isdigit():
+                self.arvore.adicionar(palavra)
+        self._correcoes: Dict[str, List[Tuple[int, str]]] = {}
+
+    @staticmethod
+    def _coletar(catalogo: Catalogo, disponibilidade: MapaDisponibilidade) -> List[Sugestao]:
+        """Produtos e ingredientes sugeríveis, do mais ao menos relevante"""
+        sugestoes = [
+            Sugestao("produto", produto.id, produto.nome)
+            for produto in catalogo.produtos.values()
+            if disponibilidade.produto_disponivel(produto.id)
+        ]
+        sugestoes += [
+            Sugestao("ingrediente", ingrediente.id, ingrediente.nome)
+            for ingrediente in catalogo.ingredientes.values()
+            if ingrediente.disponivel
+        ]
+        # Produtos antes de ingredientes; nomes curtos primeiro (mais próximos do digitado)
+        sugestoes.sort(key=lambda s: (_ORDEM_TIPOS[s.tipo], len(s.nome), dobrar(s.nome), s.id))
+        return sugestoes
+
+    def _no(self, prefixo: str) -> Optional[_No]:
+        """Nó da trie do prefixo, se existir"""
+        no = self.raiz
+        for letra in prefixo:
+            no = no.filhos.get(letra)
+            if no is None:
+                return None
+        return no
+
+    def _com_prefixo(self, prefixo: str) -> List[str]:
+        """Palavras do vocabulário que começam com o prefixo"""
+        inicio = bisect.bisect_left(self.vocabulario, prefixo)
+        fim = bisect.bisect_left(self.vocabulario, prefixo + "\uffff")
+        return self.vocabulario[inicio:fim]
+
+    def _corrigidas(self, palavra: str) -> List[Tuple[int, str]]:
+        """Palavras do vocabulário iguais ou próximas da digitada"""
+        if palavra in self.por_palavra:
+            return [(0, palavra)]
+        correcoes = self._correcoes.get(palavra)
+        if correcoes is None:
+            correcoes = self.arvore.buscar(palavra, tolerancia(palavra))
+            if len(self._correcoes) >= CORRECOES_EM_CACHE:
+                self._correcoes.clear()
+            self._correcoes[palavra] = correcoes
+        return correcoes
+
+    def sugerir(self, texto: str, limite: int) -> List[Sugestao]:
+        """Sugestões para o texto digitado"""
+        palavras = tokenizar(texto)
+        if not palavras:
+            return []
+        *completas, ultima = palavras
+
+        if not completas:
+            escolhidas: Dict[int, None] = {}
+            no = self._no(ultima)
+            if no is not None:
+                escolhidas.update(dict.fromkeys((*no.iniciais, *no.internas)))
+            # Poucos resultados por prefixo: tentar corrigir a palavra
+            if len(escolhidas) < limite:
+                for _, palavra in self._corrigidas(ultima):
+                    escolhidas.update(dict.fromkeys(self.por_palavra[palavra]))
+                    if len(escolhidas) >= limite:
+                        break
+            return [self.sugestoes[indice] for indice in list(escolhidas)[:limite]]
+
+        # Várias palavras: as completas (ou suas correções) precisam aparecer
+        # no nome e a última casa por prefixo (ou correção). Cada grupo é a
+        # lista de conjuntos de sugestões das palavras aceitas naquela posição.
+        grupos = [[self.conjuntos[p] for _, p in self._corrigidas(palavra)] for palavra in completas]
+        ultimas = set(self._com_prefixo(ultima)) | {p for _, p in self._corrigidas(ultima)}
+        grupos.append([self.conjuntos[p] for p in ultimas])
+        if not all(grupos):
+            return []
+
+        # Percorre o grupo com menos sugestões e testa a presença nos demais
+        grupos.sort(key=lambda grupo: sum(map(len, grupo)))
+        menor, *demais = grupos
+        candidatos = menor[0] if len(menor) == 1 else frozenset().union(*menor)
+        escolhidas = heapq.nsmallest(limite, (
+            indice for indice in candidatos
+            if all(any(indice in conjunto for conjunto in grupo) for grupo in demais)
+        ))
+        return [self.sugestoes[indice] for indice in escolhidas]
+
+
+_indice: Optional[IndiceSugestoes] = None
+_lock_construcao = threading.Lock()
+
+
+def sugerir(db: Session, texto: str, limite: int = 10) -> List[Sugestao]:
+    """
+    Sugestões de produtos e ingredientes para o autocomplete
+
+    Args:
+        db: Sessão usada só para obter o snapshot do catálogo
+        texto: O que o usuário já digitou
+        limite: Máximo de sugestões
+
+    Returns:
+        Lista de Sugestao, da mais à menos relevante
+    """
+    global _indice
+
+    catalogo = obter_catalogo(db)
+    indice = _indice
+    if indice is None or indice.versao != catalogo.versao:
+        with _lock_construcao:
+            indice = _indice
+            if indice is None or indice.versao != catalogo.versao:
+                indice = IndiceSugestoes(catalogo)
+                if _indice is None or indice.versao >= _indice.versao:
+                    _indice = indice
+    return indice.sugerir(texto, limite)
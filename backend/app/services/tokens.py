@@ -0,0 +1,94 @@
+"""Decodificação de tokens JWT com memoização dos tokens já verificados
+
+O frontend repete o mesmo bearer token em cada requisição (polling de
+status de pedido), e a verificação refaz a checagem da assinatura e o
+parse do JSON toda vez (bem mais cara com RS256/ES256). Aqui as claims de
+um token verificado ficam em um LRU limitado, indexado pelo SHA-256 do
+token bruto, até o exp do próprio token; repetições retornam as claims
+sem verificar de novo.
+
+Só tokens válidos entram no memo (erros sempre passam pela verificação),
+e tokens sem exp não são memoizados. Um token vencido deixa de ser
+aceito no mesmo instante em que a verificação passaria a recusá-lo.
+
+Cada entrada guarda a geração do chaveiro que a verificou: depois de
+chaveiro.recarregar() (chave removida do diretório, por exemplo) as
+entradas antigas são ignoradas e o token é verificado de novo.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from app.config import TOKENS_MEMO_MAX_ENTRADAS
+from app.services.chaves import chaveiro
+
+
+class MemoTokens:
+    """Claims de tokens verificados, por hash do token, até o exp ou a recarga das chaves (LRU)"""
+
+    def __init__(self, max_entradas: int):
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        # hash do token -> (claims, exp, geração do chaveiro)
+        self._entradas: "OrderedDict[bytes, Tuple[Mapping, float, int]]" = OrderedDict()
+
+    def decodificar(self, token: str) -> Mapping:
+        """
+        Verifica o token (ou reaproveita uma verificação anterior)
+
+        Args:
+            token: JWT bruto
+
+        Returns:
+            Claims verificadas (somente leitura)
+
+        Raises:
+            JWTError: Token inválido, com assinatura incorreta ou vencido
+        """
+        chave = hashlib.sha256(token.encode()).digest()
+        # Lida antes da verificação: uma recarga durante ela invalida a entrada
+        geracao = chaveiro.geracao
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                if entrada[1] > time.time() and entrada[2] == geracao:
+                    self._entradas.move_to_end(chave)
+                    return entrada[0]
+                del self._entradas[chave]
+
+        claims = MappingProxyType(chaveiro.verificar(token))
+        expira_em = _expiracao(claims)
+        if expira_em is not None and self.max_entradas > 0:
+            with self._lock:
+                self._entradas[chave] = (claims, expira_em, geracao)
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+        return claims
+
+    def limpar(self) -> None:
+        """Descarta todos os tokens memoizados"""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+def _expiracao(claims: Mapping) -> Optional[float]:
+    """Claim exp como timestamp (None se ausente ou inválida)"""
+    try:
+        return float(claims["exp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+memo_tokens = MemoTokens(TOKENS_MEMO_MAX_ENTRADAS)
+
+
+def decodificar_token(token: str) -> Mapping:
+    """Verifica o token usando o memo do processo (veja MemoTokens.decodificar)"""
+    return memo_tokens.decodificar(token)
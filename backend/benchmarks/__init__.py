@@ -0,0 +1 @@
+"""Benchmarks de desempenho da API (executar a partir de backend/)"""
@@ -0,0 +1,184 @@
+"""
+Benchmark: rotas async def com Session síncrona x AsyncSession
+
+Sobe duas aplicações mínimas sobre o mesmo banco SQLite populado:
+
+- antes: rota async def chamando a Session síncrona (bloqueia o event loop)
+- depois: rota async def usando AsyncSession (aiosqlite)
+
+Cada uma recebe requisições concorrentes de uma rota com consulta pesada
+enquanto uma sonda chama, em ritmo fixo, uma rota leve sem banco. Com a
+Session síncrona a sonda fica presa atrás das consultas; com AsyncSession
+ela é atendida enquanto as consultas aguardam o banco.
+
+Os dois pools são dimensionados para a concorrência: no padrão antigo,
+esgotar o pool trava o processo, porque o checkout bloqueia o event loop
+e as conexões só voltam ao pool quando o get_db (executado no threadpool)
+consegue terminar, o que depende do próprio loop.
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_async_db --requisicoes 400 --concorrencia 50
+"""
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base, url_assincrona
+from app.models.models import Pedido, Usuario
+
+
+def popular_banco(url: str, total_pedidos: int) -> None:
+    """Cria o schema e insere pedidos para a consulta pesada"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        usuario = Usuario(nome="Benchmark", email="bench@exemplo.com", senha="x")
+        db.add(usuario)
+        db.flush()
+        status_possiveis = ["PENDENTE", "EM_PREPARO", "PRONTO", "ENTREGUE", "CANCELADO"]
+        db.execute(insert(Pedido), [
+            {
+                "usuario_id": usuario.id,
+                "status": status_possiveis[i % len(status_possiveis)],
+                "preco_total": 10.0 + i % 90
+            }
+            for i in range(total_pedidos)
+        ])
+        db.commit()
+    engine.dispose()
+
+
+def consulta_pesada():
+    """Agregação por status sobre toda a tabela de pedidos"""
+    return (
+        select(Pedido.status, func.count(Pedido.id), func.sum(Pedido.preco_total))
+        .group_by(Pedido.status)
+    )
+
+
+def app_sincrona(url: str, conexoes: int) -> FastAPI:
+    """Padrão anterior: async def + Session síncrona"""
+    engine = create_engine(url, connect_args={"check_same_thread": False}, pool_size=conexoes)
+    fabrica = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    def get_db():
+        db = fabrica()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/pesada")
+    async def pesada(db: Session = Depends(get_db)):
+        return [list(row) for row in db.execute(consulta_pesada())]
+
+    @app.get("/leve")
+    async def leve():
+        return {"ok": True}
+
+    return app
+
+
+def app_assincrona(url: str, conexoes: int) -> FastAPI:
+    """Padrão atual: async def + AsyncSession"""
+    engine = create_async_engine(url_assincrona(url), pool_size=conexoes)
+    fabrica = async_sessionmaker(bind=engine, expire_on_commit=False)
+    app = FastAPI()
+
+    async def get_async_db():
+        async with fabrica() as db:
+            yield db
+
+    @app.get("/pesada")
+    async def pesada(db: AsyncSession = Depends(get_async_db)):
+        return [list(row) for row in await db.execute(consulta_pesada())]
+
+    @app.get("/leve")
+    async def leve():
+        return {"ok": True}
+
+    return app
+
+
+async def medir(app: FastAPI, requisicoes: int, concorrencia: int, intervalo_ms: float) -> dict:
+    """
+    Dispara consultas pesadas concorrentes e sonda a rota leve em ritmo fixo
+
+    A latência da sonda é medida a partir do instante em que ela deveria
+    ter sido disparada: se o event loop estiver bloqueado, a espera entra
+    na conta, como aconteceria para um cliente externo.
+    """
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias_leve = []
+    carga_ativa = True
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+        await cliente.get("/pesada")  # aquecimento do pool e do schema
+
+        async def disparar():
+            async with semaforo:
+                resposta = await cliente.get("/pesada")
+                resposta.raise_for_status()
+
+        async def sondar():
+            agendado = time.perf_counter()
+            while carga_ativa:
+                await asyncio.sleep(max(0.0, agendado - time.perf_counter()))
+                resposta = await cliente.get("/leve")
+                resposta.raise_for_status()
+                concluido = time.perf_counter()
+                latencias_leve.append(concluido - agendado)
+                agendado = concluido + intervalo_ms / 1000
+
+        sonda = asyncio.create_task(sondar())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(disparar() for _ in range(requisicoes)))
+        duracao = time.perf_counter() - inicio
+        carga_ativa = False
+        await sonda
+
+    latencias_leve.sort()
+    return {
+        "req_s": requisicoes / duracao,
+        "leve_p50_ms": statistics.median(latencias_leve) * 1000,
+        "leve_p99_ms": latencias_leve[math.ceil(len(latencias_leve) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=20000, help="Pedidos no banco")
+    parser.add_argument("--requisicoes", type=int, default=400, help="Total de requisições por cenário")
+    parser.add_argument("--concorrencia", type=int, default=50, help="Requisições simultâneas")
+    parser.add_argument("--intervalo-ms", type=float, default=5.0, help="Intervalo entre sondas da rota leve")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        url = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+        popular_banco(url, args.pedidos)
+
+        print(f"{args.requisicoes} requisições, concorrência {args.concorrencia}, {args.pedidos} pedidos")
+        print(f"{'cenário':<22}{'pesada req/s':>14}{'leve p50 (ms)':>16}{'leve p99 (ms)':>16}")
+        for nome, fabrica in (("Session síncrona", app_sincrona), ("AsyncSession", app_assincrona)):
+            resultado = asyncio.run(medir(
+                fabrica(url, args.concorrencia), args.requisicoes, args.concorrencia, args.intervalo_ms
+            ))
+            print(
+                f"{nome:<22}{resultado['req_s']:>14.1f}"
+                f"{resultado['leve_p50_ms']:>16.2f}{resultado['leve_p99_ms']:>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark: busca de produtos com ILIKE x índice invertido em memória
+
+Popula um SQLite temporário com N produtos (nomes, descrições, categorias
+e ingredientes sintéticos) e mede, para um conjunto fixo de consultas:
+
+- ilike: filtro ILIKE em nome/descricao (comportamento anterior), só os IDs
+- ranking: pontuação no índice, sem o cache de consultas recentes
+- indice: IndiceBusca.buscar com o cache aquecido (consulta repetida)
+- incremental: tempo para reindexar após renomear um produto e buscar
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_busca --produtos 10000
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.models import Categoria, Ingrediente, Produto, ProdutoIngrediente
+from app.services.busca import IndiceBusca, tokenizar
+from app.services.catalogo import obter_catalogo, observar_alteracoes
+
+SABORES = [
+    "Calabresa", "Margherita", "Portuguesa", "Frango", "Catupiry", "Quatro Queijos",
+    "Pepperoni", "Atum", "Palmito", "Bacon", "Napolitana", "Toscana", "Milho",
+    "Brócolis", "Lombo", "Camarão", "Vegetariana", "Chocolate", "Banana", "Romeu e Julieta",
+]
+INGREDIENTES = [
+    "Mussarela", "Tomate", "Manjericão", "Cebola", "Azeitona", "Orégano", "Presunto",
+    "Ovos", "Provolone", "Gorgonzola", "Parmesão", "Champignon", "Pimentão", "Alho",
+]
+CATEGORIAS = ["Pizzas Tradicionais", "Pizzas Especiais", "Pizzas Doces", "Bebidas", "Sobremesas"]
+CONSULTAS = ["calabresa", "quatro queijos", "manjericao", "pizzas doces", "camarões", "calab", "xyzabc"]
+
+
+def popular(url: str, produtos: int) -> None:
+    """Cria o schema e insere o catálogo sintético"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    aleatorio = random.Random(42)
+    with engine.begin() as conexao:
+        conexao.execute(insert(Categoria), [
+            {"id": i + 1, "nome": nome, "ordem_exibicao": i, "ativa": True} for i, nome in enumerate(CATEGORIAS)
+        ])
+        conexao.execute(insert(Ingrediente), [
+            {"id": i + 1, "nome": nome, "preco_adicional": 2.0, "disponivel": True}
+            for i, nome in enumerate(INGREDIENTES)
+        ])
+        conexao.execute(insert(Produto), [
+            {
+                "id": i + 1,
+                "categoria_id": aleatorio.randint(1, len(CATEGORIAS)),
+                "nome": f"Pizza {aleatorio.choice(SABORES)} {i}",
+                "descricao": f"{aleatorio.choice(SABORES)} com {aleatorio.choice(INGREDIENTES).lower()}",
+                "disponivel": aleatorio.random() > 0.1,
+            }
+            for i in range(produtos)
+        ])
+        conexao.execute(insert(ProdutoIngrediente), [
+            {"produto_id": i + 1, "ingrediente_id": ingrediente_id, "obrigatorio": False}
+            for i in range(produtos)
+            for ingrediente_id in aleatorio.sample(range(1, len(INGREDIENTES) + 1), 3)
+        ])
+    engine.dispose()
+
+
+def percentis(amostras: list) -> tuple:
+    """p50 e p99 (nearest rank) em microssegundos"""
+    amostras = sorted(amostras)
+    p99 = amostras[math.ceil(len(amostras) * 0.99) - 1]
+    return statistics.median(amostras) * 1e6, p99 * 1e6
+
+
+def medir(funcao, repeticoes: int) -> tuple:
+    """Executa funcao repetidamente e retorna os percentis"""
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append(time.perf_counter() - inicio)
+    return percentis(amostras)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=10000, help="Quantidade de produtos")
+    parser.add_argument("--repeticoes", type=int, default=200, help="Execuções por consulta")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    popular(url, args.produtos)
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    db = sessionmaker(bind=engine)()
+
+    indice = IndiceBusca()
+    observar_alteracoes(indice.marcar_alteracoes)
+    inicio = time.perf_counter()
+    indice.buscar(db, "aquecimento")
+    print(f"{args.produtos} produtos; indexação completa em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    print(
+        f"{'consulta':<18}{'resultados':>11}{'ilike p50 (us)':>16}{'ranking p50 (us)':>18}"
+        f"{'ranking p99 (us)':>18}{'indice p50 (us)':>17}"
+    )
+    for consulta in CONSULTAS:
+        filtro = select(Produto.id).where(
+            Produto.disponivel == True,
+            Produto.nome.ilike(f"%{consulta}%") | Produto.descricao.ilike(f"%{consulta}%")
+        )
+        ilike_p50, _ = medir(lambda: db.execute(filtro).all(), max(args.repeticoes // 10, 5))
+        palavras = tokenizar(consulta)
+        ranking_p50, ranking_p99 = medir(lambda: indice._ranquear(palavras, 50), args.repeticoes)
+        resultados = len(indice.buscar(db, consulta, 50))
+        indice_p50, _ = medir(lambda: indice.buscar(db, consulta, 50), args.repeticoes)
+        print(
+            f"{consulta:<18}{resultados:>11}{ilike_p50:>16.0f}{ranking_p50:>18.0f}"
+            f"{ranking_p99:>18.0f}{indice_p50:>17.0f}"
+        )
+
+    def renomear():
+        # O commit dispara o observador do catálogo, que marca só este produto
+        produto = db.get(Produto, random.randint(1, args.produtos))
+        produto.nome = f"Pizza Renomeada {time.perf_counter_ns()}"
+        db.commit()
+        # O snapshot do catálogo é reconstruído por qualquer leitor após uma escrita;
+        # medido à parte para isolar o custo do índice
+        inicio = time.perf_counter()
+        obter_catalogo(db)
+        snapshot = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        indice.buscar(db, "renomeada")
+        return snapshot, time.perf_counter() - inicio
+
+    snapshots, reindexacoes = zip(*(renomear() for _ in range(20)))
+    p50, p99 = percentis(list(reindexacoes))
+    print(f"reindexação de 1 produto + busca: p50 {p50:.0f} us, p99 {p99:.0f} us")
+    print(f"(snapshot do catálogo, compartilhado com /cardapio: p50 {percentis(list(snapshots))[0] / 1000:.0f} ms)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
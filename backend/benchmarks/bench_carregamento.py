@@ -0,0 +1,157 @@
+"""
+Benchmark: joinedload encadeado x carregamento por nível (selectin)
+
+Popula um SQLite temporário com N produtos, cada um com V variações e I
+ingredientes padrão, e compara os carregadores antigos (joinedload de
+variações e ingredientes na mesma query) com app.services.carregamento
+em três cenários:
+
+- cardapio: categorias ativas com o grafo de produtos (GET /cardapio/)
+- produtos: todos os produtos (GET /produtos/)
+- categoria: produtos de uma categoria (GET /cardapio/categorias/{id}/produtos)
+
+Para cada um: consultas emitidas, linhas devolvidas pelo banco e tempo
+(mediana) até ter os objetos ORM prontos.
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_carregamento --produtos 5000 --variacoes 4 --ingredientes 12
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.database import Base
+from app.models.models import Categoria, Ingrediente, Produto, ProdutoIngrediente, ProdutoVariacao
+from app.services.carregamento import consultar_categorias, consultar_produtos
+
+CATEGORIAS = 10
+INGREDIENTES = 40
+TAMANHOS = ["BROTO", "PEQUENA", "MEDIA", "GRANDE", "FAMILIA", "GIGANTE"]
+
+
+def popular(url: str, produtos: int, variacoes: int, ingredientes: int) -> None:
+    """Cria o schema e insere o catálogo sintético"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    aleatorio = random.Random(42)
+    with engine.begin() as conexao:
+        conexao.execute(insert(Categoria), [
+            {"id": i + 1, "nome": f"Categoria {i}", "ordem_exibicao": i, "ativa": True} for i in range(CATEGORIAS)
+        ])
+        conexao.execute(insert(Ingrediente), [
+            {"id": i + 1, "nome": f"Ingrediente {i}", "preco_adicional": 2.0, "disponivel": True}
+            for i in range(INGREDIENTES)
+        ])
+        conexao.execute(insert(Produto), [
+            {
+                "id": i + 1,
+                "categoria_id": i % CATEGORIAS + 1,
+                "nome": f"Produto {i}",
+                "descricao": "Descrição de tamanho realista para o produto do cardápio " * 2,
+                "imagem_url": f"https://example.com/produtos/{i}.jpg",
+                "disponivel": True,
+            }
+            for i in range(produtos)
+        ])
+        conexao.execute(insert(ProdutoVariacao), [
+            {"produto_id": i + 1, "tamanho": TAMANHOS[v], "preco": 30.0 + v * 10, "disponivel": True}
+            for i in range(produtos)
+            for v in range(variacoes)
+        ])
+        conexao.execute(insert(ProdutoIngrediente), [
+            {"produto_id": i + 1, "ingrediente_id": ingrediente_id, "obrigatorio": False}
+            for i in range(produtos)
+            for ingrediente_id in aleatorio.sample(range(1, INGREDIENTES + 1), ingredientes)
+        ])
+    engine.dispose()
+
+
+def cenarios_antigos(db):
+    """Carregadores como estavam nas rotas (joinedload encadeado)"""
+    def produtos():
+        return db.query(Produto)\
+            .options(joinedload(Produto.variacoes))\
+            .options(joinedload(Produto.ingredientes).joinedload(ProdutoIngrediente.ingrediente))
+
+    return {
+        "cardapio": lambda: db.query(Categoria)
+            .options(joinedload(Categoria.produtos).joinedload(Produto.variacoes))
+            .options(
+                joinedload(Categoria.produtos)
+                .joinedload(Produto.ingredientes)
+                .joinedload(ProdutoIngrediente.ingrediente)
+            )
+            .filter(Categoria.ativa == True).all(),
+        "produtos": lambda: produtos().all(),
+        "categoria": lambda: produtos().filter(Produto.categoria_id == 1).all(),
+    }
+
+
+def cenarios_novos(db):
+    """Carregadores de app.services.carregamento"""
+    return {
+        "cardapio": lambda: consultar_categorias(db).filter(Categoria.ativa == True).all(),
+        "produtos": lambda: consultar_produtos(db).all(),
+        "categoria": lambda: consultar_produtos(db).filter(Produto.categoria_id == 1).all(),
+    }
+
+
+def medir(engine, fabrica, cenarios, nome: str, repeticoes: int) -> dict:
+    """Executa o cenário em sessões novas e mede consultas, linhas e tempo"""
+    tempos = []
+    statements = []
+    for repeticao in range(repeticoes):
+        db = fabrica()
+        capturar = lambda conn, cursor, sql, params, contexto, many: statements.append((sql, params))
+        if repeticao == 0:
+            event.listen(engine, "before_cursor_execute", capturar)
+        inicio = time.perf_counter()
+        cenarios(db)[nome]()
+        tempos.append(time.perf_counter() - inicio)
+        if repeticao == 0:
+            event.remove(engine, "before_cursor_execute", capturar)
+        db.close()
+
+    # Reexecuta as consultas capturadas para contar as linhas devolvidas
+    conexao = engine.raw_connection()
+    try:
+        cursor = conexao.cursor()
+        linhas = sum(len(cursor.execute(sql, params).fetchall()) for sql, params in statements)
+    finally:
+        conexao.close()
+    return {"consultas": len(statements), "linhas": linhas, "ms": statistics.median(tempos) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=5000, help="Quantidade de produtos")
+    parser.add_argument("--variacoes", type=int, default=4, help="Variações por produto")
+    parser.add_argument("--ingredientes", type=int, default=12, help="Ingredientes padrão por produto")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Execuções por cenário")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    popular(url, args.produtos, args.variacoes, args.ingredientes)
+    engine = create_engine(url)
+    fabrica = sessionmaker(bind=engine)
+
+    print(f"{args.produtos} produtos x {args.variacoes} variações x {args.ingredientes} ingredientes")
+    print(f"{'cenário':<11}{'carregador':<12}{'consultas':>10}{'linhas':>10}{'tempo (ms)':>12}")
+    for nome in ("cardapio", "produtos", "categoria"):
+        for rotulo, cenarios in (("joinedload", cenarios_antigos), ("selectin", cenarios_novos)):
+            resultado = medir(engine, fabrica, cenarios, nome, args.repeticoes)
+            print(
+                f"{nome:<11}{rotulo:<12}{resultado['consultas']:>10}"
+                f"{resultado['linhas']:>10}{resultado['ms']:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
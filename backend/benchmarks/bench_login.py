@@ -0,0 +1,123 @@
+"""
+Benchmark: tempestade de logins x latência de rotas não relacionadas
+
+Dispara verificações bcrypt concorrentes (como em POST /auth/login)
+enquanto uma sonda chama, em ritmo fixo, uma rota leve. Compara:
+
+- inline: bcrypt executado no event loop (comportamento anterior)
+- thread: ExecutorSenhas com pool de threads
+- processo: ExecutorSenhas com pool de processos
+
+A latência da sonda é medida a partir do instante em que ela deveria
+ter sido disparada, então o tempo com o loop bloqueado entra na conta.
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_login --logins 64 --concorrencia 16
+"""
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.exceptions import ServicoSobrecarregado
+from app.services.senhas import ExecutorSenhas, _verificar, bcrypt_context
+
+
+def criar_app(modo: str, trabalhadores: int, fila_maxima: int, senha_hash: str):
+    """Aplicação mínima com uma rota de login e uma rota leve"""
+    app = FastAPI()
+    executor = None if modo == "inline" else ExecutorSenhas(modo, trabalhadores, fila_maxima)
+
+    @app.post("/login")
+    async def login():
+        if executor is None:
+            ok = _verificar("senha123", senha_hash)
+        else:
+            try:
+                ok = await executor.executar(_verificar, "senha123", senha_hash)
+            except ServicoSobrecarregado:
+                return {"ok": False, "recusado": True}
+        return {"ok": ok, "recusado": False}
+
+    @app.get("/leve")
+    async def leve():
+        return {"ok": True}
+
+    return app, executor
+
+
+async def medir(app: FastAPI, logins: int, concorrencia: int, intervalo_ms: float) -> dict:
+    """Executa a tempestade de logins enquanto sonda a rota leve"""
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias_leve = []
+    recusados = 0
+    carga_ativa = True
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+        await cliente.post("/login")  # aquecimento (cria o pool)
+
+        async def logar():
+            nonlocal recusados
+            async with semaforo:
+                resposta = await cliente.post("/login")
+                resposta.raise_for_status()
+                recusados += resposta.json()["recusado"]
+
+        async def sondar():
+            agendado = time.perf_counter()
+            while carga_ativa:
+                await asyncio.sleep(max(0.0, agendado - time.perf_counter()))
+                resposta = await cliente.get("/leve")
+                resposta.raise_for_status()
+                concluido = time.perf_counter()
+                latencias_leve.append(concluido - agendado)
+                agendado = concluido + intervalo_ms / 1000
+
+        sonda = asyncio.create_task(sondar())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(logar() for _ in range(logins)))
+        duracao = time.perf_counter() - inicio
+        carga_ativa = False
+        await sonda
+
+    latencias_leve.sort()
+    return {
+        "logins_s": logins / duracao,
+        "recusados": recusados,
+        "leve_p50_ms": statistics.median(latencias_leve) * 1000,
+        "leve_p99_ms": latencias_leve[math.ceil(len(latencias_leve) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="Total de logins por cenário")
+    parser.add_argument("--concorrencia", type=int, default=16, help="Logins simultâneos")
+    parser.add_argument("--trabalhadores", type=int, default=os.cpu_count() or 2, help="Tamanho do pool")
+    parser.add_argument("--fila-maxima", type=int, default=64, help="Limite da fila do pool")
+    parser.add_argument("--intervalo-ms", type=float, default=5.0, help="Intervalo entre sondas da rota leve")
+    args = parser.parse_args()
+
+    senha_hash = bcrypt_context.hash("senha123")
+    print(f"{args.logins} logins, concorrência {args.concorrencia}, {args.trabalhadores} trabalhadores")
+    print(f"{'modo':<10}{'logins/s':>10}{'recusados':>11}{'leve p50 (ms)':>16}{'leve p99 (ms)':>16}")
+    for modo in ("inline", "thread", "processo"):
+        app, executor = criar_app(modo, args.trabalhadores, args.fila_maxima, senha_hash)
+        try:
+            resultado = asyncio.run(medir(app, args.logins, args.concorrencia, args.intervalo_ms))
+        finally:
+            if executor is not None:
+                executor.encerrar()
+        print(
+            f"{modo:<10}{resultado['logins_s']:>10.1f}{resultado['recusados']:>11}"
+            f"{resultado['leve_p50_ms']:>16.2f}{resultado['leve_p99_ms']:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
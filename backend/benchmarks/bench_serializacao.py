@@ -0,0 +1,128 @@
+"""
+Benchmark: serialização padrão do FastAPI x app.services.serializacao
+
+Reaproveita o catálogo sintético de bench_carregamento e, para cada
+listagem, compara o caminho anterior das rotas com o atual:
+
+- padrão: objetos ORM -> fastapi.routing.serialize_response (validação do
+  response_model + dicts JSON-compatíveis) -> JSONResponse (json.dumps)
+- novo: TypeAdapter pré-montado -> bytes direto do pydantic-core; nas
+  listagens planas (categorias, ingredientes) a consulta lê só as colunas
+  do schema, sem hidratar objetos ORM
+
+O tempo inclui a consulta (mesma sessão, identity map limpo a cada
+execução) e vai até os bytes do corpo prontos.
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_serializacao --produtos 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import Categoria, Ingrediente, Produto
+from app.schemas.schemas import CategoriaResponse, IngredienteResponse, ProdutoResponse
+from app.services.carregamento import consultar_produtos
+from app.services.serializacao import CATEGORIAS, INGREDIENTES, PRODUTOS, colunas, resposta_json
+from benchmarks.bench_carregamento import popular
+
+
+def campo_resposta(modelo):
+    """ModelField que o FastAPI monta para o response_model da rota"""
+    return APIRoute("/", lambda: None, response_model=modelo).response_field
+
+
+def cenarios(db) -> dict:
+    """Por listagem: (response_model, consulta antiga, consulta + serialização nova)"""
+    return {
+        "produtos": (
+            List[ProdutoResponse],
+            lambda: consultar_produtos(db).all(),
+            lambda: resposta_json(PRODUTOS, consultar_produtos(db).all()).body,
+        ),
+        "categoria": (
+            List[ProdutoResponse],
+            lambda: consultar_produtos(db).filter(Produto.categoria_id == 1).all(),
+            lambda: resposta_json(PRODUTOS, consultar_produtos(db).filter(Produto.categoria_id == 1).all()).body,
+        ),
+        "categorias": (
+            List[CategoriaResponse],
+            lambda: db.query(Categoria).order_by(Categoria.ordem_exibicao).all(),
+            lambda: resposta_json(CATEGORIAS, db.execute(
+                select(*colunas(Categoria, CategoriaResponse)).order_by(Categoria.ordem_exibicao)
+            ).all()).body,
+        ),
+        "ingredientes": (
+            List[IngredienteResponse],
+            lambda: db.query(Ingrediente).order_by(Ingrediente.nome).all(),
+            lambda: resposta_json(INGREDIENTES, db.execute(
+                select(*colunas(Ingrediente, IngredienteResponse)).order_by(Ingrediente.nome)
+            ).all()).body,
+        ),
+    }
+
+
+async def medir(db, nome: str, repeticoes: int) -> dict:
+    """Mediana (ms) dos dois caminhos e tamanho do corpo"""
+    modelo, consulta_antiga, caminho_novo = cenarios(db)[nome]
+    campo = campo_resposta(modelo)
+    tempos = {"padrão": [], "novo": []}
+    corpos = {}
+    for _ in range(repeticoes):
+        db.expunge_all()
+        inicio = time.perf_counter()
+        conteudo = await serialize_response(field=campo, response_content=consulta_antiga())
+        corpos["padrão"] = JSONResponse(conteudo).body
+        tempos["padrão"].append(time.perf_counter() - inicio)
+
+        db.expunge_all()
+        inicio = time.perf_counter()
+        corpos["novo"] = caminho_novo()
+        tempos["novo"].append(time.perf_counter() - inicio)
+
+    assert corpos["padrão"] == corpos["novo"], f"{nome}: corpos diferentes"
+    return {
+        "bytes": len(corpos["novo"]),
+        **{rotulo: statistics.median(valores) * 1000 for rotulo, valores in tempos.items()},
+    }
+
+
+async def executar(db, repeticoes: int) -> None:
+    print(f"{'listagem':<14}{'bytes':>10}{'padrão (ms)':>13}{'novo (ms)':>11}{'ganho':>8}")
+    for nome in ("produtos", "categoria", "categorias", "ingredientes"):
+        resultado = await medir(db, nome, repeticoes)
+        print(
+            f"{nome:<14}{resultado['bytes']:>10}{resultado['padrão']:>13.2f}"
+            f"{resultado['novo']:>11.2f}{resultado['padrão'] / resultado['novo']:>7.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=2000, help="Quantidade de produtos")
+    parser.add_argument("--variacoes", type=int, default=4, help="Variações por produto")
+    parser.add_argument("--ingredientes", type=int, default=8, help="Ingredientes padrão por produto")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Execuções por listagem")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    popular(url, args.produtos, args.variacoes, args.ingredientes)
+    db = sessionmaker(bind=create_engine(url))()
+
+    print(f"{args.produtos} produtos x {args.variacoes} variações x {args.ingredientes} ingredientes")
+    asyncio.run(executar(db, args.repeticoes))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
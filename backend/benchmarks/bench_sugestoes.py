@@ -0,0 +1,58 @@
+"""
+Benchmark: autocomplete (/cardapio/sugestoes) sobre um catálogo grande
+
+Reaproveita o catálogo sintético de bench_busca, monta o índice de
+sugestões e mede a latência por tecla digitada, incluindo prefixos curtos,
+consultas com várias palavras e palavras com erros de digitação.
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_sugestoes --produtos 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.services.catalogo import obter_catalogo
+from app.services.sugestoes import IndiceSugestoes
+from benchmarks.bench_busca import medir, popular
+
+CONSULTAS = ["p", "pi", "cal", "calabresa", "quatro q", "pizza marg", "calabreza", "musarela", "pizsa toscna"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=10000, help="Quantidade de produtos")
+    parser.add_argument("--repeticoes", type=int, default=1000, help="Execuções por consulta")
+    parser.add_argument("--limite", type=int, default=10, help="Sugestões por consulta")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(diretorio, 'bench.db')}"
+    popular(url, args.produtos)
+    db = sessionmaker(bind=create_engine(url))()
+    catalogo = obter_catalogo(db)
+
+    inicio = time.perf_counter()
+    indice = IndiceSugestoes(catalogo)
+    print(
+        f"{args.produtos} produtos, {len(indice.por_palavra)} palavras; "
+        f"índice montado em {(time.perf_counter() - inicio) * 1000:.0f} ms"
+    )
+
+    # "1ª" inclui a busca na BK-tree; as repetições usam as correções memorizadas
+    print(f"{'consulta':<16}{'sugestões':>10}{'1ª (us)':>10}{'p50 (us)':>10}{'p99 (us)':>10}")
+    for consulta in CONSULTAS:
+        inicio = time.perf_counter()
+        sugestoes = len(indice.sugerir(consulta, args.limite))
+        primeira = (time.perf_counter() - inicio) * 1e6
+        p50, p99 = medir(lambda: indice.sugerir(consulta, args.limite), args.repeticoes)
+        print(f"{consulta:<16}{sugestoes:>10}{primeira:>10.1f}{p50:>10.1f}{p99:>10.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: verificação do JWT a cada requisição x memo de tokens verificados
+
+Simula o polling autenticado: um conjunto de tokens distintos (um por
+cliente) é decodificado repetidamente por várias threads. Para cada
+algoritmo (HS256 com segredo; RS256 e ES256 com chaves temporárias em
+app.services.chaves.Chaveiro) compara:
+
+- assinar: tokens emitidos por segundo (login/refresh)
+- decode: verificação da assinatura em toda chamada (comportamento
+  anterior ao memo, ou primeira requisição de cada token)
+- memo: app.services.tokens.MemoTokens
+
+Execute a partir de backend/:
+    python -m benchmarks.bench_tokens --tokens 500 --chamadas 200000 --threads 4
+    python -m benchmarks.bench_tokens --algoritmos RS256 ES256
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from app.services import tokens
+from app.services.chaves import Chaveiro, gerar_chave
+from app.services.tokens import MemoTokens
+
+ALGORITMOS = ("HS256", "RS256", "ES256")
+
+
+def criar_chaveiro(algoritmo: str, diretorio: str) -> Chaveiro:
+    """Chaveiro do algoritmo, com chave temporária para RS*/ES*"""
+    if algoritmo.startswith("HS"):
+        return Chaveiro(algoritmo, "segredo-do-benchmark")
+    gerar_chave(f"{diretorio}/{algoritmo}", algoritmo, "bench")
+    return Chaveiro(algoritmo, diretorio=f"{diretorio}/{algoritmo}")
+
+
+def gerar_claims(quantidade: int) -> list:
+    """Claims de acesso como os emitidos no login"""
+    expiracao = int(time.time()) + 1800
+    return [{"sub": str(i), "adm": False, "atv": True, "ver": 0, "exp": expiracao} for i in range(quantidade)]
+
+
+def medir(decodificar, tokens: list, chamadas: int, threads: int) -> float:
+    """Chamadas por segundo com `threads` threads dividindo as chamadas"""
+    por_thread = chamadas // threads
+    sequencias = [random.Random(i).choices(tokens, k=por_thread) for i in range(threads)]
+    barreira = threading.Barrier(threads + 1)
+
+    def trabalhar(sequencia):
+        barreira.wait()
+        for token in sequencia:
+            decodificar(token)
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(s,)) for s in sequencias]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    return por_thread * threads / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=500, help="Tokens distintos (clientes)")
+    parser.add_argument("--chamadas", type=int, default=200000, help="Decodificações no total")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--max-entradas", type=int, default=10000, help="Limite do memo")
+    parser.add_argument("--algoritmos", nargs="+", choices=ALGORITMOS, default=list(ALGORITMOS))
+    args = parser.parse_args()
+
+    claims = gerar_claims(args.tokens)
+
+    print(f"{args.tokens} tokens, {args.threads} threads, memo com até {args.max_entradas} entradas")
+    print(f"{'algoritmo':<10}{'assinar/s':>12}{'decode/s':>12}{'memo/s':>12}{'ganho':>8}{'tamanho':>10}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for algoritmo in args.algoritmos:
+            chaveiro = criar_chaveiro(algoritmo, diretorio)
+            vazao_assinar = medir(chaveiro.assinar, claims, len(claims), 1)
+            emitidos = [chaveiro.assinar(c) for c in claims]
+
+            # A verificação direta é lenta (sobretudo com RSA): uma fração das chamadas basta
+            vazao_decode = medir(chaveiro.verificar, emitidos, max(args.chamadas // 20, args.threads), args.threads)
+            memo = MemoTokens(args.max_entradas)
+            with patch.object(tokens, "chaveiro", chaveiro):
+                vazao_memo = medir(memo.decodificar, emitidos, args.chamadas, args.threads)
+
+            print(
+                f"{algoritmo:<10}{vazao_assinar:>12,.0f}{vazao_decode:>12,.0f}{vazao_memo:>12,.0f}"
+                f"{vazao_memo / vazao_decode:>7.1f}x{len(emitidos[0]):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
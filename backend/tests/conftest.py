@@ -1,12 +1,20 @@
 """Configurações e fixtures globais para os testes"""
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
+from app.services.catalogo import invalidar_catalogo
+from app.services.identidade import cache_usuarios, mapa_revogacao
+from app.services.tokens import memo_tokens
+from app.services import metricas
 from app.models.models import (
     Usuario, Produto, Pedido, ItemPedido,
     Categoria, Ingrediente, ProdutoVariacao, ProdutoIngrediente
@@ -14,22 +22,44 @@ from app.models.models import (
 import bcrypt
 
 
-# Database de teste em memória
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Database de teste em arquivo temporário: as sessões síncronas (fixtures)
+# e assíncronas (rotas) precisam enxergar o mesmo banco
+_arquivo_banco = os.path.join(tempfile.mkdtemp(prefix="pizzaria-testes-"), "teste.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{_arquivo_banco}"
+SQLALCHEMY_ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{_arquivo_banco}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+)
+
+# NullPool: o TestClient roda cada requisição em um event loop próprio, então
+# conexões aiosqlite não podem ser reaproveitadas entre requisições
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=NullPool,
 )
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 
 @pytest.fixture(scope="function")
 def db():
     """Fixture que cria um banco de dados limpo para cada teste"""
     Base.metadata.create_all(bind=engine)
+    # Estado em memória não pode sobreviver entre testes
+    invalidar_catalogo()
+    cache_usuarios.limpar()
+    mapa_revogacao.limpar()
+    memo_tokens.limpar()
+    metricas.reiniciar()
     db = TestingSessionLocal()
     try:
         yield db
@@ -47,7 +77,12 @@ def client(db):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as sessao:
+            yield sessao
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -1,4 +1,6 @@
 """Testes de integração para o router de cardápio"""
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import status
 
@@ -57,6 +59,48 @@ class TestCardapioCompleto:
             for produto in categoria["produtos"]:
                 assert produto["disponivel"] is True
 
+    def test_cardapio_etag_retorna_304(self, client, cardapio_completo):
+        """If-None-Match com o ETag atual deve retornar 304 sem corpo"""
+        response = client.get("/cardapio/")
+        etag = response.headers["etag"]
+        assert etag.startswith('"')
+
+        response = client.get("/cardapio/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_cardapio_gzip(self, client, cardapio_completo):
+        """Clientes que aceitam gzip recebem os bytes comprimidos"""
+        import gzip
+        import json
+
+        sem_gzip = client.get("/cardapio/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in sem_gzip.headers
+
+        response = client.get("/cardapio/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        # O cliente HTTP descomprime de forma transparente
+        assert response.json() == sem_gzip.json()
+        assert response.headers["etag"] != sem_gzip.headers["etag"]
+
+    def test_cardapio_reconstruido_apos_escrita(self, client, db, cardapio_completo, token_admin):
+        """Um commit no catálogo deve gerar novos bytes e novo ETag"""
+        antes = client.get("/cardapio/")
+        produto_id = antes.json()["categorias"][0]["produtos"][0]["id"]
+
+        client.patch(
+            f"/produtos/{produto_id}/disponibilidade",
+            headers={"Authorization": f"Bearer {token_admin}"}
+        )
+
+        depois = client.get("/cardapio/", headers={"If-None-Match": antes.headers["etag"]})
+        assert depois.status_code == status.HTTP_200_OK
+        assert depois.headers["etag"] != antes.headers["etag"]
+        ids = [p["id"] for c in depois.json()["categorias"] for p in c["produtos"]]
+        assert produto_id not in ids
+
     def test_cardapio_produtos_com_variacoes(self, client, cardapio_completo):
         """Produtos no cardápio devem incluir variações"""
         response = client.get("/cardapio/")
@@ -189,3 +233,158 @@ class TestBuscaProdutos:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data == []
+
+    def test_buscar_ignora_acentos_e_plural(self, client, cardapio_completo):
+        """Busca deve ignorar acentos e plurais simples"""
+        response = client.get("/cardapio/buscar?termo=Calabrésas")
+
+        assert response.status_code == status.HTTP_200_OK
+        nomes = [produto["nome"] for produto in response.json()]
+        assert nomes == ["Pizza Calabresa"]
+
+    def test_buscar_por_ingrediente_e_prefixo(self, client, cardapio_completo):
+        """Busca deve considerar ingredientes e casar a última palavra por prefixo"""
+        response = client.get("/cardapio/buscar?termo=mussa")
+
+        assert response.status_code == status.HTTP_200_OK
+        nomes = [produto["nome"] for produto in response.json()]
+        assert nomes == ["Pizza Calabresa"]
+
+    def test_buscar_reflete_alteracao_de_produto(self, client, db, cardapio_completo):
+        """Busca deve refletir produtos renomeados após o commit"""
+        assert client.get("/cardapio/buscar?termo=Portuguesa").json() != []
+
+        produto = cardapio_completo["produtos"][1]
+        produto.nome = "Pizza Lusitana"
+        db.commit()
+
+        assert client.get("/cardapio/buscar?termo=Portuguesa").json() == []
+        nomes = [p["nome"] for p in client.get("/cardapio/buscar?termo=lusitana").json()]
+        assert nomes == ["Pizza Lusitana"]
+
+
+class TestSugestoes:
+    """Testes do autocomplete do cardápio"""
+
+    def test_sugestoes_por_prefixo(self, client, cardapio_completo):
+        """Deve sugerir produtos e ingredientes a partir de 1 caractere"""
+        response = client.get("/cardapio/sugestoes?termo=p")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert {"tipo": "produto", "id": cardapio_completo["produtos"][0].id, "nome": "Pizza Calabresa"} in data
+        assert all(set(item) == {"tipo", "id", "nome"} for item in data)
+
+    def test_sugestoes_com_erro_de_digitacao(self, client, cardapio_completo):
+        """Deve tolerar erros de digitação"""
+        response = client.get("/cardapio/sugestoes?termo=Mussarella")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["nome"] for item in response.json()] == ["Mussarela"]
+
+    def test_sugestoes_limite(self, client, cardapio_completo):
+        """Deve respeitar o limite e validar o máximo"""
+        response = client.get("/cardapio/sugestoes?termo=pizza&limite=1")
+        assert len(response.json()) == 1
+
+        response = client.get("/cardapio/sugestoes?termo=pizza&limite=100")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestMudancas:
+    """Testes da sincronização incremental do cardápio"""
+
+    @pytest.fixture(autouse=True)
+    def sem_janela(self, monkeypatch):
+        """Sem a janela de segurança, para que só mudanças posteriores apareçam"""
+        monkeypatch.setattr("app.services.mudancas.JANELA_SEGURANCA", timedelta(0))
+
+    def _versao(self, client) -> str:
+        return client.get("/cardapio/mudancas").json()["versao"]
+
+    def test_primeira_sincronizacao_pede_cardapio_completo(self, client, cardapio_completo):
+        """Sem versão, deve pedir ressincronização e devolver a versão"""
+        response = client.get("/cardapio/mudancas")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["ressincronizar"] is True
+        assert data["versao"]
+        assert data["produtos"] == [] and data["categorias"] == []
+
+    def test_sem_mudancas(self, client, cardapio_completo):
+        """Nada mudou desde a versão: listas vazias"""
+        data = client.get(f"/cardapio/mudancas?desde={self._versao(client)}").json()
+
+        assert data["ressincronizar"] is False
+        assert data["produtos"] == [] and data["categorias"] == [] and data["ingredientes"] == []
+        assert data["removidos"] == {"categorias": [], "produtos": [], "variacoes": [], "ingredientes": []}
+
+    def test_variacao_alterada_reenvia_produto(self, client, db, cardapio_completo):
+        """Mudança de preço deve reenviar só o produto da variação"""
+        versao = self._versao(client)
+        produto = cardapio_completo["produtos"][1]
+        produto.variacoes[0].preco = 42.0
+        db.commit()
+
+        data = client.get(f"/cardapio/mudancas?desde={versao}").json()
+
+        assert [p["id"] for p in data["produtos"]] == [produto.id]
+        assert data["produtos"][0]["variacoes"][0]["preco"] == 42.0
+        assert data["versao"] != versao
+
+    def test_ingrediente_alterado_reenvia_dependentes(self, client, db, cardapio_completo):
+        """Ingrediente alterado vem na lista e nos produtos que o usam"""
+        versao = self._versao(client)
+        mussarela = cardapio_completo["ingredientes"][0]
+        mussarela.preco_adicional = 9.0
+        db.commit()
+
+        data = client.get(f"/cardapio/mudancas?desde={versao}").json()
+
+        assert [i["id"] for i in data["ingredientes"]] == [mussarela.id]
+        assert [p["id"] for p in data["produtos"]] == [cardapio_completo["produtos"][0].id]
+
+    def test_remocoes(self, client, db, cardapio_completo):
+        """Remoção física e soft delete devem aparecer em removidos"""
+        versao = self._versao(client)
+        produto = cardapio_completo["produtos"][2]
+        variacao_id = produto.variacoes[0].id
+        db.delete(produto)
+        cardapio_completo["categorias"][2].soft_delete()
+        db.commit()
+
+        data = client.get(f"/cardapio/mudancas?desde={versao}").json()
+
+        assert data["removidos"]["produtos"] == [produto.id]
+        assert data["removidos"]["variacoes"] == [variacao_id]
+        assert data["removidos"]["categorias"] == [cardapio_completo["categorias"][2].id]
+        assert data["produtos"] == [] and data["categorias"] == []
+
+    def test_mudancas_demais_pedem_ressincronizacao(self, client, db, cardapio_completo, monkeypatch):
+        """Acima do máximo de itens, deve pedir o cardápio completo"""
+        monkeypatch.setattr("app.services.mudancas.MUDANCAS_MAXIMO_ITENS", 1)
+        versao = self._versao(client)
+        for produto in cardapio_completo["produtos"][:2]:
+            produto.descricao = "Nova descrição"
+        db.commit()
+
+        data = client.get(f"/cardapio/mudancas?desde={versao}").json()
+
+        assert data["ressincronizar"] is True
+        assert data["produtos"] == []
+
+    def test_versao_antiga_pede_ressincronizacao(self, client, cardapio_completo):
+        """Versão anterior à retenção das remoções não pode ser sincronizada"""
+        from app.services.mudancas import codificar_versao
+
+        antiga = codificar_versao(datetime.utcnow() - timedelta(days=365))
+        data = client.get(f"/cardapio/mudancas?desde={antiga}").json()
+
+        assert data["ressincronizar"] is True
+
+    def test_versao_invalida(self, client):
+        """Token malformado deve retornar 400"""
+        response = client.get("/cardapio/mudancas?desde=nao-e-uma-versao")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -191,3 +191,48 @@ class TestDeleteCategoria:
         )
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestCategoriasCondicional:
+    """Testes de GET condicional nas categorias"""
+
+    def test_listagem_304_com_etag(self, client, categorias_diversas):
+        """Repetir a listagem com o ETag deve retornar 304 sem corpo"""
+        response = client.get("/categorias/")
+        assert response.headers["cache-control"] == "public, no-cache"
+        assert "last-modified" in response.headers
+
+        repetida = client.get("/categorias/", headers={"If-None-Match": response.headers["etag"]})
+
+        assert repetida.status_code == status.HTTP_304_NOT_MODIFIED
+        assert repetida.content == b""
+        assert repetida.headers["etag"] == response.headers["etag"]
+
+    def test_etag_muda_apos_alteracao(self, client, db, categorias_diversas):
+        """Alterar uma categoria invalida o ETag"""
+        etag = client.get(f"/categorias/{categorias_diversas[0].id}").headers["etag"]
+
+        categorias_diversas[0].descricao = "Nova descrição"
+        db.commit()
+        response = client.get(f"/categorias/{categorias_diversas[0].id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["descricao"] == "Nova descrição"
+        assert response.headers["etag"] != etag
+
+    def test_if_modified_since(self, client, categoria_teste):
+        """If-Modified-Since igual ao Last-Modified deve retornar 304"""
+        response = client.get(f"/categorias/{categoria_teste.id}")
+
+        repetida = client.get(
+            f"/categorias/{categoria_teste.id}",
+            headers={"If-Modified-Since": response.headers["last-modified"]}
+        )
+
+        assert repetida.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_inexistente_continua_404(self, client):
+        """Categoria inexistente não tem validador e retorna 404"""
+        response = client.get("/categorias/99999", headers={"If-None-Match": "*"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
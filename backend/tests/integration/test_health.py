@@ -15,16 +15,49 @@ class TestHealthEndpoints:
         assert data["services"]["database"]["status"] == "healthy"
 
     def test_metrics(self, client):
-        """Testa endpoint de métricas"""
+        """Testa endpoint de métricas no formato Prometheus"""
         response = client.get("/metrics")
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert "usuarios" in data
-        assert "produtos" in data
-        assert "pedidos" in data
-        assert isinstance(data["usuarios"]["total"], int)
-        assert isinstance(data["produtos"]["total"], int)
-        assert isinstance(data["pedidos"]["total"], int)
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE pizzaria_pedidos gauge" in response.text
+        assert 'pizzaria_usuarios{tipo="total"} 0' in response.text
+        assert 'pizzaria_produtos{disponibilidade="disponivel"} 0' in response.text
+        assert 'pizzaria_pedidos{status="PENDENTE"} 0' in response.text
+
+    def test_metrics_acompanham_escritas(self, client, token_usuario, token_admin, produto_teste):
+        """Testa que os medidores são atualizados pelas escritas sem reler o banco"""
+        client.get("/metrics")  # semeadura
+
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        corpo = {"itens": [{"produto_variacao_id": produto_teste.variacoes[0].id, "quantidade": 2}]}
+        pedido = client.post("/pedidos/", headers=headers, json=corpo).json()
+        client.post("/pedidos/", headers=headers, json=corpo)
+        client.patch(
+            f"/pedidos/{pedido['id']}/status",
+            headers={"Authorization": f"Bearer {token_admin}"},
+            params={"novo_status": "PRONTO"}
+        )
+        client.patch(
+            f"/produtos/{produto_teste.id}/disponibilidade",
+            headers={"Authorization": f"Bearer {token_admin}"}
+        )
+
+        texto = client.get("/metrics").text
+        assert 'pizzaria_pedidos{status="PENDENTE"} 1' in texto
+        assert 'pizzaria_pedidos{status="PRONTO"} 1' in texto
+        assert "pizzaria_pedidos_valor_total 100" in texto
+        assert "pizzaria_pedidos_criados_total 2" in texto
+        assert 'pizzaria_produtos{disponibilidade="disponivel"} 0' in texto
+        assert 'pizzaria_produtos{disponibilidade="indisponivel"} 1' in texto
+
+    def test_metrics_por_rota(self, client):
+        """Testa contagem e histograma de latência por template de rota"""
+        client.get("/info")
+        client.get("/info")
+
+        texto = client.get("/metrics").text
+        assert 'pizzaria_http_requisicoes_total{metodo="GET",rota="/info",status="200"}' in texto
+        assert 'pizzaria_http_duracao_segundos_bucket{metodo="GET",rota="/info",le="+Inf"}' in texto
 
     def test_info(self, client):
         """Testa endpoint de informações da API"""
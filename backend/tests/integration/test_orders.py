@@ -74,6 +74,114 @@ class TestCreateOrder:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "não está disponível" in response.json()["message"]
 
+    def test_criar_pedido_insere_itens_em_lote(self, client, db, token_usuario, produto_com_ingredientes, ingredientes_diversos):
+        """Testa que cabeçalho e itens são gravados com dois INSERTs e retornados sem recarregar"""
+        from sqlalchemy import event
+        from tests.conftest import async_engine
+
+        inserts = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("INSERT INTO PEDIDOS", "INSERT INTO ITENS_PEDIDOS")):
+                inserts.append(statement)
+
+        variacoes = produto_com_ingredientes.variacoes
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        itens = [
+            {
+                "produto_variacao_id": variacoes[i % len(variacoes)].id,
+                "quantidade": 1,
+                "ingredientes_adicionados": [ingredientes_diversos[3].id],
+                "observacoes": f"item {i}"
+            }
+            for i in range(10)
+        ]
+
+        # A rota escreve pela sessão assíncrona
+        engine = async_engine.sync_engine
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            response = client.post("/pedidos/", headers=headers, json={"itens": itens})
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(inserts) == 2
+
+        data = response.json()
+        assert len(data["itens"]) == 10
+        assert [item["observacoes"] for item in data["itens"]] == [f"item {i}" for i in range(10)]
+        assert len({item["id"] for item in data["itens"]}) == 10
+
+        # O que foi respondido deve bater com o que foi gravado
+        gravado = client.get(f"/pedidos/{data['id']}", headers=headers).json()
+        assert gravado["preco_total"] == data["preco_total"]
+        # Cada ID respondido é o do item com os mesmos dados
+        assert {item["id"]: item["observacoes"] for item in gravado["itens"]} == {
+            item["id"]: item["observacoes"] for item in data["itens"]
+        }
+
+
+
+class TestIdempotencyKey:
+    """Testes de Idempotency-Key na criação de pedidos"""
+
+    def test_repeticao_devolve_mesmo_pedido(self, client, db, token_usuario, produto_variacao_teste):
+        """Testa que repetir a requisição com a mesma chave não duplica o pedido"""
+        from app.models.models import Pedido
+
+        headers = {"Authorization": f"Bearer {token_usuario}", "Idempotency-Key": "pedido-repetido-1"}
+        corpo = {"itens": [{"produto_variacao_id": produto_variacao_teste.id, "quantidade": 1}]}
+
+        primeira = client.post("/pedidos/", headers=headers, json=corpo)
+        segunda = client.post("/pedidos/", headers=headers, json=corpo)
+
+        assert primeira.status_code == status.HTTP_201_CREATED
+        assert segunda.status_code == status.HTTP_201_CREATED
+        assert segunda.content == primeira.content
+        assert primeira.headers["Idempotent-Replayed"] == "false"
+        assert segunda.headers["Idempotent-Replayed"] == "true"
+        assert db.query(Pedido).count() == 1
+
+    def test_chave_reutilizada_com_outro_corpo(self, client, token_usuario, produto_variacao_teste):
+        """Testa que a mesma chave com outro conteúdo é rejeitada"""
+        headers = {"Authorization": f"Bearer {token_usuario}", "Idempotency-Key": "pedido-repetido-2"}
+        item = {"produto_variacao_id": produto_variacao_teste.id, "quantidade": 1}
+
+        client.post("/pedidos/", headers=headers, json={"itens": [item]})
+        response = client.post("/pedidos/", headers=headers, json={"itens": [{**item, "quantidade": 3}]})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["error"] == "ChaveIdempotenciaReutilizada"
+
+    def test_erro_de_negocio_repetido(self, client, db, token_usuario, produto_variacao_teste):
+        """Testa que a repetição de uma requisição recusada devolve o mesmo erro, sem reprocessar"""
+        from app.models.models import Pedido
+
+        headers = {"Authorization": f"Bearer {token_usuario}", "Idempotency-Key": "pedido-recusado"}
+        corpo = {"itens": [{"produto_variacao_id": 99999, "quantidade": 1}]}
+
+        primeira = client.post("/pedidos/", headers=headers, json=corpo)
+        segunda = client.post("/pedidos/", headers=headers, json=corpo)
+
+        assert 400 <= primeira.status_code < 500
+        assert segunda.status_code == primeira.status_code
+        assert segunda.content == primeira.content
+        assert segunda.headers["Idempotent-Replayed"] == "true"
+        assert db.query(Pedido).count() == 0
+
+    def test_sem_chave_cria_pedidos_distintos(self, client, db, token_usuario, produto_variacao_teste):
+        """Testa que sem Idempotency-Key cada requisição cria um pedido"""
+        from app.models.models import Pedido
+
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        corpo = {"itens": [{"produto_variacao_id": produto_variacao_teste.id, "quantidade": 1}]}
+
+        client.post("/pedidos/", headers=headers, json=corpo)
+        client.post("/pedidos/", headers=headers, json=corpo)
+
+        assert db.query(Pedido).count() == 2
+
 
 class TestCalculatePrice:
     """Testes de cálculo de preço"""
@@ -98,6 +206,35 @@ class TestCalculatePrice:
         assert data["preco_total"] == produto_teste.preco * 2
         assert len(data["itens"]) == 1
 
+    def test_calcular_preco_com_customizacoes(self, client, token_usuario, produto_com_ingredientes, ingredientes_diversos):
+        """Testa cálculo de preço de vários itens com ingredientes extras e removidos"""
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        variacoes = produto_com_ingredientes.variacoes
+        response = client.post(
+            "/pedidos/calcular-preco",
+            headers=headers,
+            json={
+                "itens": [
+                    {
+                        "produto_variacao_id": variacoes[0].id,
+                        "quantidade": 1,
+                        "ingredientes_adicionados": [ingredientes_diversos[3].id],
+                        "ingredientes_removidos": [ingredientes_diversos[1].id]
+                    },
+                    {
+                        "produto_variacao_id": variacoes[2].id,
+                        "quantidade": 2
+                    }
+                ]
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["quantidade_itens"] == 2
+        assert data["itens"][0]["preco_total_item"] == 28.00
+        assert data["itens"][0]["ingredientes_removidos"][0]["nome"] == "Tomate"
+        assert data["preco_total"] == 118.00
+
 
 class TestListMyOrders:
     """Testes de listagem de pedidos do usuário"""
@@ -173,6 +310,83 @@ class TestListAllOrders:
         response = client.get("/pedidos/", headers=headers)
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+    @pytest.fixture
+    def pedidos_varios(self, db, usuario_teste, admin_teste):
+        """Cria pedidos com datas repetidas para exercitar o desempate por id"""
+        from datetime import datetime
+        from app.models.models import Pedido
+
+        pedidos = []
+        for i in range(7):
+            pedidos.append(Pedido(
+                usuario_id=usuario_teste.id if i % 2 == 0 else admin_teste.id,
+                status="ENTREGUE" if i < 3 else "PENDENTE",
+                preco_total=10.0 + i,
+                created_at=datetime(2025, 1, 1 + i // 2, 12, 0)
+            ))
+        db.add_all(pedidos)
+        db.commit()
+        return pedidos
+
+    def test_paginacao_keyset_percorre_todos(self, client, token_admin, pedidos_varios):
+        """Testa que as páginas seguem (created_at, id) decrescente sem repetir pedidos"""
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        ids = []
+        cursor = None
+        paginas = 0
+        while True:
+            params = {"limite": 3}
+            if cursor:
+                params["cursor"] = cursor
+            data = client.get("/pedidos/", headers=headers, params=params).json()
+            ids.extend(pedido["id"] for pedido in data["pedidos"])
+            assert data["quantidade"] == len(data["pedidos"])
+            assert "total" not in data
+            paginas += 1
+            cursor = data["proximo_cursor"]
+            if cursor is None:
+                break
+
+        esperado = sorted(pedidos_varios, key=lambda p: (p.created_at, p.id), reverse=True)
+        assert paginas == 3
+        assert ids == [pedido.id for pedido in esperado]
+
+    def test_listar_pedidos_com_filtros(self, client, token_admin, usuario_teste, pedidos_varios):
+        """Testa filtros de status, usuário e intervalo de datas"""
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        response = client.get(
+            "/pedidos/",
+            headers=headers,
+            params={
+                "status": "pendente",
+                "usuario_id": usuario_teste.id,
+                "data_inicio": "2025-01-02T00:00:00",
+                "data_fim": "2025-01-04T00:00:00"
+            }
+        )
+        assert response.status_code == status.HTTP_200_OK
+        pedidos = response.json()["pedidos"]
+        assert [pedido["preco_total"] for pedido in pedidos] == [14.0]
+
+    def test_listar_pedidos_ndjson(self, client, token_admin, pedidos_varios):
+        """Testa o modo streaming com um pedido por linha"""
+        import json
+
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        response = client.get("/pedidos/", headers=headers, params={"formato": "ndjson", "limite": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        linhas = [json.loads(linha) for linha in response.text.splitlines()]
+        assert len(linhas) == len(pedidos_varios)
+        assert {"id", "status", "usuario_id", "preco_total", "created_at"} <= set(linhas[0])
+
+    def test_listar_pedidos_cursor_invalido(self, client, token_admin):
+        """Testa que um cursor malformado retorna 400"""
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        response = client.get("/pedidos/", headers=headers, params={"cursor": "nao-e-um-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
 
 class TestGetOrder:
     """Testes de busca de pedido específico"""
@@ -308,3 +522,41 @@ class TestOrderStatistics:
         assert "total_pedidos" in data
         assert "valor_total_gasto" in data
         assert "pedidos_por_status" in data
+
+    def test_estatisticas_acompanham_escritas(self, client, db, token_usuario, token_admin, produto_teste):
+        """Testa que criação, mudança de status e cancelamento atualizam o ledger"""
+        from app.models.models import EstatisticaUsuario
+
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        variacao = produto_teste.variacoes[0]
+        corpo = {"itens": [{"produto_variacao_id": variacao.id, "quantidade": 2}]}
+
+        primeiro = client.post("/pedidos/", headers=headers, json=corpo).json()
+        client.post("/pedidos/", headers=headers, json=corpo)
+        client.patch(
+            f"/pedidos/{primeiro['id']}/status",
+            headers={"Authorization": f"Bearer {token_admin}"},
+            params={"novo_status": "ENTREGUE"}
+        )
+
+        data = client.get("/pedidos/meus/estatisticas", headers=headers).json()
+        assert data["total_pedidos"] == 2
+        assert data["valor_total_gasto"] == 100.00
+        assert data["pedidos_por_status"]["PENDENTE"] == 1
+        assert data["pedidos_por_status"]["ENTREGUE"] == 1
+
+        client.delete(f"/pedidos/{primeiro['id']}", headers=headers)
+
+        data = client.get("/pedidos/meus/estatisticas", headers=headers).json()
+        assert data["total_pedidos"] == 1
+        assert data["valor_total_gasto"] == 50.00
+        assert data["pedidos_por_status"]["ENTREGUE"] == 0
+        assert db.query(EstatisticaUsuario).count() == 1
+
+    def test_estatisticas_montadas_do_historico(self, client, token_usuario, pedido_teste):
+        """Testa que pedidos anteriores ao ledger entram na primeira leitura"""
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        data = client.get("/pedidos/meus/estatisticas", headers=headers).json()
+        assert data["total_pedidos"] == 1
+        assert data["valor_total_gasto"] == pedido_teste.preco_total
+        assert data["pedidos_por_status"][pedido_teste.status] == 1
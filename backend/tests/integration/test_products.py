@@ -121,6 +121,68 @@ class TestListProducts:
         )
 
 
+class TestListProductsPagination:
+    """Testes de paginação, ordenação e projeção da listagem de produtos"""
+
+    def _percorrer(self, client, **params):
+        """Segue o header X-Proximo-Cursor até a última página"""
+        produtos, cursor = [], None
+        while True:
+            response = client.get("/produtos/", params={**params, **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == status.HTTP_200_OK
+            produtos += response.json()
+            cursor = response.headers.get("X-Proximo-Cursor")
+            if not cursor:
+                return produtos
+
+    def test_paginacao_por_id(self, client, produtos_diversos):
+        """Testa que as páginas cobrem todos os produtos sem repetição"""
+        produtos = self._percorrer(client, limite=3)
+
+        assert [p["id"] for p in produtos] == sorted(p.id for p in produtos_diversos)
+
+    def test_ordenacao_por_nome_decrescente(self, client, produtos_diversos):
+        """Testa ordenação decrescente por nome atravessando páginas"""
+        produtos = self._percorrer(client, limite=1, ordenar="-nome")
+
+        assert [p["nome"] for p in produtos] == sorted((p.nome for p in produtos_diversos), reverse=True)
+
+    def test_ordenacao_invalida(self, client):
+        """Testa que colunas fora da lista são rejeitadas"""
+        response = client.get("/produtos/?ordenar=descricao")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_cursor_de_outra_ordenacao(self, client, produtos_diversos):
+        """Testa que o cursor só vale para a ordenação que o gerou"""
+        cursor = client.get("/produtos/?limite=1&ordenar=nome").headers["X-Proximo-Cursor"]
+
+        response = client.get(f"/produtos/?limite=1&ordenar=id&cursor={cursor}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_projecao_de_campos(self, client, produtos_diversos):
+        """Testa que só os campos pedidos (mais id) são devolvidos"""
+        response = client.get("/produtos/?campos=nome,disponivel&ordenar=nome&limite=2")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [set(p) for p in data] == [{"id", "nome", "disponivel"}] * 2
+        assert "X-Proximo-Cursor" in response.headers
+
+    def test_projecao_com_relacionamento(self, client, produtos_diversos):
+        """Testa a projeção incluindo variações"""
+        response = client.get("/produtos/?campos=nome,variacoes")
+
+        data = response.json()
+        assert all(set(p) == {"id", "nome", "variacoes"} for p in data)
+        assert all(len(p["variacoes"]) == 1 for p in data)
+
+    def test_projecao_campo_invalido(self, client):
+        """Testa que campos desconhecidos são rejeitados"""
+        response = client.get("/produtos/?campos=nome,senha")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "senha" in response.json()["message"]
+
+
 class TestGetProduct:
     """Testes de busca de produto específico"""
 
@@ -139,6 +201,31 @@ class TestGetProduct:
         assert "não encontrado" in response.json()["message"]
 
 
+class TestGetProductCondicional:
+    """Testes de GET condicional em /produtos/{id}"""
+
+    def test_304_e_invalidacao_por_variacao(self, client, db, produto_teste):
+        """ETag vale até uma variação embutida mudar"""
+        response = client.get(f"/produtos/{produto_teste.id}")
+        etag = response.headers["etag"]
+
+        repetida = client.get(f"/produtos/{produto_teste.id}", headers={"If-None-Match": etag})
+        assert repetida.status_code == status.HTTP_304_NOT_MODIFIED
+
+        produto_teste.variacoes[0].preco = 99.0
+        db.commit()
+        alterada = client.get(f"/produtos/{produto_teste.id}", headers={"If-None-Match": etag})
+
+        assert alterada.status_code == status.HTTP_200_OK
+        assert alterada.json()["variacoes"][0]["preco"] == 99.0
+
+    def test_produto_inexistente(self, client):
+        """Produto inexistente retorna 404 mesmo com If-None-Match"""
+        response = client.get("/produtos/99999", headers={"If-None-Match": "*"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 class TestUpdateProduct:
     """Testes de atualização de produtos"""
 
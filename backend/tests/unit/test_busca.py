@@ -0,0 +1,131 @@
+"""Testes unitarios para o indice de busca de produtos"""
+from sqlalchemy import event
+
+from app.models.models import Categoria, Ingrediente, Produto, ProdutoIngrediente, ProdutoVariacao
+from app.services.busca import IndiceBusca, dobrar, indice_busca, radical, tokenizar
+
+
+class TestNormalizacao:
+    """Testes da dobra de acentos e do radical"""
+
+    def test_dobrar_remove_acentos(self):
+        """Testa que acentos e maiúsculas são removidos"""
+        assert dobrar("Calabrésa com Manjericão") == "calabresa com manjericao"
+        assert tokenizar("Coca-Cola 2L!") == ["coca", "cola", "2l"]
+
+    def test_radical_plural(self):
+        """Testa a redução dos plurais mais comuns"""
+        assert radical("pizzas") == "pizza"
+        assert radical("limoes") == "limao"
+        assert radical("pasteis") == "pastel"
+        assert radical("hamburgueres") == "hamburguer"
+        assert radical("atuns") == "atum"
+        assert radical("queijos") == "queijo"
+
+    def test_radical_respeita_minimo_e_excecoes(self):
+        """Testa que o radical mínimo e as terminações ss/us/is são respeitados"""
+        assert radical("ovos") == "ovo"
+        assert radical("mais") == "mais"
+        assert radical("onibus") == "onibus"
+        assert radical("expresso") == "expresso"
+
+
+class TestIndiceBusca:
+    """Testes do ranking e da manutenção incremental"""
+
+    def test_nome_pesa_mais_que_descricao(self, db, cardapio_completo):
+        """Testa que o produto com o termo no nome vem primeiro"""
+        ids = IndiceBusca().buscar(db, "calabresa")
+
+        assert ids[0] == cardapio_completo["produtos"][0].id
+
+    def test_todas_as_palavras_precisam_casar(self, db, cardapio_completo):
+        """Testa que consultas com várias palavras usam AND"""
+        indice = IndiceBusca()
+
+        assert indice.buscar(db, "pizza presunto") == [cardapio_completo["produtos"][1].id]
+        assert indice.buscar(db, "pizza refrigerante") == []
+
+    def test_ignora_produtos_indisponiveis(self, db, cardapio_completo):
+        """Testa que produtos indisponíveis não aparecem"""
+        assert IndiceBusca().buscar(db, "brownie") == []
+
+    def test_ingrediente_obrigatorio_indisponivel(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa que a busca segue a disponibilidade efetiva do cardápio"""
+        assert indice_busca.buscar(db, "margherita") == [produto_com_ingredientes.id]
+
+        ingredientes_diversos[0].disponivel = False  # Mussarela (obrigatória)
+        db.commit()
+        assert indice_busca.buscar(db, "margherita") == []
+
+        ingredientes_diversos[0].disponivel = True
+        db.commit()
+        assert indice_busca.buscar(db, "margherita") == [produto_com_ingredientes.id]
+
+    def test_categoria_inativa(self, db, produto_teste, categoria_teste):
+        """Testa que produtos de categoria inativa não aparecem"""
+        assert indice_busca.buscar(db, "margherita") == [produto_teste.id]
+
+        categoria_teste.ativa = False
+        db.commit()
+
+        assert indice_busca.buscar(db, "margherita") == []
+
+    def test_sem_variacao_disponivel(self, db, produto_teste):
+        """Testa que produto sem nenhum tamanho disponível não aparece"""
+        for variacao in produto_teste.variacoes:
+            variacao.disponivel = False
+        db.commit()
+
+        assert indice_busca.buscar(db, "margherita") == []
+
+    def test_busca_repetida_nao_consulta_banco(self, db, cardapio_completo):
+        """Testa que, sem alterações no catálogo, a busca não emite queries"""
+        indice_busca.buscar(db, "pizza")
+
+        queries = []
+        engine = db.get_bind()
+        registrar = lambda *args: queries.append(args[2])
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            indice_busca.buscar(db, "pizza")
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+        assert queries == []
+
+    def test_alteracao_de_ingrediente_reindexa_produtos(self, db, cardapio_completo):
+        """Testa que renomear um ingrediente atualiza os produtos que o usam"""
+        assert indice_busca.buscar(db, "provolone") == []
+
+        mussarela = cardapio_completo["ingredientes"][0]
+        mussarela.nome = "Provolone"
+        db.commit()
+
+        assert indice_busca.buscar(db, "provolone") == [cardapio_completo["produtos"][0].id]
+
+    def test_alteracao_de_categoria_reindexa_produtos(self, db, cardapio_completo):
+        """Testa que renomear uma categoria atualiza os produtos dela"""
+        bebidas = cardapio_completo["categorias"][1]
+        bebidas.nome = "Geladas"
+        db.commit()
+
+        assert indice_busca.buscar(db, "geladas") == [cardapio_completo["produtos"][2].id]
+
+    def test_novo_produto_entra_no_indice(self, db, cardapio_completo):
+        """Testa que um produto criado após a indexação é encontrado"""
+        indice_busca.buscar(db, "pizza")
+
+        categoria = db.query(Categoria).first()
+        produto = Produto(categoria_id=categoria.id, nome="Pizza Quatro Queijos", disponivel=True)
+        db.add(produto)
+        db.flush()
+        gorgonzola = Ingrediente(nome="Gorgonzola", preco_adicional=4.0, disponivel=True)
+        db.add(gorgonzola)
+        db.flush()
+        db.add(ProdutoIngrediente(produto_id=produto.id, ingrediente_id=gorgonzola.id))
+        db.add(ProdutoVariacao(produto_id=produto.id, tamanho="GRANDE", preco=50.0, disponivel=True))
+        db.commit()
+
+        assert indice_busca.buscar(db, "queijo") == [produto.id]
+        assert indice_busca.buscar(db, "gorgon") == [produto.id]
@@ -0,0 +1,178 @@
+"""Testes unitarios para o cache de produtos por categoria"""
+from app.services import cache_categorias as modulo
+from app.services import metricas
+from app.services.cache_categorias import cache_categorias
+from app.services.catalogo import AlteracoesCatalogo, invalidar_catalogo
+
+
+def _em_cache(categoria_id: int, incluir_indisponiveis: bool = False) -> bool:
+    """Verifica se a lista da categoria está em cache"""
+    shard = cache_categorias._shards.get(categoria_id)
+    return shard is not None and incluir_indisponiveis in shard.listas
+
+
+def _aquecer(db, categorias):
+    """Coloca em cache a lista de cada categoria"""
+    for categoria in categorias:
+        cache_categorias.obter(db, categoria.id)
+
+
+class TestAcertosEFalhas:
+    """Testes da leitura do cache"""
+
+    def test_acerto_apos_falha(self, db, cardapio_completo):
+        """Segunda leitura vem do cache e os contadores acompanham"""
+        categoria_id = cardapio_completo["categorias"][0].id
+        falhas = metricas.cache_categorias.valor(categoria=categoria_id, resultado="falha")
+        acertos = metricas.cache_categorias.valor(categoria=categoria_id, resultado="acerto")
+
+        primeira = cache_categorias.obter(db, categoria_id)
+        segunda = cache_categorias.obter(db, categoria_id)
+
+        assert segunda is primeira
+        assert metricas.cache_categorias.valor(categoria=categoria_id, resultado="falha") == falhas + 1
+        assert metricas.cache_categorias.valor(categoria=categoria_id, resultado="acerto") == acertos + 1
+
+    def test_com_e_sem_indisponiveis(self, db, cardapio_completo):
+        """As duas variações da lista são guardadas separadamente"""
+        categoria_id = cardapio_completo["categorias"][2].id  # Sobremesas (Brownie indisponível)
+
+        disponiveis = cache_categorias.obter(db, categoria_id)
+        todos = cache_categorias.obter(db, categoria_id, incluir_indisponiveis=True)
+
+        assert disponiveis.corpo == b"[]"
+        assert b"Brownie" in todos.corpo
+
+    def test_categoria_inexistente_nao_cria_shard(self, db, cardapio_completo):
+        """IDs desconhecidos não ocupam memória"""
+        assert cache_categorias.obter(db, 999).corpo == b"[]"
+        assert 999 not in cache_categorias._shards
+
+
+class TestInvalidacao:
+    """Testes da invalidação restrita às categorias afetadas"""
+
+    def test_produto_invalida_so_a_categoria(self, db, cardapio_completo):
+        """Alterar uma pizza não descarta as bebidas"""
+        pizzas, bebidas = cardapio_completo["categorias"][:2]
+        _aquecer(db, (pizzas, bebidas))
+
+        cardapio_completo["produtos"][1].nome = "Pizza Portuguesa Especial"
+        db.commit()
+
+        assert not _em_cache(pizzas.id)
+        assert _em_cache(bebidas.id)
+        assert b"Portuguesa Especial" in cache_categorias.obter(db, pizzas.id).corpo
+
+    def test_variacao_invalida_categoria_do_produto(self, db, cardapio_completo):
+        """Preço novo de uma bebida só descarta as bebidas"""
+        pizzas, bebidas = cardapio_completo["categorias"][:2]
+        _aquecer(db, (pizzas, bebidas))
+
+        cardapio_completo["produtos"][2].variacoes[0].preco = 9.99
+        db.commit()
+
+        assert _em_cache(pizzas.id)
+        assert not _em_cache(bebidas.id)
+        assert b"9.99" in cache_categorias.obter(db, bebidas.id).corpo
+
+    def test_ingrediente_so_nas_categorias_que_usam(self, db, cardapio_completo):
+        """Ingrediente alterado descarta só as categorias que o embutem"""
+        pizzas, bebidas = cardapio_completo["categorias"][:2]
+        _aquecer(db, (pizzas, bebidas))
+
+        cardapio_completo["ingredientes"][0].nome = "Mussarela de Búfala"  # Usada na Pizza Calabresa
+        db.commit()
+        assert not _em_cache(pizzas.id)
+        assert _em_cache(bebidas.id)
+
+        _aquecer(db, (pizzas,))
+        cardapio_completo["ingredientes"][2].nome = "Manjericão Fresco"  # Sem produtos
+        db.commit()
+        assert _em_cache(pizzas.id)
+
+    def test_ingrediente_obrigatorio_em_falta(self, db, cardapio_completo):
+        """Produto sem ingrediente obrigatório sai da lista e volta quando ele retorna"""
+        pizzas = cardapio_completo["categorias"][0]
+        mussarela = cardapio_completo["ingredientes"][0]  # Obrigatória na Pizza Calabresa
+        assert b"Pizza Calabresa" in cache_categorias.obter(db, pizzas.id).corpo
+
+        mussarela.disponivel = False
+        db.commit()
+        assert b"Pizza Calabresa" not in cache_categorias.obter(db, pizzas.id).corpo
+        assert b"Pizza Calabresa" in cache_categorias.obter(db, pizzas.id, incluir_indisponiveis=True).corpo
+
+        # A pizza não está na resposta em cache, mas a lista depende da mussarela
+        mussarela.disponivel = True
+        db.commit()
+        assert not _em_cache(pizzas.id)
+        assert b"Pizza Calabresa" in cache_categorias.obter(db, pizzas.id).corpo
+
+    def test_categoria_inativa_fica_vazia(self, db, cardapio_completo):
+        """Produtos de categoria desativada não são listados"""
+        bebidas = cardapio_completo["categorias"][1]
+        _aquecer(db, (bebidas,))
+
+        bebidas.ativa = False
+        db.commit()
+
+        assert cache_categorias.obter(db, bebidas.id).corpo == b"[]"
+
+    def test_produto_movido(self, db, cardapio_completo):
+        """Mover um produto descarta a categoria antiga e a nova"""
+        pizzas, bebidas, sobremesas = cardapio_completo["categorias"][:3]
+        _aquecer(db, (pizzas, bebidas, sobremesas))
+
+        cardapio_completo["produtos"][1].categoria_id = bebidas.id
+        db.commit()
+
+        assert not _em_cache(pizzas.id)
+        assert not _em_cache(bebidas.id)
+        assert _em_cache(sobremesas.id)
+
+    def test_montagem_durante_commit_nao_e_guardada(self, db, cardapio_completo, monkeypatch):
+        """Lista montada antes de uma invalidação concorrente não fica em cache"""
+        categoria_id = cardapio_completo["categorias"][0].id
+        montar = modulo._montar
+
+        def montar_com_commit_concorrente(*args):
+            lista = montar(*args)
+            invalidar_catalogo(AlteracoesCatalogo(categorias=frozenset({categoria_id})))
+            return lista
+
+        monkeypatch.setattr(modulo, "_montar", montar_com_commit_concorrente)
+        cache_categorias.obter(db, categoria_id)
+
+        assert not _em_cache(categoria_id)
+
+
+class TestRota:
+    """Testes da rota servida pelo cache"""
+
+    def test_reflete_alteracao_e_responde_304(self, client, db, cardapio_completo):
+        """Resposta em cache mantém o GET condicional e acompanha alterações"""
+        categoria_id = cardapio_completo["categorias"][1].id
+        url = f"/cardapio/categorias/{categoria_id}/produtos"
+        etag = client.get(url).headers["etag"]
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        cardapio_completo["produtos"][2].nome = "Coca-Cola Zero"
+        db.commit()
+        resposta = client.get(url, headers={"If-None-Match": etag})
+
+        assert resposta.status_code == 200
+        assert resposta.json()[0]["nome"] == "Coca-Cola Zero"
+
+    def test_etag_acompanha_disponibilidade(self, client, db, cardapio_completo):
+        """Ingrediente obrigatório em falta muda a resposta e o ETag"""
+        categoria_id = cardapio_completo["categorias"][0].id
+        url = f"/cardapio/categorias/{categoria_id}/produtos"
+        etag = client.get(url).headers["etag"]
+
+        cardapio_completo["ingredientes"][0].disponivel = False
+        db.commit()
+        resposta = client.get(url, headers={"If-None-Match": etag})
+
+        assert resposta.status_code == 200
+        assert "Pizza Calabresa" not in [produto["nome"] for produto in resposta.json()]
@@ -0,0 +1,41 @@
+"""Testes unitarios para o cardapio pre-serializado"""
+from sqlalchemy import event
+
+from app.services.cardapio import aceita_gzip, obter_cardapio_serializado
+from app.services.condicional import etag_corresponde
+
+
+class TestCardapioSerializado:
+    """Testes do cache de bytes do cardapio"""
+
+    def test_reutiliza_bytes_sem_consultar_banco(self, db, cardapio_completo):
+        """Testa que, com o catálogo inalterado, nenhuma query é emitida"""
+        primeiro = obter_cardapio_serializado(db)
+
+        queries = []
+        engine = db.get_bind()
+        registrar = lambda *args: queries.append(args[2])
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            segundo = obter_cardapio_serializado(db)
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+        assert segundo is primeiro
+        assert queries == []
+
+    def test_etag_corresponde(self):
+        """Testa a comparação do If-None-Match"""
+        assert etag_corresponde('"abc"', '"abc"')
+        assert etag_corresponde('"x", W/"abc"', '"abc"')
+        assert etag_corresponde("*", '"abc"')
+        assert not etag_corresponde('"abd"', '"abc"')
+        assert not etag_corresponde(None, '"abc"')
+
+    def test_aceita_gzip(self):
+        """Testa a negociação de Accept-Encoding"""
+        assert aceita_gzip("gzip, deflate, br")
+        assert aceita_gzip("br;q=1.0, gzip;q=0.5")
+        assert not aceita_gzip("gzip;q=0")
+        assert not aceita_gzip("identity")
+        assert not aceita_gzip(None)
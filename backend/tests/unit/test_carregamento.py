@@ -0,0 +1,107 @@
+"""Testes unitarios para o carregamento do grafo de produtos"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from app.exceptions import CampoInvalido
+from app.services.carregamento import (
+    carregar_produtos_por_id, consultar_categorias, consultar_produtos,
+    consultar_produtos_parciais, serializador_parcial, validar_campos
+)
+
+
+def _contar_queries(db, funcao):
+    """Executa funcao e retorna (resultado, SQLs emitidos)"""
+    queries = []
+    engine = db.get_bind()
+    registrar = lambda *args: queries.append(args[2])
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = funcao()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, queries
+
+
+class TestCarregamento:
+    """Testes do carregamento em consultas por nível"""
+
+    def test_uma_query_por_nivel(self, db, cardapio_completo):
+        """Testa que produtos, variações, associações e ingredientes vêm em 4 queries sem JOIN"""
+        db.expire_all()
+
+        produtos, queries = _contar_queries(db, lambda: consultar_produtos(db).all())
+
+        assert len(queries) == 4
+        assert not any(" JOIN " in sql for sql in queries)
+
+        # Grafo completo montado: acessar relacionamentos não emite novas queries
+        _, extras = _contar_queries(db, lambda: [
+            (p.variacoes, [pi.ingrediente.nome for pi in p.ingredientes]) for p in produtos
+        ])
+        assert extras == []
+        calabresa = next(p for p in produtos if p.nome == "Pizza Calabresa")
+        assert {pi.ingrediente.nome for pi in calabresa.ingredientes} == {"Mussarela", "Calabresa"}
+
+    def test_categorias_com_produtos(self, db, cardapio_completo):
+        """Testa o carregamento das categorias com o grafo de produtos"""
+        db.expire_all()
+
+        categorias, queries = _contar_queries(db, lambda: consultar_categorias(db).all())
+
+        assert len(queries) == 5
+        nomes = {c.nome: sorted(p.nome for p in c.produtos) for c in categorias}
+        assert nomes["Pizzas"] == ["Pizza Calabresa", "Pizza Portuguesa"]
+
+    def test_carregar_por_id_preserva_ordem(self, db, cardapio_completo):
+        """Testa que a ordem dos IDs é mantida e IDs inexistentes são ignorados"""
+        ids = [p.id for p in reversed(cardapio_completo["produtos"])]
+
+        produtos = carregar_produtos_por_id(db, [*ids, 99999])
+
+        assert [p.id for p in produtos] == ids
+        assert carregar_produtos_por_id(db, []) == []
+
+
+class TestProjecao:
+    """Testes da consulta com projeção de campos"""
+
+    def test_consulta_so_le_colunas_pedidas(self, db, cardapio_completo):
+        """Testa que a projeção não lê colunas nem relações não pedidas"""
+        db.expire_all()
+        campos = validar_campos("nome")
+
+        produtos, queries = _contar_queries(db, lambda: consultar_produtos_parciais(db, campos).all())
+
+        assert len(queries) == 1
+        assert "descricao" not in queries[0]
+        assert "imagem_url" not in queries[0]
+        assert serializador_parcial(campos).dump_python(produtos[:1], mode="json") == [
+            {"id": produtos[0].id, "nome": produtos[0].nome}
+        ]
+
+    def test_relacao_pedida_e_carregada(self, db, cardapio_completo):
+        """Testa que só as relações pedidas geram consultas extras"""
+        db.expire_all()
+        campos = validar_campos("variacoes")
+
+        _, queries = _contar_queries(db, lambda: consultar_produtos_parciais(db, campos).all())
+
+        assert len(queries) == 2
+        assert not any("produtos_ingredientes" in sql for sql in queries)
+
+    def test_acesso_fora_da_projecao_falha(self, db, cardapio_completo):
+        """Testa que atributos não carregados levantam erro em vez de consultar"""
+        db.expunge_all()
+        produto = consultar_produtos_parciais(db, validar_campos("nome")).first()
+
+        with pytest.raises(InvalidRequestError):
+            produto.descricao
+        with pytest.raises(InvalidRequestError):
+            produto.variacoes
+
+    def test_campo_invalido(self):
+        """Testa a validação da lista de campos"""
+        with pytest.raises(CampoInvalido):
+            validar_campos("nome,senha")
+        assert validar_campos(" variacoes , nome ") == ("id", "nome", "variacoes")
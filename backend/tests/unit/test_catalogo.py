@@ -0,0 +1,82 @@
+"""Testes unitarios para o catalogo de precos em memoria"""
+import pytest
+
+from app.models.models import Pedido, ProdutoVariacao
+from app.services.catalogo import obter_catalogo, versao_catalogo
+
+
+class TestCatalogo:
+    """Testes do snapshot versionado do catalogo"""
+
+    def test_snapshot_contem_dados_de_preco(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa que o snapshot traz precos, disponibilidade e obrigatoriedade"""
+        catalogo = obter_catalogo(db)
+        variacao = produto_com_ingredientes.variacoes[1]
+        mussarela = ingredientes_diversos[0]
+
+        assert catalogo.variacoes[variacao.id].preco == 35.00
+        assert catalogo.produtos[produto_com_ingredientes.id].disponivel is True
+        assert catalogo.ingredientes[ingredientes_diversos[4].id].disponivel is False
+        assert catalogo.ingredientes_padrao[(produto_com_ingredientes.id, mussarela.id)].obrigatorio is True
+
+    def test_snapshot_imutavel(self, db, produto_teste):
+        """Testa que o snapshot nao pode ser alterado"""
+        catalogo = obter_catalogo(db)
+
+        with pytest.raises(TypeError):
+            catalogo.variacoes[99999] = None
+        with pytest.raises(AttributeError):
+            catalogo.variacoes[produto_teste.variacoes[0].id].preco = 1.0
+
+    def test_commit_no_catalogo_incrementa_versao(self, db, produto_teste):
+        """Testa que alterar uma variacao publica uma nova versao do catalogo"""
+        catalogo_antigo = obter_catalogo(db)
+        variacao_id = produto_teste.variacoes[0].id
+
+        variacao = db.query(ProdutoVariacao).filter(ProdutoVariacao.id == variacao_id).first()
+        variacao.preco = 99.90
+        db.commit()
+
+        catalogo_novo = obter_catalogo(db)
+        assert catalogo_novo.versao > catalogo_antigo.versao
+        assert catalogo_novo.variacoes[variacao_id].preco == 99.90
+        # O snapshot antigo continua consistente para quem ainda o usa
+        assert catalogo_antigo.variacoes[variacao_id].preco == 25.00
+
+    def test_commit_fora_do_catalogo_nao_incrementa_versao(self, db, usuario_teste):
+        """Testa que escritas em pedidos nao invalidam o catalogo"""
+        versao = versao_catalogo()
+
+        db.add(Pedido(usuario_id=usuario_teste.id, status="PENDENTE", preco_total=10.0))
+        db.commit()
+
+        assert versao_catalogo() == versao
+
+    def test_rollback_descarta_alteracoes(self, db, produto_teste):
+        """Testa que uma transacao revertida nao incrementa a versao"""
+        versao = versao_catalogo()
+
+        variacao = produto_teste.variacoes[0]
+        variacao.preco = 1.0
+        db.flush()
+        db.rollback()
+
+        assert versao_catalogo() == versao
+
+    def test_escrita_pelo_router_atualiza_cotacao(self, client, db, token_admin, token_usuario, produto_teste):
+        """Testa que a cotacao reflete o preco logo apos o commit no router de produtos"""
+        variacao = produto_teste.variacoes[0]
+        headers_usuario = {"Authorization": f"Bearer {token_usuario}"}
+        corpo = {"itens": [{"produto_variacao_id": variacao.id, "quantidade": 1}]}
+
+        antes = client.post("/pedidos/calcular-preco", headers=headers_usuario, json=corpo)
+        assert antes.json()["preco_total"] == 25.00
+
+        client.put(
+            f"/produtos/{produto_teste.id}/variacoes/{variacao.id}",
+            headers={"Authorization": f"Bearer {token_admin}"},
+            json={"preco": 27.50}
+        )
+
+        depois = client.post("/pedidos/calcular-preco", headers=headers_usuario, json=corpo)
+        assert depois.json()["preco_total"] == 27.50
@@ -0,0 +1,172 @@
+"""Testes unitarios para as chaves de assinatura dos tokens e o JWKS"""
+import json
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from app.routers import chaves as rota_chaves
+from app.services.chaves import Chaveiro, gerar_chave
+
+
+def _claims(**extras) -> dict:
+    """Claims de um token de acesso que vence em 10 minutos"""
+    return {"sub": "1", "exp": int(time.time()) + 600, **extras}
+
+
+class TestChaveiroAssimetrico:
+    """Testes de assinatura e verificação com RS256 e ES256"""
+
+    @pytest.mark.parametrize("algoritmo", ["RS256", "ES256"])
+    def test_assina_e_verifica(self, tmp_path, algoritmo):
+        """Token assinado com a chave ativa é verificado, com kid no cabeçalho"""
+        gerar_chave(str(tmp_path), algoritmo, "k1")
+        chaveiro = Chaveiro(algoritmo, diretorio=str(tmp_path))
+
+        token = chaveiro.assinar(_claims(adm=True))
+
+        assert jwt.get_unverified_header(token)["kid"] == "k1"
+        assert chaveiro.verificar(token)["adm"] is True
+
+    def test_rotacao(self, tmp_path):
+        """Depois da troca da chave ativa, tokens da chave antiga continuam válidos"""
+        gerar_chave(str(tmp_path), "ES256", "antiga")
+        token_antigo = Chaveiro("ES256", diretorio=str(tmp_path)).assinar(_claims())
+
+        gerar_chave(str(tmp_path), "ES256", "nova")
+        chaveiro = Chaveiro("ES256", diretorio=str(tmp_path), chave_ativa="nova")
+
+        assert jwt.get_unverified_header(chaveiro.assinar(_claims()))["kid"] == "nova"
+        assert chaveiro.verificar(token_antigo)["sub"] == "1"
+
+    def test_chave_removida_recusa_tokens(self, tmp_path):
+        """Tokens de uma chave que saiu do diretório são recusados"""
+        antiga = gerar_chave(str(tmp_path), "ES256", "antiga")
+        token_antigo = Chaveiro("ES256", diretorio=str(tmp_path)).assinar(_claims())
+
+        gerar_chave(str(tmp_path), "ES256", "nova")
+        antiga.unlink()
+        chaveiro = Chaveiro("ES256", diretorio=str(tmp_path))
+
+        with pytest.raises(JWTError):
+            chaveiro.verificar(token_antigo)
+
+    def test_recarga_invalida_mantem_chaves(self, tmp_path):
+        """Diretório inválido na recarga não derruba as chaves em uso"""
+        gerar_chave(str(tmp_path), "ES256", "atual")
+        chaveiro = Chaveiro("ES256", diretorio=str(tmp_path))
+        token = chaveiro.assinar(_claims())
+
+        (tmp_path / "atual.pem").unlink()
+        with pytest.raises(ValueError):
+            chaveiro.recarregar()
+
+        assert chaveiro.geracao == 0
+        assert chaveiro.verificar(token)["sub"] == "1"
+
+    def test_recusa_token_hs256(self, tmp_path):
+        """Token HS* não é aceito, nem assinado com a chave pública como segredo"""
+        gerar_chave(str(tmp_path), "RS256", "k1")
+        chaveiro = Chaveiro("RS256", diretorio=str(tmp_path))
+        publica = json.loads(chaveiro.jwks)["keys"][0]
+
+        token = jwt.encode(_claims(), json.dumps(publica), algorithm="HS256", headers={"kid": "k1"})
+
+        with pytest.raises(JWTError):
+            chaveiro.verificar(token)
+
+    def test_chave_so_publica_verifica(self, tmp_path):
+        """Arquivo só com a chave pública verifica, mas não pode assinar"""
+        from cryptography.hazmat.primitives import serialization
+
+        gerar_chave(str(tmp_path / "origem"), "ES256", "antiga")
+        origem = Chaveiro("ES256", diretorio=str(tmp_path / "origem"))
+        token_antigo = origem.assinar(_claims())
+        privada = serialization.load_pem_private_key((tmp_path / "origem" / "antiga.pem").read_bytes(), None)
+        (tmp_path / "antiga.pem").write_bytes(privada.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+        gerar_chave(str(tmp_path), "ES256", "nova")
+
+        chaveiro = Chaveiro("ES256", diretorio=str(tmp_path))
+
+        assert chaveiro.kid == "nova"
+        assert chaveiro.verificar(token_antigo)["sub"] == "1"
+        with pytest.raises(ValueError):
+            Chaveiro("ES256", diretorio=str(tmp_path), chave_ativa="antiga")
+
+    def test_jwks_sem_material_privado(self, tmp_path):
+        """O JWKS lista as chaves públicas pelo kid, sem membros privados"""
+        gerar_chave(str(tmp_path), "RS256", "a")
+        gerar_chave(str(tmp_path), "RS256", "b")
+        chaveiro = Chaveiro("RS256", diretorio=str(tmp_path), chave_ativa="b")
+
+        chaves = json.loads(chaveiro.jwks)["keys"]
+
+        assert [c["kid"] for c in chaves] == ["a", "b"]
+        assert all(c["alg"] == "RS256" and c["use"] == "sig" for c in chaves)
+        assert not any({"d", "p", "q"} & c.keys() for c in chaves)
+
+
+class TestConfiguracao:
+    """Testes das configurações inválidas"""
+
+    def test_hs256_usa_segredo(self):
+        """HS256 assina com o segredo e publica um JWKS vazio"""
+        chaveiro = Chaveiro("HS256", "segredo")
+
+        assert jwt.decode(chaveiro.assinar(_claims()), "segredo", algorithms=["HS256"])["sub"] == "1"
+        assert json.loads(chaveiro.jwks) == {"keys": []}
+
+    def test_diretorio_ausente(self, tmp_path):
+        """RS256 sem diretório de chaves não inicializa"""
+        with pytest.raises(ValueError):
+            Chaveiro("RS256")
+        with pytest.raises(ValueError):
+            Chaveiro("RS256", diretorio=str(tmp_path / "nao_existe"))
+
+    def test_chave_ativa_ambigua_ou_inexistente(self, tmp_path):
+        """Com várias chaves privadas, JWT_CHAVE_ATIVA precisa indicar uma delas"""
+        gerar_chave(str(tmp_path), "ES256", "a")
+        gerar_chave(str(tmp_path), "ES256", "b")
+
+        with pytest.raises(ValueError):
+            Chaveiro("ES256", diretorio=str(tmp_path))
+        with pytest.raises(ValueError):
+            Chaveiro("ES256", diretorio=str(tmp_path), chave_ativa="c")
+
+    def test_chave_de_outro_algoritmo(self, tmp_path):
+        """Chave EC não serve para RS256"""
+        gerar_chave(str(tmp_path), "ES256", "k1")
+
+        with pytest.raises(ValueError):
+            Chaveiro("RS256", diretorio=str(tmp_path))
+
+    def test_gerar_chave_nao_sobrescreve(self, tmp_path):
+        """kid existente ou algoritmo simétrico são recusados"""
+        gerar_chave(str(tmp_path), "ES256", "k1")
+
+        with pytest.raises(ValueError):
+            gerar_chave(str(tmp_path), "ES256", "k1")
+        with pytest.raises(ValueError):
+            gerar_chave(str(tmp_path), "HS256")
+
+
+class TestRotaJwks:
+    """Testes de GET /.well-known/jwks.json"""
+
+    def test_publica_jwks_com_etag(self, client, tmp_path, monkeypatch):
+        """Resposta com as chaves, ETag e Cache-Control; If-None-Match retorna 304"""
+        gerar_chave(str(tmp_path), "ES256", "k1")
+        chaveiro = Chaveiro("ES256", diretorio=str(tmp_path))
+        monkeypatch.setattr(rota_chaves, "chaveiro", chaveiro)
+
+        response = client.get("/.well-known/jwks.json")
+
+        assert response.status_code == 200
+        assert response.json()["keys"][0]["kid"] == "k1"
+        assert response.headers["etag"] == chaveiro.jwks_etag
+        assert "max-age" in response.headers["cache-control"]
+
+        nao_modificado = client.get("/.well-known/jwks.json", headers={"If-None-Match": chaveiro.jwks_etag})
+        assert nao_modificado.status_code == 304
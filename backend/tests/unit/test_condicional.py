@@ -0,0 +1,97 @@
+"""Testes unitarios para o GET condicional"""
+from datetime import datetime, timedelta
+
+from starlette.requests import Request
+
+from app.models.models import Categoria, Produto
+from app.services.condicional import (
+    calcular_validador, etag_corresponde, resposta_nao_modificada, resumo, resumo_produtos
+)
+
+
+def _requisicao(**headers) -> Request:
+    """Request mínima com os headers informados"""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "headers": [(nome.replace("_", "-").encode(), valor.encode()) for nome, valor in headers.items()],
+    })
+
+
+class TestValidador:
+    """Testes do cálculo do validador"""
+
+    def test_etag_estavel_e_por_escopo(self, db, categorias_diversas):
+        """Mesmos dados geram o mesmo ETag; escopos diferentes, ETags diferentes"""
+        primeiro = calcular_validador(db, "categorias", *resumo(Categoria))
+        segundo = calcular_validador(db, "categorias", *resumo(Categoria))
+        outro = calcular_validador(db, "outro", *resumo(Categoria))
+
+        assert primeiro == segundo
+        assert primeiro.etag != outro.etag
+        assert primeiro.etag.startswith('W/"')
+        assert primeiro.ultima_modificacao == max(c.updated_at for c in categorias_diversas)
+
+    def test_muda_com_atualizacao_e_remocao(self, db, categorias_diversas):
+        """Atualizar ou remover uma linha muda o ETag"""
+        inicial = calcular_validador(db, "categorias", *resumo(Categoria))
+
+        categorias_diversas[0].nome = "Pizzas Especiais"
+        db.commit()
+        atualizado = calcular_validador(db, "categorias", *resumo(Categoria))
+
+        db.delete(categorias_diversas[2])
+        db.commit()
+        removido = calcular_validador(db, "categorias", *resumo(Categoria))
+
+        assert len({inicial.etag, atualizado.etag, removido.etag}) == 3
+
+    def test_produto_muda_com_variacao(self, db, produto_teste):
+        """Alterar uma variação embutida muda o validador do produto"""
+        filtro = Produto.id == produto_teste.id
+        inicial = calcular_validador(db, "produto", *resumo_produtos(filtro), obrigatorio=True)
+
+        produto_teste.variacoes[0].preco += 1
+        db.commit()
+
+        assert calcular_validador(db, "produto", *resumo_produtos(filtro), obrigatorio=True) != inicial
+
+    def test_recurso_inexistente(self, db):
+        """Recurso obrigatório sem linhas não tem validador"""
+        assert calcular_validador(db, "produto", *resumo_produtos(Produto.id == 999), obrigatorio=True) is None
+
+
+class TestRespostaNaoModificada:
+    """Testes da decisão de responder 304"""
+
+    def _validador(self, db):
+        return calcular_validador(db, "categorias", *resumo(Categoria))
+
+    def test_if_none_match(self, db, categorias_diversas):
+        """ETag igual responde 304 com os validadores"""
+        validador = self._validador(db)
+
+        resposta = resposta_nao_modificada(_requisicao(if_none_match=validador.etag), validador)
+
+        assert resposta.status_code == 304
+        assert resposta.headers["etag"] == validador.etag
+        assert "last-modified" in resposta.headers
+        assert resposta_nao_modificada(_requisicao(if_none_match='"outro"'), validador) is None
+
+    def test_if_modified_since(self, db, categorias_diversas):
+        """If-Modified-Since vale só sem If-None-Match"""
+        validador = self._validador(db)
+        futuro = (datetime.utcnow() + timedelta(minutes=1)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        passado = (validador.ultima_modificacao - timedelta(minutes=1)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+        assert resposta_nao_modificada(_requisicao(if_modified_since=futuro), validador).status_code == 304
+        assert resposta_nao_modificada(_requisicao(if_modified_since=passado), validador) is None
+        assert resposta_nao_modificada(_requisicao(if_modified_since="data inválida"), validador) is None
+        assert resposta_nao_modificada(
+            _requisicao(if_none_match='"outro"', if_modified_since=futuro), validador
+        ) is None
+
+    def test_etag_fraco(self):
+        """Comparação fraca aceita ETags com ou sem W/"""
+        assert etag_corresponde('"abc"', 'W/"abc"')
+        assert etag_corresponde('W/"abc"', 'W/"abc"')
@@ -0,0 +1,169 @@
+"""Testes unitarios para o indice de disponibilidade efetiva"""
+import threading
+
+import pytest
+
+from app.exceptions import ProdutoIndisponivel
+from app.models.models import ProdutoIngrediente
+from app.schemas.schemas import ItemPedidoCreate, PedidoCreate
+from app.services.cardapio import carregar_cardapio
+from app.services import catalogo
+from app.services.catalogo import obter_catalogo
+from app.services.disponibilidade import IndiceDisponibilidade, indice_disponibilidade
+from app.services.precificacao import precificar_pedido
+from tests.conftest import TestingSessionLocal
+
+
+def _mapa(db):
+    """Mapa do índice global na versão atual do catálogo"""
+    return indice_disponibilidade.obter(obter_catalogo(db))
+
+
+class TestDerivacao:
+    """Testes das regras de disponibilidade efetiva"""
+
+    def test_produto_e_variacoes_disponiveis(self, db, produto_teste):
+        """Testa o caso comum: tudo disponível"""
+        mapa = _mapa(db)
+
+        assert mapa.produto_disponivel(produto_teste.id)
+        assert all(mapa.variacao_disponivel(v.id) for v in produto_teste.variacoes)
+
+    def test_ingrediente_obrigatorio_indisponivel(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa que faltar um ingrediente obrigatório indisponibiliza o produto"""
+        ingredientes_diversos[0].disponivel = False  # Mussarela (obrigatória)
+        db.commit()
+
+        mapa = _mapa(db)
+
+        assert not mapa.produto_disponivel(produto_com_ingredientes.id)
+        assert not any(mapa.variacao_disponivel(v.id) for v in produto_com_ingredientes.variacoes)
+
+    def test_ingrediente_opcional_indisponivel(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa que ingrediente não obrigatório não afeta o produto"""
+        ingredientes_diversos[1].disponivel = False  # Tomate (opcional)
+        db.commit()
+
+        assert _mapa(db).produto_disponivel(produto_com_ingredientes.id)
+
+    def test_todas_variacoes_indisponiveis(self, db, produto_teste):
+        """Testa que sem variação disponível o produto fica indisponível"""
+        for variacao in produto_teste.variacoes:
+            variacao.disponivel = False
+        db.commit()
+
+        assert not _mapa(db).produto_disponivel(produto_teste.id)
+
+    def test_categoria_inativa(self, db, produto_teste, categoria_teste):
+        """Testa que categoria inativa indisponibiliza os produtos"""
+        categoria_teste.ativa = False
+        db.commit()
+
+        assert not _mapa(db).produto_disponivel(produto_teste.id)
+
+        categoria_teste.ativa = True
+        db.commit()
+
+        assert _mapa(db).produto_disponivel(produto_teste.id)
+
+
+class TestManutencaoIncremental:
+    """Testes da atualização incremental a partir das alterações do catálogo"""
+
+    def test_rederiva_so_os_afetados(self, db, cardapio_completo, monkeypatch):
+        """Testa que trocar a flag de uma variação rederiva só o produto dela"""
+        _mapa(db)
+        derivados = []
+        original = indice_disponibilidade._derivar
+        monkeypatch.setattr(
+            indice_disponibilidade, "_derivar", lambda *args: (derivados.append(args[1]), original(*args))
+        )
+
+        produto = cardapio_completo["produtos"][1]
+        produto.variacoes[0].disponivel = False
+        db.commit()
+        mapa = _mapa(db)
+
+        assert derivados == [produto.id]
+        assert not mapa.produto_disponivel(produto.id)
+
+    def test_nova_associacao_obrigatoria(self, db, produto_teste, ingredientes_diversos):
+        """Testa que associar um ingrediente obrigatório indisponível afeta o produto"""
+        assert _mapa(db).produto_disponivel(produto_teste.id)
+
+        bacon = ingredientes_diversos[4]  # Indisponível
+        db.add(ProdutoIngrediente(produto_id=produto_teste.id, ingrediente_id=bacon.id, obrigatorio=True))
+        db.commit()
+
+        assert not _mapa(db).produto_disponivel(produto_teste.id)
+
+    def test_leitura_durante_invalidacao(self, db, cardapio_completo, monkeypatch):
+        """Testa que uma leitura concorrente com a troca de versão não perde as alterações"""
+        pizza = cardapio_completo["produtos"][0]
+        mussarela = cardapio_completo["ingredientes"][0]  # Obrigatória na Pizza Calabresa
+        _mapa(db)
+
+        def ler_em_outra_thread(versao, alteracoes):
+            # Outra requisição lê o catálogo enquanto o commit notifica os observadores
+            def ler():
+                sessao = TestingSessionLocal()
+                try:
+                    indice_disponibilidade.obter(obter_catalogo(sessao))
+                finally:
+                    sessao.close()
+            leitor = threading.Thread(target=ler)
+            leitor.start()
+            leitor.join()
+
+        monkeypatch.setattr(catalogo, "_observadores", [ler_em_outra_thread, *catalogo._observadores])
+        mussarela.disponivel = False
+        db.commit()
+
+        assert not _mapa(db).produto_disponivel(pizza.id)
+
+    def test_incremental_igual_a_reconstrucao(self, db, cardapio_completo, ingredientes_diversos,
+                                              categorias_diversas):
+        """Testa que uma sequência de alterações leva ao mesmo mapa que reconstruir"""
+        _mapa(db)
+        ingredientes_diversos[0].disponivel = False
+        db.commit()
+        _mapa(db)
+        categorias_diversas[1].ativa = False
+        cardapio_completo["produtos"][0].variacoes[0].disponivel = False
+        db.commit()
+        _mapa(db)
+        ingredientes_diversos[0].disponivel = True
+        db.delete(cardapio_completo["produtos"][3])
+        db.commit()
+
+        incremental = _mapa(db)
+        reconstruido = IndiceDisponibilidade().obter(obter_catalogo(db))
+
+        assert dict(incremental.produtos) == dict(reconstruido.produtos)
+        assert dict(incremental.variacoes) == dict(reconstruido.variacoes)
+
+
+class TestConsumidores:
+    """Testes do cardápio e da precificação lendo o índice"""
+
+    def test_pedido_com_obrigatorio_em_falta(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa que o pedido é recusado quando falta ingrediente obrigatório"""
+        ingredientes_diversos[0].disponivel = False
+        db.commit()
+        pedido = PedidoCreate(itens=[
+            ItemPedidoCreate(produto_variacao_id=produto_com_ingredientes.variacoes[0].id, quantidade=1)
+        ])
+
+        with pytest.raises(ProdutoIndisponivel):
+            precificar_pedido(pedido, db)
+
+    def test_cardapio_omite_produto_sem_variacao_disponivel(self, db, cardapio_completo):
+        """Testa que o cardápio usa a disponibilidade efetiva"""
+        produto = cardapio_completo["produtos"][0]
+        produto.variacoes[0].disponivel = False
+        db.commit()
+
+        ids = {p.id for categoria in carregar_cardapio(db)["categorias"] for p in categoria["produtos"]}
+
+        assert produto.id not in ids
+        assert cardapio_completo["produtos"][1].id in ids
@@ -0,0 +1,114 @@
+"""Testes unitarios para a atualização do esquema de bancos de versões anteriores"""
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import get_async_db, get_db
+from app.esquema import atualizar_esquema
+from app.main import app
+
+# Tabela usuarios como criada antes de token_versao
+USUARIOS_ANTIGA = """
+CREATE TABLE usuarios (
+    id INTEGER NOT NULL,
+    nome VARCHAR NOT NULL,
+    email VARCHAR NOT NULL,
+    senha VARCHAR NOT NULL,
+    ativo BOOLEAN,
+    admin BOOLEAN,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    deleted_at DATETIME,
+    PRIMARY KEY (id)
+)
+"""
+
+PEDIDOS_ANTIGA = """
+CREATE TABLE pedidos (
+    id INTEGER NOT NULL,
+    status VARCHAR,
+    usuario_id INTEGER NOT NULL,
+    preco_total FLOAT,
+    endereco_entrega_id INTEGER,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    deleted_at DATETIME,
+    PRIMARY KEY (id)
+)
+"""
+
+
+@pytest.fixture
+def banco_antigo(tmp_path):
+    """Banco SQLite com usuarios e pedidos no esquema anterior e um usuário cadastrado"""
+    url = f"sqlite:///{tmp_path / 'antigo.db'}"
+    motor = create_engine(url)
+    senha_hash = bcrypt.hashpw(b"senha123", bcrypt.gensalt()).decode()
+    with motor.begin() as conexao:
+        conexao.execute(text(USUARIOS_ANTIGA))
+        conexao.execute(text(PEDIDOS_ANTIGA))
+        conexao.execute(
+            text(
+                "INSERT INTO usuarios (id, nome, email, senha, ativo, admin, created_at, updated_at) "
+                "VALUES (1, 'Antigo', 'antigo@exemplo.com', :senha, 1, 0, '2024-01-01', '2024-01-01')"
+            ),
+            {"senha": senha_hash}
+        )
+    yield motor, url
+    motor.dispose()
+
+
+class TestAtualizarEsquema:
+    """Testes de atualizar_esquema"""
+
+    def test_adiciona_coluna_e_indices(self, banco_antigo):
+        """Colunas e índices novos são criados em tabelas existentes"""
+        motor, _ = banco_antigo
+
+        comandos = atualizar_esquema(motor)
+
+        inspetor = inspect(motor)
+        assert "token_versao" in {c["name"] for c in inspetor.get_columns("usuarios")}
+        assert "ix_pedidos_created_at_id" in {i["name"] for i in inspetor.get_indexes("pedidos")}
+        assert "estatisticas_usuarios" in inspetor.get_table_names()
+        assert any("token_versao" in comando for comando in comandos)
+        with motor.connect() as conexao:
+            assert conexao.execute(text("SELECT token_versao FROM usuarios")).scalar_one() == 0
+
+    def test_idempotente(self, banco_antigo):
+        """Com o esquema em dia nada é executado"""
+        motor, _ = banco_antigo
+        atualizar_esquema(motor)
+
+        assert atualizar_esquema(motor) == []
+
+    def test_login_em_banco_atualizado(self, db, banco_antigo):
+        """Login e rotas autenticadas funcionam em um banco da versão anterior"""
+        motor, url = banco_antigo
+        atualizar_esquema(motor)
+        motor_async = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+        sessoes = async_sessionmaker(bind=motor_async, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessoes() as sessao:
+                yield sessao
+
+        def override_get_db():
+            raise AssertionError("rota síncrona não esperada")
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            client = TestClient(app)
+            response = client.post("/auth/login", json={"email": "antigo@exemplo.com", "senha": "senha123"})
+            assert response.status_code == 200
+
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            assert client.post("/auth/refresh", json={"refresh_token": response.json()["refresh_token"]})\
+                .status_code == 200
+            assert client.get("/pedidos/meus", headers=headers).json() == []
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,54 @@
+"""Testes unitarios para o ledger de estatisticas de pedidos"""
+from app.models.models import EstatisticaUsuario, Pedido
+from app.services.estatisticas import recalcular_estatisticas
+
+
+class TestRecalcularEstatisticas:
+    """Testes da reconstrucao do ledger a partir do historico"""
+
+    def test_cria_ledger_a_partir_do_historico(self, db, usuario_teste):
+        """Testa que o recalculo gera as contagens e o valor total"""
+        db.add_all([
+            Pedido(usuario_id=usuario_teste.id, status="PENDENTE", preco_total=20.0),
+            Pedido(usuario_id=usuario_teste.id, status="ENTREGUE", preco_total=30.5),
+            Pedido(usuario_id=usuario_teste.id, status="ENTREGUE", preco_total=10.0),
+        ])
+        db.commit()
+
+        assert recalcular_estatisticas(db) == [usuario_teste.id]
+
+        estatistica = db.get(EstatisticaUsuario, usuario_teste.id)
+        assert estatistica.total_pedidos == 3
+        assert estatistica.valor_total == 60.5
+        assert estatistica.pendente == 1
+        assert estatistica.entregue == 2
+        assert estatistica.cancelado == 0
+
+    def test_corrige_ledger_divergente(self, db, usuario_teste):
+        """Testa que uma linha desatualizada é detectada e corrigida"""
+        db.add(Pedido(usuario_id=usuario_teste.id, status="PRONTO", preco_total=15.0))
+        db.add(EstatisticaUsuario(usuario_id=usuario_teste.id, total_pedidos=7, valor_total=1.0))
+        db.commit()
+
+        assert recalcular_estatisticas(db, aplicar=False) == [usuario_teste.id]
+        db.expire_all()
+        assert db.get(EstatisticaUsuario, usuario_teste.id).total_pedidos == 7
+
+        assert recalcular_estatisticas(db) == [usuario_teste.id]
+        db.expire_all()
+        estatistica = db.get(EstatisticaUsuario, usuario_teste.id)
+        assert estatistica.total_pedidos == 1
+        assert estatistica.pronto == 1
+
+        assert recalcular_estatisticas(db, aplicar=False) == []
+
+    def test_usuario_sem_pedidos_zera_ledger(self, db, usuario_teste):
+        """Testa que um ledger sem pedidos correspondentes volta a zero"""
+        db.add(EstatisticaUsuario(usuario_id=usuario_teste.id, total_pedidos=2, valor_total=40.0, pendente=2))
+        db.commit()
+
+        assert recalcular_estatisticas(db) == [usuario_teste.id]
+        db.expire_all()
+        estatistica = db.get(EstatisticaUsuario, usuario_teste.id)
+        assert estatistica.total_pedidos == 0
+        assert estatistica.pendente == 0
@@ -0,0 +1,181 @@
+"""Testes unitarios para o registro de Idempotency-Key"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.exceptions import ChaveIdempotenciaReutilizada
+from app.models.models import Pedido, RespostaIdempotente
+from app.services.idempotencia import RegistroIdempotencia, impressao_requisicao
+from tests.conftest import TestingAsyncSessionLocal
+
+
+async def _executar(registro: RegistroIdempotencia, usuario_id, chave, impressao, produzir):
+    """Executa com uma sessão própria, como uma requisição"""
+    async with TestingAsyncSessionLocal() as sessao:
+        return await registro.executar(sessao, usuario_id, chave, impressao, lambda: produzir(sessao))
+
+
+async def _contar(modelo) -> int:
+    """Linhas gravadas na tabela do modelo"""
+    async with TestingAsyncSessionLocal() as sessao:
+        return await sessao.scalar(select(func.count()).select_from(modelo))
+
+
+async def _criar_pedido(sessao, usuario_id: int = 1):
+    """Escrita feita por produzir, sem commit"""
+    await sessao.execute(insert(Pedido).values(usuario_id=usuario_id, preco_total=10.0, status="PENDENTE"))
+
+
+class TestRegistroIdempotencia:
+    """Testes do armazenamento e replay de respostas"""
+
+    async def test_repeticao_devolve_resposta_gravada(self, db):
+        """Testa que a repetição devolve os bytes gravados sem executar de novo"""
+        registro = RegistroIdempotencia(ttl_segundos=60, limpeza_segundos=60)
+        execucoes = []
+
+        async def produzir(sessao):
+            execucoes.append(1)
+            await _criar_pedido(sessao)
+            return 201, b'{"id": 1}'
+
+        primeira, replay_primeira = await _executar(registro, 1, "chave", "abc", produzir)
+        segunda, replay_segunda = await _executar(registro, 1, "chave", "abc", produzir)
+
+        assert len(execucoes) == 1
+        assert (replay_primeira, replay_segunda) == (False, True)
+        assert segunda.corpo == primeira.corpo == b'{"id": 1}'
+        assert await _contar(Pedido) == 1
+
+    async def test_resposta_vista_por_outro_processo(self, db):
+        """Testa que outra instância do registro (outro worker) encontra a resposta"""
+        async def produzir(sessao):
+            await _criar_pedido(sessao)
+            return 201, b"ok"
+
+        await _executar(RegistroIdempotencia(60, 60), 1, "chave", "abc", produzir)
+        resposta, replay = await _executar(RegistroIdempotencia(60, 60), 1, "chave", "abc", produzir)
+
+        assert replay is True
+        assert await _contar(Pedido) == 1
+
+    async def test_duplicatas_concorrentes_aguardam_a_original(self, db):
+        """Testa que requisições simultâneas com a mesma chave processam uma única vez"""
+        registros = [RegistroIdempotencia(60, 60, intervalo_espera=0.01) for _ in range(3)]
+        execucoes = []
+
+        async def produzir(sessao):
+            execucoes.append(1)
+            await asyncio.sleep(0.1)  # Duplicatas chegam durante o processamento
+            await _criar_pedido(sessao)
+            return 201, b'{"id": 1}'
+
+        resultados = await asyncio.gather(*(
+            _executar(registro, 1, "chave", "abc", produzir) for registro in registros
+        ))
+
+        assert len(execucoes) == 1
+        assert sorted(replay for _, replay in resultados) == [False, True, True]
+        assert {resposta.corpo for resposta, _ in resultados} == {b'{"id": 1}'}
+        assert await _contar(Pedido) == 1
+
+    async def test_reserva_abandonada_vence(self, db):
+        """Testa que a chave de uma requisição que não terminou é liberada ao vencer"""
+        async with TestingAsyncSessionLocal() as sessao:
+            await sessao.execute(insert(RespostaIdempotente).values(
+                usuario_id=1, chave="chave", impressao="abc", expira_em=datetime.utcnow() - timedelta(seconds=1)
+            ))
+            await sessao.commit()
+
+        async def produzir(sessao):
+            return 201, b"ok"
+
+        resposta, replay = await _executar(RegistroIdempotencia(60, 60), 1, "chave", "abc", produzir)
+
+        assert (resposta.corpo, replay) == (b"ok", False)
+
+    async def test_excecao_libera_a_chave(self, db):
+        """Testa que uma falha inesperada desfaz o pedido e libera a chave"""
+        registro = RegistroIdempotencia(60, 60)
+
+        async def falhar(sessao):
+            await _criar_pedido(sessao)
+            raise RuntimeError("falha")
+
+        with pytest.raises(RuntimeError):
+            await _executar(registro, 1, "chave", "abc", falhar)
+
+        assert await _contar(RespostaIdempotente) == 0
+        assert await _contar(Pedido) == 0
+
+    async def test_erro_de_negocio_e_guardado(self, db):
+        """Testa que a resposta 4xx é devolvida de novo sem reexecutar"""
+        registro = RegistroIdempotencia(60, 60)
+        execucoes = []
+
+        async def produzir(sessao):
+            execucoes.append(1)
+            return 404, b'{"error": "ProdutoNaoEncontrado"}'
+
+        await _executar(registro, 1, "chave", "abc", produzir)
+        resposta, replay = await _executar(registro, 1, "chave", "abc", produzir)
+
+        assert (resposta.status_code, replay) == (404, True)
+        assert len(execucoes) == 1
+
+    async def test_erro_5xx_nao_e_guardado(self, db):
+        """Testa que a resposta 5xx não ocupa a chave nem mantém as escritas"""
+        registro = RegistroIdempotencia(60, 60)
+
+        async def produzir(sessao):
+            await _criar_pedido(sessao)
+            return 503, b"{}"
+
+        await _executar(registro, 1, "chave", "abc", produzir)
+
+        assert await _contar(RespostaIdempotente) == 0
+        assert await _contar(Pedido) == 0
+
+    async def test_impressao_diferente_rejeitada(self, db):
+        """Testa que a chave não pode ser reaproveitada para outro corpo"""
+        registro = RegistroIdempotencia(60, 60)
+
+        async def produzir(sessao):
+            return 201, b"ok"
+
+        await _executar(registro, 1, "chave", impressao_requisicao({"a": 1}), produzir)
+
+        with pytest.raises(ChaveIdempotenciaReutilizada):
+            await _executar(registro, 1, "chave", impressao_requisicao({"a": 2}), produzir)
+
+    async def test_chaves_isoladas_por_usuario(self, db):
+        """Testa que a mesma chave de usuários diferentes não colide"""
+        registro = RegistroIdempotencia(60, 60)
+
+        async def produzir(sessao):
+            return 201, b"ok"
+
+        _, replay_usuario_1 = await _executar(registro, 1, "chave", "abc", produzir)
+        _, replay_usuario_2 = await _executar(registro, 2, "chave", "xyz", produzir)
+
+        assert replay_usuario_1 is False
+        assert replay_usuario_2 is False
+
+    async def test_expiracao_por_ttl(self, db):
+        """Testa que respostas vencidas são substituídas e removidas"""
+        registro = RegistroIdempotencia(ttl_segundos=0, limpeza_segundos=0)
+        execucoes = []
+
+        async def produzir(sessao):
+            execucoes.append(1)
+            return 201, b"ok"
+
+        await _executar(registro, 1, "chave", "abc", produzir)
+        await _executar(registro, 2, "outra", "abc", produzir)
+        _, replay = await _executar(registro, 1, "chave", "abc", produzir)
+
+        assert replay is False
+        assert len(execucoes) == 3
+        assert await _contar(RespostaIdempotente) == 1
@@ -0,0 +1,232 @@
+"""Testes unitarios para a identidade dos usuários autenticados (cache e claims)"""
+from unittest.mock import patch
+
+from sqlalchemy import event, text, update
+
+from app.models.models import Usuario
+from app.services import metricas
+from app.services.identidade import CacheUsuarios, MapaRevogacao, UsuarioAutenticado, cache_usuarios
+from tests.conftest import TestingAsyncSessionLocal
+
+
+async def _obter(usuario_id: int, cache: CacheUsuarios = cache_usuarios):
+    """Lê o usuário pelo cache com uma sessão assíncrona de teste"""
+    async with TestingAsyncSessionLocal() as sessao:
+        return await cache.obter(sessao, usuario_id)
+
+
+class TestCacheUsuarios:
+    """Testes de leitura, TTL e limite de entradas"""
+
+    async def test_guarda_campos_de_autorizacao(self, db, usuario_teste):
+        """Falha consulta o banco; a leitura seguinte vem do cache"""
+        falhas = metricas.cache_usuarios.valor(resultado="falha")
+        acertos = metricas.cache_usuarios.valor(resultado="acerto")
+
+        primeiro = await _obter(usuario_teste.id)
+        segundo = await _obter(usuario_teste.id)
+
+        assert primeiro == UsuarioAutenticado(id=usuario_teste.id, ativo=True, admin=False)
+        assert segundo is primeiro
+        assert metricas.cache_usuarios.valor(resultado="falha") == falhas + 1
+        assert metricas.cache_usuarios.valor(resultado="acerto") == acertos + 1
+
+    async def test_usuario_inexistente_nao_e_guardado(self, db):
+        """IDs sem usuário retornam None e não ocupam o cache"""
+        assert await _obter(999) is None
+        assert len(cache_usuarios) == 0
+
+    async def test_ttl(self, db, usuario_teste):
+        """Entrada vencida é relida do banco"""
+        cache = CacheUsuarios(ttl_segundos=0, max_entradas=10)
+
+        primeiro = await _obter(usuario_teste.id, cache)
+        segundo = await _obter(usuario_teste.id, cache)
+
+        assert segundo == primeiro
+        assert segundo is not primeiro
+
+    async def test_limite_de_entradas(self, db, usuario_teste, admin_teste):
+        """Acima do limite sai o usado há mais tempo"""
+        cache = CacheUsuarios(ttl_segundos=60, max_entradas=1)
+
+        await _obter(usuario_teste.id, cache)
+        await _obter(admin_teste.id, cache)
+
+        assert len(cache) == 1
+        assert admin_teste.id in cache._entradas
+
+
+class TestInvalidacao:
+    """Testes da invalidação pelas escritas em usuários"""
+
+    async def test_desativacao(self, db, usuario_teste):
+        """Desativar o usuário descarta a entrada no commit"""
+        await _obter(usuario_teste.id)
+
+        usuario_teste.ativo = False
+        db.commit()
+
+        assert usuario_teste.id not in cache_usuarios._entradas
+        assert (await _obter(usuario_teste.id)).ativo is False
+
+    async def test_remocao(self, db, usuario_teste):
+        """Remover o usuário descarta a entrada"""
+        await _obter(usuario_teste.id)
+
+        db.delete(usuario_teste)
+        db.commit()
+
+        assert await _obter(usuario_teste.id) is None
+
+    async def test_rollback_nao_invalida(self, db, usuario_teste):
+        """Alteração revertida mantém a entrada"""
+        await _obter(usuario_teste.id)
+
+        usuario_teste.admin = True
+        db.flush()
+        db.rollback()
+
+        assert usuario_teste.id in cache_usuarios._entradas
+
+    async def test_update_em_lote(self, db, usuario_teste):
+        """UPDATE em lote descarta o cache inteiro"""
+        await _obter(usuario_teste.id)
+
+        db.execute(update(Usuario).values(admin=True))
+        db.commit()
+
+        assert len(cache_usuarios) == 0
+
+    async def test_leitura_concorrente_com_commit_nao_e_guardada(self, db, usuario_teste):
+        """Leitura iniciada antes de uma invalidação não guarda o resultado"""
+        cache = CacheUsuarios(ttl_segundos=60, max_entradas=10)
+
+        class SessaoComCommitConcorrente:
+            """Sessão que invalida o cache durante a consulta"""
+            def __init__(self, sessao):
+                self.sessao = sessao
+
+            async def execute(self, *args):
+                cache.invalidar({usuario_teste.id})
+                return await self.sessao.execute(*args)
+
+        async with TestingAsyncSessionLocal() as sessao:
+            await cache.obter(SessaoComCommitConcorrente(sessao), usuario_teste.id)
+
+        assert len(cache) == 0
+
+
+class TestDependencia:
+    """Testes de obter_usuario_atual com o cache"""
+
+    def test_usuario_desativado_perde_acesso(self, client, db, usuario_teste, token_usuario):
+        """Desativação vale na requisição seguinte, mesmo com o usuário em cache"""
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        assert client.get("/pedidos/meus", headers=headers).status_code == 200
+
+        usuario_teste.ativo = False
+        db.commit()
+
+        assert client.get("/pedidos/meus", headers=headers).status_code == 403
+
+    def test_promocao_a_admin(self, client, db, usuario_teste, token_usuario):
+        """Promoção a admin vale na requisição seguinte"""
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        assert client.get("/pedidos/", headers=headers).status_code == 403
+
+        usuario_teste.admin = True
+        db.commit()
+
+        assert client.get("/pedidos/", headers=headers).status_code == 200
+
+
+class TestClaimsAutorizacao:
+    """Testes da autorização pelas claims do token"""
+
+    def test_token_traz_claims(self, client, usuario_teste):
+        """Login emite adm, atv e ver"""
+        from jose import jwt
+        from app.config import ALGORITHM, SECRET_KEY
+
+        token = client.post("/auth/login", json={"email": "teste@exemplo.com", "senha": "senha123"})\
+            .json()["access_token"]
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+        assert (claims["adm"], claims["atv"], claims["ver"]) == (False, True, 0)
+
+    def test_autoriza_sem_consultar_usuario(self, client, token_admin):
+        """Com o mapa carregado, rotas de admin não leem a tabela usuarios"""
+        consultas = []
+
+        def registrar(conn, cursor, sql, *args):
+            consultas.append(sql)
+
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        assert client.get("/pedidos/", headers=headers).status_code == 200
+
+        motor = TestingAsyncSessionLocal.kw["bind"].sync_engine
+        event.listen(motor, "before_cursor_execute", registrar)
+        try:
+            with patch.object(cache_usuarios, "obter", side_effect=AssertionError("cache consultado")):
+                assert client.get("/pedidos/", headers=headers).status_code == 200
+        finally:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+        assert not [sql for sql in consultas if "FROM usuarios" in sql]
+
+    def test_rebaixar_admin_revoga_claims(self, client, db, admin_teste, token_admin):
+        """Token antigo de admin perde o acesso assim que o papel muda"""
+        headers = {"Authorization": f"Bearer {token_admin}"}
+        assert client.get("/pedidos/", headers=headers).status_code == 200
+
+        admin_teste.admin = False
+        db.commit()
+
+        assert client.get("/pedidos/", headers=headers).status_code == 403
+
+    def test_usuario_removido(self, client, db, usuario_teste, token_usuario):
+        """Token de usuário removido é recusado"""
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+        assert client.get("/pedidos/meus", headers=headers).status_code == 200
+
+        db.delete(usuario_teste)
+        db.commit()
+
+        assert client.get("/pedidos/meus", headers=headers).status_code == 401
+
+
+class TestVersaoToken:
+    """Testes do incremento de token_versao e do mapa de revogação"""
+
+    def test_incrementa_so_com_ativo_ou_admin(self, db, usuario_teste):
+        """Nome não muda a versão; ativo e admin mudam"""
+        usuario_teste.nome = "Outro Nome"
+        db.commit()
+        assert usuario_teste.token_versao == 0
+
+        usuario_teste.ativo = False
+        db.commit()
+        usuario_teste.admin = True
+        db.commit()
+        assert usuario_teste.token_versao == 2
+
+    def test_update_em_lote_incrementa(self, db, usuario_teste):
+        """UPDATE em lote incrementa a versão das linhas atingidas"""
+        db.execute(update(Usuario).where(Usuario.id == usuario_teste.id).values(admin=True))
+        db.commit()
+        db.refresh(usuario_teste)
+
+        assert usuario_teste.token_versao == 1
+
+    async def test_revalida_escritas_de_outro_processo(self, db, usuario_teste):
+        """Alteração sem eventos (outro processo) aparece após a revalidação"""
+        mapa = MapaRevogacao(revalidar_segundos=0)
+        async with TestingAsyncSessionLocal() as sessao:
+            assert await mapa.minimo(sessao, usuario_teste.id) == 0
+
+        db.execute(text("UPDATE usuarios SET token_versao = 5 WHERE id = :id"), {"id": usuario_teste.id})
+        db.commit()
+
+        async with TestingAsyncSessionLocal() as sessao:
+            assert await mapa.minimo(sessao, usuario_teste.id) == 5
@@ -0,0 +1,51 @@
+"""Testes unitarios para as metricas no formato Prometheus"""
+from app.services.metricas import Contador, Histograma, Medidor, RegistroMetricas
+
+
+class TestFormatoPrometheus:
+    """Testes da serializacao das metricas em memoria"""
+
+    def test_contador_com_rotulos(self):
+        """Testa acumulação e escape de rótulos"""
+        contador = Contador("teste_total", "Ajuda", ("rota",))
+        contador.inc(rota="/a")
+        contador.inc(2, rota="/a")
+        contador.inc(rota='/b"x')
+
+        linhas = contador.exportar()
+        assert linhas[:2] == ["# HELP teste_total Ajuda", "# TYPE teste_total counter"]
+        assert 'teste_total{rota="/a"} 3' in linhas
+        assert 'teste_total{rota="/b\\"x"} 1' in linhas
+
+    def test_medidor_sem_rotulos(self):
+        """Testa medidor sem rótulos, exportado mesmo sem valor"""
+        medidor = Medidor("teste_valor", "Ajuda")
+        assert "teste_valor 0" in medidor.exportar()
+
+        medidor.definir(10.5)
+        medidor.inc(-0.25)
+        assert "teste_valor 10.25" in medidor.exportar()
+
+    def test_histograma_cumulativo(self):
+        """Testa buckets cumulativos, soma e contagem"""
+        histograma = Histograma("teste_segundos", "Ajuda", ("rota",), buckets=(0.1, 1.0))
+        for valor in (0.05, 0.1, 0.5, 3.0):
+            histograma.observar(valor, rota="/a")
+
+        linhas = histograma.exportar()
+        assert 'teste_segundos_bucket{rota="/a",le="0.1"} 2' in linhas
+        assert 'teste_segundos_bucket{rota="/a",le="1"} 3' in linhas
+        assert 'teste_segundos_bucket{rota="/a",le="+Inf"} 4' in linhas
+        assert 'teste_segundos_sum{rota="/a"} 3.65' in linhas
+        assert 'teste_segundos_count{rota="/a"} 4' in linhas
+
+    def test_registro_exporta_todas(self):
+        """Testa que o registro concatena as métricas terminando em nova linha"""
+        registro = RegistroMetricas()
+        registro.registrar(Contador("a_total", "A")).inc()
+        registro.registrar(Medidor("b", "B")).definir(2)
+
+        texto = registro.exportar()
+        assert texto.endswith("\n")
+        assert "a_total 1\n" in texto
+        assert "b 2\n" in texto
@@ -0,0 +1,130 @@
+"""Testes unitarios para o motor de precificacao de pedidos"""
+import pytest
+from sqlalchemy import event
+
+from app.schemas.schemas import PedidoCreate, ItemPedidoCreate
+from app.services.precificacao import precificar_pedido
+from app.exceptions import (
+    ProdutoVariacaoNaoEncontrada, IngredienteIndisponivel,
+    IngredienteObrigatorio, IngredienteNaoEncontrado
+)
+
+
+@pytest.fixture
+def contar_queries(db):
+    """Fixture que conta os SELECTs executados na conexao de teste"""
+    queries = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            queries.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", registrar)
+    yield queries
+    event.remove(engine, "before_cursor_execute", registrar)
+
+
+class TestPrecificarPedido:
+    """Testes do calculo de preco de pedidos em lote"""
+
+    def test_preco_com_customizacoes(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa preco base, adicionais e remocoes de um item"""
+        variacao = produto_com_ingredientes.variacoes[1]  # MEDIA 35.00
+        calabresa = ingredientes_diversos[3]
+        tomate = ingredientes_diversos[1]
+
+        pedido = PedidoCreate(itens=[
+            ItemPedidoCreate(
+                produto_variacao_id=variacao.id,
+                quantidade=2,
+                ingredientes_adicionados=[calabresa.id],
+                ingredientes_removidos=[tomate.id]
+            )
+        ])
+
+        resultado = precificar_pedido(pedido, db)
+
+        item = resultado.itens[0]
+        assert item.preco_base == 35.00
+        assert item.preco_ingredientes == 3.0
+        assert item.preco_total == 76.0
+        assert item.ingredientes_adicionados[0]["nome"] == "Calabresa"
+        assert item.ingredientes_removidos == [{"id": tomate.id, "nome": "Tomate"}]
+        assert resultado.preco_total == 76.0
+
+    def test_pedido_grande_nao_consulta_banco(self, db, produto_com_ingredientes,
+                                              ingredientes_diversos, contar_queries):
+        """Testa que, com o catalogo carregado, nenhum item gera consulta ao banco"""
+        variacao_ids = [variacao.id for variacao in produto_com_ingredientes.variacoes]
+        adicionais = [ingredientes_diversos[3].id, ingredientes_diversos[2].id]
+        removidos = [ingredientes_diversos[1].id, ingredientes_diversos[2].id]
+
+        def montar_pedido(quantidade_itens):
+            return PedidoCreate(itens=[
+                ItemPedidoCreate(
+                    produto_variacao_id=variacao_ids[i % len(variacao_ids)],
+                    quantidade=1,
+                    ingredientes_adicionados=adicionais,
+                    ingredientes_removidos=removidos
+                )
+                for i in range(quantidade_itens)
+            ])
+
+        pedido_pequeno = montar_pedido(1)
+        pedido_grande = montar_pedido(30)
+
+        precificar_pedido(pedido_pequeno, db)
+        contar_queries.clear()
+        resultado = precificar_pedido(pedido_grande, db)
+
+        assert contar_queries == []
+        assert len(resultado.itens) == 30
+
+    def test_variacao_inexistente(self, db, produto_teste):
+        """Testa erro quando a variacao nao existe"""
+        pedido = PedidoCreate(itens=[ItemPedidoCreate(produto_variacao_id=99999, quantidade=1)])
+
+        with pytest.raises(ProdutoVariacaoNaoEncontrada):
+            precificar_pedido(pedido, db)
+
+    def test_ingrediente_inexistente(self, db, produto_variacao_teste):
+        """Testa erro quando ingrediente adicionado nao existe"""
+        pedido = PedidoCreate(itens=[
+            ItemPedidoCreate(
+                produto_variacao_id=produto_variacao_teste.id,
+                quantidade=1,
+                ingredientes_adicionados=[99999]
+            )
+        ])
+
+        with pytest.raises(IngredienteNaoEncontrado):
+            precificar_pedido(pedido, db)
+
+    def test_ingrediente_indisponivel(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa erro ao adicionar ingrediente indisponivel"""
+        bacon = ingredientes_diversos[4]
+        pedido = PedidoCreate(itens=[
+            ItemPedidoCreate(
+                produto_variacao_id=produto_com_ingredientes.variacoes[0].id,
+                quantidade=1,
+                ingredientes_adicionados=[bacon.id]
+            )
+        ])
+
+        with pytest.raises(IngredienteIndisponivel):
+            precificar_pedido(pedido, db)
+
+    def test_remover_ingrediente_obrigatorio(self, db, produto_com_ingredientes, ingredientes_diversos):
+        """Testa erro ao remover ingrediente obrigatorio"""
+        mussarela = ingredientes_diversos[0]
+        pedido = PedidoCreate(itens=[
+            ItemPedidoCreate(
+                produto_variacao_id=produto_com_ingredientes.variacoes[0].id,
+                quantidade=1,
+                ingredientes_removidos=[mussarela.id]
+            )
+        ])
+
+        with pytest.raises(IngredienteObrigatorio):
+            precificar_pedido(pedido, db)
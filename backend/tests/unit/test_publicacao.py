@@ -0,0 +1,141 @@
+"""Testes unitarios para a publicação estática do cardápio"""
+import gzip
+import json
+import os
+import threading
+import time
+
+import brotli
+
+from app.services import publicacao
+from app.services.publicacao import PublicadorCardapio, publicar_cardapio
+
+
+class TestPublicarCardapio:
+    """Testes dos arquivos gerados"""
+
+    def test_mesmo_conteudo_da_api(self, client, db, cardapio_completo, tmp_path):
+        """Arquivos têm os mesmos bytes das rotas, também comprimidos"""
+        manifest = publicar_cardapio(db, str(tmp_path))
+
+        corpo = (tmp_path / "cardapio.json").read_bytes()
+        assert corpo == client.get("/cardapio/").content
+        assert (tmp_path / manifest["cardapio"]["arquivo"]).read_bytes() == corpo
+        assert gzip.decompress((tmp_path / "cardapio.json.gz").read_bytes()) == corpo
+        resposta = client.get("/cardapio/", headers={"Accept-Encoding": "identity"})
+        assert manifest["cardapio"]["etag"] == resposta.headers["etag"]
+
+        for categoria in cardapio_completo["categorias"]:
+            arquivo = tmp_path / "categorias" / str(categoria.id) / "produtos.json"
+            assert arquivo.read_bytes() == client.get(f"/cardapio/categorias/{categoria.id}/produtos").content
+
+    def test_brotli(self, db, cardapio_completo, tmp_path):
+        """Cada recurso tem a variante .br, que descomprime nos mesmos bytes"""
+        manifest = publicar_cardapio(db, str(tmp_path))
+
+        assert "br" in manifest["cardapio"]["compressoes"]
+        arquivos = [tmp_path / "cardapio.json", tmp_path / manifest["cardapio"]["arquivo"]]
+        arquivos += [tmp_path / "categorias" / str(c.id) / "produtos.json" for c in cardapio_completo["categorias"]]
+        for arquivo in arquivos:
+            comprimido = arquivo.with_name(arquivo.name + ".br")
+            assert comprimido.exists()
+            assert brotli.decompress(comprimido.read_bytes()) == arquivo.read_bytes()
+
+    def test_manifest_e_sem_temporarios(self, db, cardapio_completo, tmp_path):
+        """Manifest gravado por último e nenhum temporário sobra"""
+        manifest = publicar_cardapio(db, str(tmp_path))
+
+        assert json.loads((tmp_path / "manifest.json").read_bytes()) == manifest
+        assert set(manifest["categorias"]) == {str(c.id) for c in cardapio_completo["categorias"]}
+        assert not [caminho for caminho in tmp_path.rglob(".*")]
+
+    def test_mantem_versao_anterior_e_remove_antigas(self, db, cardapio_completo, tmp_path):
+        """Versões fora dos dois últimos manifests e sem uso recente são removidas"""
+        produto = cardapio_completo["produtos"][0]
+        primeiro = publicar_cardapio(db, str(tmp_path), retencao_segundos=0)["cardapio"]["arquivo"]
+
+        produto.nome = "Pizza Nova"
+        db.commit()
+        segundo = publicar_cardapio(db, str(tmp_path), retencao_segundos=0)["cardapio"]["arquivo"]
+        assert primeiro != segundo
+        assert (tmp_path / primeiro).exists()
+
+        produto.nome = "Pizza Mais Nova"
+        db.commit()
+        publicar_cardapio(db, str(tmp_path), retencao_segundos=0)
+
+        assert not (tmp_path / primeiro).exists()
+        assert not (tmp_path / f"{primeiro}.gz").exists()
+        assert (tmp_path / segundo).exists()
+
+    def test_mantem_versoes_recentes_de_outros_processos(self, db, cardapio_completo, tmp_path):
+        """Versão recente fora dos manifests (publicada por outro worker) não é removida"""
+        produto = cardapio_completo["produtos"][0]
+        primeiro = publicar_cardapio(db, str(tmp_path), retencao_segundos=60)["cardapio"]["arquivo"]
+        for nome in ("Pizza Nova", "Pizza Mais Nova"):
+            produto.nome = nome
+            db.commit()
+            publicar_cardapio(db, str(tmp_path), retencao_segundos=60)
+        assert (tmp_path / primeiro).exists()
+
+        # Sem uso há mais que a retenção: removida na próxima publicação
+        for caminho in tmp_path.glob(f"{primeiro}*"):
+            os.utime(caminho, (time.time() - 120, time.time() - 120))
+        publicar_cardapio(db, str(tmp_path), retencao_segundos=60)
+        assert not (tmp_path / primeiro).exists()
+
+    def test_reuso_renova_o_uso(self, db, cardapio_completo, tmp_path):
+        """Publicar de novo um conteúdo já gravado conta como uso recente"""
+        arquivo = tmp_path / publicar_cardapio(db, str(tmp_path))["cardapio"]["arquivo"]
+        os.utime(arquivo, (time.time() - 120, time.time() - 120))
+
+        publicar_cardapio(db, str(tmp_path))
+
+        assert arquivo.stat().st_mtime > time.time() - 60
+
+    def test_categoria_removida(self, db, cardapio_completo, tmp_path):
+        """Lista estável de uma categoria removida deixa de ser publicada"""
+        categoria = cardapio_completo["categorias"][2]
+        publicar_cardapio(db, str(tmp_path))
+        for produto in list(categoria.produtos):
+            db.delete(produto)
+        db.delete(categoria)
+        db.commit()
+
+        manifest = publicar_cardapio(db, str(tmp_path), retencao_segundos=0)
+
+        assert str(categoria.id) not in manifest["categorias"]
+        assert not (tmp_path / "categorias" / str(categoria.id) / "produtos.json").exists()
+
+
+class TestPublicador:
+    """Testes da publicação em segundo plano"""
+
+    def test_desativado_sem_diretorio(self):
+        """Sem diretório não inicia thread e agendar não faz nada"""
+        publicador = PublicadorCardapio()
+        publicador.iniciar("")
+        publicador.agendar()
+
+        assert publicador._thread is None
+
+    def test_publica_ao_iniciar_e_ao_agendar(self, tmp_path, monkeypatch):
+        """Publica na inicialização e de novo quando o catálogo muda"""
+        chamadas = []
+        publicou = threading.Semaphore(0)
+
+        def publicar(db, diretorio):
+            chamadas.append(diretorio)
+            publicou.release()
+
+        monkeypatch.setattr(publicacao, "publicar_cardapio", publicar)
+        publicador = PublicadorCardapio()
+        publicador.iniciar(str(tmp_path))
+        try:
+            assert publicou.acquire(timeout=5)
+            publicador.agendar()
+            assert publicou.acquire(timeout=5)
+        finally:
+            publicador.encerrar()
+
+        assert chamadas == [str(tmp_path), str(tmp_path)]
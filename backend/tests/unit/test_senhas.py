@@ -0,0 +1,174 @@
+"""Testes unitarios para o executor de senhas"""
+import asyncio
+import threading
+
+import pytest
+
+from app.exceptions import ServicoSobrecarregado
+from app.models.models import Usuario
+from app.services import metricas
+from app.services.senhas import ExecutorSenhas, PoliticaSenhas, calibrar, gerar_hash_senha, verificar_senha
+
+
+def _aguardar(evento: threading.Event) -> bool:
+    """Tarefa bloqueante usada para ocupar o executor"""
+    return evento.wait(timeout=5)
+
+
+class TestExecutorSenhas:
+    """Testes do hash e da verificação fora do event loop"""
+
+    async def test_hash_e_verificacao(self):
+        """Testa que o hash gerado no executor é verificado corretamente"""
+        senha_hash = await gerar_hash_senha("senha123")
+
+        assert await verificar_senha("senha123", senha_hash) is True
+        assert await verificar_senha("errada", senha_hash) is False
+
+    async def test_nao_bloqueia_event_loop(self):
+        """Testa que o loop continua atendendo enquanto o hash é calculado"""
+        executor = ExecutorSenhas("thread", trabalhadores=1, fila_maxima=0)
+        evento = threading.Event()
+        try:
+            tarefa = asyncio.create_task(executor.executar(_aguardar, evento))
+            await asyncio.sleep(0.01)
+            assert not tarefa.done()
+
+            evento.set()
+            assert await tarefa is True
+        finally:
+            executor.encerrar()
+
+    async def test_fila_cheia_recusa_requisicao(self):
+        """Testa que trabalhadores e fila ocupados resultam em ServicoSobrecarregado"""
+        executor = ExecutorSenhas("thread", trabalhadores=1, fila_maxima=1)
+        evento = threading.Event()
+        try:
+            ocupadas = [asyncio.create_task(executor.executar(_aguardar, evento)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+
+            with pytest.raises(ServicoSobrecarregado):
+                await executor.executar(_aguardar, evento)
+
+            evento.set()
+            assert await asyncio.gather(*ocupadas) == [True, True]
+            # As vagas são devolvidas ao terminar
+            assert await executor.executar(_aguardar, evento) is True
+        finally:
+            executor.encerrar()
+
+    async def test_pool_de_processos(self):
+        """Testa o executor com pool de processos"""
+        from app.services.senhas import _gerar_hash, _verificar
+
+        executor = ExecutorSenhas("processo", trabalhadores=1, fila_maxima=0)
+        try:
+            senha_hash = await executor.executar(_gerar_hash, "senha123")
+            assert await executor.executar(_verificar, "senha123", senha_hash) is True
+        finally:
+            executor.encerrar()
+
+    def test_tipo_invalido(self):
+        """Testa que um tipo de executor desconhecido é rejeitado"""
+        with pytest.raises(ValueError):
+            ExecutorSenhas("fibra", trabalhadores=1, fila_maxima=0)
+
+
+class TestPoliticaSenhas:
+    """Testes da política de hash (esquema, custo e pepper)"""
+
+    def test_custo_diferente_precisa_atualizar(self):
+        """Hash com outros rounds é aceito, mas marcado para atualização"""
+        antiga = PoliticaSenhas("bcrypt", bcrypt_rounds=4)
+        atual = PoliticaSenhas("bcrypt", bcrypt_rounds=5)
+        senha_hash = antiga.gerar_hash("senha123")
+
+        assert atual.verificar("senha123", senha_hash) is True
+        assert atual.precisa_atualizar(senha_hash) is True
+        assert antiga.precisa_atualizar(senha_hash) is False
+
+    def test_verificar_e_atualizar(self):
+        """Senha correta com hash antigo gera o hash da política atual"""
+        senha_hash = PoliticaSenhas("bcrypt", bcrypt_rounds=5).gerar_hash("senha123")
+        atual = PoliticaSenhas("bcrypt", bcrypt_rounds=4)
+
+        assert atual.verificar_e_atualizar("errada", senha_hash) == (False, None)
+        valida, novo_hash = atual.verificar_e_atualizar("senha123", senha_hash)
+        assert valida is True
+        assert novo_hash.startswith("$2b$04$")
+        assert atual.verificar_e_atualizar("senha123", novo_hash) == (True, None)
+
+    def test_pepper(self):
+        """Com pepper, hashes antigos sem pepper são migrados e o segredo é exigido"""
+        sem_pepper = PoliticaSenhas("bcrypt", bcrypt_rounds=4)
+        com_pepper = PoliticaSenhas("bcrypt", bcrypt_rounds=4, pepper="segredo")
+        hash_antigo = sem_pepper.gerar_hash("senha123")
+        hash_novo = com_pepper.gerar_hash("senha123")
+
+        assert com_pepper.verificar("senha123", hash_antigo) is True
+        assert com_pepper.precisa_atualizar(hash_antigo) is True
+        assert com_pepper.verificar("senha123", hash_novo) is True
+        assert com_pepper.precisa_atualizar(hash_novo) is False
+        assert PoliticaSenhas("bcrypt", bcrypt_rounds=4, pepper="outro").verificar("senha123", hash_novo) is False
+        with pytest.raises(ValueError):
+            sem_pepper.verificar("senha123", hash_novo)
+
+    def test_troca_de_esquema(self):
+        """Hash bcrypt continua válido com argon2 e é migrado"""
+        pytest.importorskip("argon2")
+        senha_hash = PoliticaSenhas("bcrypt", bcrypt_rounds=4).gerar_hash("senha123")
+        argon2 = PoliticaSenhas("argon2", argon2_time_cost=1, argon2_memoria_kib=1024, argon2_paralelismo=1)
+
+        valida, novo_hash = argon2.verificar_e_atualizar("senha123", senha_hash)
+
+        assert valida is True
+        assert novo_hash.startswith("$argon2")
+        assert argon2.precisa_atualizar(novo_hash) is False
+        assert PoliticaSenhas(
+            "argon2", argon2_time_cost=1, argon2_memoria_kib=2048, argon2_paralelismo=1
+        ).precisa_atualizar(novo_hash) is True
+
+    def test_esquema_invalido(self):
+        """Esquema desconhecido é rejeitado"""
+        with pytest.raises(ValueError):
+            PoliticaSenhas("md5")
+
+    def test_calibrar(self):
+        """Calibração para no primeiro custo acima do alvo e recomenda o anterior"""
+        recomendados, medicoes = calibrar("bcrypt", alvo_ms=0, repeticoes=1)
+
+        assert len(medicoes) == 1
+        assert recomendados == medicoes[0].parametros == {"bcrypt_rounds": 8}
+
+
+class TestAtualizacaoNoLogin:
+    """Testes da atualização do hash no login"""
+
+    def test_login_refaz_hash_fora_da_politica(self, client, db, usuario_teste):
+        """Login com hash de custo antigo grava o hash da política atual"""
+        usuario_teste.senha = PoliticaSenhas("bcrypt", bcrypt_rounds=4).gerar_hash("senha123")
+        db.commit()
+        atualizadas = metricas.senhas_atualizadas.valor(esquema="bcrypt")
+
+        response = client.post("/auth/login", json={"email": "teste@exemplo.com", "senha": "senha123"})
+
+        assert response.status_code == 200
+        db.expire_all()
+        senha_hash = db.get(Usuario, usuario_teste.id).senha
+        assert not senha_hash.startswith("$2b$04$")
+        assert metricas.senhas_atualizadas.valor(esquema="bcrypt") == atualizadas + 1
+
+        # O hash novo já segue a política: o próximo login não grava nada
+        assert client.post("/auth/login", json={"email": "teste@exemplo.com", "senha": "senha123"}).status_code == 200
+        assert metricas.senhas_atualizadas.valor(esquema="bcrypt") == atualizadas + 1
+
+    def test_senha_errada_nao_altera_hash(self, client, db, usuario_teste):
+        """Senha incorreta não grava hash"""
+        usuario_teste.senha = hash_antigo = PoliticaSenhas("bcrypt", bcrypt_rounds=4).gerar_hash("senha123")
+        db.commit()
+
+        response = client.post("/auth/login", json={"email": "teste@exemplo.com", "senha": "errada"})
+
+        assert response.status_code == 401
+        db.expire_all()
+        assert db.get(Usuario, usuario_teste.id).senha == hash_antigo
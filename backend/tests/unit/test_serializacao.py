@@ -0,0 +1,65 @@
+"""Testes unitarios para a serialização das respostas"""
+import json
+from typing import List
+
+from sqlalchemy import select
+
+from app.models.models import Categoria, Ingrediente
+from app.schemas.schemas import CategoriaResponse, IngredienteResponse, ProdutoResponse
+from app.services.carregamento import consultar_produtos
+from app.services.serializacao import (
+    CATEGORIAS, INGREDIENTES, PRODUTOS, colunas, resposta_json
+)
+
+
+def _caminho_padrao(modelo, dados) -> list:
+    """Resultado do caminho antigo: validar, converter para dicts e json"""
+    return [json.loads(modelo.model_validate(item).model_dump_json()) for item in dados]
+
+
+class TestRespostaJson:
+    """Testes do serializador baseado em TypeAdapter"""
+
+    def test_produtos_iguais_ao_caminho_padrao(self, db, cardapio_completo):
+        """Testa que o corpo gerado é o mesmo do response_model"""
+        produtos = consultar_produtos(db).all()
+
+        resposta = resposta_json(PRODUTOS, produtos)
+
+        assert resposta.status_code == 200
+        assert resposta.media_type == "application/json"
+        assert json.loads(resposta.body) == _caminho_padrao(ProdutoResponse, produtos)
+
+    def test_headers_e_status(self, db):
+        """Testa que status e headers adicionais são repassados"""
+        resposta = resposta_json(PRODUTOS, [], status_code=201, headers={"X-Proximo-Cursor": "abc"})
+
+        assert resposta.status_code == 201
+        assert resposta.headers["X-Proximo-Cursor"] == "abc"
+        assert resposta.body == b"[]"
+
+
+class TestLinhas:
+    """Testes da serialização direta de linhas, sem objetos ORM"""
+
+    def test_colunas_seguem_o_schema(self):
+        """Testa que as colunas selecionadas são exatamente os campos do schema"""
+        selecionadas = colunas(Categoria, CategoriaResponse)
+
+        assert [coluna.key for coluna in selecionadas] == list(CategoriaResponse.model_fields)
+
+    def test_categorias_a_partir_de_linhas(self, db, categorias_diversas):
+        """Testa que linhas de colunas geram o mesmo JSON que os objetos"""
+        linhas = db.execute(select(*colunas(Categoria, CategoriaResponse)).order_by(Categoria.id)).all()
+        objetos = db.query(Categoria).order_by(Categoria.id).all()
+
+        assert json.loads(resposta_json(CATEGORIAS, linhas).body) == _caminho_padrao(CategoriaResponse, objetos)
+
+    def test_ingredientes_a_partir_de_linhas(self, db, ingredientes_diversos):
+        """Testa a listagem de ingredientes a partir de linhas"""
+        linhas = db.execute(select(*colunas(Ingrediente, IngredienteResponse)).order_by(Ingrediente.nome)).all()
+
+        corpo: List[dict] = json.loads(resposta_json(INGREDIENTES, linhas).body)
+
+        assert [item["nome"] for item in corpo] == sorted(i.nome for i in ingredientes_diversos)
+        assert set(corpo[0]) == set(IngredienteResponse.model_fields)
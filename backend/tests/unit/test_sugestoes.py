@@ -0,0 +1,76 @@
+"""Testes unitarios para o autocomplete do cardapio"""
+from app.services.catalogo import obter_catalogo
+from app.services.sugestoes import ArvoreBK, IndiceSugestoes, levenshtein, sugerir
+
+
+class TestDistancia:
+    """Testes da distância de edição e da BK-tree"""
+
+    def test_levenshtein(self):
+        """Testa inserção, remoção e troca"""
+        assert levenshtein("calabresa", "calabresa") == 0
+        assert levenshtein("calabreza", "calabresa") == 1
+        assert levenshtein("musarela", "mussarela") == 1
+        assert levenshtein("", "pizza") == 5
+
+    def test_arvore_bk_respeita_tolerancia(self):
+        """Testa que só palavras dentro da distância máxima são retornadas"""
+        arvore = ArvoreBK()
+        for palavra in ["calabresa", "catupiry", "mussarela", "margherita", "bacon", "cebola"]:
+            arvore.adicionar(palavra)
+
+        assert arvore.buscar("calabreza", 1) == [(1, "calabresa")]
+        assert arvore.buscar("musarella", 2) == [(2, "mussarela")]
+        assert arvore.buscar("xyz", 1) == []
+
+
+class TestIndiceSugestoes:
+    """Testes do índice de sugestões sobre o catálogo"""
+
+    def test_prefixo_no_inicio_vem_antes(self, db, cardapio_completo):
+        """Testa que nomes começando pelo prefixo vêm antes de palavras internas"""
+        indice = IndiceSugestoes(obter_catalogo(db))
+
+        nomes = [s.nome for s in indice.sugerir("c", 10)]
+
+        assert nomes[0] == "Coca-Cola"
+        assert "Pizza Calabresa" in nomes
+        assert nomes.index("Coca-Cola") < nomes.index("Pizza Calabresa")
+
+    def test_inclui_ingredientes_disponiveis(self, db, cardapio_completo):
+        """Testa que ingredientes disponíveis são sugeridos e indisponíveis não"""
+        indice = IndiceSugestoes(obter_catalogo(db))
+
+        assert [(s.tipo, s.nome) for s in indice.sugerir("calab", 10)] == [
+            ("ingrediente", "Calabresa"), ("produto", "Pizza Calabresa")
+        ]
+        assert indice.sugerir("bacon", 10) == []
+        assert indice.sugerir("brownie", 10) == []
+
+    def test_corrige_erros_de_digitacao(self, db, cardapio_completo):
+        """Testa a correção de palavras com um ou dois erros"""
+        indice = IndiceSugestoes(obter_catalogo(db))
+
+        assert [s.nome for s in indice.sugerir("calabreza", 10)] == ["Pizza Calabresa", "Calabresa"]
+        assert [s.nome for s in indice.sugerir("Portugueza", 10)] == ["Pizza Portuguesa"]
+        assert [s.nome for s in indice.sugerir("pizsa calab", 10)] == ["Pizza Calabresa"]
+
+    def test_reconstroi_quando_catalogo_muda(self, db, cardapio_completo):
+        """Testa que a sugestão reflete o catálogo após um commit"""
+        assert sugerir(db, "lusitana") == []
+
+        produto = cardapio_completo["produtos"][1]
+        produto.nome = "Pizza Lusitana"
+        db.commit()
+
+        assert [s.nome for s in sugerir(db, "lusit")] == ["Pizza Lusitana"]
+
+    def test_ignora_produto_sem_ingrediente_obrigatorio(self, db, cardapio_completo):
+        """Testa que um produto que não pode ser pedido não é sugerido"""
+        assert [s.nome for s in sugerir(db, "pizza calab")] == ["Pizza Calabresa"]
+
+        cardapio_completo["ingredientes"][0].disponivel = False  # Mussarela, obrigatória na Calabresa
+        db.commit()
+
+        assert sugerir(db, "pizza calab") == []
+        assert "Pizza Calabresa" not in [s.nome for s in sugerir(db, "pizza")]
@@ -0,0 +1,145 @@
+"""Testes unitarios para a memoização de tokens verificados"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from jose import JWTError, jwt
+
+from app.config import ALGORITHM, SECRET_KEY
+from app.services import chaves, tokens
+from app.services.chaves import Chaveiro, gerar_chave
+from app.services.tokens import MemoTokens
+
+
+def _token(segundos: float = 600, **claims) -> str:
+    """Token assinado que vence em `segundos`"""
+    claims.setdefault("sub", "1")
+    if segundos is not None:
+        claims["exp"] = datetime.now(timezone.utc) + timedelta(seconds=segundos)
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class TestMemoTokens:
+    """Testes do memo de claims verificadas"""
+
+    def test_verifica_uma_vez(self):
+        """Token repetido não é verificado de novo"""
+        memo = MemoTokens(max_entradas=10)
+        token = _token()
+
+        with patch.object(chaves.jwt, "decode", wraps=jwt.decode) as decode:
+            primeiro = memo.decodificar(token)
+            segundo = memo.decodificar(token)
+
+        assert decode.call_count == 1
+        assert segundo is primeiro
+        assert primeiro["sub"] == "1"
+
+    def test_claims_somente_leitura(self):
+        """Claims compartilhadas não podem ser alteradas por quem lê"""
+        claims = MemoTokens(max_entradas=10).decodificar(_token())
+
+        with pytest.raises(TypeError):
+            claims["sub"] = "2"
+
+    def test_token_invalido_nao_entra(self):
+        """Assinatura incorreta falha sempre e não ocupa o memo"""
+        memo = MemoTokens(max_entradas=10)
+        adulterado = _token()[:-2] + "xx"
+
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                memo.decodificar(adulterado)
+        assert len(memo) == 0
+
+    def test_expira_no_exp(self):
+        """Depois do exp o token volta a passar por jwt.decode (que o recusa)"""
+        memo = MemoTokens(max_entradas=10)
+        token = _token(segundos=60)
+        memo.decodificar(token)
+
+        with patch.object(tokens.time, "time", return_value=time.time() + 120), \
+                patch.object(chaves.jwt, "decode", side_effect=JWTError("Signature has expired.")) as decode:
+            with pytest.raises(JWTError):
+                memo.decodificar(token)
+
+        assert decode.call_count == 1
+        assert len(memo) == 0
+
+    def test_sem_exp_nao_memoiza(self):
+        """Tokens sem exp são sempre verificados"""
+        memo = MemoTokens(max_entradas=10)
+        memo.decodificar(_token(segundos=None))
+
+        assert len(memo) == 0
+
+    def test_limite_lru(self):
+        """Acima do limite sai o token usado há mais tempo"""
+        memo = MemoTokens(max_entradas=2)
+        primeiro, segundo, terceiro = (_token(sub=str(i)) for i in range(3))
+
+        memo.decodificar(primeiro)
+        memo.decodificar(segundo)
+        memo.decodificar(primeiro)
+        memo.decodificar(terceiro)
+
+        assert len(memo) == 2
+        with patch.object(chaves.jwt, "decode", wraps=jwt.decode) as decode:
+            memo.decodificar(primeiro)
+            memo.decodificar(segundo)
+        assert decode.call_count == 1
+
+    def test_concorrencia(self):
+        """Várias threads com tokens repetidos recebem as claims corretas"""
+        memo = MemoTokens(max_entradas=4)
+        lista = [_token(sub=str(i)) for i in range(8)]
+        erros = []
+
+        def trabalhar():
+            for _ in range(200):
+                for i, token in enumerate(lista):
+                    if memo.decodificar(token)["sub"] != str(i):
+                        erros.append(i)
+
+        threads = [threading.Thread(target=trabalhar) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not erros
+        assert len(memo) <= 4
+
+    def test_chave_removida_invalida_o_memo(self, tmp_path):
+        """Depois da recarga sem o kid, o token memoizado é recusado"""
+        gerar_chave(str(tmp_path), "ES256", "antiga")
+        token = Chaveiro("ES256", diretorio=str(tmp_path)).assinar({"sub": "1", "exp": int(time.time()) + 600})
+        gerar_chave(str(tmp_path), "ES256", "nova")
+        chaveiro = Chaveiro("ES256", diretorio=str(tmp_path), chave_ativa="nova")
+        memo = MemoTokens(max_entradas=10)
+
+        with patch.object(tokens, "chaveiro", chaveiro):
+            assert memo.decodificar(token)["sub"] == "1"
+
+            (tmp_path / "antiga.pem").unlink()
+            chaveiro.recarregar()
+
+            with pytest.raises(JWTError):
+                memo.decodificar(token)
+        assert len(memo) == 0
+
+
+class TestRotas:
+    """Testes das rotas com o memo"""
+
+    def test_token_repetido_nas_rotas(self, client, token_usuario):
+        """Requisições seguidas com o mesmo token verificam a assinatura uma vez"""
+        headers = {"Authorization": f"Bearer {token_usuario}"}
+
+        with patch.object(chaves.jwt, "decode", wraps=jwt.decode) as decode:
+            for _ in range(3):
+                assert client.get("/pedidos/meus", headers=headers).status_code == 200
+
+        assert decode.call_count == 1